@@ -72,7 +72,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            # SQLite cannot ALTER most things; batch mode rebuilds the table instead
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
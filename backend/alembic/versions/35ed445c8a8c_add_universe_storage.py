@@ -0,0 +1,33 @@
+"""add universe storage
+
+Revision ID: 35ed445c8a8c
+Revises: 8b1b19fd8a33
+Create Date: 2026-10-19 07:24:31.843125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '35ed445c8a8c'
+down_revision: Union[str, Sequence[str], None] = '8b1b19fd8a33'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('universes', sa.Column('storage', sa.String(), server_default='live', nullable=False))
+    # Existing universes count as opened now, so none is archived on upgrade
+    op.add_column('universes', sa.Column('last_accessed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('universes', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('universes', 'archived_at')
+    op.drop_column('universes', 'last_accessed_at')
+    op.drop_column('universes', 'storage')
@@ -0,0 +1,28 @@
+"""add tweaks universe index
+
+Revision ID: 8b1b19fd8a33
+Revises: 2c7f396a9847
+Create Date: 2026-10-19 06:55:11.019376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1b19fd8a33'
+down_revision: Union[str, Sequence[str], None] = '2c7f396a9847'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tweaks_universe_story', 'tweaks', ['universe_id', sa.text('coalesce(custom_date, created_at)'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tweaks_universe_story', table_name='tweaks')
@@ -0,0 +1,64 @@
+"""add universe branches
+
+Revision ID: a4c8e0f27b93
+Revises: f3b9d26a8e17
+Create Date: 2026-10-19 18:12:44.901532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e0f27b93'
+down_revision: Union[str, Sequence[str], None] = 'f3b9d26a8e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('universes', sa.Column('parent_universe_id', sa.Integer(), nullable=True))
+    op.add_column('universes', sa.Column('branch_watermarks', sa.JSON(), nullable=True))
+    op.create_index(op.f('ix_universes_parent_universe_id'), 'universes', ['parent_universe_id'], unique=False)
+    op.create_foreign_key(None, 'universes', 'universes', ['parent_universe_id'], ['id'])
+
+    op.add_column('tweaks', sa.Column('overrides_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(None, 'tweaks', 'tweaks', ['overrides_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_tweaks_overrides_id', 'tweaks', ['overrides_id'], unique=False, postgresql_where=sa.text('overrides_id IS NOT NULL'))
+    op.create_index('ix_tweaks_reply_to_tweak_id', 'tweaks', ['reply_to_tweak_id'], unique=False, postgresql_where=sa.text('reply_to_tweak_id IS NOT NULL'))
+
+    op.add_column('tweaknow_characters', sa.Column('overrides_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(None, 'tweaknow_characters', 'tweaknow_characters', ['overrides_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_tweaknow_characters_overrides_id', 'tweaknow_characters', ['overrides_id'], unique=False, postgresql_where=sa.text('overrides_id IS NOT NULL'))
+
+    op.create_table('branch_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('universe_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['universe_id'], ['universes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('universe_id', 'kind', 'target_id', name='unique_tombstone')
+    )
+    op.create_index(op.f('ix_branch_tombstones_id'), 'branch_tombstones', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_branch_tombstones_id'), table_name='branch_tombstones')
+    op.drop_table('branch_tombstones')
+    op.drop_index('ix_tweaknow_characters_overrides_id', table_name='tweaknow_characters', postgresql_where=sa.text('overrides_id IS NOT NULL'))
+    op.drop_constraint('tweaknow_characters_overrides_id_fkey', 'tweaknow_characters', type_='foreignkey')
+    op.drop_column('tweaknow_characters', 'overrides_id')
+    op.drop_index('ix_tweaks_reply_to_tweak_id', table_name='tweaks', postgresql_where=sa.text('reply_to_tweak_id IS NOT NULL'))
+    op.drop_index('ix_tweaks_overrides_id', table_name='tweaks', postgresql_where=sa.text('overrides_id IS NOT NULL'))
+    op.drop_constraint('tweaks_overrides_id_fkey', 'tweaks', type_='foreignkey')
+    op.drop_column('tweaks', 'overrides_id')
+    op.drop_constraint('universes_parent_universe_id_fkey', 'universes', type_='foreignkey')
+    op.drop_index(op.f('ix_universes_parent_universe_id'), table_name='universes')
+    op.drop_column('universes', 'branch_watermarks')
+    op.drop_column('universes', 'parent_universe_id')
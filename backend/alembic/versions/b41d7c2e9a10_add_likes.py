@@ -0,0 +1,41 @@
+"""add likes
+
+Revision ID: b41d7c2e9a10
+Revises: f833cac79b19
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7c2e9a10'
+down_revision: Union[str, Sequence[str], None] = 'f833cac79b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('likes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('character_id', sa.Integer(), nullable=False),
+    sa.Column('tweak_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['character_id'], ['tweaknow_characters.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tweak_id'], ['tweaks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('character_id', 'tweak_id', name='unique_like')
+    )
+    op.create_index(op.f('ix_likes_id'), 'likes', ['id'], unique=False)
+    op.create_index(op.f('ix_likes_tweak_id'), 'likes', ['tweak_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_likes_tweak_id'), table_name='likes')
+    op.drop_index(op.f('ix_likes_id'), table_name='likes')
+    op.drop_table('likes')
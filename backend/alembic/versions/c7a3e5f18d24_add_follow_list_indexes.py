@@ -0,0 +1,30 @@
+"""add follow list indexes
+
+Revision ID: c7a3e5f18d24
+Revises: b41d7c2e9a10
+Create Date: 2026-10-19 11:02:17.530412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3e5f18d24'
+down_revision: Union[str, Sequence[str], None] = 'b41d7c2e9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_character_follows_following_id_id', 'character_follows', ['following_id', 'id'], unique=False)
+    op.create_index('ix_character_follows_follower_id_id', 'character_follows', ['follower_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_character_follows_follower_id_id', table_name='character_follows')
+    op.drop_index('ix_character_follows_following_id_id', table_name='character_follows')
@@ -0,0 +1,47 @@
+"""add engagement indexes
+
+Revision ID: d5e82b9c4f31
+Revises: c7a3e5f18d24
+Create Date: 2026-10-19 13:40:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e82b9c4f31'
+down_revision: Union[str, Sequence[str], None] = 'c7a3e5f18d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The retweets table predates the migration history (it was created by
+    # create_all); create it here on databases built from migrations alone
+    if not sa.inspect(op.get_bind()).has_table('retweets'):
+        op.create_table('retweets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('character_id', sa.Integer(), nullable=False),
+        sa.Column('tweak_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['character_id'], ['tweaknow_characters.id'], ),
+        sa.ForeignKeyConstraint(['tweak_id'], ['tweaks.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('character_id', 'tweak_id', name='unique_retweet')
+        )
+        op.create_index(op.f('ix_retweets_id'), 'retweets', ['id'], unique=False)
+    op.create_index(op.f('ix_tweaks_character_id'), 'tweaks', ['character_id'], unique=False)
+    op.create_index('ix_tweaks_quoted_tweak_id', 'tweaks', ['quoted_tweak_id'], unique=False,
+                    postgresql_where=sa.text('quoted_tweak_id IS NOT NULL'))
+    op.create_index(op.f('ix_retweets_tweak_id'), 'retweets', ['tweak_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_retweets_tweak_id'), table_name='retweets')
+    op.drop_index('ix_tweaks_quoted_tweak_id', table_name='tweaks')
+    op.drop_index(op.f('ix_tweaks_character_id'), table_name='tweaks')
@@ -0,0 +1,28 @@
+"""add universe ranking weights
+
+Revision ID: e1f04a7b6c52
+Revises: d5e82b9c4f31
+Create Date: 2026-10-19 15:21:08.664310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f04a7b6c52'
+down_revision: Union[str, Sequence[str], None] = 'd5e82b9c4f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('universes', sa.Column('ranking_weights', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('universes', 'ranking_weights')
@@ -0,0 +1,34 @@
+"""add profile tab indexes
+
+Revision ID: f3b9d26a8e17
+Revises: e1f04a7b6c52
+Create Date: 2026-10-19 16:48:31.207115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d26a8e17'
+down_revision: Union[str, Sequence[str], None] = 'e1f04a7b6c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tweaks_character_story', 'tweaks', ['character_id', sa.text('coalesce(custom_date, created_at)'), 'id'], unique=False)
+    op.create_index('ix_tweaks_character_posts', 'tweaks', ['character_id', sa.text('coalesce(custom_date, created_at)'), 'id'], unique=False, postgresql_where=sa.text('reply_to_tweak_id IS NULL'))
+    op.create_index('ix_tweaks_character_media', 'tweaks', ['character_id', sa.text('coalesce(custom_date, created_at)'), 'id'], unique=False, postgresql_where=sa.text('cardinality(images) > 0'))
+    op.create_index('ix_likes_character_id_id', 'likes', ['character_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_likes_character_id_id', table_name='likes')
+    op.drop_index('ix_tweaks_character_media', table_name='tweaks', postgresql_where=sa.text('cardinality(images) > 0'))
+    op.drop_index('ix_tweaks_character_posts', table_name='tweaks', postgresql_where=sa.text('reply_to_tweak_id IS NULL'))
+    op.drop_index('ix_tweaks_character_story', table_name='tweaks')
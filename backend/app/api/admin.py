@@ -0,0 +1,102 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.auth import get_current_admin
+from app.core import profiling
+from app.core.database import get_db
+from app.crud import archive as crud_archive
+from app.schemas.user import User
+
+router = APIRouter()
+
+KEY_TYPES = {"lineno", "filename", "traceback"}
+
+
+# ===== REQUEST PROFILES =====
+@router.get("/profiles")
+def list_profiles(current_admin: User = Depends(get_current_admin)):
+    """Profiles written by requests sent with `X-Profile: 1`, newest first"""
+    return {"profiles": profiling.list_profiles()}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_admin: User = Depends(get_current_admin)):
+    """Collapsed stacks, loadable in speedscope or flamegraph.pl"""
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+
+
+# ===== MEMORY SNAPSHOTS =====
+@router.get("/memory")
+def memory_status(current_admin: User = Depends(get_current_admin)):
+    return profiling.tracing_status()
+
+@router.post("/memory/start")
+def start_memory_tracing(frames: int = 25, current_admin: User = Depends(get_current_admin)):
+    """Start tracemalloc in this worker. Allocation tracking slows the worker down noticeably."""
+    profiling.start_tracing(max(1, min(frames, 100)))
+    return profiling.tracing_status()
+
+@router.post("/memory/stop")
+def stop_memory_tracing(current_admin: User = Depends(get_current_admin)):
+    profiling.stop_tracing()
+    return profiling.tracing_status()
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+def take_memory_snapshot(current_admin: User = Depends(get_current_admin)):
+    try:
+        return profiling.take_snapshot()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@router.get("/memory/snapshots/{snapshot_id}")
+def get_memory_snapshot(
+    snapshot_id: int,
+    key_type: str = "lineno",
+    limit: int = 25,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Largest allocation sites in one snapshot"""
+    if key_type not in KEY_TYPES:
+        raise HTTPException(status_code=400, detail=f"key_type must be one of {sorted(KEY_TYPES)}")
+    snapshot = profiling.get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"id": snapshot_id, "top": profiling.snapshot_top(snapshot, key_type, limit)}
+
+@router.get("/memory/snapshots/{snapshot_id}/diff/{base_snapshot_id}")
+def diff_memory_snapshots(
+    snapshot_id: int,
+    base_snapshot_id: int,
+    key_type: str = "lineno",
+    limit: int = 25,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Allocation growth between two snapshots of this worker, largest first"""
+    if key_type not in KEY_TYPES:
+        raise HTTPException(status_code=400, detail=f"key_type must be one of {sorted(KEY_TYPES)}")
+    newer = profiling.get_snapshot(snapshot_id)
+    older = profiling.get_snapshot(base_snapshot_id)
+    if newer is None or older is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {
+        "id": snapshot_id,
+        "base_id": base_snapshot_id,
+        "diff": profiling.snapshot_diff(newer, older, key_type, limit),
+    }
+
+
+# ===== COLD STORAGE =====
+
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+def archive_cold_universes(
+    older_than_days: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """Queue archive jobs for universes unopened for `older_than_days` (ARCHIVE_AFTER_DAYS by default)"""
+    return {"queued": crud_archive.enqueue_cold(db, older_than_days)}
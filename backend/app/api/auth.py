@@ -7,6 +7,7 @@ from jose import JWTError, jwt
 from app.core.database import get_db
 from app.core.security import verify_password, create_access_token
 from app.core.config import settings
+from app.core.profiling import is_admin_email
 from app.schemas.user import UserCreate, User, Token, UserLogin
 from app.crud import user as crud_user
 
@@ -32,6 +33,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
     return user
 
+def get_current_admin(current_user: User = Depends(get_current_user)):
+    if not is_admin_email(current_user.email):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
 @router.post("/signup", response_model=User, status_code=status.HTTP_201_CREATED)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
     # Check if email exists
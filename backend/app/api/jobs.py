@@ -0,0 +1,48 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.auth import get_current_user
+from app.core.database import get_db
+from app.crud import jobs as crud_jobs
+from app.schemas.job import Job
+from app.schemas.user import User
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Job])
+def get_jobs(
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The caller's jobs, newest first"""
+    return crud_jobs.get_jobs(db, current_user.id, status=status, skip=skip, limit=min(limit, 100))
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # The primary, not a replica: pollers want the latest progress
+    job = crud_jobs.get_job(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{job_id}/cancel", response_model=Job)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a queued job, or ask a running one to stop; check the returned status"""
+    job = crud_jobs.get_job(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in crud_jobs.FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return crud_jobs.cancel_job(db, job)
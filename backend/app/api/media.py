@@ -0,0 +1,55 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.auth import get_current_user
+from app.core import media
+from app.core.database import get_db
+from app.crud import media as crud_media
+from app.schemas.media import Media
+from app.schemas.user import User
+
+router = APIRouter()
+
+# Stored files never change: their name is their content hash
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.post("/", response_model=List[Media], status_code=status.HTTP_201_CREATED)
+async def upload_media(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload up to MEDIA_MAX_FILES images as multipart/form-data file parts.
+    The body is streamed to disk, never parsed into memory as a whole.
+    """
+    try:
+        files = await media.receive_images(request)
+    except media.MediaError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+    rows = await run_in_threadpool(crud_media.record_uploads, db, current_user.id, files)
+    return [
+        Media(
+            id=row.id,
+            sha256=row.sha256,
+            content_type=row.content_type,
+            size_bytes=row.size_bytes,
+            url=str(request.url_for("get_media", filename=f.stored_name)),
+            created_at=row.created_at,
+        )
+        for row, f in zip(rows, files)
+    ]
+
+@router.get("/{filename}", name="get_media")
+def get_media(filename: str):
+    """Public: image URLs are used directly by <Image> components and exported pages"""
+    path = media.media_path(filename)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Media not found")
+    extension = filename.rsplit(".", 1)[1]
+    return FileResponse(path, media_type=media.CONTENT_TYPES[extension], headers={"Cache-Control": IMMUTABLE})
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+router = APIRouter()
+
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost", "testclient"}
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint. Async so threadpool stats are read from the event loop."""
+    if settings.METRICS_LOCAL_ONLY:
+        client_host = request.client.host if request.client else None
+        if client_host not in LOCAL_HOSTS:
+            raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,32 +1,67 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core import autocomplete
+from app.core.cache import cached_response, encode_json
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.impressions import buffer as impression_buffer
+from app.core import render
+from app.core.zipstream import stream_zip
 from app.api.auth import get_current_user
 from app.schemas.tweaknow import (
     TweakNowCharacter, TweakNowCharacterCreate, TweakNowCharacterUpdate,
-    Tweak, TweakCreate, TweakUpdate,
+    Tweak, TweakCreate, TweakUpdate, TweakThread,
     TweakTemplate, TweakTemplateCreate,
-    RetweetCreate, RetweetResponse
+    RetweetCreate, RetweetResponse,
+    LikeCreate, LikeResponse,
+    ViewerStateRequest, ViewerState,
+    FollowPage, FollowSuggestion,
+    CharacterProfile, ProfileTweakPage,
+    ImpressionBatch, ImpressionAck,
+    AutocompleteSuggestion
 )
 from app.schemas.user import User
+from app.crud import branches as crud_branches
 from app.crud import tweaknow as crud_tweaknow
 from app.crud import universe as crud_universe
 
 router = APIRouter()
 
+# Cached routes return encoded bodies, so they serialize through the response model themselves
+_characters_adapter = TypeAdapter(List[TweakNowCharacter])
+_suggestions_adapter = TypeAdapter(List[FollowSuggestion])
+
+def _reject_on_branch(universe):
+    """Likes, retweets and follows live outside the branch overlay (see app/crud/branches.py)"""
+    if crud_branches.is_branch(universe):
+        raise HTTPException(
+            status_code=409, detail="Likes, retweets and follows can only be changed in the parent universe"
+        )
+
 # ===== CHARACTER ROUTES =====
 @router.get("/universes/{universe_id}/characters", response_model=List[TweakNowCharacter])
 def get_characters(
     universe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    return crud_tweaknow.get_characters(db, universe_id=universe_id)
+    if crud_branches.is_branch(universe):
+        return cached_response(
+            "characters", universe_id,
+            lambda: _characters_adapter.validate_python(crud_branches.get_characters(db, universe)),
+            base_universe_id=universe.parent_universe_id,
+        )
+    return cached_response(
+        "characters", universe_id,
+        lambda: _characters_adapter.validate_python(crud_tweaknow.get_characters(db, universe_id=universe_id)),
+    )
 
 @router.post("/universes/{universe_id}/characters", response_model=TweakNowCharacter, status_code=status.HTTP_201_CREATED)
 def create_character(
@@ -52,9 +87,14 @@ def update_character(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    db_character = crud_tweaknow.update_character(
-        db, character_id=character_id, universe_id=universe_id, character_update=character_update
-    )
+    if crud_branches.is_branch(universe):
+        db_character = crud_branches.update_entity(
+            db, universe, "character", character_id, character_update.dict(exclude_unset=True)
+        )
+    else:
+        db_character = crud_tweaknow.update_character(
+            db, character_id=character_id, universe_id=universe_id, character_update=character_update
+        )
     if not db_character:
         raise HTTPException(status_code=404, detail="Character not found")
     return db_character
@@ -69,7 +109,10 @@ def delete_character(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    success = crud_tweaknow.delete_character(db, character_id=character_id, universe_id=universe_id)
+    if crud_branches.is_branch(universe):
+        success = crud_branches.delete_entity(db, universe, "character", character_id)
+    else:
+        success = crud_tweaknow.delete_character(db, character_id=character_id, universe_id=universe_id)
     if not success:
         raise HTTPException(status_code=404, detail="Character not found")
     return None
@@ -79,17 +122,46 @@ def delete_character(
 @router.get("/universes/{universe_id}/tweaks")
 def get_tweaks(
     universe_id: int,
-    db: Session = Depends(get_db),
+    mode: str = Query("latest", pattern="^(latest|for_you)$"),
+    character_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get feed with tweets AND retweets"""
+    """
+    Get feed with tweets AND retweets. mode=for_you returns the `limit`
+    best-ranked tweets for `character_id` instead (see app/core/ranking.py).
+    """
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
+
+    if mode == "for_you":
+        if character_id is None:
+            raise HTTPException(status_code=422, detail="character_id is required for mode=for_you")
+        tweets, characters = crud_branches.read_views(universe)
+
+        def ranked_feed():
+            feed = crud_tweaknow.get_ranked_feed(
+                db, tweets, characters, character_id, weights=universe.ranking_weights, limit=limit,
+                home_universe_ids=crud_branches.home_universe_ids(universe),
+            )
+            if feed is None:
+                raise HTTPException(status_code=404, detail="Character not found")
+            return feed
+
+        return cached_response(
+            "for_you", universe_id, ranked_feed, variant=f"{character_id}:{limit}",
+            base_universe_id=universe.parent_universe_id,
+        )
     
-    # Get feed with retweets
-    feed_items = crud_tweaknow.get_feed_with_retweets(db, universe_id=universe_id)
-    return feed_items
+    if crud_branches.is_branch(universe):
+        return cached_response(
+            "feed", universe_id, lambda: crud_branches.get_feed(db, universe),
+            base_universe_id=universe.parent_universe_id,
+        )
+    # Get feed with retweets (cached until the universe changes)
+    return cached_response("feed", universe_id, lambda: crud_tweaknow.get_feed_with_retweets(db, universe_id=universe_id))
 
 @router.post("/universes/{universe_id}/tweaks", response_model=Tweak, status_code=status.HTTP_201_CREATED)
 def create_tweak(
@@ -105,6 +177,8 @@ def create_tweak(
 
     # If it's a quote tweet, use the quote tweet creator
     if tweak.quoted_tweak_id:
+        if crud_branches.is_branch(universe):
+            return crud_branches.create_quote_tweet(db, universe, tweak)
         return crud_tweaknow.create_quote_tweet(db=db, tweak=tweak)
 
     return crud_tweaknow.create_tweak(db=db, tweak=tweak)
@@ -120,9 +194,12 @@ def update_tweak(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    db_tweak = crud_tweaknow.update_tweak(
-        db, tweak_id=tweak_id, universe_id=universe_id, tweak_update=tweak_update
-    )
+    if crud_branches.is_branch(universe):
+        db_tweak = crud_branches.update_entity(db, universe, "tweak", tweak_id, tweak_update.dict(exclude_unset=True))
+    else:
+        db_tweak = crud_tweaknow.update_tweak(
+            db, tweak_id=tweak_id, universe_id=universe_id, tweak_update=tweak_update
+        )
     if not db_tweak:
         raise HTTPException(status_code=404, detail="Tweak not found")
     return db_tweak
@@ -137,11 +214,91 @@ def delete_tweak(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    success = crud_tweaknow.delete_tweak(db, tweak_id=tweak_id, universe_id=universe_id)
+    if crud_branches.is_branch(universe):
+        success = crud_branches.delete_entity(db, universe, "tweak", tweak_id)
+    else:
+        success = crud_tweaknow.delete_tweak(db, tweak_id=tweak_id, universe_id=universe_id)
     if not success:
         raise HTTPException(status_code=404, detail="Tweak not found")
     return None
 
+@router.get("/universes/{universe_id}/tweaks/{tweak_id}/thread", response_model=TweakThread)
+def get_thread(
+    universe_id: int,
+    tweak_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """A tweet with its quoted tweet and all replies below it"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if crud_branches.is_branch(universe):
+        tweets = crud_branches.visible_tweaks(universe)
+    else:
+        tweets = crud_tweaknow.universe_tweaks(universe_id)
+    thread = crud_tweaknow.get_thread(db, tweets, tweak_id)
+    if thread is None:
+        raise HTTPException(status_code=404, detail="Tweak not found")
+    return thread
+
+
+# ===== CARD RENDERING =====
+THEME_PATTERN = "^(light|dark|dim)$"
+
+def _card_context(db: Session, universe, tweak_id: int, whole_thread: bool):
+    if crud_branches.is_branch(universe):
+        tweets, characters = crud_branches.visible_tweaks(universe), crud_branches.visible_characters(universe)
+    else:
+        tweets = crud_tweaknow.universe_tweaks(universe.id)
+        characters = crud_tweaknow.universe_characters(universe.id)
+    context = crud_tweaknow.get_cards(db, tweets, characters, tweak_id, whole_thread=whole_thread)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Tweak not found")
+    return context
+
+@router.get("/universes/{universe_id}/tweaks/{tweak_id}/render.png")
+def render_tweak(
+    universe_id: int,
+    tweak_id: int,
+    request: Request,
+    theme: str = Query("light", pattern=THEME_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The tweet as an image in the detail-view layout; cached by its inputs (see app/core/render.py)"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    inputs = render.thread_card_inputs(_card_context(db, universe, tweak_id, whole_thread=False), theme)[0]
+    etag = f'"{render.cache_key(inputs)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    path, = render.ensure_rendered([inputs])
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+@router.get("/universes/{universe_id}/tweaks/{tweak_id}/thread/render.zip")
+def render_thread(
+    universe_id: int,
+    tweak_id: int,
+    theme: str = Query("light", pattern=THEME_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cards for a tweet and every reply below it, as a ZIP of PNGs in story order"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    context = _card_context(db, universe, tweak_id, whole_thread=True)
+    paths = render.ensure_rendered(render.thread_card_inputs(context, theme))
+    members = [
+        (f"{index:03d}-{card['id']}.png", path) for index, (card, path) in enumerate(zip(context["cards"], paths))
+    ]
+    return StreamingResponse(
+        stream_zip(members), media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="thread-{tweak_id}-{theme}.zip"'},
+    )
 
 # ===== RETWEET ROUTES (NEW APPROACH) =====
 @router.post("/universes/{universe_id}/tweaks/{tweak_id}/retweet", response_model=RetweetResponse, status_code=status.HTTP_201_CREATED)
@@ -156,11 +313,13 @@ def retweet(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
+    _reject_on_branch(universe)
     
     retweet = crud_tweaknow.create_retweet(
         db,
         character_id=retweet_data.character_id,
-        tweak_id=tweak_id
+        tweak_id=tweak_id,
+        universe_id=universe_id
     )
     if not retweet:
         raise HTTPException(status_code=404, detail="Tweet not found")
@@ -178,8 +337,9 @@ def undo_retweet(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
+    _reject_on_branch(universe)
     
-    success = crud_tweaknow.delete_retweet(db, character_id, tweak_id)
+    success = crud_tweaknow.delete_retweet(db, character_id, tweak_id, universe_id)
     if not success:
         raise HTTPException(status_code=404, detail="Retweet not found")
     return None
@@ -189,7 +349,7 @@ def check_retweet_status(
     universe_id: int,
     tweak_id: int,
     character_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Check if a character has retweeted a tweet"""
@@ -201,10 +361,114 @@ def check_retweet_status(
     return {"is_retweeted": is_retweeted}
 
 
+# ===== LIKE ROUTES =====
+@router.post("/universes/{universe_id}/tweaks/{tweak_id}/like", response_model=LikeResponse)
+def like_tweak(
+    universe_id: int,
+    tweak_id: int,
+    like_data: LikeCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    _reject_on_branch(universe)
+    if not crud_tweaknow.get_character(db, like_data.character_id, universe_id):
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    result = crud_tweaknow.like_tweak(db, like_data.character_id, tweak_id, universe_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Tweet not found")
+    liked, like_count = result
+    return {"liked": liked, "like_count": like_count}
+
+@router.delete("/universes/{universe_id}/tweaks/{tweak_id}/like/{character_id}", response_model=LikeResponse)
+def unlike_tweak(
+    universe_id: int,
+    tweak_id: int,
+    character_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    _reject_on_branch(universe)
+
+    result = crud_tweaknow.unlike_tweak(db, character_id, tweak_id, universe_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Tweet not found")
+    liked, like_count = result
+    return {"liked": liked, "like_count": like_count}
+
+
+# ===== VIEWER STATE =====
+@router.post("/universes/{universe_id}/viewer-state", response_model=ViewerState)
+def get_viewer_state(
+    universe_id: int,
+    request: ViewerStateRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Liked, retweeted and following flags of the acting character for a page of tweets"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    tweets, characters = crud_branches.read_views(universe)
+    tweaks = crud_tweaknow.get_viewer_state(db, tweets, characters, request.character_id, request.tweak_ids)
+    if tweaks is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return {"character_id": request.character_id, "tweaks": tweaks}
+
+
+# ===== IMPRESSIONS =====
+@router.post("/universes/{universe_id}/impressions", response_model=ImpressionAck, status_code=status.HTTP_202_ACCEPTED)
+def record_impressions(
+    universe_id: int,
+    batch: ImpressionBatch,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Count views; they reach view_count with the next buffered flush (see app/core/impressions.py)"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if crud_branches.is_branch(universe):
+        # Counted on the row behind each tweet: the branch's own, or the parent's it shows
+        targets = crud_branches.impression_targets(db, universe, batch.tweak_ids)
+        impression_buffer.drop(len(batch.tweak_ids) - len(targets))
+        return {"accepted": impression_buffer.add_keys(targets)}
+    return {"accepted": impression_buffer.add(universe_id, batch.tweak_ids)}
+
+
+# ===== AUTOCOMPLETE =====
+@router.get("/universes/{universe_id}/autocomplete", response_model=List[AutocompleteSuggestion])
+def autocomplete_mentions(
+    universe_id: int,
+    q: str = Query("", max_length=100),
+    limit: int = Query(8, ge=1, le=settings.AUTOCOMPLETE_MAX_RESULTS),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Characters and hashtags starting with `q`: "@pre" only characters, "#pre"
+    only hashtags, anything else both. Answered from an in-memory index (see
+    app/core/autocomplete.py); the universe is only read the first time.
+    """
+    index = autocomplete.cached_index(universe_id)
+    if index is None or index.user_id != current_user.id:
+        universe = crud_universe.get_universe(db, universe_id, current_user.id)
+        if not universe:
+            raise HTTPException(status_code=404, detail="Universe not found")
+        index = autocomplete.get_index(db, universe)
+    return Response(content=encode_json(autocomplete.search(index, q.strip(), limit)), media_type="application/json")
+
+
 # ===== TEMPLATE ROUTES =====
 @router.get("/templates", response_model=List[TweakTemplate])
 def get_templates(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return crud_tweaknow.get_templates(db, user_id=current_user.id)
@@ -241,6 +505,7 @@ def follow_character(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
+    _reject_on_branch(universe)
     
     follower = crud_tweaknow.get_character(db, follower_id, universe_id)
     following = crud_tweaknow.get_character(db, following_id, universe_id)
@@ -251,7 +516,7 @@ def follow_character(
     if follower_id == following_id:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
     
-    crud_tweaknow.follow_character(db, follower_id, following_id)
+    crud_tweaknow.follow_character(db, follower_id, following_id, universe_id=universe_id)
     return {"success": True}
 
 @router.delete("/universes/{universe_id}/characters/{follower_id}/unfollow/{following_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -265,7 +530,8 @@ def unfollow_character(
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    crud_tweaknow.unfollow_character(db, follower_id, following_id)
+    _reject_on_branch(universe)
+    crud_tweaknow.unfollow_character(db, follower_id, following_id, universe_id=universe_id)
     return None
 
 @router.get("/universes/{universe_id}/characters/{follower_id}/is-following/{following_id}")
@@ -273,7 +539,7 @@ def check_following(
     universe_id: int,
     follower_id: int,
     following_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
@@ -290,21 +556,126 @@ def check_following(
         "following_count": following_count
     }
 
-# ADD THESE ROUTES TO api/tweaknow.py at the end (before or after follow routes)
+@router.get("/universes/{universe_id}/characters/{character_id}/followers", response_model=FollowPage)
+def get_followers(
+    universe_id: int,
+    character_id: int,
+    relative_to: Optional[int] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Characters following `character_id`, newest first; pass `next_cursor` back for the next page"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    _, characters = crud_branches.read_views(universe)
+    return crud_tweaknow.get_follow_page(
+        db, characters, character_id, "followers", relative_to=relative_to, cursor=cursor, limit=limit
+    )
+
+@router.get("/universes/{universe_id}/characters/{character_id}/following", response_model=FollowPage)
+def get_following(
+    universe_id: int,
+    character_id: int,
+    relative_to: Optional[int] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Characters `character_id` follows, newest first"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    _, characters = crud_branches.read_views(universe)
+    return crud_tweaknow.get_follow_page(
+        db, characters, character_id, "following", relative_to=relative_to, cursor=cursor, limit=limit
+    )
+
+@router.get("/universes/{universe_id}/characters/{character_id}/profile", response_model=CharacterProfile)
+def get_character_profile(
+    universe_id: int,
+    character_id: int,
+    viewer_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Profile header with real tweet/reply/media/like/follow counts and, with `viewer_id`, follow flags"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    tweets, characters = crud_branches.read_views(universe)
+    profile = crud_tweaknow.get_profile(db, tweets, characters, character_id, viewer_id=viewer_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return profile
+
+@router.get("/universes/{universe_id}/characters/{character_id}/tweaks", response_model=ProfileTweakPage)
+def get_character_tweaks(
+    universe_id: int,
+    character_id: int,
+    tab: str = Query("tweets", pattern="^(tweets|replies|media|likes)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """One page of a profile tab, newest first; pass `next_cursor` back for the next page"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    tweets, characters = crud_branches.read_views(universe)
+    try:
+        return crud_tweaknow.get_profile_tweaks(db, tweets, characters, character_id, tab, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/universes/{universe_id}/characters/{character_id}/suggestions", response_model=List[FollowSuggestion])
+def get_follow_suggestions(
+    universe_id: int,
+    character_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Who to follow: friends-of-friends, shared engagement and popularity (cached until the universe changes)"""
+    universe = crud_universe.get_universe(db, universe_id, current_user.id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    tweets, characters = crud_branches.read_views(universe)
+
+    def suggestions():
+        found = crud_tweaknow.get_follow_suggestions(db, tweets, characters, character_id, limit=limit)
+        if found is None:
+            raise HTTPException(status_code=404, detail="Character not found")
+        return _suggestions_adapter.validate_python(found)
+
+    return cached_response(
+        "suggestions", universe_id, suggestions,
+        variant=f"{character_id}:{limit}",
+        base_universe_id=universe.parent_universe_id,
+    )
 
 # ===== TREND ROUTES =====
 from app.schemas.tweaknow import Trend, TrendCreate, TrendUpdate
 
+_trends_adapter = TypeAdapter(List[Trend])
+
 @router.get("/universes/{universe_id}/trends", response_model=List[Trend])
 def get_trends(
     universe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     universe = crud_universe.get_universe(db, universe_id, current_user.id)
     if not universe:
         raise HTTPException(status_code=404, detail="Universe not found")
-    return crud_tweaknow.get_trends(db, universe_id=universe_id)
+    return cached_response(
+        "trends", universe_id,
+        lambda: _trends_adapter.validate_python(crud_tweaknow.get_trends(db, universe_id=universe_id)),
+    )
 
 @router.post("/universes/{universe_id}/trends", response_model=Trend, status_code=status.HTTP_201_CREATED)
 def create_trend(
@@ -1,11 +1,21 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core import autocomplete
+from app.core import export as export_site
+from app.core.database import get_db, get_read_db
+from app.core.zipstream import stream_zip
 from app.api.auth import get_current_user
-from app.schemas.universe import Universe, UniverseCreate, UniverseUpdate
+from app.schemas.job import Job
+from app.schemas.universe import (
+    BranchCreate, ScreenBootstrap, Universe, UniverseCreate, UniverseListBootstrap, UniverseUpdate
+)
 from app.schemas.user import User
+from app.crud import bootstrap as crud_bootstrap
+from app.crud import branches as crud_branches
+from app.crud import jobs as crud_jobs
 from app.crud import universe as crud_universe
 
 router = APIRouter()
@@ -14,11 +24,22 @@ router = APIRouter()
 def get_universes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return crud_universe.get_universes(db, user_id=current_user.id, skip=skip, limit=limit)
 
+@router.get("/bootstrap", response_model=UniverseListBootstrap)
+def bootstrap_universe_list(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The universe list screen in one request: the user, and their universes with counts"""
+    universes = crud_universe.get_universes(db, user_id=current_user.id, skip=skip, limit=limit)
+    return {"user": current_user, "universes": crud_universe.get_universe_summaries(db, universes)}
+
 @router.post("/", response_model=Universe, status_code=status.HTTP_201_CREATED)
 def create_universe(
     universe: UniverseCreate,
@@ -30,14 +51,57 @@ def create_universe(
 @router.get("/{universe_id}", response_model=Universe)
 def get_universe(
     universe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_universe = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id)
+    # An archived universe is listed with its storage state; opening it starts the restore
+    db_universe = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id, require_live=False)
     if db_universe is None:
         raise HTTPException(status_code=404, detail="Universe not found")
     return db_universe
 
+@router.get("/{universe_id}/bootstrap", response_model=ScreenBootstrap)
+def bootstrap_screen(
+    universe_id: int,
+    screen: str = Query(..., pattern=f"^({'|'.join(crud_bootstrap.SCREENS)})$"),
+    character_id: Optional[int] = None,
+    viewer_id: Optional[int] = None,
+    tweak_id: Optional[int] = None,
+    mode: str = Query("latest", pattern="^(latest|for_you)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Everything `screen` needs, from queries run side by side (see
+    app/crud/bootstrap.py). profile needs `character_id` (and takes
+    `viewer_id`), detail needs `tweak_id`; on home and detail `character_id`
+    is the acting character, and on home `mode`/`limit` pick the feed.
+    """
+    if screen == "profile" and character_id is None:
+        raise HTTPException(status_code=422, detail="character_id is required for screen=profile")
+    if screen == "detail" and tweak_id is None:
+        raise HTTPException(status_code=422, detail="tweak_id is required for screen=detail")
+    # The dashboard only needs the universe row; an archived one shows without counts
+    universe = crud_universe.get_universe(
+        db, universe_id=universe_id, user_id=current_user.id, require_live=screen != "dashboard"
+    )
+    if universe is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    params = crud_bootstrap.ScreenParams(
+        universe, current_user.id, character_id=character_id, viewer_id=viewer_id, tweak_id=tweak_id,
+        mode=mode if screen == "home" else "latest", limit=limit,
+    )
+    if screen == "composer":
+        # The composer's first keystroke should find the mention index built
+        autocomplete.warm(universe)
+    parts = crud_bootstrap.build_parts(db, screen, params)
+    if any(parts.get(name, b"") is None for name in ("profile", "feed", "viewer_state")):
+        raise HTTPException(status_code=404, detail="Character not found")
+    if parts.get("thread", b"") is None:
+        raise HTTPException(status_code=404, detail="Tweak not found")
+    return Response(content=crud_bootstrap.assemble(screen, parts), media_type="application/json")
+
 @router.put("/{universe_id}", response_model=Universe)
 def update_universe(
     universe_id: int,
@@ -52,13 +116,111 @@ def update_universe(
         raise HTTPException(status_code=404, detail="Universe not found")
     return db_universe
 
-@router.delete("/{universe_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{universe_id}", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
 def delete_universe(
     universe_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    success = crud_universe.delete_universe(db, universe_id=universe_id, user_id=current_user.id)
-    if not success:
+    """Hide the universe (and its branches) now; its rows are removed by the returned job"""
+    db_universe = crud_universe.get_universe(
+        db, universe_id=universe_id, user_id=current_user.id, require_live=False, warm=False
+    )
+    if db_universe is None:
         raise HTTPException(status_code=404, detail="Universe not found")
-    return None
\ No newline at end of file
+    return crud_universe.delete_universe(db, db_universe)
+
+# ===== BRANCHES =====
+@router.post("/{universe_id}/branches", response_model=Universe, status_code=status.HTTP_201_CREATED)
+def create_branch(
+    universe_id: int,
+    branch: BranchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Fork a universe for an alternate storyline; nothing is copied until the branch changes it"""
+    parent = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id)
+    if parent is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if crud_branches.is_branch(parent):
+        raise HTTPException(status_code=400, detail="Branches cannot be branched")
+    return crud_branches.create_branch(db, parent, name=branch.name, description=branch.description)
+
+@router.get("/{universe_id}/branches", response_model=List[Universe])
+def get_branches(
+    universe_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    if crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id) is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    return crud_branches.get_branches(db, universe_id)
+
+@router.post("/{universe_id}/merge", response_model=Universe)
+def merge_branch(
+    universe_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply a branch to its parent and remove it; returns the parent. DELETE discards a branch instead."""
+    branch = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id)
+    if branch is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if not crud_branches.is_branch(branch):
+        raise HTTPException(status_code=400, detail="Not a branch")
+    return crud_branches.merge_branch(db, branch)
+
+# ===== MAINTENANCE =====
+@router.post("/{universe_id}/reconcile", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def reconcile_counters(
+    universe_id: int,
+    exact: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a job that raises like/retweet/comment/quote counts to the real
+    number of likes, retweets, replies and quotes (`exact`: set them to it)
+    """
+    universe = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id)
+    if universe is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if crud_branches.is_branch(universe):
+        raise HTTPException(status_code=400, detail="Branches share their parent's counters")
+    return crud_jobs.enqueue(db, "reconcile_counters", current_user.id, universe_id, payload={"exact": exact})
+
+# ===== STATIC EXPORT =====
+@router.post("/{universe_id}/export", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def export_universe(
+    universe_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a job that writes or refreshes the universe's static archive
+    (unchanged pages are left alone); its result is an ExportSummary. While
+    one is queued or running, the same job is returned.
+    """
+    universe = crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id)
+    if universe is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    # Someone is waiting to download this one
+    return crud_jobs.enqueue(db, "export_universe", current_user.id, universe_id, priority=10)
+
+@router.get("/{universe_id}/export.zip")
+def download_export(
+    universe_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The last export as a ZIP, streamed from disk; media files are stored, pages deflated"""
+    if crud_universe.get_universe(db, universe_id=universe_id, user_id=current_user.id) is None:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    site = export_site.site_dir(universe_id)
+    if not (site / export_site.MANIFEST).is_file():
+        raise HTTPException(status_code=404, detail="This universe has not been exported")
+    return StreamingResponse(
+        stream_zip(export_site.archive_members(site), compress=lambda name: not name.startswith("media/")),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="universe-{universe_id}.zip"'},
+    )
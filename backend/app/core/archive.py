@@ -0,0 +1,185 @@
+"""
+Cold storage for universes nobody has opened in a while; crud/archive.py
+decides which, and moves their rows out of and back into the database.
+
+    ARCHIVE_DIR/universes/<id>.jsonl.xz   the universe's rows
+    ARCHIVE_DIR/media/<sha256>            every inlined image, once across all archives
+
+A rows file is xz-compressed JSON lines: a header, then for each table a
+line naming its columns, followed by one line per row with the values in
+that order. Storing rows as bare value lists leaves the column names out
+of every row, and xz's dictionary spans the whole file, so text repeated
+anywhere in a universe (sources, handles, quoted phrases) is stored once.
+
+Images stored inline as data: URIs are most of the bytes of a typical
+universe, and the same avatar or picture recurs on many rows. Each one is
+decoded and kept once under media/ by content hash; the row holds
+{"$media": sha256, "prefix": "data:image/png;base64,"} instead, and
+re-encoding gives back the exact string. A URI whose base64 would not
+come back identical stays inline. Timestamps are {"$t": isoformat}.
+
+Media files are written before the rows file, and the rows file under a
+temporary name that is renamed when complete: an archive that exists is
+whole.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import lzma
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+ARCHIVE_VERSION = 1
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def archive_path(universe_id: int) -> Path:
+    return Path(settings.ARCHIVE_DIR) / "universes" / f"{universe_id}.jsonl.xz"
+
+
+def media_blob_path(sha256: str) -> Path:
+    return Path(settings.ARCHIVE_DIR) / "media" / sha256
+
+
+def remove(universe_id: int):
+    """Forget a universe's rows file; shared media stays"""
+    archive_path(universe_id).unlink(missing_ok=True)
+
+
+# ===== WRITING =====
+class ArchiveWriter:
+    """
+    Streams one universe's rows into its archive:
+
+        with ArchiveWriter(universe_id, header) as writer:
+            writer.table("tweaks", ["id", ...])
+            writer.rows(rows)
+    """
+
+    def __init__(self, universe_id: int, header: dict):
+        self.path = archive_path(universe_id)
+        self.header = header
+        self.rows_written = 0
+        self.media_stored = 0
+        self.media_shared = 0
+        self._file = None
+        self._tmp = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, self._tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        os.close(handle)
+        self._file = lzma.open(self._tmp, "wt", encoding="utf-8")
+        self._line({"version": ARCHIVE_VERSION, **self.header})
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            with open(self._tmp, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(self._tmp, self.path)
+        else:
+            os.unlink(self._tmp)
+        return False
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size
+
+    def _line(self, value):
+        self._file.write(json.dumps(value, separators=(",", ":"), ensure_ascii=False))
+        self._file.write("\n")
+
+    def table(self, name: str, columns: List[str]):
+        self._line({"table": name, "columns": columns})
+
+    def rows(self, rows: Iterable[Tuple]):
+        for row in rows:
+            self._line([self._encode(value) for value in row])
+            self.rows_written += 1
+
+    def _encode(self, value):
+        if isinstance(value, datetime):
+            return {"$t": value.isoformat()}
+        if isinstance(value, str) and value.startswith("data:"):
+            return self._store_media(value)
+        if isinstance(value, list):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _store_media(self, uri: str):
+        prefix, comma, payload = uri.partition(",")
+        if not comma or not prefix.endswith(";base64"):
+            return uri
+        try:
+            data = base64.b64decode(payload, validate=True)
+        except (binascii.Error, ValueError):
+            return uri
+        if base64.b64encode(data).decode("ascii") != payload:
+            return uri
+        sha256 = hashlib.sha256(data).hexdigest()
+        target = media_blob_path(sha256)
+        if target.exists():
+            self.media_shared += 1
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=target.parent, suffix=".tmp", delete=False) as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp.name, target)
+            self.media_stored += 1
+        return {"$media": sha256, "prefix": prefix + ","}
+
+
+# ===== READING =====
+def _decode(value):
+    if isinstance(value, dict):
+        if "$t" in value:
+            return datetime.fromisoformat(value["$t"])
+        if "$media" in value:
+            try:
+                data = media_blob_path(value["$media"]).read_bytes()
+            except OSError as exc:
+                raise ArchiveError(f"Archived image {value['$media']} is missing") from exc
+            return value["prefix"] + base64.b64encode(data).decode("ascii")
+        return value
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def read_header(universe_id: int) -> Optional[dict]:
+    path = archive_path(universe_id)
+    if not path.is_file():
+        return None
+    with lzma.open(path, "rt", encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+
+def read_rows(universe_id: int) -> Iterator[Tuple[str, dict]]:
+    """(table, row as a column -> value dict) for every archived row, table by table"""
+    path = archive_path(universe_id)
+    if not path.is_file():
+        raise ArchiveError(f"Universe {universe_id} has no archive")
+    with lzma.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != ARCHIVE_VERSION:
+            raise ArchiveError(f"Unsupported archive version {header.get('version')}")
+        table, columns = None, []
+        for line in f:
+            value = json.loads(line)
+            if isinstance(value, dict):
+                table, columns = value["table"], value["columns"]
+                continue
+            yield table, dict(zip(columns, (_decode(item) for item in value)))
@@ -0,0 +1,540 @@
+"""
+In-memory prefix index for @mention and #hashtag autocomplete.
+
+Each worker keeps, for the universes its composers are open in, every
+character (by username, full name and each word of the name) and every
+hashtag used in a tweet, in a sorted array of (folded key, entry) pairs. The
+matches for a prefix are one contiguous run of it, found by bisection, so a
+keystroke never touches the database.
+
+* Entries rank by a score fixed when they change, "hot"-style: the log of
+  their popularity (followers for a character, tweets for a hashtag) plus
+  their last use in story time (a character's newest tweet, or its creation
+  before it has one) over RECENCY_SCALE, so a month of recency is worth e
+  times the popularity and nothing decays at query time.
+* Short prefixes match much of the array; their top results are kept until
+  an entry under the prefix changes. Longer ones scan their run.
+* Indexes follow writes made through SessionLocal: an after_flush hook
+  records new, edited and deleted characters, tweets and follows (note_tweak
+  records edits made by UPDATE statements), and they are applied once the
+  transaction commits. Set-based writes (deleting or
+  archiving a universe, merging a branch) discard the index instead, and it
+  is rebuilt on next use.
+* Writes from other workers are noticed through the universe's cache version
+  (app/core/cache.py); the index is then rebuilt in the background at most
+  every AUTOCOMPLETE_REFRESH_SECONDS, and answers from the old one meanwhile.
+  Branch indexes are not updated in place: they are rebuilt from the merged
+  view whenever the branch or its parent changes.
+
+At most AUTOCOMPLETE_MAX_UNIVERSES indexes are kept, least recently used
+first out.
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry
+from app.models.tweaknow import CharacterFollow, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+
+logger = logging.getLogger(__name__)
+
+HASHTAG = re.compile(r"(?<!\w)#(\w+)")
+# Seconds of story time worth one unit of log-popularity
+RECENCY_SCALE = 30 * 24 * 3600.0
+# Prefixes up to this long have their top results kept
+CACHED_PREFIX_LENGTH = 2
+
+index_builds = registry.counter(
+    "allsocit_autocomplete_builds_total", "Autocomplete indexes built, by reason.", ("reason",)
+)
+
+
+def fold(text: str) -> str:
+    return text.casefold()
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _score(popularity: int, last_used: float) -> float:
+    return math.log1p(max(popularity, 0)) + last_used / RECENCY_SCALE
+
+
+# ===== PREFIX INDEX =====
+class PrefixIndex:
+    """Sorted (key, entry) pairs; the keys starting with a prefix are one run of them."""
+
+    def __init__(self):
+        self._pairs: List[Tuple[str, Hashable]] = []
+        self._top: Dict[str, List[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def load(self, pairs: List[Tuple[str, Hashable]]):
+        self._pairs = sorted(set(pairs))
+        self._top.clear()
+
+    def add(self, key: str, entry: Hashable):
+        pair = (key, entry)
+        at = bisect_left(self._pairs, pair)
+        if at == len(self._pairs) or self._pairs[at] != pair:
+            self._pairs.insert(at, pair)
+        self.touch(key)
+
+    def remove(self, key: str, entry: Hashable):
+        pair = (key, entry)
+        at = bisect_left(self._pairs, pair)
+        if at < len(self._pairs) and self._pairs[at] == pair:
+            del self._pairs[at]
+        self.touch(key)
+
+    def touch(self, key: str):
+        """Forget the kept results of prefixes of `key` (its entry was added, removed or rescored)"""
+        for length in range(min(len(key), CACHED_PREFIX_LENGTH) + 1):
+            self._top.pop(key[:length], None)
+
+    def search(self, prefix: str, score: Callable[[Hashable], float], limit: int) -> List[Hashable]:
+        """The `limit` best entries with a key starting with `prefix`, best first"""
+        kept = prefix if len(prefix) <= CACHED_PREFIX_LENGTH else None
+        if kept is not None and kept in self._top and len(self._top[kept]) >= limit:
+            return self._top[kept][:limit]
+        start = bisect_left(self._pairs, (prefix,))
+        end = bisect_left(self._pairs, (prefix + "\U0010ffff",), start)
+        entries = {entry for _, entry in self._pairs[start:end]}
+        width = max(limit, settings.AUTOCOMPLETE_MAX_RESULTS) if kept is not None else limit
+        # Ties go to the smaller entry (the older character, the first hashtag alphabetically)
+        best = heapq.nsmallest(width, entries, key=lambda entry: (-score(entry), entry))
+        if kept is not None:
+            self._top[kept] = best
+        return best[:limit]
+
+
+# ===== UNIVERSE INDEX =====
+class _Character:
+    __slots__ = ("name", "username", "official_mark", "display_followers", "followers", "last_active", "keys")
+
+    def __init__(self, name, username, official_mark, display_followers, followers=0, last_active=0.0):
+        self.name = name
+        self.username = username
+        self.official_mark = official_mark
+        self.display_followers = display_followers or 0
+        self.followers = followers
+        self.last_active = last_active
+        self.keys = character_keys(name, username)
+
+    @property
+    def score(self) -> float:
+        return _score(max(self.display_followers, self.followers), self.last_active)
+
+
+class _Hashtag:
+    __slots__ = ("value", "count", "last_used")
+
+    def __init__(self, value: str):
+        self.value = value
+        self.count = 0
+        self.last_used = 0.0
+
+    @property
+    def score(self) -> float:
+        return _score(self.count, self.last_used)
+
+
+def character_keys(name: str, username: str) -> Tuple[str, ...]:
+    keys = {fold(username), fold(name)}
+    keys.update(fold(word) for word in name.split())
+    return tuple(key for key in keys if key)
+
+
+def hashtags(content: str) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(HASHTAG.findall(content or "")))
+
+
+class UniverseIndex:
+    """One universe's characters and hashtags; every method is called with `lock` held."""
+
+    def __init__(self, universe: Universe, versions):
+        self.universe_id = universe.id
+        self.user_id = universe.user_id
+        self.parent_universe_id = universe.parent_universe_id
+        self.versions = versions
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.characters: Dict[int, _Character] = {}
+        self.hashtags: Dict[str, _Hashtag] = {}
+        # Only tweets that have hashtags, so an edit or delete knows what to take back
+        self.tweak_hashtags: Dict[int, Tuple[str, ...]] = {}
+        self.character_keys = PrefixIndex()
+        self.hashtag_keys = PrefixIndex()
+
+    @property
+    def is_branch(self) -> bool:
+        return self.parent_universe_id is not None
+
+    # ----- writes -----
+    def put_character(self, character_id: int, name: str, username: str, official_mark: str,
+                      display_followers: int, created: float):
+        current = self.characters.get(character_id)
+        entry = _Character(name, username, official_mark, display_followers, last_active=created)
+        if current is not None:
+            entry.followers, entry.last_active = current.followers, current.last_active
+            for key in current.keys:
+                self.character_keys.remove(key, character_id)
+        self.characters[character_id] = entry
+        for key in entry.keys:
+            self.character_keys.add(key, character_id)
+
+    def drop_character(self, character_id: int):
+        current = self.characters.pop(character_id, None)
+        if current is not None:
+            for key in current.keys:
+                self.character_keys.remove(key, character_id)
+
+    def add_followers(self, character_id: int, delta: int):
+        entry = self.characters.get(character_id)
+        if entry is not None:
+            entry.followers = max(entry.followers + delta, 0)
+            self._rescored_character(entry)
+
+    def put_tweak(self, tweak_id: int, character_id: int, content: str, at: float):
+        """A new or edited tweet"""
+        self.drop_tweak(tweak_id)
+        tags = hashtags(content)
+        for value in tags:
+            key = fold(value)
+            tag = self.hashtags.get(key)
+            if tag is None:
+                tag = self.hashtags[key] = _Hashtag(value)
+                self.hashtag_keys.add(key, key)
+            tag.count += 1
+            tag.last_used = max(tag.last_used, at)
+            self.hashtag_keys.touch(key)
+        if tags:
+            self.tweak_hashtags[tweak_id] = tags
+        author = self.characters.get(character_id)
+        if author is not None and at > author.last_active:
+            author.last_active = at
+            self._rescored_character(author)
+
+    def drop_tweak(self, tweak_id: int):
+        # A hashtag keeps its last use; only its count goes down
+        for value in self.tweak_hashtags.pop(tweak_id, ()):
+            key = fold(value)
+            tag = self.hashtags.get(key)
+            if tag is None:
+                continue
+            tag.count -= 1
+            if tag.count <= 0:
+                del self.hashtags[key]
+                self.hashtag_keys.remove(key, key)
+            else:
+                self.hashtag_keys.touch(key)
+
+    def _rescored_character(self, entry: _Character):
+        for key in entry.keys:
+            self.character_keys.touch(key)
+
+    # ----- reads -----
+    def search(self, query: str, limit: int) -> List[dict]:
+        """Suggestions for `query`: "@pre" characters, "#pre" hashtags, a bare prefix both"""
+        kind = query[:1] if query[:1] in ("@", "#") else ""
+        prefix = fold(query[1:] if kind else query)
+        found: List[Tuple[float, dict]] = []
+        if kind != "#":
+            for character_id in self.character_keys.search(
+                prefix, lambda entry: self.characters[entry].score, limit
+            ):
+                entry = self.characters[character_id]
+                found.append((entry.score, {
+                    "kind": "character", "value": f"@{entry.username}", "character_id": character_id,
+                    "name": entry.name, "username": entry.username, "official_mark": entry.official_mark,
+                }))
+        if kind != "@":
+            for key in self.hashtag_keys.search(prefix, lambda entry: self.hashtags[entry].score, limit):
+                tag = self.hashtags[key]
+                found.append((tag.score, {"kind": "hashtag", "value": f"#{tag.value}", "count": tag.count}))
+        found.sort(key=lambda item: item[0], reverse=True)
+        return [suggestion for _, suggestion in found[:limit]]
+
+
+# ===== BUILDING =====
+def _versions(universe_id: int, parent_universe_id: Optional[int]):
+    """What the index was built from, as far as the response cache can tell; None without a cache"""
+    if cache.backend is None:
+        return None
+    ids = (universe_id,) if parent_universe_id is None else (universe_id, parent_universe_id)
+    return tuple(cache.backend.version(universe_id) for universe_id in ids)
+
+
+def build_index(db: Session, universe: Universe) -> UniverseIndex:
+    """Read a universe's characters and hashtagged tweets into a fresh index"""
+    # Before reading: a write committed meanwhile leaves the index stale, not silently behind
+    index = UniverseIndex(universe, _versions(universe.id, universe.parent_universe_id))
+    if universe.parent_universe_id is not None:
+        from app.crud import branches as crud_branches
+        characters = crud_branches.visible_characters(universe)
+        tweets = crud_branches.visible_tweaks(universe)
+    else:
+        characters = select(TweakNowCharacter).where(TweakNowCharacter.universe_id == universe.id).subquery()
+        tweets = select(Tweak).where(Tweak.universe_id == universe.id).subquery()
+    story_time = func.coalesce(tweets.c.custom_date, tweets.c.created_at)
+
+    followers = (
+        select(CharacterFollow.following_id, func.count().label("n"))
+        .where(CharacterFollow.following_id.in_(select(characters.c.id)))
+        .group_by(CharacterFollow.following_id).subquery()
+    )
+    last_active = (
+        select(tweets.c.character_id, func.max(story_time).label("at")).group_by(tweets.c.character_id).subquery()
+    )
+    rows = db.execute(
+        select(
+            characters.c.id, characters.c.name, characters.c.username, characters.c.official_mark,
+            characters.c.display_followers_count, characters.c.created_at, followers.c.n, last_active.c.at,
+        )
+        .outerjoin(followers, followers.c.following_id == characters.c.id)
+        .outerjoin(last_active, last_active.c.character_id == characters.c.id)
+    )
+    pairs = []
+    for row in rows:
+        entry = _Character(row.name, row.username, row.official_mark, row.display_followers_count,
+                           followers=row.n or 0, last_active=_epoch(row.at or row.created_at))
+        index.characters[row.id] = entry
+        pairs.extend((key, row.id) for key in entry.keys)
+    index.character_keys.load(pairs)
+
+    tagged = db.execute(
+        select(tweets.c.id, tweets.c.content, story_time.label("at")).where(tweets.c.content.contains("#"))
+    )
+    for row in tagged:
+        tags = hashtags(row.content)
+        if not tags:
+            continue
+        index.tweak_hashtags[row.id] = tags
+        at = _epoch(row.at)
+        for value in tags:
+            key = fold(value)
+            tag = index.hashtags.get(key)
+            if tag is None:
+                tag = index.hashtags[key] = _Hashtag(value)
+            tag.count += 1
+            tag.last_used = max(tag.last_used, at)
+    index.hashtag_keys.load([(key, key) for key in index.hashtags])
+    return index
+
+
+# ===== REGISTRY =====
+_indexes: "OrderedDict[int, UniverseIndex]" = OrderedDict()
+_registry_lock = threading.Lock()
+_build_locks: Dict[int, threading.Lock] = {}
+_rebuilding: set = set()
+
+
+def _store(index: UniverseIndex):
+    with _registry_lock:
+        _indexes[index.universe_id] = index
+        _indexes.move_to_end(index.universe_id)
+        while len(_indexes) > max(settings.AUTOCOMPLETE_MAX_UNIVERSES, 1):
+            _indexes.popitem(last=False)
+
+
+def cached_index(universe_id: int) -> Optional[UniverseIndex]:
+    """The index of a universe if this worker has one, whoever it belongs to"""
+    with _registry_lock:
+        index = _indexes.get(universe_id)
+        if index is not None:
+            _indexes.move_to_end(universe_id)
+        return index
+
+
+def get_index(db: Session, universe: Universe) -> UniverseIndex:
+    """The universe's index, built on first use; one build per universe at a time"""
+    index = cached_index(universe.id)
+    if index is not None:
+        return index
+    with _registry_lock:
+        lock = _build_locks.setdefault(universe.id, threading.Lock())
+    with lock:
+        index = cached_index(universe.id)
+        if index is None:
+            index = build_index(db, universe)
+            index_builds.inc(reason="first_use")
+            _store(index)
+    return index
+
+
+def _stale(index: UniverseIndex) -> bool:
+    versions = _versions(index.universe_id, index.parent_universe_id)
+    if versions is None or versions != index.versions:
+        # Branches have no incremental updates; anything else waits out the interval
+        return index.is_branch or time.monotonic() - index.built_at >= settings.AUTOCOMPLETE_REFRESH_SECONDS
+    return False
+
+
+def _build(universe_id: int, reason: str):
+    try:
+        with _registry_lock:
+            lock = _build_locks.setdefault(universe_id, threading.Lock())
+        with lock, SessionLocal() as session:
+            universe = session.get(Universe, universe_id)
+            if universe is None or universe.deleted_at is not None or universe.storage != "live":
+                forget(universe_id)
+                return
+            current = cached_index(universe_id)
+            # Warming one that exists, or rebuilding one discarded meanwhile, is left to the next use
+            if (current is not None) == (reason == "warm"):
+                return
+            index = build_index(session, universe)
+            _store(index)
+            index_builds.inc(reason=reason)
+    except Exception:
+        logger.exception("building the autocomplete index of universe %s failed", universe_id)
+    finally:
+        with _registry_lock:
+            _rebuilding.discard(universe_id)
+
+
+def _build_in_background(universe_id: int, reason: str):
+    with _registry_lock:
+        if universe_id in _rebuilding:
+            return
+        _rebuilding.add(universe_id)
+    threading.Thread(target=_build, args=(universe_id, reason), name="autocomplete-build", daemon=True).start()
+
+
+def search(index: UniverseIndex, query: str, limit: int) -> List[dict]:
+    """Suggestions from `index`, starting a background rebuild when other writers have changed the universe"""
+    if _stale(index):
+        _build_in_background(index.universe_id, "stale")
+    with index.lock:
+        return index.search(query, limit)
+
+
+def warm(universe: Universe):
+    """Build the universe's index in the background if there is none (a composer is about to open)"""
+    if universe.storage == "live" and cached_index(universe.id) is None:
+        _build_in_background(universe.id, "warm")
+
+
+def forget(universe_id: int):
+    """Drop the index of a universe and of its branches"""
+    with _registry_lock:
+        for index_id in [i for i, index in _indexes.items()
+                         if universe_id in (index.universe_id, index.parent_universe_id)]:
+            del _indexes[index_id]
+
+
+# ===== FOLLOWING WRITES =====
+def discard_index(db: Session, universe_id: Optional[int]):
+    """Drop the universe's index once the current transaction commits (for writes the hooks can't see)"""
+    if universe_id is not None:
+        db.info.setdefault("autocomplete_discard", set()).add(universe_id)
+
+
+def _loaded(obj, name):
+    """An attribute's value without loading it"""
+    return inspect(obj).dict.get(name)
+
+
+def _put_tweak(tweak: Tweak) -> tuple:
+    # A new row's created_at is the database's; now is close enough
+    at = _loaded(tweak, "custom_date") or _loaded(tweak, "created_at") or datetime.now(timezone.utc)
+    return ("put_tweak", tweak.universe_id, tweak.id, tweak.character_id, tweak.content, _epoch(at))
+
+
+def _put_character(character: TweakNowCharacter) -> tuple:
+    at = _loaded(character, "created_at") or datetime.now(timezone.utc)
+    return ("put_character", character.universe_id, character.id, character.name, character.username,
+            character.official_mark, character.display_followers_count, _epoch(at))
+
+
+def note_tweak(db: Session, tweak: Tweak):
+    """Follow a tweet edited by a set-based UPDATE, which the flush hook doesn't see"""
+    db.info.setdefault("autocomplete_changes", []).append(_put_tweak(tweak))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Tweak):
+            changes.append(_put_tweak(obj))
+        elif isinstance(obj, TweakNowCharacter):
+            changes.append(_put_character(obj))
+        elif isinstance(obj, CharacterFollow):
+            changes.append(("add_followers", None, obj.following_id, 1))
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Tweak):
+            if state.attrs.content.history.has_changes() or state.attrs.custom_date.history.has_changes():
+                changes.append(_put_tweak(obj))
+        elif isinstance(obj, TweakNowCharacter):
+            if any(state.attrs[name].history.has_changes()
+                   for name in ("name", "username", "official_mark", "display_followers_count")):
+                changes.append(_put_character(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Tweak):
+            changes.append(("drop_tweak", _loaded(obj, "universe_id"), inspect(obj).identity[0]))
+        elif isinstance(obj, TweakNowCharacter):
+            changes.append(("drop_character", _loaded(obj, "universe_id"), inspect(obj).identity[0]))
+        elif isinstance(obj, CharacterFollow):
+            changes.append(("add_followers", None, _loaded(obj, "following_id"), -1))
+    if changes:
+        session.info.setdefault("autocomplete_changes", []).extend(changes)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_changes(session):
+    for universe_id in session.info.pop("autocomplete_discard", ()):
+        forget(universe_id)
+    changes = session.info.pop("autocomplete_changes", None)
+    if not changes or not _indexes:
+        return
+    with _registry_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if index.is_branch:
+            continue
+        applied = False
+        with index.lock:
+            for method, universe_id, *args in changes:
+                if universe_id is None:
+                    # A follow: the character's universe is wherever it is indexed
+                    if args[0] not in index.characters:
+                        continue
+                elif universe_id != index.universe_id:
+                    continue
+                getattr(index, method)(*args)
+                applied = True
+            # The cache hooks, installed first, have bumped the version for this commit. One bump
+            # past the index's is this commit's own; more mean other writers too, and a rebuild.
+            if applied and index.versions is not None:
+                versions = _versions(index.universe_id, None)
+                if versions == (index.versions[0] + 1,):
+                    index.versions = versions
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("autocomplete_changes", None)
+    session.info.pop("autocomplete_discard", None)
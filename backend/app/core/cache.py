@@ -0,0 +1,317 @@
+"""
+Server-side cache for computed universe responses (feed, characters, trends).
+
+Entries hold the encoded JSON body, keyed by namespace, universe id and the
+universe's cache version. Writes don't delete entries; they bump the
+version, which makes every older entry for that universe unreachable:
+
+* crud functions call invalidate_universe(db, universe_id) inside their
+  transaction. The local version is bumped after the commit, and on Postgres
+  a NOTIFY is queued in the same transaction, so other workers hear about it
+  exactly when the change becomes visible.
+* Each worker runs a LISTEN thread (start_invalidation_listener) that bumps
+  its own versions when a NOTIFY arrives.
+* With the Redis backend the versions live in Redis, so every worker sees
+  the same version without the listener.
+
+A reader captures the version before computing; if a write lands while it is
+computing, the result is stored under the old version and never served.
+
+A miss on a universe bumped in the last REPLICA_STICKY_SECONDS is built from
+the primary even when the request reads from a replica (fill_from_primary):
+a lagging replica would otherwise store the pre-write body under the new
+version and serve it to everyone until the TTL.
+"""
+import json
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import event, func, select as sql_select
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "allsocit_cache"
+
+cache_requests = registry.counter(
+    "allsocit_cache_requests_total", "Cache lookups by namespace and result.", ("namespace", "result")
+)
+cache_invalidations = registry.counter(
+    "allsocit_cache_invalidations_total", "Universe cache invalidations applied.", ("source",)
+)
+
+
+# ===== BACKENDS =====
+class LRUCache:
+    """In-process LRU bounded by total bytes, with a per-entry TTL."""
+
+    def __init__(self, max_bytes: int, default_ttl: float):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[int, int] = {}
+        self._bumped_at: Dict[int, float] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        # A single entry may not take more than a quarter of the cache
+        if len(value) > self.max_bytes // 4:
+            return
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._versions.clear()
+            self._bumped_at.clear()
+
+    def version(self, universe_id: int) -> int:
+        return self._versions.get(universe_id, 0)
+
+    def bump(self, universe_id: int):
+        with self._lock:
+            self._versions[universe_id] = self._versions.get(universe_id, 0) + 1
+            self._bumped_at[universe_id] = time.monotonic()
+
+    def recently_bumped(self, universe_id: int) -> bool:
+        bumped_at = self._bumped_at.get(universe_id)
+        return bumped_at is not None and time.monotonic() - bumped_at < settings.REPLICA_STICKY_SECONDS
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Shared cache in Redis. Versions are Redis counters, so every worker agrees on them."""
+
+    shared_versions = True
+
+    def __init__(self, url: str, default_ttl: float):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the `redis` package") from exc
+        self.client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"allsocit:cache:{key}")
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.client.set(f"allsocit:cache:{key}", value, ex=int(ttl or self.default_ttl))
+
+    def clear(self):
+        for key in self.client.scan_iter("allsocit:cache:*"):
+            self.client.delete(key)
+
+    def version(self, universe_id: int) -> int:
+        return int(self.client.get(f"allsocit:version:{universe_id}") or 0)
+
+    def bump(self, universe_id: int):
+        pipeline = self.client.pipeline()
+        pipeline.incr(f"allsocit:version:{universe_id}")
+        pipeline.set(f"allsocit:bumped:{universe_id}", 1, px=int(settings.REPLICA_STICKY_SECONDS * 1000) or 1)
+        pipeline.execute()
+
+    def recently_bumped(self, universe_id: int) -> bool:
+        return bool(self.client.exists(f"allsocit:bumped:{universe_id}"))
+
+
+def _make_backend():
+    name = settings.CACHE_BACKEND.lower()
+    if name == "off":
+        return None
+    if name == "redis":
+        return RedisCache(settings.CACHE_REDIS_URL, settings.CACHE_TTL_SECONDS)
+    return LRUCache(settings.CACHE_MAX_BYTES, settings.CACHE_TTL_SECONDS)
+
+
+backend = _make_backend()
+
+if isinstance(backend, LRUCache):
+    registry.gauge("allsocit_cache_bytes", "Bytes held by the in-process cache.",
+                   callback=lambda: backend.size_bytes)
+    registry.gauge("allsocit_cache_entries", "Entries held by the in-process cache.",
+                   callback=lambda: backend.entry_count)
+
+
+# ===== READS =====
+# Set while a miss right after a write is built; RoutingSession reads from the primary then
+fill_from_primary: ContextVar[bool] = ContextVar("fill_from_primary", default=False)
+
+def encode_json(content) -> bytes:
+    """Same encoding FastAPI's JSONResponse uses."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def cache_key(namespace: str, universe_id: int, version: int, variant: str = "") -> str:
+    return f"{namespace}:{universe_id}:{version}:{variant}"
+
+
+def cached_json(namespace: str, universe_id: int, build: Callable[[], bytes], variant: str = "") -> bytes:
+    """Return the cached body for (namespace, universe, variant), building and storing it on a miss."""
+    if backend is None:
+        return build()
+    version = backend.version(universe_id)
+    key = cache_key(namespace, universe_id, version, variant)
+    body = backend.get(key)
+    if body is not None:
+        cache_requests.inc(namespace=namespace, result="hit")
+        return body
+    cache_requests.inc(namespace=namespace, result="miss")
+    if not backend.recently_bumped(universe_id):
+        body = build()
+    else:
+        token = fill_from_primary.set(True)
+        try:
+            body = build()
+        finally:
+            fill_from_primary.reset(token)
+    backend.set(key, body)
+    return body
+
+
+def cached_content(namespace: str, universe_id: int, build: Callable[[], object], variant: str = "",
+                   base_universe_id: Optional[int] = None) -> bytes:
+    """
+    Like cached_json, but `build` returns the (unencoded) content. A branch
+    passes its parent as `base_universe_id`, so writes to either one invalidate.
+    """
+    if base_universe_id is not None and backend is not None:
+        variant = f"{variant}@{backend.version(base_universe_id)}"
+    return cached_json(namespace, universe_id, lambda: encode_json(build()), variant)
+
+
+def cached_response(namespace: str, universe_id: int, build: Callable[[], object], variant: str = "",
+                    base_universe_id: Optional[int] = None) -> Response:
+    """cached_content as a route's response"""
+    body = cached_content(namespace, universe_id, build, variant, base_universe_id)
+    return Response(content=body, media_type="application/json")
+
+
+# ===== INVALIDATION =====
+def invalidate_universe(db, universe_id: Optional[int]):
+    """Drop cached responses for a universe once the current transaction commits."""
+    if universe_id is None or backend is None:
+        return
+    db.info.setdefault("invalidate_universes", set()).add(universe_id)
+    if not getattr(backend, "shared_versions", False) and db.get_bind().dialect.name == "postgresql":
+        db.execute(sql_select(func.pg_notify(NOTIFY_CHANNEL, str(universe_id))))
+
+
+def _apply_invalidations(session):
+    for universe_id in session.info.pop("invalidate_universes", ()):
+        backend.bump(universe_id)
+        cache_invalidations.inc(source="local")
+
+
+def _discard_invalidations(session):
+    session.info.pop("invalidate_universes", None)
+
+
+def install_session_hooks(session_factory):
+    event.listen(session_factory, "after_commit", _apply_invalidations)
+    event.listen(session_factory, "after_rollback", _discard_invalidations)
+
+
+class InvalidationListener(threading.Thread):
+    """LISTENs for invalidations committed by other workers."""
+
+    def __init__(self, engine):
+        super().__init__(name="cache-invalidation-listener", daemon=True)
+        self.engine = engine
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("cache invalidation listener failed, reconnecting")
+                # Anything missed while disconnected expires through the TTL
+                self._stopping.wait(1.0)
+
+    def _listen(self):
+        raw = self.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self._stopping.is_set():
+                if select.select([connection], [], [], 1.0) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    try:
+                        backend.bump(int(notify.payload))
+                        cache_invalidations.inc(source="notify")
+                    except ValueError:
+                        pass
+        finally:
+            raw.invalidate()
+
+
+_listener: Optional[InvalidationListener] = None
+
+
+def start_invalidation_listener(engine):
+    global _listener
+    if (backend is None or getattr(backend, "shared_versions", False)
+            or engine.dialect.name != "postgresql" or engine.dialect.driver != "psycopg2"):
+        return
+    _listener = InvalidationListener(engine)
+    _listener.start()
+
+
+def stop_invalidation_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=2.0)
+        _listener = None
@@ -1,10 +1,99 @@
+import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
+    # postgresql://... in production; sqlite:///path runs without a database server (app/core/dialect.py)
     DATABASE_URL: str
+    # Comma-separated read replica URLs; read-only routes use them when set
+    DATABASE_REPLICA_URLS: str = ""
+    # How long after a write the writer's reads must see it (primary or caught-up replica)
+    REPLICA_STICKY_SECONDS: float = 5.0
+    # SQLite only: how long a writer waits for the write lock, and pooled connections per process
+    SQLITE_BUSY_TIMEOUT: float = 10.0
+    SQLITE_POOL_SIZE: int = 5
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Startup: "strict" refuses to start on an out-of-date schema, "warn" logs, "off" skips
+    SCHEMA_CHECK: str = "strict"
+    # Connections opened during warm-up (defaults to the pool size)
+    WARMUP_POOL_CONNECTIONS: Optional[int] = None
+
+    # Prometheus-format metrics at /metrics, reachable from loopback only unless disabled
+    METRICS_ENABLED: bool = True
+    METRICS_LOCAL_ONLY: bool = True
+
+    # Response cache for feeds, characters and trends: "memory" (per worker), "redis" or "off"
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # View counts: impressions are summed in memory and flushed in one UPDATE per interval
+    IMPRESSION_FLUSH_SECONDS: float = 5.0
+    IMPRESSION_MAX_PENDING: int = 5_000
+    IMPRESSION_MAX_BUFFERED: int = 100_000
+
+    # Uploaded images (POST /media): stored under MEDIA_DIR by content hash
+    MEDIA_DIR: str = "media"
+    MEDIA_MAX_BYTES: int = 10 * 1024 * 1024
+    MEDIA_MAX_FILES: int = 4
+
+    # Processes for CPU-bound work: card rendering, static exports (0 = in the request thread)
+    WORKER_PROCESSES: int = min(4, os.cpu_count() or 1)
+
+    # Threads per API process running a screen bootstrap's queries side by side
+    # (app/crud/bootstrap.py; 0 = one after the other in the request thread)
+    BOOTSTRAP_THREADS: int = 8
+
+    # @mention/#hashtag autocomplete (app/core/autocomplete.py): universes indexed per
+    # process, and how often an index changed by another worker is rebuilt
+    AUTOCOMPLETE_MAX_UNIVERSES: int = 256
+    AUTOCOMPLETE_MAX_RESULTS: int = 20
+    AUTOCOMPLETE_REFRESH_SECONDS: float = 30.0
+
+    # Tweet card PNGs, cached by a hash of their inputs
+    RENDER_CACHE_DIR: str = "render-cache"
+
+    # TrueType fonts for cards; DejaVu Sans, then Pillow's built-in font, when unset or missing
+    RENDER_FONT: str = ""
+    RENDER_BOLD_FONT: str = ""
+
+    # Static archives (POST /universes/{id}/export), rewritten incrementally in place
+    EXPORT_DIR: str = "exports"
+    EXPORT_PAGE_SIZE: int = 50
+    EXPORT_PROFILE_POSTS: int = 50
+
+    # Background jobs (app/core/jobs.py): worker threads in each API process;
+    # set to 0 when `python worker.py` runs the jobs instead
+    JOB_THREADS: int = 1
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_HEARTBEAT_SECONDS: float = 5.0
+    # A running job that has not heartbeated for this long is handed to another worker
+    JOB_LEASE_SECONDS: float = 60.0
+    # Delay before the first retry, doubled for each one after it
+    JOB_RETRY_SECONDS: float = 10.0
+    JOB_MAX_ATTEMPTS: int = 3
+    # Tweets deleted per transaction when a universe is deleted or archived
+    JOB_DELETE_BATCH: int = 1000
+
+    # Cold storage (app/crud/archive.py): universes nobody opened for this many
+    # days move to ARCHIVE_DIR and come back when opened (0 = never archive)
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_SWEEP_SECONDS: float = 3600.0
+    # last_accessed_at is written at most this often per universe
+    ARCHIVE_TOUCH_SECONDS: float = 3600.0
+    # Retry-After sent with 503 while a universe is restored
+    ARCHIVE_RETRY_AFTER_SECONDS: int = 2
+
+    # Comma-separated emails allowed to use the /admin routes and request profiling
+    ADMIN_EMAILS: str = ""
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.005
+    MEMORY_SNAPSHOT_LIMIT: int = 10
     
     class Config:
         env_file = ".env"
@@ -1,16 +1,92 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import fill_from_primary, install_session_hooks
 from app.core.config import settings
+from app.core.dialect import create_database_engine
+from app.core.metrics import instrument_engine, register_pool_gauges
+from app.core.replication import ReplicaRouter, current_consistency
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_database_engine(settings.DATABASE_URL)
+instrument_engine(engine)
+register_pool_gauges(engine)
+
+# Optional read replicas (see app/core/replication.py)
+replica_engines = []
+for index, url in enumerate(u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip()):
+    replica = create_database_engine(url)
+    instrument_engine(replica)
+    register_pool_gauges(replica, name=f"replica{index}")
+    replica_engines.append(replica)
+
+router = ReplicaRouter(engine, replica_engines, settings.REPLICA_STICKY_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Reads go to `info["read_bind"]` when a replica was chosen; flushes, and
+    cache fills right after a write (app/core/cache.py), go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        read_bind = self.info.get("read_bind")
+        if read_bind is not None and not self._flushing and not fill_from_primary.get():
+            return read_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
 
 Base = declarative_base()
 
+# Cached responses are invalidated once the write that changed them commits
+install_session_hooks(SessionLocal)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _remember_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _remember_bulk_write(orm_execute_state):
+    # Query.update()/delete() and insert() statements bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write_position(session):
+    if not session.info.pop("wrote", False) or not router.enabled:
+        return
+    consistency = current_consistency.get()
+    if consistency is None:
+        # Jobs and scripts write outside a request; nobody reads behind them
+        return
+    lsn = router.primary_lsn()
+    router.note_write(consistency.user_key, lsn)
+    consistency.write_lsn = lsn
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    """Session for read-only routes: a replica when one is consistent enough for the caller."""
+    consistency = current_consistency.get()
+    if consistency is not None:
+        bind = router.choose(consistency.user_key, consistency.min_lsn)
+    else:
+        bind = router.choose()
+    db = SessionLocal()
+    if bind is not engine:
+        db.info["read_bind"] = bind
+    try:
+        yield db
+    finally:
+        db.close()
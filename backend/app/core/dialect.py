@@ -0,0 +1,214 @@
+"""
+What the models and crud modules need from the database, on PostgreSQL
+and on SQLite.
+
+PostgreSQL is the production database. SQLite (DATABASE_URL=sqlite:///path)
+runs the app with no database server, for tests, benchmarks and single-user
+installs. It allows one writer at a time, so:
+
+* connections use WAL, so readers never wait for the writer, and a busy
+  timeout, so writers queue for the write lock rather than fail;
+* a transaction starts as a plain (deferred) BEGIN and reads from a
+  snapshot. Its first INSERT, UPDATE or DELETE ends that read-only
+  transaction and starts again with BEGIN IMMEDIATE, which waits for the
+  write lock. (Writing from the old snapshot would fail outright if another
+  writer had committed since.) Writes thus see the latest committed data,
+  as under PostgreSQL's READ COMMITTED; earlier reads may be older.
+
+Everything dialect-specific that crud code uses lives here:
+
+* StringList: ARRAY(TEXT) on PostgreSQL, a JSON array on SQLite.
+* Timestamp: timezone-aware datetimes. SQLite has no timezone type, so
+  values are stored in UTC and read back as UTC.
+* list_length, greatest and epoch_seconds: SQL functions whose names or
+  syntax differ between the two.
+* insert_ignoring: INSERT ... ON CONFLICT DO NOTHING against a named unique
+  constraint.
+* try_exclusive: a non-blocking lock on (key, id) for the rest of the
+  transaction. It is an advisory lock on PostgreSQL and a per-process lock
+  on SQLite, where there is only one server process.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import timezone
+from typing import Iterator
+
+from sqlalchemy import JSON, DateTime, Float, Integer, Text, create_engine, event, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+)
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+# ===== ENGINES =====
+def create_database_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT},
+        pool_size=settings.SQLITE_POOL_SIZE,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        # Transactions are begun below, not by the sqlite3 module
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.info["sqlite_writing"] = False
+        if not _autocommit(connection):
+            # Straight to the driver: BEGIN is not a query worth counting
+            connection.connection.dbapi_connection.execute("BEGIN")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_write_lock(connection, cursor, statement, parameters, context, executemany):
+        if connection.info.get("sqlite_writing", True) or _autocommit(connection):
+            return
+        if not ((context is not None and (context.isinsert or context.isupdate or context.isdelete))
+                or statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS)):
+            return
+        # Nothing was written yet, so the read-only part can end here
+        dbapi_connection = connection.connection.dbapi_connection
+        dbapi_connection.execute("COMMIT")
+        dbapi_connection.execute("BEGIN IMMEDIATE")
+        connection.info["sqlite_writing"] = True
+
+    return engine
+
+
+def _autocommit(connection) -> bool:
+    return connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+# ===== TYPES =====
+StringList = ARRAY(Text).with_variant(JSON(), "sqlite")
+
+
+class Timestamp(TypeDecorator):
+    """DateTime(timezone=True) that stays timezone-aware on SQLite."""
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == "sqlite" and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and dialect.name == "sqlite" and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+# ===== FUNCTIONS =====
+class list_length(FunctionElement):
+    """Number of items in a StringList column (NULL for NULL)."""
+    type = Integer()
+    inherit_cache = True
+    name = "list_length"
+
+
+@compiles(list_length)
+def _list_length(element, compiler, **kw):
+    return f"cardinality({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(list_length, "sqlite")
+def _list_length_sqlite(element, compiler, **kw):
+    return f"json_array_length({compiler.process(element.clauses, **kw)})"
+
+
+class greatest(FunctionElement):
+    inherit_cache = True
+    name = "greatest"
+
+
+@compiles(greatest)
+def _greatest(element, compiler, **kw):
+    return f"greatest({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(greatest, "sqlite")
+def _greatest_sqlite(element, compiler, **kw):
+    # SQLite's multi-argument max() is a scalar function
+    return f"max({compiler.process(element.clauses, **kw)})"
+
+
+class epoch_seconds(FunctionElement):
+    """Seconds since 1970 of a timestamp, as a float."""
+    type = Float()
+    inherit_cache = True
+    name = "epoch_seconds"
+
+
+@compiles(epoch_seconds)
+def _epoch_seconds(element, compiler, **kw):
+    return f"CAST(extract(epoch FROM {compiler.process(element.clauses, **kw)}) AS FLOAT)"
+
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    # Julian day 2440587.5 is 1970-01-01T00:00:00Z; stored timestamps are UTC
+    return f"((julianday({compiler.process(element.clauses, **kw)}) - 2440587.5) * 86400.0)"
+
+
+# ===== STATEMENTS =====
+def insert_ignoring(bind, model, values, constraint: str):
+    """INSERT that skips rows violating the unique constraint named `constraint`."""
+    if is_sqlite(bind):
+        columns = next(c.columns for c in model.__table__.constraints if c.name == constraint)
+        return sqlite_insert(model).values(values).on_conflict_do_nothing(index_elements=list(columns))
+    return pg_insert(model).values(values).on_conflict_do_nothing(constraint=constraint)
+
+
+_held = set()
+_held_lock = threading.Lock()
+
+
+@contextmanager
+def try_exclusive(db, key: int, object_id: int) -> Iterator[bool]:
+    """
+    Yields whether the lock on (key, object_id) was acquired. The caller
+    should end its transaction inside the block; on PostgreSQL that is what
+    releases the lock.
+    """
+    if not is_sqlite(db.get_bind()):
+        yield db.execute(select(func.pg_try_advisory_xact_lock(key, object_id))).scalar()
+        return
+    with _held_lock:
+        acquired = (key, object_id) not in _held
+        _held.add((key, object_id))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with _held_lock:
+                _held.discard((key, object_id))
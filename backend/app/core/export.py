@@ -0,0 +1,243 @@
+"""
+Static archive of a universe: HTML pages with JSON twins under
+EXPORT_DIR/universe-<id>/, downloadable as a ZIP.
+
+    index.html                  redirects to the newest feed page
+    style.css
+    feed/page-<n>.html|.json    top-level tweets, EXPORT_PAGE_SIZE per page, oldest first
+    characters/<id>.html|.json  profile header and latest posts
+    threads/<id>.html|.json     a tweet and every reply below it
+    media/<sha256>.<ext>        every image, once
+
+Feed pages are numbered from the oldest tweet, so a new tweet only touches
+the last feed page, its thread and its author's profile.
+
+This module writes pages; crud/export.py reads the universe. Each page is a
+plain dict. Its fingerprint (a hash of the dict) is recorded in
+.manifest.json, and a re-export renders and writes only the pages whose
+fingerprint changed, then deletes pages that no longer exist. Pages are
+written by the worker pool (app/core/workers.py).
+
+Images: data: URIs are decoded and /media uploads copied into media/ under
+their content hash. Other URLs are left pointing at the web.
+"""
+import base64
+import hashlib
+import html
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.media import EXTENSIONS, media_path, sniff_content_type
+from app.core.render import MARK_COLORS, format_count, format_timestamp
+
+EXPORT_VERSION = 1
+MANIFEST = ".manifest.json"
+
+STYLE = """\
+body { margin: 0; background: #fff; color: #0f1419; font: 15px/1.4 -apple-system, "Segoe UI", sans-serif; }
+main { max-width: 600px; margin: 0 auto; border-left: 1px solid #e1e8ed; border-right: 1px solid #e1e8ed; min-height: 100vh; }
+a { color: inherit; text-decoration: none; }
+h1 { font-size: 20px; margin: 0; padding: 12px 16px; border-bottom: 1px solid #e1e8ed; }
+.tweet { display: flex; gap: 12px; padding: 12px 16px; border-bottom: 1px solid #e1e8ed; }
+.tweet.root p { font-size: 18px; }
+.avatar { flex: none; width: 48px; height: 48px; border-radius: 50%; background: #1da1f2; color: #fff;
+          display: flex; align-items: center; justify-content: center; font-weight: bold; object-fit: cover; }
+.body { flex: 1; min-width: 0; }
+.muted, time, .handle { color: #536471; }
+.mark { display: inline-block; width: 14px; height: 14px; border-radius: 50%; vertical-align: -2px; }
+p { margin: 4px 0; white-space: pre-wrap; overflow-wrap: anywhere; }
+.images { display: grid; grid-template-columns: repeat(auto-fit, minmax(120px, 1fr)); gap: 2px; margin-top: 8px; }
+.images img { width: 100%; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 12px; }
+.quoted { border: 1px solid #e1e8ed; border-radius: 12px; padding: 10px; margin: 8px 0 0; }
+footer.counts { display: flex; gap: 16px; margin-top: 8px; color: #536471; font-size: 13px; }
+.profile { padding: 16px; border-bottom: 1px solid #e1e8ed; }
+.profile img.banner { width: 100%; aspect-ratio: 3 / 1; object-fit: cover; }
+nav.pages { display: flex; justify-content: space-between; padding: 16px; }
+"""
+
+
+def site_dir(universe_id: int) -> Path:
+    return Path(settings.EXPORT_DIR) / f"universe-{universe_id}"
+
+
+def fingerprint(page: dict) -> str:
+    encoded = json.dumps([EXPORT_VERSION, page], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def load_manifest(site: Path) -> Dict[str, str]:
+    try:
+        return json.loads((site / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path: Path, data: bytes):
+    """Atomic replace: a half-written page is never visible, not even to a running ZIP download."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+def _copy(source: Path, target: Path):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=target.parent, suffix=".tmp", delete=False) as tmp:
+        with open(source, "rb") as f:
+            shutil.copyfileobj(f, tmp)
+    os.replace(tmp.name, target)
+
+
+# ===== MEDIA =====
+def localize(site: Path, ref: Optional[str]) -> Tuple[Optional[str], bool]:
+    """
+    The page-relative URL of an image inside the archive, copying it into
+    media/ if it is not there yet. Returns (url, written).
+    """
+    if not ref:
+        return None, False
+    if ref.startswith("data:"):
+        try:
+            data = base64.b64decode(ref.split(",", 1)[1])
+        except (ValueError, IndexError):
+            return None, False
+        content_type = sniff_content_type(data[:12])
+        if content_type is None:
+            return None, False
+        name = f"{hashlib.sha256(data).hexdigest()}.{EXTENSIONS[content_type]}"
+        target = site / "media" / name
+        if target.exists():
+            return f"../media/{name}", False
+        _write(target, data)
+        return f"../media/{name}", True
+    if "/media/" in ref:
+        name = ref.rsplit("/", 1)[-1]
+        source = media_path(name)
+        if source is not None and source.is_file():
+            target = site / "media" / name
+            if target.exists():
+                return f"../media/{name}", False
+            _copy(source, target)
+            return f"../media/{name}", True
+    return ref, False
+
+
+# ===== HTML =====
+def _e(value) -> str:
+    return html.escape(str(value or ""))
+
+
+def _avatar(person: dict) -> str:
+    if person.get("picture"):
+        return f'<img class="avatar" src="{_e(person["picture"])}" alt="">'
+    initials = "".join(part[0] for part in person["name"].split() if part)[:2].upper()
+    return f'<div class="avatar">{_e(initials)}</div>'
+
+
+def _name(person: dict, character_id: int) -> str:
+    color = MARK_COLORS.get(person.get("official_mark"))
+    mark = f' <span class="mark" style="background:{color}"></span>' if color else ""
+    return (f'<a href="../characters/{character_id}.html"><strong>{_e(person["name"])}</strong>{mark} '
+            f'<span class="handle">@{_e(person["username"])}</span></a>')
+
+
+def _tweet_html(tweet: dict, authors: Dict[str, dict], root: bool = False) -> str:
+    author = authors[str(tweet["character_id"])]
+    parts = [f'<div class="body"><div>{_name(author, tweet["character_id"])} · '
+             f'<time datetime="{_e(tweet["story_time"])}">{_e(format_timestamp(tweet["story_time"]))}</time></div>']
+    if tweet.get("replying_to"):
+        parts.append(f'<div class="muted">Replying to @{_e(tweet["replying_to"])}</div>')
+    parts.append(f"<p>{_e(tweet['content'])}</p>")
+    if tweet["images"]:
+        parts.append('<div class="images">' + "".join(
+            f'<img src="{_e(src)}" alt="" loading="lazy">' for src in tweet["images"] if src
+        ) + "</div>")
+    quoted = tweet.get("quoted")
+    if quoted and str(quoted["character_id"]) in authors:
+        quoted_author = authors[str(quoted["character_id"])]
+        parts.append(f'<blockquote class="quoted"><div>{_name(quoted_author, quoted["character_id"])}</div>'
+                     f'<p>{_e(quoted["content"])}</p></blockquote>')
+    counts = tweet["counts"]
+    footer = [f"{format_count(counts[key])} {label}" for key, label in
+              (("comment", "Replies"), ("retweet", "Retweets"), ("like", "Likes"), ("view", "Views"))]
+    if tweet.get("has_replies"):
+        footer.append(f'<a href="../threads/{tweet["id"]}.html">Thread</a>')
+    parts.append('<footer class="counts">' + "".join(f"<span>{item}</span>" for item in footer) + "</footer></div>")
+    css = "tweet root" if root else "tweet"
+    return f'<article class="{css}" id="t{tweet["id"]}">{_avatar(author)}{"".join(parts)}</article>'
+
+
+def _page_html(page: dict) -> str:
+    body = [f"<h1>{_e(page['title'])}</h1>"]
+    character = page.get("character")
+    if character:
+        banner = f'<img class="banner" src="{_e(character["banner"])}" alt="">' if character.get("banner") else ""
+        body.append(
+            f'<section class="profile">{banner}{_avatar(character)}'
+            f'<div>{_name(character, character["id"])}</div><p>{_e(character.get("bio"))}</p>'
+            f'<div class="muted">{format_count(character["posts"])} posts · '
+            f'{format_count(character.get("followers") or 0)} Followers · '
+            f'{format_count(character.get("following") or 0)} Following</div></section>'
+        )
+    for index, tweet in enumerate(page["tweets"]):
+        body.append(_tweet_html(tweet, page["authors"], root=page["kind"] == "thread" and index == 0))
+    links = page.get("links") or {}
+    if links:
+        body.append('<nav class="pages">' + "".join(
+            f'<a href="{_e(href)}">{_e(label)}</a>' for label, href in links.items()
+        ) + "</nav>")
+    return (
+        '<!doctype html><html><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f'<title>{_e(page["title"])}</title><link rel="stylesheet" href="../style.css"></head>'
+        f'<body><main>{"".join(body)}</main></body></html>'
+    )
+
+
+def write_page(site: str, page: dict) -> Tuple[str, int]:
+    """Worker entry point: localize the page's images and write its .html and .json."""
+    root = Path(site)
+    media_written = 0
+    for tweet in page["tweets"]:
+        images = []
+        for ref in tweet["images"]:
+            url, written = localize(root, ref)
+            media_written += written
+            if url:
+                images.append(url)
+        tweet["images"] = images
+    _write(root / f"{page['path']}.json", json.dumps(page, default=str).encode())
+    _write(root / f"{page['path']}.html", _page_html(page).encode())
+    return page["path"], media_written
+
+
+def finish(site: Path, manifest: Dict[str, str], newest_feed_page: str):
+    """The stylesheet, the index and the manifest, once every page is written."""
+    _write(site / "style.css", STYLE.encode())
+    target = f"{newest_feed_page}.html"
+    _write(site / "index.html", (
+        f'<!doctype html><meta charset="utf-8"><meta http-equiv="refresh" content="0; url={target}">'
+        f'<a href="{target}">Open the archive</a>'
+    ).encode())
+    _write(site / MANIFEST, json.dumps(manifest, sort_keys=True).encode())
+
+
+def prune(site: Path, old: Dict[str, str], new: Dict[str, str]) -> int:
+    gone = old.keys() - new.keys()
+    for path in gone:
+        for suffix in (".html", ".json"):
+            (site / f"{path}{suffix}").unlink(missing_ok=True)
+    return len(gone)
+
+
+def archive_members(site: Path) -> Iterable[Tuple[str, Path]]:
+    """Every file of the site except the manifest, in a stable order."""
+    for path in sorted(p for p in site.rglob("*") if p.is_file()):
+        relative = path.relative_to(site).as_posix()
+        if relative != MANIFEST and not relative.endswith(".tmp"):
+            yield relative, path
@@ -0,0 +1,174 @@
+"""
+Write-coalescing pipeline for tweak view counts.
+
+POST .../impressions only adds to an in-memory counter per (universe, tweak).
+A background thread swaps the counters out every IMPRESSION_FLUSH_SECONDS
+(or sooner, once IMPRESSION_MAX_PENDING tweaks are waiting) and applies them
+in one statement:
+
+    UPDATE tweaks SET view_count = coalesce(view_count, 0) + v.n
+    FROM (VALUES (...), (...)) AS v(universe_id, tweak_id, n)
+    WHERE tweaks.id = v.tweak_id AND tweaks.universe_id = v.universe_id
+
+so a hot tweak viewed a thousand times costs one row update per flush.
+
+A flush does not invalidate cached responses (app/core/cache.py): bumping
+the universe's version every few seconds would evict every cached entry of
+any universe being scrolled, and mark its autocomplete index stale, for a
+change to view counts alone. Cached feeds show view counts up to
+CACHE_TTL_SECONDS old; anything else that changes the universe refreshes
+them sooner.
+
+Loss is bounded: a worker that dies loses at most the impressions received
+since its last flush (one interval, or IMPRESSION_MAX_PENDING tweaks), and a
+graceful shutdown flushes what is left. A failed flush puts its counts back.
+The buffer never holds more than IMPRESSION_MAX_BUFFERED tweaks: if the
+database stays down, impressions of tweaks beyond that are dropped and
+counted in allsocit_impressions_total{result="dropped"}.
+"""
+import logging
+import threading
+import time
+from collections import Counter as TallyCounter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, column, func, update, values
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import SIZE_BUCKETS, registry
+from app.models.tweaknow import Tweak
+
+logger = logging.getLogger(__name__)
+
+impressions_total = registry.counter(
+    "allsocit_impressions_total", "Impressions by outcome.", ("result",)
+)
+flush_duration = registry.histogram(
+    "allsocit_impression_flush_seconds", "Time to apply one batch of view-count increments."
+)
+flush_rows = registry.histogram(
+    "allsocit_impression_flush_rows", "Tweaks updated per flush.", buckets=SIZE_BUCKETS
+)
+
+Key = Tuple[int, int]  # (universe_id, tweak_id)
+
+
+class ImpressionBuffer:
+    def __init__(self, session_factory, flush_seconds: float, max_pending: int, max_buffered: int):
+        self.session_factory = session_factory
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self._pending: Dict[Key, int] = TallyCounter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, universe_id: int, tweak_ids: Iterable[int]) -> int:
+        """Count one impression per id; returns how many were accepted."""
+        return self.add_keys((universe_id, tweak_id) for tweak_id in tweak_ids)
+
+    def add_keys(self, keys: Iterable[Key]) -> int:
+        """Count one impression per (universe, tweak) row; returns how many were accepted."""
+        accepted = dropped = 0
+        with self._lock:
+            for key in keys:
+                # Tweaks already waiting cost nothing more; new ones only fit under the cap
+                if key in self._pending or len(self._pending) < self.max_buffered:
+                    self._pending[key] += 1
+                    accepted += 1
+                else:
+                    dropped += 1
+            full = len(self._pending) >= self.max_pending
+        impressions_total.inc(accepted, result="accepted")
+        self.drop(dropped)
+        if full:
+            self._wake.set()
+        return accepted
+
+    def drop(self, count: int):
+        """Count impressions refused before reaching the buffer."""
+        if count:
+            impressions_total.inc(count, result="dropped")
+
+    def flush(self) -> int:
+        """Apply everything pending in one UPDATE; returns the number of tweaks touched."""
+        with self._lock:
+            batch, self._pending = self._pending, TallyCounter()
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        rows = sorted((universe_id, tweak_id, n) for (universe_id, tweak_id), n in batch.items())
+        # A CTE rather than FROM (VALUES ...) AS v(...): SQLite cannot name VALUES columns inline
+        increments = values(
+            column("universe_id", Integer), column("tweak_id", Integer), column("n", Integer), name="v"
+        ).data(rows).cte("v")
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(Tweak)
+                .where(Tweak.id == increments.c.tweak_id, Tweak.universe_id == increments.c.universe_id)
+                .values(view_count=func.coalesce(Tweak.view_count, 0) + increments.c.n)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("impression flush failed, keeping %d tweaks for the next attempt", len(batch))
+            self._restore(batch)
+            return 0
+        finally:
+            db.close()
+
+        flush_duration.observe(time.perf_counter() - started)
+        flush_rows.observe(len(rows))
+        impressions_total.inc(sum(batch.values()), result="flushed")
+        return len(rows)
+
+    def _restore(self, batch: Dict[Key, int]):
+        with self._lock:
+            for key, n in batch.items():
+                if key in self._pending or len(self._pending) < self.max_buffered:
+                    self._pending[key] += n
+                else:
+                    impressions_total.inc(n, result="dropped")
+
+    # ===== BACKGROUND FLUSHING =====
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="impression-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and flush what is left."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join(timeout=10.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+
+buffer = ImpressionBuffer(
+    SessionLocal,
+    flush_seconds=settings.IMPRESSION_FLUSH_SECONDS,
+    max_pending=settings.IMPRESSION_MAX_PENDING,
+    max_buffered=settings.IMPRESSION_MAX_BUFFERED,
+)
+registry.gauge("allsocit_impressions_pending", "Tweaks with unflushed impressions.",
+               callback=lambda: buffer.pending)
@@ -0,0 +1,255 @@
+"""
+Durable background jobs for work too long for a request: deleting a
+universe, exporting its archive, reconciling its counters, moving cold
+universes to the archive and back. Every worker also queues archive jobs
+for universes unopened for ARCHIVE_AFTER_DAYS, every ARCHIVE_SWEEP_SECONDS.
+
+A job is a row in `jobs` (app/models/job.py, queue operations in
+app/crud/jobs.py). The API queues it and answers 202 with the row, which
+GET /jobs/{id} reads back until the job ends. Workers claim due jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can poll the same
+table without two ever taking the same job.
+
+* Priority: higher first, then oldest first.
+* Retries: a handler that raises is run again after JOB_RETRY_SECONDS,
+  doubled for every further attempt, until the job's max_attempts. Raise
+  JobFailed to fail at once.
+* Leases: while a job runs, a heartbeat thread stores its progress and
+  renews heartbeat_at every JOB_HEARTBEAT_SECONDS. A job whose heartbeat is
+  older than JOB_LEASE_SECONDS lost its worker and is queued again.
+* Cancellation: POST /jobs/{id}/cancel ends a queued job at once. A running
+  job learns of it at its next heartbeat and stops the next time its
+  handler calls JobContext.check_cancelled(); the handler's open
+  transaction is rolled back.
+
+Handlers are registered with @handler("kind") next to the crud code they
+drive (HANDLER_MODULES) and run with their own session. A handler can be
+interrupted at any point and run again, so it must pick up from whatever
+a previous attempt committed.
+
+Workers run as `python worker.py` processes, or as JOB_THREADS threads in
+each API process (the default, so that a single-process install needs
+nothing else). On SQLite there is no SKIP LOCKED; the claim is a single
+UPDATE, and the database's one write lock keeps claims apart.
+"""
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Modules whose import registers handlers
+HANDLER_MODULES = ("app.crud.universe", "app.crud.export", "app.crud.tweaknow", "app.crud.archive")
+
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+jobs_finished = registry.counter(
+    "allsocit_jobs_total", "Background job attempts, by kind and outcome.", ("kind", "outcome")
+)
+job_duration = registry.histogram(
+    "allsocit_job_duration_seconds", "Background job attempt duration.", ("kind",), buckets=DURATION_BUCKETS
+)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without retrying."""
+
+
+class JobContext:
+    """What a handler knows about its job, and how it reports back."""
+
+    def __init__(self, job):
+        self.job_id = job.id
+        self.kind = job.kind
+        self.user_id = job.user_id
+        self.universe_id = job.universe_id
+        self.payload = dict(job.payload or {})
+        self.attempt = job.attempts
+        self.max_attempts = job.max_attempts
+        self.progress = 0.0
+        self.message: Optional[str] = None
+        self.cancel_requested = bool(job.cancel_requested)
+
+    def report(self, progress: float, message: Optional[str] = None):
+        """Fraction done (0..1); stored with the next heartbeat"""
+        self.progress = min(1.0, max(0.0, progress))
+        self.message = message
+
+    def check_cancelled(self):
+        """Stop here if the job was cancelled; call it where stopping leaves nothing half done"""
+        if self.cancel_requested:
+            raise JobCancelled()
+
+
+_handlers: Dict[str, Callable] = {}
+
+
+def handler(kind: str):
+    """Register fn(db, ctx) -> Optional[dict] as the handler for jobs of `kind`; its return value is the result"""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def load_handlers():
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+# ===== RUNNING JOBS =====
+class _Heartbeat(threading.Thread):
+    def __init__(self, ctx: JobContext, worker: str):
+        super().__init__(name=f"job-{ctx.job_id}-heartbeat", daemon=True)
+        self.ctx = ctx
+        self.worker = worker
+        self.stopped = threading.Event()
+
+    def run(self):
+        from app.crud import jobs as crud_jobs
+
+        while not self.stopped.wait(settings.JOB_HEARTBEAT_SECONDS):
+            try:
+                with SessionLocal() as db:
+                    cancel = crud_jobs.heartbeat(db, self.ctx.job_id, self.worker, self.ctx.progress, self.ctx.message)
+            except Exception:
+                logger.exception("heartbeat for job %s failed", self.ctx.job_id)
+                continue
+            if cancel is None:
+                # The lease expired and the job went to another worker
+                logger.warning("job %s is no longer held by %s, stopping it", self.ctx.job_id, self.worker)
+            if cancel or cancel is None:
+                self.ctx.cancel_requested = True
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_one(worker: str) -> bool:
+    """Claim and run one due job; False when there was none"""
+    # Imported here: the crud package imports this module for @handler
+    from app.crud import jobs as crud_jobs
+
+    with SessionLocal() as db:
+        job = crud_jobs.claim_next(db, worker)
+        if job is None:
+            return False
+        ctx = JobContext(job)
+
+    fn = _handlers.get(ctx.kind)
+    started = time.monotonic()
+    outcome, result, error = "succeeded", None, None
+    if fn is None:
+        outcome, error = "failed", f"No handler for {ctx.kind!r} jobs"
+    else:
+        heartbeat = _Heartbeat(ctx, worker)
+        heartbeat.start()
+        db = SessionLocal()
+        try:
+            ctx.check_cancelled()
+            result = fn(db, ctx)
+            db.commit()
+        except JobCancelled:
+            db.rollback()
+            outcome = "cancelled"
+        except JobFailed as exc:
+            db.rollback()
+            outcome, error = "failed", str(exc)
+        except Exception as exc:
+            db.rollback()
+            logger.exception("job %s (%s) attempt %d failed", ctx.job_id, ctx.kind, ctx.attempt)
+            outcome = "retry" if ctx.attempt < ctx.max_attempts else "failed"
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            db.close()
+            heartbeat.stop()
+
+    with SessionLocal() as db:
+        if outcome == "retry":
+            delay = settings.JOB_RETRY_SECONDS * 2 ** (ctx.attempt - 1)
+            crud_jobs.retry_later(db, ctx.job_id, worker, delay, error)
+        else:
+            crud_jobs.finish(db, ctx.job_id, worker, outcome, result=result, error=error,
+                             progress=1.0 if outcome == "succeeded" else ctx.progress)
+    jobs_finished.inc(kind=ctx.kind, outcome=outcome)
+    job_duration.observe(time.monotonic() - started, kind=ctx.kind)
+    return True
+
+
+def run_pending(worker: str = "inline") -> int:
+    """Run due jobs in this thread until none is left; how many ran"""
+    load_handlers()
+    ran = 0
+    while run_one(worker):
+        ran += 1
+    return ran
+
+
+def worker_name(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def work(name: str, stop: threading.Event):
+    """A worker's loop: run jobs while there are any, poll while there are none"""
+    from app.crud import jobs as crud_jobs
+
+    load_handlers()
+    next_sweep = next_archive_sweep = 0.0
+    while not stop.is_set():
+        try:
+            if time.monotonic() >= next_sweep:
+                with SessionLocal() as db:
+                    released = crud_jobs.expire_leases(db, settings.JOB_LEASE_SECONDS)
+                if released:
+                    logger.warning("released %d jobs whose workers stopped responding", released)
+                next_sweep = time.monotonic() + settings.JOB_LEASE_SECONDS / 2
+            if settings.ARCHIVE_AFTER_DAYS > 0 and time.monotonic() >= next_archive_sweep:
+                from app.crud import archive as crud_archive
+
+                with SessionLocal() as db:
+                    queued = crud_archive.enqueue_cold(db)
+                if queued:
+                    logger.info("queued %d cold universes for archiving", queued)
+                next_archive_sweep = time.monotonic() + settings.ARCHIVE_SWEEP_SECONDS
+            ran = run_one(name)
+        except Exception:
+            # The database is unreachable, most likely; try again after a pause
+            logger.exception("job worker %s", name)
+            ran = False
+        if not ran:
+            stop.wait(settings.JOB_POLL_SECONDS)
+
+
+# ===== IN-PROCESS WORKERS =====
+_threads: List[threading.Thread] = []
+_stop = threading.Event()
+
+
+def start_threads(count: Optional[int] = None):
+    count = settings.JOB_THREADS if count is None else count
+    _stop.clear()
+    for index in range(count):
+        thread = threading.Thread(target=work, args=(worker_name(index), _stop), name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_threads():
+    """Let running jobs finish their attempt, then stop"""
+    _stop.set()
+    for thread in _threads:
+        thread.join()
+    _threads.clear()
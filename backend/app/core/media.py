@@ -0,0 +1,225 @@
+"""
+Streaming storage for uploaded images.
+
+POST /media is parsed straight off the ASGI receive stream with
+python-multipart's push parser. Each chunk of a file part is hashed and
+appended to a temporary file under MEDIA_DIR/tmp as it arrives, so a
+request holds one network chunk in memory however large the upload is.
+
+Limits are enforced as early as possible:
+
+* a Content-Length that cannot fit MEDIA_MAX_FILES images is refused before
+  the body is read (413);
+* a file part is abandoned as soon as it grows past MEDIA_MAX_BYTES (413);
+* the type is sniffed from the first bytes of the part, not taken from the
+  client, and anything but JPEG/PNG/GIF/WebP is refused (415).
+
+A finished file is named after its SHA-256 and moved into place with
+os.replace, so identical uploads share one file and readers never see a
+partial one. Files are served from GET /media/{sha256}.{ext}.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+CONTENT_TYPES = {extension: content_type for content_type, extension in EXTENSIONS.items()}
+FILENAME = re.compile(r"^(?P<sha256>[0-9a-f]{64})\.(?P<extension>jpg|png|gif|webp)$")
+
+# Room for the boundary and part headers around each file in the body
+PART_OVERHEAD = 16 * 1024
+SNIFF_BYTES = 12
+
+
+class MediaError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def media_root() -> Path:
+    return Path(settings.MEDIA_DIR)
+
+
+def media_path(filename: str) -> Optional[Path]:
+    """Where a stored file lives, or None for names that are not ours."""
+    match = FILENAME.match(filename)
+    if match is None:
+        return None
+    return media_root() / match["sha256"][:2] / filename
+
+
+class StoredFile:
+    """One file part: streamed into a temporary file, then stored by hash."""
+
+    def __init__(self, filename: Optional[str]):
+        self.filename = filename
+        self.size = 0
+        self.head = b""
+        self.sha256 = ""
+        self.content_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._file = None
+
+    @property
+    def stored_name(self) -> str:
+        return f"{self.sha256}.{EXTENSIONS[self.content_type]}"
+
+    def write(self, data: bytes):
+        if self._file is None:
+            tmp_dir = media_root() / "tmp"
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            self._file = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+        self._hash.update(data)
+        self._file.write(data)
+
+    def store(self):
+        """Close the temporary file and move it to its content-addressed name."""
+        self.sha256 = self._hash.hexdigest()
+        self.content_type = sniff_content_type(self.head)
+        if self._file is None:
+            raise MediaError(400, "Empty file")
+        self._file.close()
+        if self.content_type is None:
+            raise MediaError(415, "Only JPEG, PNG, GIF and WebP images can be uploaded")
+        destination = media_path(self.stored_name)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.exists():
+            os.unlink(self._file.name)
+        else:
+            os.replace(self._file.name, destination)
+        self._file = None
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None
+
+
+class _UploadParser:
+    """Callbacks for MultipartParser; file data is queued and written between chunks."""
+
+    def __init__(self, max_bytes: int, max_files: int):
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.files: List[StoredFile] = []
+        self.pending: List[tuple] = []
+        self._current: Optional[StoredFile] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._current = None
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"filename" not in options:
+            return  # a plain form field: its value is skipped
+        if len(self.files) >= self.max_files:
+            raise MediaError(413, f"At most {self.max_files} files per upload")
+        self._current = StoredFile(options[b"filename"].decode("utf-8", "replace"))
+        self.files.append(self._current)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        part = self._current
+        if part is None:
+            return
+        part.size += end - start
+        if part.size > self.max_bytes:
+            raise MediaError(413, f"Files are limited to {self.max_bytes} bytes")
+        chunk = data[start:end]
+        if len(part.head) < SNIFF_BYTES:
+            part.head += chunk[:SNIFF_BYTES - len(part.head)]
+        self.pending.append((part, chunk))
+
+    def flush(self):
+        for part, chunk in self.pending:
+            part.write(chunk)
+        self.pending.clear()
+
+
+async def receive_images(request) -> List[StoredFile]:
+    """Stream every file part of a multipart request into media storage."""
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise MediaError(400, "Expected a multipart/form-data body")
+
+    max_bytes, max_files = settings.MEDIA_MAX_BYTES, settings.MEDIA_MAX_FILES
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_files * (max_bytes + PART_OVERHEAD):
+        raise MediaError(413, "Upload too large")
+
+    upload = _UploadParser(max_bytes, max_files)
+    parser = MultipartParser(options[b"boundary"], upload.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if upload.pending:
+                # Hashing and disk writes stay off the event loop
+                await run_in_threadpool(upload.flush)
+        parser.finalize()
+        if not upload.files:
+            raise MediaError(400, "No files in the upload")
+        for part in upload.files:
+            await run_in_threadpool(part.store)
+    except Exception as exc:
+        for part in upload.files:
+            part.discard()
+        if isinstance(exc, MultipartParseError):
+            raise MediaError(400, "Malformed multipart body") from exc
+        raise
+    return upload.files
@@ -0,0 +1,374 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Request latency, response size and per-request SQL counts are recorded by
+MetricsMiddleware; SQL statements are counted through SQLAlchemy engine
+events, so an N+1 loop shows up as a growing `allsocit_request_db_queries`
+histogram for the route that owns it.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A gauge that is either set explicitly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Optional[float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        if self._callback is not None:
+            value = self._callback()
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback=callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "allsocit_http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "allsocit_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+http_response_size = registry.histogram(
+    "allsocit_http_response_size_bytes", "HTTP response body size.", ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+http_requests_in_progress = registry.gauge(
+    "allsocit_http_requests_in_progress", "HTTP requests currently being served."
+)
+request_db_queries = registry.histogram(
+    "allsocit_request_db_queries", "SQL statements executed per request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+request_db_duration = registry.histogram(
+    "allsocit_request_db_seconds", "Time spent in SQL per request.", ("method", "route")
+)
+db_queries_total = registry.counter("allsocit_db_queries_total", "SQL statements executed.")
+db_query_duration = registry.histogram(
+    "allsocit_db_query_duration_seconds", "Latency of individual SQL statements."
+)
+
+
+# ===== PER-REQUEST SQL ACCOUNTING =====
+class QueryStats:
+    """SQL statements observed while a request (or a test block) is active."""
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.record_statements = record_statements
+        self.statements: List[str] = []
+
+    def add(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if self.record_statements:
+            self.statements.append(statement)
+
+
+# Sync endpoints run in the threadpool with a copy of the caller's context, so
+# the QueryStats object set by the middleware is shared with the worker thread.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+# The start time lives on the statement's execution context rather than the
+# connection, so a statement that raises leaves nothing behind to mismatch
+# the next one's timing. Dialect-internal statements (version and isolation
+# probes on connect) run without a context and fall back to conn.info, which
+# the next statement overwrites before it is read.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        conn.info["allsocit_query_start"] = time.perf_counter()
+    else:
+        context._allsocit_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        started = conn.info.pop("allsocit_query_start", None)
+    else:
+        started = getattr(context, "_allsocit_query_start", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_queries_total.inc()
+    db_query_duration.observe(elapsed)
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+
+
+def instrument_engine(engine):
+    """Attach SQL counting hooks to an engine. Safe to call more than once."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ===== PROCESS GAUGES =====
+def register_pool_gauges(engine, name: str = "primary"):
+    pool = engine.pool
+    prefix = f"allsocit_db_pool_{name}"
+    for attr, documentation in (
+        ("size", "Configured pool size."),
+        ("checkedout", "Connections currently checked out."),
+        ("checkedin", "Idle connections held by the pool."),
+        ("overflow", "Connections opened beyond the pool size."),
+    ):
+        method = getattr(pool, attr, None)
+        if method is not None:
+            registry.gauge(f"{prefix}_{attr}", documentation, callback=method)
+
+
+def _threadpool_statistics():
+    # Only meaningful from inside the event loop (the /metrics route is async).
+    from anyio import to_thread
+
+    try:
+        return to_thread.current_default_thread_limiter().statistics()
+    except Exception:
+        return None
+
+
+def _threadpool_gauge(attr):
+    def read():
+        stats = _threadpool_statistics()
+        return None if stats is None else getattr(stats, attr)
+    return read
+
+
+registry.gauge(
+    "allsocit_threadpool_busy_threads", "Threadpool tokens in use by sync endpoints.",
+    callback=_threadpool_gauge("borrowed_tokens"),
+)
+registry.gauge(
+    "allsocit_threadpool_size", "Threadpool capacity.",
+    callback=_threadpool_gauge("total_tokens"),
+)
+registry.gauge(
+    "allsocit_threadpool_queue_depth", "Sync endpoint calls waiting for a thread.",
+    callback=_threadpool_gauge("tasks_waiting"),
+)
+
+
+# ===== ASGI MIDDLEWARE =====
+class MetricsMiddleware:
+    """Records latency, response size and SQL usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec()
+            current_query_stats.reset(token)
+
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", "<unmatched>"),
+            }
+            http_requests_total.inc(status=response["status"], **labels)
+            http_request_duration.observe(elapsed, **labels)
+            http_response_size.observe(response["size"], **labels)
+            request_db_queries.observe(stats.count, **labels)
+            request_db_duration.observe(stats.seconds, **labels)
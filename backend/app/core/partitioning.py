@@ -0,0 +1,341 @@
+"""
+Opt-in hash partitioning of `tweaks` by universe_id (PostgreSQL only).
+
+Every per-universe read filters on universe_id, so once `tweaks` is
+PARTITION BY HASH (universe_id) the planner only touches the partition a
+universe lives in: its indexes stay as small as a 1/N share of the data,
+and vacuum and index maintenance work a partition at a time. The schema
+Alembic manages stays the plain table; partitioning is a deployment
+choice made with `python partition.py`:
+
+    python partition.py status
+    python partition.py start --partitions 16   # shadow table + sync trigger
+    python partition.py backfill                # copy rows in batches, resumable
+    python partition.py swap                    # short lock, rename, done
+    python partition.py drop-old                # once satisfied
+    python partition.py run                     # start, backfill and swap in one go
+
+The conversion is online. `start` creates `tweaks_partitioned` with the
+same columns, a (id, universe_id) primary key and copies of every index
+and outgoing foreign key, and a trigger on `tweaks` that mirrors each
+insert, update and delete into it. `backfill` copies existing rows in id
+ranges, one short transaction per batch (FOR SHARE, so a concurrent update
+waits for the batch instead of racing it); it can be stopped and run again
+at any time. `swap` takes the locks for a few renames: `tweaks` becomes
+`tweaks_unpartitioned` (inert, kept for rollback until drop-old) and the
+partitioned table takes its name, indexes and id sequence.
+
+Foreign keys into a partitioned table must cover its partition key, and
+likes, retweets and the tweaks' own reply/quote/override columns point at
+a bare tweak id. `swap` replaces those constraints with triggers that keep
+their rules: inserting or updating a reference checks (and key-share
+locks) the tweak, and deleting a tweak cascades, nulls or refuses exactly
+as the constraint it replaces did. Hence the Alembic caveat: autogenerate
+against a partitioned database reports the missing foreign keys and the
+partitions; leave those out of generated migrations.
+"""
+import re
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.dialect import is_sqlite
+
+TABLE = "tweaks"
+SHADOW = "tweaks_partitioned"
+OLD = "tweaks_unpartitioned"
+PARTITION_KEY = "universe_id"
+
+DEFAULT_PARTITIONS = 16
+DEFAULT_BATCH_SIZE = 5_000
+# DDL waits at most this long for a lock, so a long transaction makes it
+# fail (try again later) instead of queueing every query behind it
+LOCK_TIMEOUT = "5s"
+
+# pg_constraint.confdeltype -> what deleting the tweak does to referencing rows
+_ON_DELETE = {"a": "no action", "r": "restrict", "c": "cascade", "n": "set null"}
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def _require_postgres(conn: Connection):
+    if is_sqlite(conn):
+        raise PartitioningError("Partitioning needs PostgreSQL")
+
+
+def _quote(conn: Connection, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _relkind(conn: Connection, name: str) -> Optional[str]:
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}).scalar()
+
+
+def _lock_timeout(conn: Connection):
+    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+
+
+def _indexes(conn: Connection, table: str) -> List[dict]:
+    return [dict(row._mapping) for row in conn.execute(text(
+        "SELECT c.relname AS name, i.indisprimary AS is_primary, i.indisunique AS is_unique, "
+        "pg_get_indexdef(i.indexrelid) AS definition "
+        "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": table})]
+
+
+def _foreign_keys(conn: Connection, table: str) -> List[dict]:
+    """Foreign keys out of `table` to other tables"""
+    return [dict(row._mapping) for row in conn.execute(text(
+        "SELECT conname AS name, pg_get_constraintdef(oid) AS definition FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = to_regclass(:table) AND confrelid <> conrelid ORDER BY conname"
+    ), {"table": table})]
+
+
+def _references(conn: Connection) -> List[dict]:
+    """Foreign keys into `tweaks`, its own included: name, table, column, on_delete"""
+    rows = conn.execute(text(
+        "SELECT c.conname AS name, c.conrelid::regclass::text AS table, c.confdeltype AS on_delete, "
+        "array_length(c.conkey, 1) AS width, a.attname AS column FROM pg_constraint c "
+        "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+        "WHERE c.contype = 'f' AND c.confrelid = to_regclass(:table) ORDER BY c.conname"
+    ), {"table": TABLE}).mappings().all()
+    references = []
+    for row in rows:
+        if row["width"] != 1 or row["on_delete"] not in _ON_DELETE:
+            raise PartitioningError(f"Cannot emulate foreign key {row['name']}")
+        references.append(dict(row))
+    return references
+
+
+def _renamed(definition: str, name: str, table: str) -> str:
+    """pg_get_indexdef output rewritten to create index `name` on `table`"""
+    return re.sub(r"^CREATE (UNIQUE )?INDEX \S+ ON \S+ ", lambda m: f"CREATE {m.group(1) or ''}INDEX {name} ON {table} ",
+                  definition, count=1)
+
+
+def _shadow_index_name(name: str) -> str:
+    return f"{name}_partitioned"
+
+
+def _old_index_name(name: str) -> str:
+    return f"{name}_unpartitioned"
+
+
+# ===== STATUS =====
+def status(engine: Engine) -> Dict:
+    """Where the conversion stands: "unpartitioned", "backfilling" (started, not swapped) or "partitioned" """
+    with engine.connect() as conn:
+        _require_postgres(conn)
+        partitioned = _relkind(conn, TABLE) == "p"
+        shadow = _relkind(conn, SHADOW) is not None
+        result = {
+            "state": "partitioned" if partitioned else "backfilling" if shadow else "unpartitioned",
+            "old_table": _relkind(conn, OLD) is not None,
+        }
+        parent = TABLE if partitioned else SHADOW if shadow else None
+        if parent:
+            result["partitions"] = conn.execute(text(
+                "SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(:table)"
+            ), {"table": parent}).scalar()
+        if shadow:
+            result["rows"] = conn.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar()
+            result["copied"] = conn.execute(text(f"SELECT count(*) FROM {SHADOW}")).scalar()
+        return result
+
+
+# ===== START =====
+_SYNC_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {SHADOW}_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM {SHADOW} WHERE id = OLD.id AND {PARTITION_KEY} = OLD.{PARTITION_KEY};
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {SHADOW} SELECT (NEW).*;
+    END IF;
+    RETURN NULL;
+END $$
+"""
+
+
+def start(engine: Engine, partitions: int = DEFAULT_PARTITIONS):
+    """Create the partitioned shadow table and start mirroring writes into it"""
+    if partitions < 1:
+        raise PartitioningError("Need at least one partition")
+    with engine.begin() as conn:
+        _require_postgres(conn)
+        if _relkind(conn, TABLE) == "p":
+            raise PartitioningError(f"{TABLE} is already partitioned")
+        if _relkind(conn, SHADOW) is not None:
+            raise PartitioningError(f"{SHADOW} already exists: run backfill, or drop it to start over")
+        _lock_timeout(conn)
+
+        conn.execute(text(
+            f"CREATE TABLE {SHADOW} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY HASH ({PARTITION_KEY})"
+        ))
+        for remainder in range(partitions):
+            conn.execute(text(
+                f"CREATE TABLE {TABLE}_p{remainder} PARTITION OF {SHADOW} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            ))
+        for index in _indexes(conn, TABLE):
+            if index["is_primary"]:
+                conn.execute(text(f"ALTER TABLE {SHADOW} ADD CONSTRAINT {SHADOW}_pkey PRIMARY KEY (id, {PARTITION_KEY})"))
+            elif index["is_unique"]:
+                raise PartitioningError(f"Unique index {index['name']} does not include {PARTITION_KEY}")
+            else:
+                name = _quote(conn, _shadow_index_name(index["name"]))
+                conn.execute(text(_renamed(index["definition"], name, SHADOW)))
+        for key in _foreign_keys(conn, TABLE):
+            conn.execute(text(f"ALTER TABLE {SHADOW} ADD CONSTRAINT {_quote(conn, key['name'])} {key['definition']}"))
+
+        conn.execute(text(_SYNC_FUNCTION))
+        conn.execute(text(
+            f"CREATE TRIGGER {SHADOW}_sync AFTER INSERT OR UPDATE OR DELETE ON {TABLE} "
+            f"FOR EACH ROW EXECUTE FUNCTION {SHADOW}_sync()"
+        ))
+
+
+# ===== BACKFILL =====
+def backfill(engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE, after_id: int = 0,
+             on_batch: Optional[Callable[[int, int, int], None]] = None) -> int:
+    """
+    Copy rows with id > after_id into the shadow table, batch_size ids per
+    transaction; on_batch(last_id, max_id, copied) after each. Rows already
+    copied are skipped, so running it again is safe. Returns rows copied.
+    """
+    with engine.connect() as conn:
+        _require_postgres(conn)
+        if _relkind(conn, SHADOW) is None:
+            raise PartitioningError(f"{SHADOW} does not exist: run start first")
+        # Rows inserted from here on are mirrored by the trigger
+        max_id = conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {TABLE}")).scalar()
+
+    copied, last_id = 0, after_id
+    while last_id < max_id:
+        upper = min(last_id + batch_size, max_id)
+        with engine.begin() as conn:
+            _lock_timeout(conn)
+            batch = conn.execute(text(
+                f"INSERT INTO {SHADOW} SELECT * FROM {TABLE} WHERE id > :lower AND id <= :upper "
+                f"ORDER BY id FOR SHARE ON CONFLICT DO NOTHING"
+            ), {"lower": last_id, "upper": upper}).rowcount
+        copied += batch
+        last_id = upper
+        if on_batch is not None:
+            on_batch(last_id, max_id, batch)
+    return copied
+
+
+# ===== SWAP =====
+def _check_function() -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION {TABLE}_check_reference() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    ref bigint := (to_jsonb(NEW) ->> TG_ARGV[1])::bigint;
+BEGIN
+    IF ref IS NOT NULL THEN
+        PERFORM 1 FROM {TABLE} WHERE id = ref FOR KEY SHARE;
+        IF NOT FOUND THEN
+            RAISE foreign_key_violation USING MESSAGE = format(
+                'insert or update on table "%s" violates %s: tweak %s does not exist', TG_TABLE_NAME, TG_ARGV[0], ref);
+        END IF;
+    END IF;
+    RETURN NULL;
+END $$
+"""
+
+
+def _delete_function(references: List[dict]) -> str:
+    actions, checks = [], []
+    for ref in references:
+        where = f"{ref['column']} = OLD.id"
+        if ref["on_delete"] == "c":
+            actions.append(f"    DELETE FROM {ref['table']} WHERE {where};")
+        elif ref["on_delete"] == "n":
+            actions.append(f"    UPDATE {ref['table']} SET {ref['column']} = NULL WHERE {where};")
+        else:
+            checks.append(
+                f"    IF EXISTS (SELECT 1 FROM {ref['table']} WHERE {where}) THEN\n"
+                f"        RAISE foreign_key_violation USING MESSAGE = format(\n"
+                f"            'delete on table \"{TABLE}\" violates {ref['name']}: tweak %s is still referenced from \"{ref['table']}\"', OLD.id);\n"
+                f"    END IF;"
+            )
+    body = "\n".join(actions + checks)
+    return f"""
+CREATE OR REPLACE FUNCTION {TABLE}_delete_references() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+{body}
+    RETURN NULL;
+END $$
+"""
+
+
+def swap(engine: Engine):
+    """Put the partitioned table in place of `tweaks`, in one short transaction"""
+    with engine.begin() as conn:
+        _require_postgres(conn)
+        if _relkind(conn, SHADOW) is None:
+            raise PartitioningError(f"{SHADOW} does not exist: run start and backfill first")
+        if _relkind(conn, OLD) is not None:
+            raise PartitioningError(f"{OLD} already exists: run drop-old first")
+        _lock_timeout(conn)
+
+        references = _references(conn)
+        tables = sorted({TABLE, SHADOW} | {ref["table"] for ref in references})
+        conn.execute(text(f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE"))
+        rows = conn.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar()
+        copied = conn.execute(text(f"SELECT count(*) FROM {SHADOW}")).scalar()
+        if rows != copied:
+            raise PartitioningError(f"{SHADOW} has {copied} of {rows} rows: run backfill first")
+
+        conn.execute(text(f"DROP TRIGGER {SHADOW}_sync ON {TABLE}"))
+        conn.execute(text(f"DROP FUNCTION {SHADOW}_sync()"))
+        for ref in references:
+            conn.execute(text(f"ALTER TABLE {ref['table']} DROP CONSTRAINT {_quote(conn, ref['name'])}"))
+        # The old table keeps its rows but nothing else: no keys pinning other tables, no sequence
+        for key in _foreign_keys(conn, TABLE):
+            conn.execute(text(f"ALTER TABLE {TABLE} DROP CONSTRAINT {_quote(conn, key['name'])}"))
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": TABLE}).scalar()
+        conn.execute(text(f"ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT"))
+
+        old_indexes = _indexes(conn, TABLE)
+        for index in old_indexes:
+            conn.execute(text(
+                f"ALTER INDEX {_quote(conn, index['name'])} RENAME TO {_quote(conn, _old_index_name(index['name']))}"
+            ))
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {OLD}"))
+        conn.execute(text(f"ALTER TABLE {SHADOW} RENAME TO {TABLE}"))
+        for index in old_indexes:
+            new_name = f"{SHADOW}_pkey" if index["is_primary"] else _shadow_index_name(index["name"])
+            conn.execute(text(f"ALTER INDEX {_quote(conn, new_name)} RENAME TO {_quote(conn, index['name'])}"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id"))
+
+        conn.execute(text(_check_function()))
+        for ref in references:
+            conn.execute(text(
+                f"CREATE TRIGGER {_quote(conn, ref['name'] + '_check')} "
+                f"AFTER INSERT OR UPDATE OF {ref['column']} ON {ref['table']} "
+                f"FOR EACH ROW EXECUTE FUNCTION {TABLE}_check_reference('{ref['name']}', '{ref['column']}')"
+            ))
+        conn.execute(text(_delete_function(references)))
+        conn.execute(text(
+            f"CREATE TRIGGER {TABLE}_delete_references AFTER DELETE ON {TABLE} "
+            f"FOR EACH ROW EXECUTE FUNCTION {TABLE}_delete_references()"
+        ))
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def drop_old(engine: Engine):
+    with engine.begin() as conn:
+        _require_postgres(conn)
+        if _relkind(conn, TABLE) != "p":
+            raise PartitioningError(f"{TABLE} is not partitioned yet")
+        conn.execute(text(f"DROP TABLE IF EXISTS {OLD}"))
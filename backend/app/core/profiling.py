@@ -0,0 +1,276 @@
+"""
+On-demand request profiling and heap snapshots for admins.
+
+A request carrying `X-Profile: 1` (or `?__profile=1`) from an admin is run
+under a sampling profiler. The collapsed stacks are written to PROFILE_DIR in
+the "folded" format understood by flamegraph.pl and speedscope, and the file
+id is returned in the `X-Profile-Id` response header.
+
+The sampler reads every thread's stack through sys._current_frames(), so
+other requests running on the same worker at the same time show up in the
+profile too; stacks are prefixed with the thread name to tell them apart.
+"""
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from anyio import to_thread
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+
+# Frames a thread sits in while it has nothing to do
+_IDLE_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+
+
+def admin_emails() -> set:
+    return {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+
+
+def is_admin_email(email: Optional[str]) -> bool:
+    return bool(email) and email.lower() in admin_emails()
+
+
+def admin_email_from_authorization(authorization: Optional[str]) -> Optional[str]:
+    """Return the token subject if the bearer token belongs to an admin, else None."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    return email if is_admin_email(email) else None
+
+
+# ===== SAMPLING CPU PROFILER =====
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._collapse(frame)
+                if stack is not None:
+                    self.samples[f"{names.get(ident, ident)};{stack}"] += 1
+            self.sample_count += 1
+
+    @staticmethod
+    def _collapse(frame) -> Optional[str]:
+        top = frame.f_code
+        if (os.path.basename(top.co_filename), top.co_name) in _IDLE_FUNCTIONS:
+            return None
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _profile_dir() -> str:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    return settings.PROFILE_DIR
+
+
+def save_profile(profiler: SamplingProfiler, method: str, path: str, status: int) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:80] or "root"
+    profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{method.lower()}-{slug}"
+    with open(os.path.join(_profile_dir(), profile_id + ".folded"), "w") as f:
+        f.write(
+            f"# {method} {path} -> {status}, {profiler.duration * 1000:.1f} ms, "
+            f"{profiler.sample_count} samples every {profiler.interval * 1000:g} ms\n"
+        )
+        f.write(profiler.folded())
+    return profile_id
+
+
+def list_profiles() -> List[str]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    names = [name[:-len(".folded")] for name in os.listdir(settings.PROFILE_DIR) if name.endswith(".folded")]
+    return sorted(names, reverse=True)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+", profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, profile_id + ".folded")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it, if they come from an admin."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if admin_email_from_authorization(headers.get(b"authorization", b"").decode("latin-1")) is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL)
+        state = {"start": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Stop at the first byte of the response; the header must be set before it goes out.
+                # Joining the sampler and writing the file happen off the event loop.
+                await to_thread.run_sync(profiler.stop)
+                profile_id = await to_thread.run_sync(
+                    save_profile, profiler, scope["method"], scope["path"], message["status"]
+                )
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+                state["start"] = message
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if state["start"] is None:
+                await to_thread.run_sync(profiler.stop)
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER.encode() and value not in (b"", b"0", b"false"):
+                return True
+        query = scope.get("query_string", b"").decode("latin-1")
+        return any(
+            part.split("=", 1)[0] == PROFILE_QUERY_PARAM and part.split("=", 1)[-1] not in ("0", "false")
+            for part in query.split("&") if part
+        )
+
+
+# ===== HEAP SNAPSHOTS =====
+_snapshots: Dict[int, dict] = {}
+_snapshot_lock = threading.Lock()
+_next_snapshot_id = 1
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def start_tracing(frames: int):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    with _snapshot_lock:
+        _snapshots.clear()
+
+
+def tracing_status() -> dict:
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    return {
+        "pid": os.getpid(),
+        "tracing": tracemalloc.is_tracing(),
+        "traceback_limit": tracemalloc.get_traceback_limit(),
+        "traced_bytes": current,
+        "peak_traced_bytes": peak,
+        "snapshots": sorted(_snapshots),
+    }
+
+
+def take_snapshot() -> dict:
+    global _next_snapshot_id
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing; start it first")
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    with _snapshot_lock:
+        snapshot_id = _next_snapshot_id
+        _next_snapshot_id += 1
+        _snapshots[snapshot_id] = {"snapshot": snapshot, "taken_at": datetime.utcnow()}
+        # Snapshots hold every traceback; keep only the most recent few
+        for old_id in sorted(_snapshots)[:-settings.MEMORY_SNAPSHOT_LIMIT]:
+            del _snapshots[old_id]
+    return {
+        "id": snapshot_id,
+        "pid": os.getpid(),
+        "taken_at": _snapshots[snapshot_id]["taken_at"],
+        "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+    }
+
+
+def get_snapshot(snapshot_id: int):
+    entry = _snapshots.get(snapshot_id)
+    return entry["snapshot"] if entry else None
+
+
+def _format_traceback(traceback) -> List[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+def snapshot_top(snapshot, key_type: str, limit: int) -> List[dict]:
+    return [
+        {"location": _format_traceback(stat.traceback), "size": stat.size, "count": stat.count}
+        for stat in snapshot.statistics(key_type)[:limit]
+    ]
+
+
+def snapshot_diff(newer, older, key_type: str, limit: int) -> List[dict]:
+    return [
+        {
+            "location": _format_traceback(stat.traceback),
+            "size": stat.size,
+            "size_diff": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in newer.compare_to(older, key_type)[:limit]
+    ]
@@ -0,0 +1,382 @@
+"""
+Tweet cards rendered to PNG on the server.
+
+Cards follow the app's detail layout (TweetCard.tsx with isDetailView): the
+avatar, name, mark and handle, "Replying to", the text, a quoted tweet,
+up to four images, the story timestamp and the counts row. Colors come
+from the app's themes (ThemeContext.tsx).
+
+A card is described by a plain dict of everything it shows (card_inputs).
+Its PNG is cached on disk as RENDER_CACHE_DIR/<sha256 of the inputs>.png,
+so an unchanged card is served without drawing anything. Editing the
+tweet, its author or the tweet it quotes changes the key. RENDERER_VERSION
+is part of the inputs; bump it when the layout changes.
+
+Drawing runs in the shared worker pool (app/core/workers.py). Jobs send the
+inputs and get nothing back: workers write the PNG into the cache
+themselves.
+
+Images are read from data: URIs and /media uploads only. Other URLs are
+drawn as empty placeholders; the renderer never fetches from the network.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from app.core.config import settings
+from app.core.media import media_path
+from app.core.metrics import registry
+from app.core.workers import run_all
+
+RENDERER_VERSION = 1
+
+THEMES = {
+    "light": {"background": "#FFFFFF", "border": "#E1E8ED", "text": "#0F1419",
+              "text_secondary": "#536471", "primary": "#1DA1F2"},
+    "dark": {"background": "#000000", "border": "#2F3336", "text": "#E7E9EA",
+             "text_secondary": "#71767B", "primary": "#1DA1F2"},
+    "dim": {"background": "#15202B", "border": "#38444D", "text": "#FFFFFF",
+            "text_secondary": "#8899A6", "primary": "#1DA1F2"},
+}
+MARK_COLORS = {"Blue": "#1DA1F2", "Gold": "#FFD700", "Grey": "#8899A6"}
+AVATAR_COLOR = "#1DA1F2"
+
+# Layout in points, drawn at SCALE pixels per point
+SCALE = 2
+WIDTH = 600
+PADDING = 16
+
+card_renders = registry.counter(
+    "allsocit_card_renders_total", "Tweet cards requested, by whether the PNG was cached.", ("result",)
+)
+
+
+# ===== INPUTS AND CACHE =====
+def _person(character: dict) -> dict:
+    return {
+        "name": character["name"],
+        "username": character["username"],
+        "official_mark": character.get("official_mark") or "None",
+        "profile_picture": character.get("profile_picture"),
+    }
+
+
+def _story_time(tweak: dict) -> str:
+    return (tweak.get("custom_date") or tweak["created_at"]).isoformat()
+
+
+def card_inputs(tweak: dict, author: dict, theme: str, quoted: Optional[dict] = None,
+                quoted_author: Optional[dict] = None, replying_to: Optional[str] = None) -> dict:
+    """Everything a card shows, as JSON-able data; the cache key is its hash."""
+    return {
+        "version": RENDERER_VERSION,
+        "theme": theme,
+        "author": _person(author),
+        "replying_to": replying_to,
+        "content": tweak.get("content") or "",
+        "images": list(tweak.get("images") or [])[:4],
+        "story_time": _story_time(tweak),
+        "counts": [tweak.get(name) or 0 for name in ("view_count", "retweet_count", "quote_count", "like_count")],
+        "quoted": {
+            "author": _person(quoted_author),
+            "content": quoted.get("content") or "",
+            "image": (quoted.get("images") or [None])[0],
+        } if quoted is not None and quoted_author is not None else None,
+    }
+
+
+def thread_card_inputs(context: dict, theme: str) -> List[dict]:
+    """card_inputs for every card in crud.tweaknow.get_cards' result."""
+    tweets, authors = context["tweets"], context["characters"]
+    inputs = []
+    for tweak in context["cards"]:
+        quoted = tweets.get(tweak["quoted_tweak_id"])
+        parent = tweets.get(tweak["reply_to_tweak_id"])
+        parent_author = authors.get(parent["character_id"]) if parent else None
+        inputs.append(card_inputs(
+            tweak, authors[tweak["character_id"]], theme,
+            quoted=quoted,
+            quoted_author=authors.get(quoted["character_id"]) if quoted else None,
+            replying_to=parent_author["username"] if parent_author else None,
+        ))
+    return inputs
+
+
+def cache_key(inputs: dict) -> str:
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def cache_path(key: str) -> Path:
+    return Path(settings.RENDER_CACHE_DIR) / key[:2] / f"{key}.png"
+
+
+# ===== DRAWING =====
+@lru_cache(maxsize=None)
+def _font(points: int, bold: bool = False):
+    configured = settings.RENDER_BOLD_FONT if bold else settings.RENDER_FONT
+    for name in (configured, "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"):
+        if name:
+            try:
+                return ImageFont.truetype(name, points * SCALE)
+            except OSError:
+                pass
+    return ImageFont.load_default(points * SCALE)
+
+
+def format_count(count: int) -> str:
+    for threshold, suffix in ((1_000_000, "M"), (1_000, "K")):
+        if count >= threshold:
+            return f"{count / threshold:.1f}".removesuffix(".0") + suffix
+    return str(count)
+
+
+def format_timestamp(value: str) -> str:
+    """'3:45 PM · Oct 19, 26', as formatFullDate in TweetCard.tsx"""
+    moment = datetime.fromisoformat(value)
+    hour = moment.hour % 12 or 12
+    return f"{hour}:{moment.minute:02d} {'PM' if moment.hour >= 12 else 'AM'} · {moment:%b} {moment.day}, {moment:%y}"
+
+
+def _wrap(text: str, font, width: int, max_lines: Optional[int] = None) -> List[str]:
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if font.getlength(candidate) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # Break words longer than the line
+            while font.getlength(word) > width:
+                cut = len(word)
+                while cut > 1 and font.getlength(word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    if max_lines is not None and len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip() + "…"
+    return lines
+
+
+def _load_image(ref: Optional[str]) -> Optional[Image.Image]:
+    if not ref:
+        return None
+    try:
+        if ref.startswith("data:"):
+            return Image.open(io.BytesIO(base64.b64decode(ref.split(",", 1)[1]))).convert("RGB")
+        if "/media/" in ref:
+            path = media_path(ref.rsplit("/", 1)[-1])
+            if path is not None and path.is_file():
+                return Image.open(path).convert("RGB")
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _rounded_paste(canvas: Image.Image, image: Optional[Image.Image], box, radius: int, fill: str):
+    x0, y0, x1, y1 = box
+    size = (x1 - x0, y1 - y0)
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, size[0] - 1, size[1] - 1), radius=radius, fill=255)
+    tile = ImageOps.fit(image, size) if image is not None else Image.new("RGB", size, fill)
+    canvas.paste(tile, (x0, y0), mask)
+
+
+def _avatar(canvas: Image.Image, draw: ImageDraw.ImageDraw, person: dict, x: int, y: int, size: int):
+    picture = _load_image(person["profile_picture"])
+    if picture is not None:
+        _rounded_paste(canvas, picture, (x, y, x + size, y + size), size // 2, AVATAR_COLOR)
+        return
+    draw.ellipse((x, y, x + size, y + size), fill=AVATAR_COLOR)
+    initials = "".join(part[0] for part in person["name"].split() if part)[:2].upper()
+    draw.text((x + size / 2, y + size / 2), initials, font=_font(max(size // SCALE * 2 // 5, 6), True),
+              fill="#FFFFFF", anchor="mm")
+
+
+def _mark(draw: ImageDraw.ImageDraw, mark: str, x: float, y: float, size: int) -> float:
+    """Verification badge left-aligned at x, centered on y; returns its width."""
+    color = MARK_COLORS.get(mark)
+    if color is None:
+        return 0
+    r = size / 2
+    draw.ellipse((x, y - r, x + size, y + r), fill=color)
+    draw.line([(x + size * 0.28, y), (x + size * 0.44, y + size * 0.16), (x + size * 0.74, y - size * 0.18)],
+              fill="#FFFFFF", width=max(SCALE * 2, 2), joint="curve")
+    return size
+
+
+class _Card:
+    """Lays a card out top to bottom; with draw=False it only measures."""
+
+    def __init__(self, inputs: dict, canvas: Optional[Image.Image] = None):
+        self.inputs = inputs
+        self.colors = THEMES[inputs["theme"]]
+        self.canvas = canvas
+        self.draw = ImageDraw.Draw(canvas) if canvas is not None else None
+        self.left = PADDING * SCALE
+        self.inner = (WIDTH - 2 * PADDING) * SCALE
+        self.y = PADDING * SCALE
+
+    def layout(self) -> int:
+        self.header()
+        self.text(self.inputs["content"], _font(18), 24, self.colors["text"], after=12)
+        if self.inputs["quoted"]:
+            self.quoted(self.inputs["quoted"])
+        if self.inputs["images"]:
+            self.images(self.inputs["images"])
+        self.text(format_timestamp(self.inputs["story_time"]), _font(15), 20,
+                  self.colors["text_secondary"], before=8, after=12)
+        self.stats()
+        return self.y + PADDING * SCALE
+
+    def header(self):
+        s, colors, person = SCALE, self.colors, self.inputs["author"]
+        avatar = 48 * s
+        if self.draw:
+            _avatar(self.canvas, self.draw, person, self.left, self.y, avatar)
+            x = self.left + avatar + 12 * s
+            name_font = _font(16, True)
+            self.draw.text((x, self.y + 2 * s), person["name"], font=name_font, fill=colors["text"])
+            _mark(self.draw, person["official_mark"], x + name_font.getlength(person["name"]) + 4 * s,
+                  self.y + 12 * s, 18 * s)
+            self.draw.text((x, self.y + 24 * s), f"@{person['username']}", font=_font(15),
+                           fill=colors["text_secondary"])
+        self.y += avatar + 12 * s
+        if self.inputs["replying_to"]:
+            if self.draw:
+                prefix = "Replying to "
+                font = _font(15)
+                self.draw.text((self.left, self.y), prefix, font=font, fill=colors["text_secondary"])
+                self.draw.text((self.left + font.getlength(prefix), self.y), f"@{self.inputs['replying_to']}",
+                               font=font, fill=colors["primary"])
+            self.y += 28 * s
+
+    def text(self, text: str, font, line_height: int, fill: str, before: int = 0, after: int = 0,
+             left: Optional[int] = None, width: Optional[int] = None, max_lines: Optional[int] = None):
+        if not text:
+            return
+        left = self.left if left is None else left
+        self.y += before * SCALE
+        for line in _wrap(text, font, width or self.inner, max_lines):
+            if self.draw:
+                self.draw.text((left, self.y), line, font=font, fill=fill)
+            self.y += line_height * SCALE
+        self.y += after * SCALE
+
+    def images(self, refs: List[str]):
+        s, gap = SCALE, 2 * SCALE
+        height = self.inner * 9 // 16
+        if self.draw:
+            x0, y0, x1 = self.left, self.y, self.left + self.inner
+            fill = self.colors["border"]
+            half = (x1 - x0 - gap) // 2
+            if len(refs) == 1:
+                boxes = [(x0, y0, x1, y0 + height)]
+            elif len(refs) == 2:
+                boxes = [(x0, y0, x0 + half, y0 + height), (x1 - half, y0, x1, y0 + height)]
+            else:
+                rows = len(refs) - 1
+                small = (height - gap * (rows - 1)) // rows
+                boxes = [(x0, y0, x0 + half, y0 + height)] + [
+                    (x1 - half, y0 + i * (small + gap), x1, y0 + i * (small + gap) + small) for i in range(rows)
+                ]
+            for ref, box in zip(refs, boxes):
+                _rounded_paste(self.canvas, _load_image(ref), box, 12 * s, fill)
+        self.y += height + 12 * s
+
+    def quoted(self, quoted: dict):
+        s, colors = SCALE, self.colors
+        top = self.y + 8 * s
+        self.y = top + 10 * s
+        left, width = self.left + 10 * s, self.inner - 20 * s
+        person = quoted["author"]
+        if self.draw:
+            _avatar(self.canvas, self.draw, person, left, self.y, 16 * s)
+            name_font = _font(15, True)
+            x = left + 22 * s
+            self.draw.text((x, self.y), person["name"], font=name_font, fill=colors["text"])
+            x += name_font.getlength(person["name"]) + 4 * s
+            x += _mark(self.draw, person["official_mark"], x, self.y + 9 * s, 15 * s)
+            self.draw.text((x + 4 * s, self.y), f"@{person['username']}", font=_font(15),
+                           fill=colors["text_secondary"])
+        self.y += 22 * s
+        self.text(quoted["content"], _font(15), 20, colors["text"], left=left, width=width, max_lines=2)
+        if quoted["image"]:
+            height = width * 9 // 16
+            if self.draw:
+                _rounded_paste(self.canvas, _load_image(quoted["image"]),
+                               (left, self.y + 8 * s, left + width, self.y + 8 * s + height), 8 * s, colors["border"])
+            self.y += height + 8 * s
+        self.y += 10 * s
+        if self.draw:
+            self.draw.rounded_rectangle((self.left, top, self.left + self.inner, self.y), radius=12 * s,
+                                        outline=colors["border"], width=s)
+        self.y += 4 * s
+
+    def stats(self):
+        s, colors = SCALE, self.colors
+        views, retweets, quotes, likes = self.inputs["counts"]
+        stats = ([(views, "Views")] if views > 0 else []) + [(retweets, "Retweet"), (quotes, "Quotes"), (likes, "Likes")]
+        height = 40 * s
+        if self.draw:
+            right = self.left + self.inner
+            self.draw.line((self.left, self.y, right, self.y), fill=colors["border"], width=s)
+            self.draw.line((self.left, self.y + height, right, self.y + height), fill=colors["border"], width=s)
+            x, middle = self.left, self.y + height / 2
+            number_font, label_font = _font(15, True), _font(14)
+            for count, label in stats:
+                number = format_count(count)
+                self.draw.text((x, middle), number, font=number_font, fill=colors["text"], anchor="lm")
+                x += number_font.getlength(number) + 4 * s
+                self.draw.text((x, middle), label, font=label_font, fill=colors["text_secondary"], anchor="lm")
+                x += label_font.getlength(label) + 16 * s
+        self.y += height
+
+
+def render_card(inputs: dict) -> bytes:
+    height = _Card(inputs).layout()
+    canvas = Image.new("RGB", (WIDTH * SCALE, height), THEMES[inputs["theme"]]["background"])
+    _Card(inputs, canvas).layout()
+    out = io.BytesIO()
+    # Fast zlib level: encoding dominates the draw time, and the result is cached anyway
+    canvas.save(out, format="PNG", compress_level=1)
+    return out.getvalue()
+
+
+def _render_to_cache(inputs: dict, path: str):
+    """Worker entry point: draw one card and move it into the cache atomically."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=target.parent, suffix=".tmp", delete=False) as tmp:
+        tmp.write(render_card(inputs))
+    os.replace(tmp.name, target)
+
+
+def ensure_rendered(cards: List[dict]) -> List[Path]:
+    """Cached PNG paths for `cards` (card_inputs dicts), drawing the missing ones in the pool."""
+    paths = [cache_path(cache_key(inputs)) for inputs in cards]
+    missing: Dict[Path, dict] = {}
+    for inputs, path in zip(cards, paths):
+        if not path.exists():
+            missing.setdefault(path, inputs)
+    card_renders.inc(len(cards) - len(missing), result="cached")
+    card_renders.inc(len(missing), result="rendered")
+
+    for _ in run_all(_render_to_cache, [(inputs, str(path)) for path, inputs in missing.items()]):
+        pass
+    return paths
@@ -0,0 +1,171 @@
+"""
+Read-replica routing with read-your-writes consistency.
+
+Read-only routes take their session from get_read_db, which picks a replica
+engine unless the caller has written recently:
+
+* Every commit that wrote something records the primary's WAL position
+  (pg_current_wal_lsn) for the caller and returns it as `X-Write-LSN`.
+* A read from the same caller within REPLICA_STICKY_SECONDS only goes to a
+  replica whose replay position has reached that LSN; otherwise it is served
+  by the primary. Clients may also echo the header back as `X-Min-LSN`, which
+  carries the guarantee across workers and processes.
+* Without an LSN (non-Postgres databases) the stickiness window alone
+  decides: recent writers read from the primary.
+
+Local setup with two Postgres instances: start a primary with
+`wal_level = replica`, create a standby with `pg_basebackup -R -D standby -h
+localhost -p 5432` and start it on another port, then set
+DATABASE_REPLICA_URLS=postgresql://.../allsocit_db on the standby's port.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+LSN_RESPONSE_HEADER = b"x-write-lsn"
+LSN_REQUEST_HEADER = b"x-min-lsn"
+
+# How long a replica's replay position is trusted before asking again
+REPLAY_POSITION_TTL = 0.05
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """'16/B374D848' -> integer byte position, so positions compare with <."""
+    if not value:
+        return None
+    try:
+        high, low = value.strip().split("/")
+        return (int(high, 16) << 32) + int(low, 16)
+    except ValueError:
+        return None
+
+
+def format_lsn(position: int) -> str:
+    return f"{position >> 32:X}/{position & 0xFFFFFFFF:X}"
+
+
+class RequestConsistency:
+    """Per-request state shared between the middleware and the sessions it spawns."""
+
+    def __init__(self, user_key: Optional[str] = None, min_lsn: Optional[int] = None):
+        self.user_key = user_key
+        self.min_lsn = min_lsn
+        self.write_lsn: Optional[int] = None
+
+
+current_consistency: ContextVar[Optional[RequestConsistency]] = ContextVar("current_consistency", default=None)
+
+
+class ReplicaRouter:
+    def __init__(self, primary, replicas: List, sticky_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._round_robin = itertools.cycle(range(len(replicas))) if replicas else None
+        self._last_writes: Dict[str, Tuple[float, Optional[int]]] = {}
+        self._replay_positions: Dict[int, Tuple[float, Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    # ===== WRITES =====
+    def primary_lsn(self) -> Optional[int]:
+        if self.primary.dialect.name != "postgresql":
+            return None
+        with self.primary.connect() as connection:
+            return parse_lsn(connection.execute(text("SELECT pg_current_wal_lsn()::text")).scalar())
+
+    def note_write(self, user_key: Optional[str], lsn: Optional[int]):
+        if not user_key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_writes[user_key] = (now, lsn)
+            # Forget writers whose window has passed so the map stays small
+            if len(self._last_writes) > 10_000:
+                cutoff = now - self.sticky_seconds
+                self._last_writes = {k: v for k, v in self._last_writes.items() if v[0] >= cutoff}
+
+    # ===== READS =====
+    def replay_lsn(self, index: int) -> Optional[int]:
+        now = time.monotonic()
+        cached = self._replay_positions.get(index)
+        if cached is not None and now - cached[0] < REPLAY_POSITION_TTL:
+            return cached[1]
+        try:
+            with self.replicas[index].connect() as connection:
+                position = parse_lsn(connection.execute(text("SELECT pg_last_wal_replay_lsn()::text")).scalar())
+        except Exception:
+            position = None  # unreachable replicas never satisfy a requirement
+        self._replay_positions[index] = (now, position)
+        return position
+
+    def required_lsn(self, user_key: Optional[str], min_lsn: Optional[int]) -> Tuple[bool, Optional[int]]:
+        """(must be consistent, LSN to wait for) for the caller."""
+        required = min_lsn
+        sticky = False
+        if user_key:
+            last = self._last_writes.get(user_key)
+            if last is not None and time.monotonic() - last[0] < self.sticky_seconds:
+                sticky = True
+                if last[1] is not None:
+                    required = max(required or 0, last[1])
+        return sticky or required is not None, required
+
+    def choose(self, user_key: Optional[str] = None, min_lsn: Optional[int] = None):
+        """The engine a read for this caller should use."""
+        if not self.replicas:
+            return self.primary
+        with self._lock:
+            start = next(self._round_robin)
+        consistent, required = self.required_lsn(user_key, min_lsn)
+        if not consistent:
+            return self.replicas[start]
+        if required is None:
+            # Recent writer but no WAL position to compare against
+            return self.primary
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+            position = self.replay_lsn(index)
+            if position is not None and position >= required:
+                return self.replicas[index]
+        return self.primary
+
+
+class ReadYourWritesMiddleware:
+    """Tracks the caller and their LSN requirement; reports the LSN of writes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        consistency = RequestConsistency(
+            user_key=authorization or None,
+            min_lsn=parse_lsn(headers.get(LSN_REQUEST_HEADER, b"").decode("latin-1")),
+        )
+        token = current_consistency.set(consistency)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and consistency.write_lsn is not None:
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (LSN_RESPONSE_HEADER, format_lsn(consistency.write_lsn).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_consistency.reset(token)
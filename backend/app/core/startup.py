@@ -0,0 +1,124 @@
+"""
+Worker startup: schema revision check and warm-up.
+
+Workers never create or alter tables. Migrations are applied once per
+deploy (`alembic upgrade head`, or `python serve.py --migrate`), and each
+worker only checks that the database is at the revision its code expects.
+
+The migration history was written for PostgreSQL. A new SQLite database is
+created from the models and stamped at head instead; migrations after that
+point run on SQLite in Alembic's batch mode.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SchemaRevisionError(RuntimeError):
+    pass
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def expected_heads() -> set:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(engine) -> set:
+    with engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def check_schema_revision(engine, mode: str = None):
+    """
+    Compare the database's Alembic revision with the migration heads shipped
+    with the code. `mode` is "strict" (raise), "warn" (log) or "off".
+    """
+    mode = (mode or settings.SCHEMA_CHECK).lower()
+    if mode == "off":
+        return
+    expected = expected_heads()
+    current = current_revisions(engine)
+    if current == expected:
+        return
+    message = (
+        f"Database schema is at revision {sorted(current) or 'none'}, "
+        f"code expects {sorted(expected)}. Run `alembic upgrade head`."
+    )
+    if mode == "strict":
+        raise SchemaRevisionError(message)
+    logger.warning(message)
+
+
+def run_migrations():
+    """Upgrade the database to head. Call from a single process only."""
+    from alembic import command
+    from app.core.database import Base, engine
+    from app.core.dialect import is_sqlite
+
+    if is_sqlite(engine) and not current_revisions(engine):
+        import app.models  # noqa: F401  (register every table)
+
+        Base.metadata.create_all(bind=engine)
+        command.stamp(alembic_config(), "head")
+        return
+    command.upgrade(alembic_config(), "head")
+
+
+# ===== WARM-UP =====
+def _ping(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def warm_pool(engine, connections: int = None):
+    """Open `connections` pooled connections at once so the first requests don't pay for connects."""
+    size = connections if connections is not None else getattr(engine.pool, "size", lambda: 1)()
+    if size <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        list(executor.map(lambda _: _ping(engine), range(size)))
+
+
+def _iter_models(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _iter_models(subclass)
+
+
+def warm_validators(fastapi_app):
+    """
+    Finish every lazily-built piece the first request would otherwise build:
+    Pydantic schemas with deferred references, SQLAlchemy mapper
+    configuration, the OpenAPI document and the password hasher backend.
+    """
+    from app.core.security import pwd_context
+
+    for model in _iter_models(BaseModel):
+        if model.__module__.startswith("app.") and not model.__pydantic_complete__:
+            model.model_rebuild()
+    configure_mappers()
+    fastapi_app.openapi()
+    pwd_context.handler().get_backend()
+
+
+def warm_up(fastapi_app, engine):
+    warm_pool(engine, settings.WARMUP_POOL_CONNECTIONS)
+    warm_validators(fastapi_app)
@@ -0,0 +1,69 @@
+"""
+The API process's pool of worker processes for CPU-bound work (card
+rendering, static exports).
+
+Workers are started with "spawn", so they share nothing with the API
+process: no database pools, no threads, no half-held locks. Jobs should be
+plain functions of picklable arguments that write their output to disk
+rather than sending large results back. With WORKER_PROCESSES=0 jobs run in
+the calling thread instead.
+"""
+import multiprocessing
+import signal
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, started on first use; None when work runs inline."""
+    global _pool
+    if settings.WORKER_PROCESSES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.WORKER_PROCESSES, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_ignore_interrupts,
+            )
+        return _pool
+
+
+def _ignore_interrupts():
+    # Ctrl-C reaches the whole process group; the owning process shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def run_all(fn: Callable, jobs: Iterable[tuple], max_in_flight: Optional[int] = None) -> Iterator:
+    """
+    fn(*job) for every job, results in submission order. At most
+    `max_in_flight` jobs are queued at once, so a lazy `jobs` iterable is
+    consumed only as fast as the workers keep up.
+    """
+    pool = get_pool()
+    if pool is None:
+        for job in jobs:
+            yield fn(*job)
+        return
+    limit = max_in_flight or settings.WORKER_PROCESSES * 2
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, *job))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
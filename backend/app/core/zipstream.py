@@ -0,0 +1,72 @@
+"""
+ZIP archives produced piece by piece for streaming responses.
+
+zipfile can write to a stream it cannot seek: it then puts a data
+descriptor after each member instead of patching the local header. The
+archive here writes into a sink that is drained after every chunk, so a
+response holds one chunk at a time however large the archive gets.
+"""
+import io
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Tuple, Union
+
+CHUNK_BYTES = 64 * 1024
+
+# A member's content: a file on disk, bytes/str, or an iterable of bytes/str pieces
+Source = Union[Path, bytes, str, Iterable]
+
+
+class _Sink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _pieces(source: Source) -> Iterator[bytes]:
+    if isinstance(source, Path):
+        with open(source, "rb") as f:
+            while chunk := f.read(CHUNK_BYTES):
+                yield chunk
+    elif isinstance(source, (bytes, str)):
+        yield source.encode() if isinstance(source, str) else source
+    else:
+        for piece in source:
+            yield piece.encode() if isinstance(piece, str) else piece
+
+
+def stream_zip(
+    members: Iterable[Tuple[str, Source]], compress: Union[bool, Callable[[str], bool]] = False
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of `members` ((name, source) pairs) in chunks.
+    PNGs and other compressed files are best stored as-is (compress=False);
+    `compress` may also be a function deciding per member name.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        for name, source in members:
+            deflate = compress(name) if callable(compress) else compress
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if deflate else zipfile.ZIP_STORED
+            with archive.open(info, "w") as entry:
+                for piece in _pieces(source):
+                    entry.write(piece)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    # The central directory is written on close
+    yield sink.drain()
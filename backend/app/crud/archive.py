@@ -0,0 +1,317 @@
+"""
+Cold universes: the "archive_universe" job moves a universe nobody has
+opened for ARCHIVE_AFTER_DAYS into its archive (app/core/archive.py) and
+deletes its rows; opening it again queues "rehydrate_universe", which
+puts them back. The universe row itself stays, with its storage state:
+
+    live -> archiving -> archived -> warming -> live
+
+Only a live universe is served; any other state answers 503 with the
+restore job (crud/universe.get_universe). Opening a universe while it is
+being archived turns it to warming too: the archive job notices before its
+next batch of deletions and stops, and the restore puts back whatever it
+had removed. Restoring inserts only rows that are missing, by id, so a
+restore that is interrupted, or races the end of an archive, is simply run
+again.
+
+Only self-contained universes are archived: not branches, not universes
+with branches, and none whose tweets or characters are quoted, liked,
+retweeted or followed from another universe. Rows keep their ids.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core import archive
+from app.core.cache import invalidate_universe
+from app.core.config import settings
+from app.core.dialect import is_sqlite
+from app.core.jobs import JobContext, handler
+from app.crud import jobs as crud_jobs
+from app.crud.universe import _delete_universe_rows
+from app.models.job import Job
+from app.models.tweaknow import CharacterFollow, Like, Retweet, Trend, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+
+# Restore order: every row's references come before it
+ARCHIVED_MODELS = (TweakNowCharacter, Tweak, Retweet, Like, CharacterFollow, Trend)
+RESTORE_BATCH = 1000
+# Tweak columns that may point at a tweak restored later (or at one that is gone)
+TWEAK_REFERENCES = ("reply_to_tweak_id", "quoted_tweak_id", "overrides_id")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _idle_since():
+    return func.coalesce(Universe.last_accessed_at, Universe.created_at)
+
+
+# ===== CHOOSING =====
+def cold_universes(db: Session, older_than_days: int, limit: int = 100) -> List[Universe]:
+    """Live top-level universes without branches that nobody has opened for `older_than_days`"""
+    branches = select(Universe.parent_universe_id).where(Universe.parent_universe_id.isnot(None))
+    return db.query(Universe).filter(
+        Universe.storage == "live",
+        Universe.deleted_at.is_(None),
+        Universe.parent_universe_id.is_(None),
+        ~Universe.id.in_(branches),
+        _idle_since() < _now() - timedelta(days=older_than_days),
+    ).order_by(_idle_since()).limit(limit).all()
+
+
+def enqueue_cold(db: Session, older_than_days: Optional[int] = None) -> int:
+    """Queue an archive job for every cold universe; returns how many"""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    if days <= 0:
+        return 0
+    universes = cold_universes(db, days)
+    for universe in universes:
+        crud_jobs.enqueue(db, "archive_universe", universe.user_id, universe.id, priority=-10,
+                          payload={"older_than_days": days})
+    return len(universes)
+
+
+def _outside_references(db: Session, universe_id: int) -> Optional[str]:
+    """Why the universe cannot leave the database on its own, or None"""
+    tweak_ids = select(Tweak.id).where(Tweak.universe_id == universe_id)
+    character_ids = select(TweakNowCharacter.id).where(TweakNowCharacter.universe_id == universe_id)
+    checks = {
+        "its tweets are quoted or replied to from another universe": select(Tweak.id).where(
+            Tweak.universe_id != universe_id,
+            or_(Tweak.reply_to_tweak_id.in_(tweak_ids), Tweak.quoted_tweak_id.in_(tweak_ids),
+                Tweak.overrides_id.in_(tweak_ids)),
+        ),
+        "its tweets are retweeted from another universe": select(Retweet.id).where(
+            Retweet.tweak_id.in_(tweak_ids), ~Retweet.character_id.in_(character_ids)
+        ),
+        "its tweets are liked from another universe": select(Like.id).where(
+            Like.tweak_id.in_(tweak_ids), ~Like.character_id.in_(character_ids)
+        ),
+        "its characters are followed across universes": select(CharacterFollow.id).where(
+            or_(
+                and_(CharacterFollow.follower_id.in_(character_ids), ~CharacterFollow.following_id.in_(character_ids)),
+                and_(CharacterFollow.following_id.in_(character_ids), ~CharacterFollow.follower_id.in_(character_ids)),
+            )
+        ),
+    }
+    for reason, query in checks.items():
+        if db.scalar(query.limit(1)) is not None:
+            return reason
+    return None
+
+
+def _holds_newest_ids(db: Session, universe_id: int) -> bool:
+    """
+    SQLite hands out max(id) + 1, so deleting the newest rows of a table
+    would let their ids be reused before the archive is restored.
+    """
+    for model in ARCHIVED_MODELS:
+        newest = db.scalar(select(func.max(model.id)))
+        if newest is not None and db.scalar(_archive_query(model, universe_id).where(model.id == newest)) is not None:
+            return True
+    return False
+
+
+def _archive_query(model, universe_id: int):
+    tweak_ids = select(Tweak.id).where(Tweak.universe_id == universe_id)
+    character_ids = select(TweakNowCharacter.id).where(TweakNowCharacter.universe_id == universe_id)
+    if model in (Retweet, Like):
+        condition = or_(model.tweak_id.in_(tweak_ids), model.character_id.in_(character_ids))
+    elif model is CharacterFollow:
+        condition = CharacterFollow.follower_id.in_(character_ids)
+    else:
+        condition = model.universe_id == universe_id
+    return select(*model.__table__.columns).where(condition)
+
+
+# ===== ARCHIVING =====
+def _storage(db: Session, universe_id: int) -> Optional[str]:
+    return db.scalar(select(Universe.storage).where(Universe.id == universe_id))
+
+
+def _back_to_live(db: Session, universe_id: int):
+    """Undo the claim before anything was deleted; a restore queued meanwhile has nothing to do"""
+    db.execute(
+        update(Universe).where(Universe.id == universe_id, Universe.storage.in_(("archiving", "warming")))
+        .values(storage="live").execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _write_archive(db: Session, universe_id: int, ctx: Optional[JobContext]) -> archive.ArchiveWriter:
+    counts = {
+        model.__tablename__: db.scalar(select(func.count()).select_from(_archive_query(model, universe_id).subquery()))
+        for model in ARCHIVED_MODELS
+    }
+    total = max(1, sum(counts.values()))
+    with archive.ArchiveWriter(universe_id, {"universe_id": universe_id, "rows": counts}) as writer:
+        for model in ARCHIVED_MODELS:
+            writer.table(model.__tablename__, [column.name for column in model.__table__.columns])
+            query = _archive_query(model, universe_id).order_by(model.id)
+            writer.rows(tuple(row) for row in db.execute(query.execution_options(yield_per=RESTORE_BATCH)))
+            if ctx is not None:
+                ctx.report(0.5 * writer.rows_written / total, f"{writer.rows_written} rows archived")
+    db.commit()
+    return writer
+
+
+def archive_universe(db: Session, universe_id: int, older_than_days: int, ctx: Optional[JobContext] = None) -> dict:
+    """Write the universe's archive, then delete its rows; see the module docstring"""
+    claimed = db.execute(
+        update(Universe).where(
+            Universe.id == universe_id, Universe.storage == "live", Universe.deleted_at.is_(None),
+            _idle_since() < _now() - timedelta(days=older_than_days),
+        ).values(storage="archiving").execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return {"skipped": "not live, or opened recently"}
+
+    try:
+        reason = _outside_references(db, universe_id)
+        if reason is None and db.scalar(select(Universe.id).where(Universe.parent_universe_id == universe_id).limit(1)):
+            reason = "it has branches"
+        if reason is None and is_sqlite(db.get_bind()) and _holds_newest_ids(db, universe_id):
+            reason = "it holds the newest rows"
+        if reason is not None:
+            _back_to_live(db, universe_id)
+            return {"skipped": reason}
+        writer = _write_archive(db, universe_id, ctx)
+    except Exception:
+        # Nothing is deleted yet
+        db.rollback()
+        _back_to_live(db, universe_id)
+        raise
+
+    total, deleted = writer.header["rows"][Tweak.__tablename__], 0
+    rows = _delete_universe_rows(db, universe_id, keep_universe=True)
+    # Opened meanwhile: stop deleting, the restore puts back what is gone
+    while _storage(db, universe_id) == "archiving":
+        batch = next(rows, None)
+        if batch is None:
+            break
+        deleted += batch
+        if ctx is not None:
+            ctx.report(0.5 + 0.5 * deleted / max(1, total), f"{deleted} of {total} tweets removed")
+    rows.close()
+    db.commit()
+
+    archived = db.execute(
+        update(Universe).where(Universe.id == universe_id, Universe.storage == "archiving")
+        .values(storage="archived", archived_at=_now()).execution_options(synchronize_session=False)
+    ).rowcount
+    invalidate_universe(db, universe_id)
+    db.commit()
+    if db.scalar(select(Universe.deleted_at).where(Universe.id == universe_id)) is not None:
+        # Deleted meanwhile; its delete job may have run before the archive existed
+        archive.remove(universe_id)
+    return {
+        "archived": bool(archived),
+        "rows": writer.rows_written,
+        "bytes": writer.size,
+        "media_stored": writer.media_stored,
+        "media_shared": writer.media_shared,
+    }
+
+
+@handler("archive_universe")
+def _run_archive(db: Session, ctx: JobContext) -> dict:
+    days = int(ctx.payload.get("older_than_days") or settings.ARCHIVE_AFTER_DAYS)
+    return archive_universe(db, ctx.universe_id, days, ctx=ctx)
+
+
+# ===== RESTORING =====
+def _existing_ids(db: Session, model, ids) -> set:
+    return set(db.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+
+
+def _restore_batch(db: Session, model, rows: List[dict], deferred: List[tuple]) -> int:
+    """Insert the rows of one batch that are not in the database; returns how many"""
+    present = _existing_ids(db, model, [row["id"] for row in rows])
+    rows = [row for row in rows if row["id"] not in present]
+    if not rows:
+        return 0
+    if model is Tweak:
+        targets = {row[column] for row in rows for column in TWEAK_REFERENCES if row[column] is not None}
+        known = _existing_ids(db, Tweak, targets) | {row["id"] for row in rows}
+        for row in rows:
+            for column in TWEAK_REFERENCES:
+                # A later tweet in this batch or a later one: set once it is in
+                target = row[column]
+                if target is not None and (target not in known or target > row["id"]):
+                    deferred.append((row["id"], column, target))
+                    row[column] = None
+    elif model in (Retweet, Like):
+        # Characters come first, so only a tweet elsewhere can have gone
+        known = _existing_ids(db, Tweak, {row["tweak_id"] for row in rows})
+        rows = [row for row in rows if row["tweak_id"] in known]
+    if rows:
+        db.execute(model.__table__.insert(), rows)
+    return len(rows)
+
+
+def rehydrate_universe(db: Session, universe_id: int, ctx: Optional[JobContext] = None) -> dict:
+    header = archive.read_header(universe_id)
+    if header is None:
+        # Its archive was never written, so nothing was deleted
+        _back_to_live(db, universe_id)
+        invalidate_universe(db, universe_id)
+        db.commit()
+        return {"rows": 0, "tables": {}}
+    total = max(1, sum(header["rows"].values()))
+    models = {model.__tablename__: model for model in ARCHIVED_MODELS}
+
+    restored, seen, deferred = {}, 0, []
+    batch, batch_table = [], None
+
+    def flush():
+        if batch:
+            model = models[batch_table]
+            restored[batch_table] = restored.get(batch_table, 0) + _restore_batch(db, model, batch, deferred)
+            db.commit()
+            if ctx is not None:
+                ctx.report(seen / total, f"{seen} of {total} rows restored")
+
+    for table, row in archive.read_rows(universe_id):
+        if table != batch_table or len(batch) >= RESTORE_BATCH:
+            flush()
+            batch, batch_table = [], table
+        batch.append(row)
+        seen += 1
+    flush()
+
+    # References to tweets restored after the tweet that holds them; those
+    # to tweets that no longer exist anywhere stay empty
+    for tweak_id, column, target in deferred:
+        db.execute(
+            update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id,
+                                select(Tweak.id).where(Tweak.id == target).exists())
+            .values({column: target}).execution_options(synchronize_session=False)
+        )
+    db.execute(
+        update(Universe).where(Universe.id == universe_id, Universe.storage == "warming")
+        .values(storage="live", archived_at=None, last_accessed_at=_now())
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_universe(db, universe_id)
+    db.commit()
+    archive.remove(universe_id)
+    return {"rows": sum(restored.values()), "tables": restored}
+
+
+@handler("rehydrate_universe")
+def _run_rehydrate(db: Session, ctx: JobContext) -> dict:
+    universe = db.get(Universe, ctx.universe_id)
+    if universe is None or universe.deleted_at is not None or universe.storage != "warming":
+        return {"skipped": "not waiting to be restored"}
+    archiving = db.scalar(select(Job.id).where(
+        Job.kind == "archive_universe", Job.universe_id == ctx.universe_id, Job.status == "running"
+    ))
+    if archiving is not None:
+        # It stops before its next batch; retried after JOB_RETRY_SECONDS
+        raise RuntimeError("the universe is still being archived")
+    return rehydrate_universe(db, ctx.universe_id, ctx=ctx)
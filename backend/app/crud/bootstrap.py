@@ -0,0 +1,227 @@
+"""
+Screen bootstraps: everything a screen needs to draw, in one response.
+
+Opening a TweakNow screen used to take two to four requests (characters,
+feed, viewer state, profile, thread, templates...), each authenticated and
+routed separately. GET /universes/{id}/bootstrap?screen=... returns them all:
+
+* The parts of a screen are independent queries, run side by side on a
+  small thread pool, each in its own session on the bind the request was
+  routed to (the replica, when one was chosen). The slowest part sets the
+  latency instead of their sum, at the cost of up to BOOTSTRAP_THREADS
+  extra pooled connections per process. With BOOTSTRAP_THREADS=0 they run
+  one after another in the request's session.
+* Parts that the single routes cache (characters, feed, trends) are read
+  from, and stored under, the same cache entries, so the bootstrap and those
+  routes warm each other.
+* Each part is encoded once, and the body is spliced from the encoded parts.
+
+Part builders return None when what they describe does not exist (an
+unknown character or tweet); the route answers 404 for those. The home
+screen's viewer state without any character is an encoded null instead.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import cached_content, encode_json
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import branches as crud_branches
+from app.crud import tweaknow as crud_tweaknow
+from app.crud import universe as crud_universe
+from app.models.universe import Universe
+from app.schemas.tweaknow import (
+    CharacterProfile, ProfileTweakPage, TweakNowCharacter as CharacterSchema,
+    TweakTemplate, TweakThread, Trend, ViewerState,
+)
+from app.schemas.universe import UniverseSummary
+
+# The screens and their parts, in response order
+SCREENS = {
+    "dashboard": ("universe",),
+    "home": ("characters", "feed", "viewer_state"),
+    "notifications": ("characters", "feed"),
+    "profile": ("profile", "tweaks"),
+    "detail": ("thread", "characters", "viewer_state"),
+    "composer": ("characters", "templates"),
+    "trends": ("trends",),
+}
+
+PROFILE_PAGE_SIZE = 20
+
+_characters_adapter = TypeAdapter(List[CharacterSchema])
+_templates_adapter = TypeAdapter(List[TweakTemplate])
+_trends_adapter = TypeAdapter(List[Trend])
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ThreadPoolExecutor]:
+    global _pool
+    if settings.BOOTSTRAP_THREADS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.BOOTSTRAP_THREADS, thread_name_prefix="bootstrap")
+        return _pool
+
+
+class ScreenParams:
+    """What the parts are built from; `universe` is loaded before they start and only read"""
+
+    def __init__(self, universe: Universe, user_id: int, character_id: Optional[int] = None,
+                 viewer_id: Optional[int] = None, tweak_id: Optional[int] = None, mode: str = "latest",
+                 limit: int = 50):
+        self.universe = universe
+        self.user_id = user_id
+        self.character_id = character_id
+        self.viewer_id = viewer_id
+        self.tweak_id = tweak_id
+        self.mode = mode
+        self.limit = limit
+
+
+# ===== PARTS =====
+def _universe(db: Session, params: ScreenParams) -> bytes:
+    summary, = crud_universe.get_universe_summaries(db, [params.universe])
+    return encode_json(UniverseSummary.model_validate(summary))
+
+
+def _characters(db: Session, params: ScreenParams) -> bytes:
+    universe = params.universe
+    if crud_branches.is_branch(universe):
+        return cached_content(
+            "characters", universe.id,
+            lambda: _characters_adapter.validate_python(crud_branches.get_characters(db, universe)),
+            base_universe_id=universe.parent_universe_id,
+        )
+    return cached_content(
+        "characters", universe.id,
+        lambda: _characters_adapter.validate_python(crud_tweaknow.get_characters(db, universe_id=universe.id)),
+    )
+
+
+def _feed(db: Session, params: ScreenParams) -> Optional[bytes]:
+    universe = params.universe
+    if params.mode == "for_you" and params.character_id is not None:
+        feed = cached_content(
+            "for_you", universe.id,
+            lambda: crud_tweaknow.get_ranked_feed(
+                db, *crud_branches.read_views(universe), params.character_id,
+                weights=universe.ranking_weights, limit=params.limit,
+                home_universe_ids=crud_branches.home_universe_ids(universe),
+            ),
+            variant=f"{params.character_id}:{params.limit}",
+            base_universe_id=universe.parent_universe_id,
+        )
+        # get_ranked_feed's None (the viewer is not one of the universe's characters), encoded
+        return None if feed == b"null" else feed
+    if crud_branches.is_branch(universe):
+        return cached_content(
+            "feed", universe.id, lambda: crud_branches.get_feed(db, universe),
+            base_universe_id=universe.parent_universe_id,
+        )
+    return cached_content("feed", universe.id, lambda: crud_tweaknow.get_feed_with_retweets(db, universe_id=universe.id))
+
+
+def _viewer_state(db: Session, params: ScreenParams) -> Optional[bytes]:
+    """
+    Flags for every tweet the character liked or retweeted, rather than for a
+    list of tweet ids, so that it needs neither the feed nor the thread first.
+    Without `character_id`, for the universe's first character, which is
+    the one the home screen starts with.
+    """
+    tweets, characters = crud_branches.read_views(params.universe)
+    character_id = params.character_id
+    if character_id is None:
+        character_id = db.scalar(select(characters.c.id).order_by(characters.c.id).limit(1))
+        if character_id is None:
+            return encode_json(None)
+    flags = crud_tweaknow.get_viewer_state(db, tweets, characters, character_id, None)
+    if flags is None:
+        return None
+    return encode_json(ViewerState(character_id=character_id, tweaks=flags))
+
+
+def _profile(db: Session, params: ScreenParams) -> Optional[bytes]:
+    tweets, characters = crud_branches.read_views(params.universe)
+    profile = crud_tweaknow.get_profile(db, tweets, characters, params.character_id, viewer_id=params.viewer_id)
+    return None if profile is None else encode_json(CharacterProfile.model_validate(profile))
+
+
+def _tweaks(db: Session, params: ScreenParams) -> bytes:
+    tweets, characters = crud_branches.read_views(params.universe)
+    page = crud_tweaknow.get_profile_tweaks(
+        db, tweets, characters, params.character_id, "tweets", limit=PROFILE_PAGE_SIZE
+    )
+    return encode_json(ProfileTweakPage.model_validate(page))
+
+
+def _thread(db: Session, params: ScreenParams) -> Optional[bytes]:
+    tweets, _ = crud_branches.read_views(params.universe)
+    thread = crud_tweaknow.get_thread(db, tweets, params.tweak_id)
+    return None if thread is None else encode_json(TweakThread.model_validate(thread))
+
+
+def _templates(db: Session, params: ScreenParams) -> bytes:
+    return encode_json(_templates_adapter.validate_python(crud_tweaknow.get_templates(db, user_id=params.user_id)))
+
+
+def _trends(db: Session, params: ScreenParams) -> bytes:
+    universe_id = params.universe.id
+    return cached_content(
+        "trends", universe_id,
+        lambda: _trends_adapter.validate_python(crud_tweaknow.get_trends(db, universe_id=universe_id)),
+    )
+
+
+PARTS: Dict[str, Callable[[Session, ScreenParams], Optional[bytes]]] = {
+    "universe": _universe,
+    "characters": _characters,
+    "feed": _feed,
+    "viewer_state": _viewer_state,
+    "profile": _profile,
+    "tweaks": _tweaks,
+    "thread": _thread,
+    "templates": _templates,
+    "trends": _trends,
+}
+
+
+# ===== ASSEMBLY =====
+def _run_part(name: str, read_bind, params: ScreenParams) -> Optional[bytes]:
+    with SessionLocal() as session:
+        if read_bind is not None:
+            session.info["read_bind"] = read_bind
+        return PARTS[name](session, params)
+
+
+def build_parts(db: Session, screen: str, params: ScreenParams) -> Dict[str, Optional[bytes]]:
+    """The encoded parts of `screen`, built concurrently; None for a part whose subject does not exist"""
+    names = SCREENS[screen]
+    pool = _get_pool()
+    if pool is None or len(names) == 1:
+        return {name: PARTS[name](db, params) for name in names}
+    read_bind = db.info.get("read_bind")
+    # Each part carries the request's context (consistency, per-request SQL counts)
+    futures = {
+        name: pool.submit(contextvars.copy_context().run, _run_part, name, read_bind, params)
+        for name in names
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def assemble(screen: str, parts: Dict[str, bytes]) -> bytes:
+    """A ScreenBootstrap body from encoded parts"""
+    body = [b'{"screen":', encode_json(screen)]
+    for name, part in parts.items():
+        body += [b',"', name.encode(), b'":', part]
+    body.append(b"}")
+    return b"".join(body)
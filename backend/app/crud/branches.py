@@ -0,0 +1,376 @@
+"""
+Copy-on-write universe branches.
+
+A branch is a Universe row with a parent_universe_id and, in
+branch_watermarks, the highest tweak/character/retweet ids that existed when
+it was created. Creating one copies nothing, so it costs the same for a
+universe of ten tweets or ten million.
+
+A branch sees the parent's rows up to the watermarks, overlaid with its own:
+
+* inserts   - ordinary rows with universe_id = the branch
+* updates   - a copy of the parent row in the branch, with overrides_id
+              pointing at the original
+* deletes   - a BranchTombstone naming the parent row
+
+Reads go through visible_tweaks()/visible_characters(): the branch's rows
+UNION ALL the parent's rows minus anything overridden or tombstoned (NOT
+EXISTS anti-joins on indexed columns). Overrides are reported under the
+parent id, so ids stay stable across the branch, its parent and a merge.
+
+Likes, retweets and follows are not branched: their tables carry no
+universe to overlay, so those writes are refused on branches, and the feed
+shows the parent's retweets up to the watermark. Parent edits to rows the
+branch has not touched show through; on merge the branch's version wins.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.core.autocomplete import discard_index
+from app.core.cache import invalidate_universe
+from app.crud import tweaknow as crud_tweaknow
+from app.models.tweaknow import CharacterFollow, Retweet, Trend, Tweak, TweakNowCharacter
+from app.models.universe import BranchTombstone, Universe
+
+KINDS = {"tweak": Tweak, "character": TweakNowCharacter}
+
+
+def is_branch(universe: Universe) -> bool:
+    return universe.parent_universe_id is not None
+
+
+def create_branch(db: Session, parent: Universe, name: str, description: Optional[str] = None) -> Universe:
+    """Fork `parent`; only the watermarks are recorded."""
+    watermarks = db.execute(select(
+        select(func.coalesce(func.max(Tweak.id), 0)).scalar_subquery().label("tweaks"),
+        select(func.coalesce(func.max(TweakNowCharacter.id), 0)).scalar_subquery().label("characters"),
+        select(func.coalesce(func.max(Retweet.id), 0)).scalar_subquery().label("retweets"),
+    )).one()
+    branch = Universe(
+        name=name,
+        description=description,
+        user_id=parent.user_id,
+        parent_universe_id=parent.id,
+        branch_watermarks=dict(watermarks._mapping),
+        ranking_weights=parent.ranking_weights,
+    )
+    db.add(branch)
+    db.commit()
+    db.refresh(branch)
+    return branch
+
+
+def get_branches(db: Session, universe_id: int) -> List[Universe]:
+    return db.query(Universe).filter(
+        Universe.parent_universe_id == universe_id, Universe.deleted_at.is_(None)
+    ).order_by(Universe.id).all()
+
+
+# ===== MERGED READS =====
+def _visible(branch: Universe, model, watermark: int):
+    """The branch's view of `model`'s table, as a subquery with the table's columns."""
+    table = model.__table__
+    fields = [c for c in table.c if c.name not in ("id", "universe_id", "overrides_id")]
+
+    own = table.alias("own")
+    overlay = select(
+        func.coalesce(own.c.overrides_id, own.c.id).label("id"),
+        literal(branch.id).label("universe_id"),
+        *[own.c[c.name] for c in fields],
+    ).where(own.c.universe_id == branch.id)
+
+    base, override = table.alias("base"), table.alias("override")
+    inherited = select(
+        base.c.id,
+        literal(branch.id).label("universe_id"),
+        *[base.c[c.name] for c in fields],
+    ).where(
+        base.c.universe_id == branch.parent_universe_id,
+        base.c.id <= watermark,
+        ~exists().where(override.c.universe_id == branch.id, override.c.overrides_id == base.c.id),
+        ~exists().where(
+            BranchTombstone.universe_id == branch.id,
+            BranchTombstone.kind == _kind_of(model),
+            BranchTombstone.target_id == base.c.id,
+        ),
+    )
+    return union_all(overlay, inherited).subquery(f"visible_{table.name}")
+
+
+def _kind_of(model) -> str:
+    return next(kind for kind, candidate in KINDS.items() if candidate is model)
+
+
+def visible_tweaks(branch: Universe):
+    return _visible(branch, Tweak, branch.branch_watermarks["tweaks"])
+
+
+def visible_characters(branch: Universe):
+    return _visible(branch, TweakNowCharacter, branch.branch_watermarks["characters"])
+
+
+def read_views(universe: Universe):
+    """(tweets, characters) subqueries to read any universe through: a branch's merged view, or its own rows"""
+    if is_branch(universe):
+        return visible_tweaks(universe), visible_characters(universe)
+    return crud_tweaknow.universe_tweaks(universe.id), crud_tweaknow.universe_characters(universe.id)
+
+
+def home_universe_ids(universe: Universe) -> List[int]:
+    """The universes read_views reads rows from"""
+    return [universe.id, universe.parent_universe_id] if is_branch(universe) else [universe.id]
+
+
+def get_characters(db: Session, branch: Universe) -> List[dict]:
+    characters = visible_characters(branch)
+    return [dict(row._mapping) for row in db.execute(select(characters).order_by(characters.c.id))]
+
+
+def get_feed(db: Session, branch: Universe) -> List[dict]:
+    """Same items as crud.tweaknow.get_feed_with_retweets, over the merged view."""
+    tweets = visible_tweaks(branch)
+    rows = [dict(row._mapping) for row in db.execute(select(tweets))]
+    tweets_by_id = {row["id"]: row for row in rows}
+
+    missing_quoted_ids = {
+        row["quoted_tweak_id"] for row in rows
+        if row["quoted_tweak_id"] and row["quoted_tweak_id"] not in tweets_by_id
+    }
+    if missing_quoted_ids:
+        # Only quotes across universes; a quoted parent tweet not in view was deleted in the branch
+        quoted = db.execute(select(Tweak.__table__).where(
+            Tweak.id.in_(missing_quoted_ids),
+            Tweak.universe_id.notin_([branch.id, branch.parent_universe_id]),
+        )).all()
+        tweets_by_id.update({row.id: dict(row._mapping) for row in quoted})
+
+    retweets = db.query(Retweet).filter(
+        Retweet.tweak_id.in_(select(tweets.c.id).where(tweets.c.reply_to_tweak_id.is_(None))),
+        Retweet.id <= branch.branch_watermarks["retweets"],
+    ).all()
+
+    feed_items = []
+    for tweet in rows:
+        if not tweet["reply_to_tweak_id"]:
+            feed_items.append({
+                'type': 'tweet',
+                'tweak': tweet,
+                'tweak_id': tweet["id"],
+                'retweeted_by_character_id': None,
+                'timestamp': tweet["custom_date"] or tweet["created_at"],
+                'quoted_tweak': tweets_by_id.get(tweet["quoted_tweak_id"]),
+            })
+    for retweet in retweets:
+        tweet = tweets_by_id[retweet.tweak_id]
+        feed_items.append({
+            'type': 'retweet',
+            'tweak': tweet,
+            'tweak_id': tweet["id"],
+            'retweeted_by_character_id': retweet.character_id,
+            'timestamp': retweet.created_at,
+            'quoted_tweak': tweets_by_id.get(tweet["quoted_tweak_id"]),
+        })
+
+    feed_items.sort(key=lambda x: x['timestamp'], reverse=True)
+    return feed_items
+
+
+def get_visible_tweak(db: Session, branch: Universe, tweak_id: int) -> Optional[dict]:
+    tweets = visible_tweaks(branch)
+    row = db.execute(select(tweets).where(tweets.c.id == tweak_id)).first()
+    return dict(row._mapping) if row else None
+
+
+def impression_targets(db: Session, branch: Universe, tweak_ids: List[int]) -> List[Tuple[int, int]]:
+    """
+    (universe_id, tweak_id) of the physical row behind each visible id, one
+    per impression: the branch's own row or override, else the parent's row.
+    Ids the branch cannot see are left out.
+    """
+    tweets = visible_tweaks(branch)
+    physical = Tweak.__table__.alias("physical")
+    rows = db.execute(
+        select(tweets.c.id, physical.c.id.label("own_id")).select_from(tweets.outerjoin(physical, and_(
+            physical.c.universe_id == branch.id,
+            func.coalesce(physical.c.overrides_id, physical.c.id) == tweets.c.id,
+        ))).where(tweets.c.id.in_(set(tweak_ids)))
+    )
+    targets = {
+        row.id: (branch.id, row.own_id) if row.own_id is not None else (branch.parent_universe_id, row.id)
+        for row in rows
+    }
+    return [targets[tweak_id] for tweak_id in tweak_ids if tweak_id in targets]
+
+
+# ===== WRITES =====
+def _own_row(db: Session, branch: Universe, model, entity_id: int):
+    """The branch's physical row for a visible id: its own insert or its override."""
+    return db.query(model).filter(
+        model.universe_id == branch.id,
+        ((model.id == entity_id) & model.overrides_id.is_(None)) | (model.overrides_id == entity_id),
+    ).first()
+
+
+def _visible_base_row(db: Session, branch: Universe, model, entity_id: int):
+    """The parent's row for `entity_id`, if the branch can still see it."""
+    kind = _kind_of(model)
+    return db.query(model).filter(
+        model.id == entity_id,
+        model.universe_id == branch.parent_universe_id,
+        model.id <= branch.branch_watermarks[f"{kind}s"],
+        ~exists().where(
+            BranchTombstone.universe_id == branch.id,
+            BranchTombstone.kind == kind,
+            BranchTombstone.target_id == entity_id,
+        ),
+    ).first()
+
+
+def _writable_row(db: Session, branch: Universe, model, entity_id: int):
+    """Row to edit for a visible id, copying the parent's row into the branch on first write."""
+    row = _own_row(db, branch, model, entity_id)
+    if row is not None:
+        return row
+    base = _visible_base_row(db, branch, model, entity_id)
+    if base is None:
+        return None
+    values = {
+        c.name: getattr(base, c.key) for c in model.__table__.c
+        if c.name not in ("id", "universe_id", "overrides_id")
+    }
+    row = model(**values, universe_id=branch.id, overrides_id=base.id)
+    db.add(row)
+    db.flush()
+    return row
+
+
+def _as_visible(row) -> dict:
+    """A physical branch row as the branch reports it (overrides under the parent's id)."""
+    values = {c.name: getattr(row, c.key) for c in type(row).__table__.c if c.name != "overrides_id"}
+    values["id"] = row.overrides_id or row.id
+    return values
+
+
+def update_entity(db: Session, branch: Universe, kind: str, entity_id: int, changes: dict) -> Optional[dict]:
+    """Edit a visible tweak or character ("tweak"/"character") inside the branch."""
+    row = _writable_row(db, branch, KINDS[kind], entity_id)
+    if row is None:
+        return None
+    for field, value in changes.items():
+        setattr(row, field, value)
+    invalidate_universe(db, branch.id)
+    db.commit()
+    db.refresh(row)
+    return _as_visible(row)
+
+
+def delete_entity(db: Session, branch: Universe, kind: str, entity_id: int) -> bool:
+    """Delete a visible tweak or character inside the branch; parent rows get a tombstone."""
+    model = KINDS[kind]
+    own = _own_row(db, branch, model, entity_id)
+    base = _visible_base_row(db, branch, model, entity_id) if own is None or own.overrides_id else None
+    if own is None and base is None:
+        return False
+
+    if model is TweakNowCharacter:
+        # A character's tweets go with it, parent ones by tombstone
+        tweets = visible_tweaks(branch)
+        db.execute(insert(BranchTombstone).from_select(
+            ["universe_id", "kind", "target_id"],
+            select(literal(branch.id), literal("tweak"), tweets.c.id).where(
+                tweets.c.character_id == entity_id, tweets.c.id <= branch.branch_watermarks["tweaks"]
+            ),
+        ))
+        db.query(Tweak).filter(
+            Tweak.universe_id == branch.id, Tweak.character_id == entity_id
+        ).delete(synchronize_session=False)
+
+    if own is not None:
+        db.delete(own)
+    if base is not None or (own is not None and own.overrides_id):
+        db.add(BranchTombstone(universe_id=branch.id, kind=kind, target_id=entity_id))
+    invalidate_universe(db, branch.id)
+    db.commit()
+    return True
+
+
+def create_quote_tweet(db: Session, branch: Universe, tweak) -> Tweak:
+    """Quote inside a branch: the quoted tweet's count is bumped on the branch's copy."""
+    db_tweak = Tweak(**tweak.dict())
+    db.add(db_tweak)
+    if tweak.quoted_tweak_id:
+        quoted = _writable_row(db, branch, Tweak, tweak.quoted_tweak_id)
+        if quoted is not None:
+            quoted.quote_count = (quoted.quote_count or 0) + 1
+    invalidate_universe(db, branch.id)
+    db.commit()
+    db.refresh(db_tweak)
+    return db_tweak
+
+
+# ===== MERGE =====
+def _delete_parent_tweaks(db: Session, tweak_ids):
+    db.query(Retweet).filter(Retweet.tweak_id.in_(tweak_ids)).delete(synchronize_session=False)
+    db.query(Tweak).filter(Tweak.reply_to_tweak_id.in_(tweak_ids)).update(
+        {Tweak.reply_to_tweak_id: None}, synchronize_session=False
+    )
+    db.query(Tweak).filter(Tweak.quoted_tweak_id.in_(tweak_ids)).update(
+        {Tweak.quoted_tweak_id: None}, synchronize_session=False
+    )
+    db.query(Tweak).filter(Tweak.id.in_(tweak_ids)).delete(synchronize_session=False)
+
+
+def _apply_overrides(db: Session, branch: Universe, model):
+    table = model.__table__
+    override = table.alias("override")
+    fields = [c.name for c in table.c if c.name not in ("id", "universe_id", "overrides_id", "created_at")]
+    db.execute(
+        update(table)
+        .where(override.c.universe_id == branch.id, override.c.overrides_id == table.c.id)
+        .values({name: override.c[name] for name in fields})
+    )
+    db.execute(table.delete().where(table.c.universe_id == branch.id, table.c.overrides_id.isnot(None)))
+
+
+def merge_branch(db: Session, branch: Universe) -> Universe:
+    """
+    Fold a branch into its parent with set-based statements, then drop it:
+    tombstoned rows are deleted, overrides written over the originals and the
+    branch's own rows moved across.
+    """
+    parent_id = branch.parent_universe_id
+
+    def tombstoned(kind):
+        return select(BranchTombstone.target_id).where(
+            BranchTombstone.universe_id == branch.id, BranchTombstone.kind == kind
+        )
+
+    _delete_parent_tweaks(db, tombstoned("tweak"))
+    deleted_characters = tombstoned("character")
+    # Including what the parent gave them after the fork
+    _delete_parent_tweaks(db, select(Tweak.id).where(Tweak.character_id.in_(deleted_characters)))
+    db.query(Retweet).filter(Retweet.character_id.in_(deleted_characters)).delete(synchronize_session=False)
+    db.query(CharacterFollow).filter(
+        CharacterFollow.follower_id.in_(deleted_characters) | CharacterFollow.following_id.in_(deleted_characters)
+    ).delete(synchronize_session=False)
+    db.query(TweakNowCharacter).filter(TweakNowCharacter.id.in_(deleted_characters)).delete(synchronize_session=False)
+
+    _apply_overrides(db, branch, TweakNowCharacter)
+    _apply_overrides(db, branch, Tweak)
+
+    for model in (TweakNowCharacter, Tweak, Trend):
+        db.query(model).filter(model.universe_id == branch.id).update(
+            {model.universe_id: parent_id}, synchronize_session=False
+        )
+    db.query(BranchTombstone).filter(BranchTombstone.universe_id == branch.id).delete(synchronize_session=False)
+    db.query(Universe).filter(Universe.id == branch.id).delete(synchronize_session=False)
+
+    invalidate_universe(db, parent_id)
+    invalidate_universe(db, branch.id)
+    # Set-based, so the parent's index can't follow it
+    discard_index(db, parent_id)
+    db.commit()
+    db.expire_all()
+    return db.query(Universe).filter(Universe.id == parent_id).first()
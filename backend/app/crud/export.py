@@ -0,0 +1,246 @@
+"""
+Reads a universe for the static archive (app/core/export.py).
+
+Tweets are read with server-side cursors and grouped into one page at a
+time: feed pages in story order, each character's latest posts, and each
+thread (a recursive CTE tags every reply with its top-level tweet). Only
+the characters are held whole. The export holds an exclusive lock on the
+universe (dialect.try_exclusive), so two exports of one universe never
+interleave; it runs as a background job (app/core/jobs.py).
+"""
+import itertools
+import math
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core import export as site_writer
+from app.core.config import settings
+from app.core.dialect import try_exclusive
+from app.core.jobs import JobContext, JobFailed, handler
+from app.core.workers import run_all
+from app.crud import branches as crud_branches
+from app.crud import tweaknow as crud_tweaknow
+from app.models.universe import Universe
+
+# Lock key for dialect.try_exclusive(db, key, universe_id)
+EXPORT_LOCK_KEY = 4201
+
+ROWS_PER_FETCH = 1000
+
+
+class ExportInProgress(Exception):
+    pass
+
+
+def _sources(universe: Universe):
+    if crud_branches.is_branch(universe):
+        return crud_branches.visible_tweaks(universe), crud_branches.visible_characters(universe)
+    return crud_tweaknow.universe_tweaks(universe.id), crud_tweaknow.universe_characters(universe.id)
+
+
+def _tweet_query(tweets):
+    """Columns of an exported tweet: the row, its quoted tweet and whether anything replies to it."""
+    quoted = tweets.alias("quoted")
+    replies = tweets.alias("replies")
+    story_time = func.coalesce(tweets.c.custom_date, tweets.c.created_at)
+    query = select(
+        tweets.c.id, tweets.c.character_id, tweets.c.content, tweets.c.images, tweets.c.reply_to_tweak_id,
+        tweets.c.comment_count, tweets.c.retweet_count, tweets.c.like_count, tweets.c.view_count,
+        story_time.label("story_time"),
+        quoted.c.id.label("quoted_id"), quoted.c.character_id.label("quoted_character_id"),
+        quoted.c.content.label("quoted_content"),
+        exists().where(replies.c.reply_to_tweak_id == tweets.c.id).label("has_replies"),
+    ).select_from(tweets.outerjoin(quoted, quoted.c.id == tweets.c.quoted_tweak_id))
+    return query, story_time
+
+
+def _stream(db: Session, query):
+    return db.connection().execution_options(stream_results=True, yield_per=ROWS_PER_FETCH).execute(query)
+
+
+def _tweet(row) -> dict:
+    return {
+        "id": row.id,
+        "character_id": row.character_id,
+        "content": row.content,
+        "images": list(row.images or []),
+        "story_time": row.story_time.isoformat(),
+        "counts": {
+            "comment": row.comment_count or 0, "retweet": row.retweet_count or 0,
+            "like": row.like_count or 0, "view": row.view_count or 0,
+        },
+        "quoted": {
+            "id": row.quoted_id, "character_id": row.quoted_character_id, "content": row.quoted_content,
+        } if row.quoted_id is not None else None,
+        "has_replies": row.has_replies,
+    }
+
+
+def _page(kind: str, path: str, title: str, tweets: List[dict], people: Dict[int, dict], **extra) -> dict:
+    """A page dict with just the authors it shows (keyed by str, as they come back from JSON)."""
+    ids = {t["character_id"] for t in tweets} | {t["quoted"]["character_id"] for t in tweets if t["quoted"]}
+    authors = {str(i): people[i] for i in sorted(ids) if i in people}
+    return dict(kind=kind, path=path, title=title, tweets=tweets, authors=authors, **extra)
+
+
+# ===== PAGES =====
+def _feed_pages(db: Session, tweets, people, universe: Universe, total: int) -> Iterator[dict]:
+    size = settings.EXPORT_PAGE_SIZE
+    pages = max(1, math.ceil(total / size))
+    query, story_time = _tweet_query(tweets)
+    rows = _stream(db, query.where(tweets.c.reply_to_tweak_id.is_(None)).order_by(story_time, tweets.c.id))
+    chunks = (list(chunk) for _, chunk in itertools.groupby(enumerate(rows), key=lambda item: item[0] // size))
+    for number in range(1, pages + 1):
+        chunk = next(chunks, [])
+        links = {}
+        if number > 1:
+            links["Older"] = f"page-{number - 1}.html"
+        if number < pages:
+            links["Newer"] = f"page-{number + 1}.html"
+        yield _page("feed", f"feed/page-{number}", f"{universe.name} · page {number} of {pages}",
+                    [_tweet(row) for _, row in chunk], people, links=links)
+
+
+def _character_pages(db: Session, tweets, people, characters: Dict[int, dict]) -> Iterator[dict]:
+    query, story_time = _tweet_query(tweets)
+    ranked = query.add_columns(
+        func.row_number().over(
+            partition_by=tweets.c.character_id, order_by=(story_time.desc(), tweets.c.id.desc())
+        ).label("rank"),
+        func.count().over(partition_by=tweets.c.character_id).label("posts"),
+    ).where(tweets.c.reply_to_tweak_id.is_(None)).subquery()
+    rows = _stream(db, select(ranked).where(ranked.c.rank <= settings.EXPORT_PROFILE_POSTS)
+                   .order_by(ranked.c.character_id, ranked.c.rank))
+    posts_by_character = itertools.groupby(rows, key=lambda row: row.character_id)
+
+    pending = next(posts_by_character, None)
+    for character_id in sorted(characters):
+        posts = []
+        if pending is not None and pending[0] == character_id:
+            posts = list(pending[1])
+            pending = next(posts_by_character, None)
+        character = dict(characters[character_id], posts=posts[0].posts if posts else 0)
+        yield _page("character", f"characters/{character_id}",
+                    f"{character['name']} (@{character['username']})",
+                    [_tweet(row) for row in posts], people, character=character)
+
+
+def _thread_pages(db: Session, tweets, people) -> Iterator[dict]:
+    """One page per top-level tweet with replies: the tweet, then every reply below it in story order."""
+    roots = select(tweets.c.id.label("id"), tweets.c.id.label("root_id")).where(
+        tweets.c.reply_to_tweak_id.is_(None)
+    ).cte("roots", recursive=True)
+    roots = roots.union_all(
+        select(tweets.c.id, roots.c.root_id).join(roots, tweets.c.reply_to_tweak_id == roots.c.id)
+    )
+    query, story_time = _tweet_query(tweets)
+    rows = _stream(db, query.add_columns(roots.c.root_id).join(roots, roots.c.id == tweets.c.id).order_by(
+        roots.c.root_id, case((tweets.c.id == roots.c.root_id, 0), else_=1), story_time, tweets.c.id,
+    ))
+    for root_id, group in itertools.groupby(rows, key=lambda row: row.root_id):
+        group = list(group)
+        if len(group) < 2:
+            continue
+        authors = {row.id: row.character_id for row in group}
+        thread = [_tweet(row) for row in group]
+        for tweet, row in zip(thread[1:], group[1:]):
+            parent_author = people.get(authors.get(row.reply_to_tweak_id))
+            tweet["replying_to"] = parent_author["username"] if parent_author else None
+        root_author = people.get(thread[0]["character_id"])
+        title = f"Thread by @{root_author['username']}" if root_author else "Thread"
+        yield _page("thread", f"threads/{root_id}", title, thread, people)
+
+
+# ===== EXPORT =====
+def export_universe(db: Session, universe: Universe, ctx: Optional[JobContext] = None) -> dict:
+    """
+    Bring the universe's archive on disk up to date. Only pages whose data
+    changed since the last export are rendered and written. With a job
+    context, progress is reported per page and cancellation is honoured
+    between pages; pages already written are simply found unchanged next time.
+    """
+    with try_exclusive(db, EXPORT_LOCK_KEY, universe.id) as acquired:
+        if not acquired:
+            raise ExportInProgress()
+        try:
+            return _export(db, universe, ctx)
+        finally:
+            db.rollback()  # releases the lock; nothing was written to the database
+
+
+@handler("export_universe")
+def _run_export(db: Session, ctx: JobContext) -> dict:
+    universe = db.get(Universe, ctx.universe_id)
+    if universe is None or universe.deleted_at is not None:
+        raise JobFailed("Universe not found")
+    return export_universe(db, universe, ctx)
+
+
+def _page_estimate(db: Session, tweets, total: int, characters: int) -> int:
+    """Feed pages, profiles and (top-level tweets with replies) threads"""
+    replies = tweets.alias("replies")
+    threads = db.execute(select(func.count()).select_from(tweets).where(
+        tweets.c.reply_to_tweak_id.is_(None), exists().where(replies.c.reply_to_tweak_id == tweets.c.id)
+    )).scalar_one()
+    return max(1, math.ceil(total / settings.EXPORT_PAGE_SIZE)) + characters + threads
+
+
+def _export(db: Session, universe: Universe, ctx: Optional[JobContext] = None) -> dict:
+    site = site_writer.site_dir(universe.id)
+    site.mkdir(parents=True, exist_ok=True)
+    old_manifest = site_writer.load_manifest(site)
+    tweets, characters_table = _sources(universe)
+
+    total = db.execute(
+        select(func.count()).select_from(tweets).where(tweets.c.reply_to_tweak_id.is_(None))
+    ).scalar_one()
+
+    characters, people, media_written = {}, {}, 0
+    for row in db.execute(select(characters_table).order_by(characters_table.c.id)):
+        picture, written = site_writer.localize(site, row.profile_picture)
+        banner, banner_written = site_writer.localize(site, row.banner_image)
+        media_written += written + banner_written
+        people[row.id] = {
+            "name": row.name, "username": row.username, "official_mark": row.official_mark, "picture": picture,
+        }
+        characters[row.id] = dict(
+            people[row.id], id=row.id, bio=row.bio, banner=banner,
+            followers=row.display_followers_count, following=row.display_following_count,
+        )
+
+    pages = itertools.chain(
+        _feed_pages(db, tweets, people, universe, total),
+        _character_pages(db, tweets, people, characters),
+        _thread_pages(db, tweets, people),
+    )
+    manifest, unchanged = {}, 0
+    estimate = _page_estimate(db, tweets, total, len(characters)) if ctx is not None else 0
+
+    def changed_pages():
+        nonlocal unchanged
+        for page in pages:
+            if ctx is not None:
+                ctx.check_cancelled()
+                ctx.report(len(manifest) / estimate, f"{len(manifest)} of about {estimate} pages")
+            manifest[page["path"]] = site_writer.fingerprint(page)
+            if (old_manifest.get(page["path"]) == manifest[page["path"]]
+                    and (site / f"{page['path']}.html").exists()):
+                unchanged += 1
+                continue
+            yield str(site), page
+
+    written = 0
+    for _, page_media in run_all(site_writer.write_page, changed_pages()):
+        written += 1
+        media_written += page_media
+
+    removed = site_writer.prune(site, old_manifest, manifest)
+    site_writer.finish(site, manifest, f"feed/page-{max(1, math.ceil(total / settings.EXPORT_PAGE_SIZE))}")
+    return {
+        "pages_written": written,
+        "pages_unchanged": unchanged,
+        "pages_removed": removed,
+        "media_written": media_written,
+    }
@@ -0,0 +1,166 @@
+"""
+The jobs table as a queue (app/core/jobs.py runs what is in it).
+
+Every change a worker makes to a running job is conditional on the job
+still being running under that worker's name, so a worker whose lease
+expired (and whose job was handed to someone else) cannot overwrite the
+new attempt.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job
+
+ACTIVE = ("queued", "running")
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ===== API SIDE =====
+def enqueue(db: Session, kind: str, user_id: int, universe_id: Optional[int] = None,
+            payload: Optional[dict] = None, priority: int = 0) -> Job:
+    """
+    Queue a job and commit, together with whatever else the session holds.
+    A job of the same kind already waiting or running for the universe is
+    returned instead of queueing a second one.
+    """
+    if universe_id is not None:
+        active = db.scalars(
+            select(Job).where(Job.kind == kind, Job.universe_id == universe_id, Job.status.in_(ACTIVE))
+            .order_by(Job.id).limit(1)
+        ).first()
+        if active is not None:
+            db.commit()
+            return active
+    job = Job(
+        kind=kind, user_id=user_id, universe_id=universe_id, payload=payload or {}, priority=priority,
+        max_attempts=settings.JOB_MAX_ATTEMPTS, run_after=_now(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int, user_id: int) -> Optional[Job]:
+    return db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+
+
+def get_jobs(db: Session, user_id: int, status: Optional[str] = None, skip: int = 0, limit: int = 50) -> List[Job]:
+    """The user's jobs, newest first"""
+    query = db.query(Job).filter(Job.user_id == user_id)
+    if status is not None:
+        query = query.filter(Job.status == status)
+    return query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    """A queued job is cancelled at once; a running one is asked to stop and ends at its next check"""
+    now = _now()
+    cancelled = db.execute(
+        update(Job).where(Job.id == job.id, Job.status == "queued")
+        .values(status="cancelled", cancel_requested=True, finished_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        db.execute(
+            update(Job).where(Job.id == job.id, Job.status == "running").values(cancel_requested=True)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+# ===== WORKER SIDE =====
+def claim_next(db: Session, worker: str) -> Optional[Job]:
+    """
+    Take the most urgent queued job that is due: highest priority, then
+    oldest. Concurrent workers skip rows another worker has locked instead
+    of waiting for them.
+    """
+    now = _now()
+    candidate = (
+        select(Job.id).where(Job.status == "queued", Job.run_after <= now)
+        .order_by(Job.priority.desc(), Job.id).limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    job = db.scalars(
+        update(Job).where(Job.id == candidate, Job.status == "queued")
+        .values(status="running", worker=worker, attempts=Job.attempts + 1,
+                started_at=now, heartbeat_at=now, error=None)
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return job
+
+
+def heartbeat(db: Session, job_id: int, worker: str, progress: float, message: Optional[str]) -> Optional[bool]:
+    """Renew the lease and store progress; whether cancellation was asked for, None if the job is no longer ours"""
+    row = db.execute(
+        update(Job).where(Job.id == job_id, Job.worker == worker, Job.status == "running")
+        .values(heartbeat_at=_now(), progress=progress, progress_message=message)
+        .returning(Job.cancel_requested)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return None if row is None else row.cancel_requested
+
+
+def finish(db: Session, job_id: int, worker: str, status: str, result: Optional[dict] = None,
+           error: Optional[str] = None, progress: Optional[float] = None) -> bool:
+    """Record how an attempt ended: succeeded, failed or cancelled"""
+    values = {"status": status, "result": result, "error": error, "finished_at": _now(), "worker": None}
+    if progress is not None:
+        values["progress"] = progress
+    return _update_own(db, job_id, worker, values)
+
+
+def retry_later(db: Session, job_id: int, worker: str, delay: float, error: str) -> bool:
+    """Put a failed attempt back in the queue, not to be claimed for `delay` seconds"""
+    return _update_own(db, job_id, worker, {
+        "status": "queued", "error": error, "worker": None, "run_after": _now() + timedelta(seconds=delay),
+    })
+
+
+def _update_own(db: Session, job_id: int, worker: str, values: dict) -> bool:
+    updated = db.execute(
+        update(Job).where(Job.id == job_id, Job.worker == worker, Job.status == "running").values(values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def expire_leases(db: Session, lease_seconds: float) -> int:
+    """
+    Running jobs whose worker stopped heartbeating (it crashed or was
+    killed) go back to the queue; the lost attempt counts. Returns how many
+    jobs were released.
+    """
+    now = _now()
+    expired = (Job.status == "running", Job.heartbeat_at < now - timedelta(seconds=lease_seconds))
+    released = 0
+    for condition, values in (
+        (Job.cancel_requested.is_(True), {"status": "cancelled", "finished_at": now}),
+        (Job.attempts >= Job.max_attempts,
+         {"status": "failed", "error": "The worker running this job stopped responding", "finished_at": now}),
+        (None, {"status": "queued", "run_after": now}),
+    ):
+        statement = update(Job).where(*expired)
+        if condition is not None:
+            statement = statement.where(condition)
+        released += db.execute(
+            statement.values(dict(values, worker=None)).execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+    return released
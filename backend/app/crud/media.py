@@ -0,0 +1,19 @@
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.dialect import insert_ignoring
+from app.core.media import StoredFile
+from app.models.media import Media
+
+def record_uploads(db: Session, user_id: int, files: List[StoredFile]) -> List[Media]:
+    """One Media row per stored file, reusing the user's row when they uploaded it before"""
+    db.execute(insert_ignoring(db.get_bind(), Media, [
+        {"user_id": user_id, "sha256": f.sha256, "content_type": f.content_type, "size_bytes": f.size}
+        for f in files
+    ], "unique_user_media"))
+    db.commit()
+    rows = db.scalars(
+        select(Media).where(Media.user_id == user_id, Media.sha256.in_({f.sha256 for f in files}))
+    ).all()
+    by_hash = {row.sha256: row for row in rows}
+    return [by_hash[f.sha256] for f in files]
@@ -1,6 +1,19 @@
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.tweaknow import TweakNowCharacter, Tweak, TweakTemplate, Retweet
+import math
+
+import numpy as np
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Integer, and_, case, cast, delete, exists, func, literal, or_, select, tuple_, union_all, update,
+)
+from sqlalchemy.orm import Session, aliased
+from typing import Iterable, List, Optional
+from app.core import ranking
+from app.core.autocomplete import note_tweak
+from app.core.cache import invalidate_universe
+from app.core.dialect import epoch_seconds, greatest, insert_ignoring, list_length
+from app.core.jobs import JobContext, handler
+from app.models.tweaknow import TweakNowCharacter, Tweak, TweakTemplate, Retweet, Like, CharacterFollow
 from app.schemas.tweaknow import (
     TweakNowCharacterCreate, TweakNowCharacterUpdate,
     TweakCreate, TweakUpdate,
@@ -11,7 +24,7 @@ from app.schemas.tweaknow import (
 def get_characters(db: Session, universe_id: int) -> List[TweakNowCharacter]:
     return db.query(TweakNowCharacter).filter(
         TweakNowCharacter.universe_id == universe_id
-    ).all()
+    ).order_by(TweakNowCharacter.id).all()
 
 def get_character(db: Session, character_id: int, universe_id: int):
     return db.query(TweakNowCharacter).filter(
@@ -22,6 +35,7 @@ def get_character(db: Session, character_id: int, universe_id: int):
 def create_character(db: Session, character: TweakNowCharacterCreate):
     db_character = TweakNowCharacter(**character.dict())
     db.add(db_character)
+    invalidate_universe(db, character.universe_id)
     db.commit()
     db.refresh(db_character)
     return db_character
@@ -35,6 +49,7 @@ def update_character(db: Session, character_id: int, universe_id: int, character
     for field, value in update_data.items():
         setattr(db_character, field, value)
     
+    invalidate_universe(db, universe_id)
     db.commit()
     db.refresh(db_character)
     return db_character
@@ -43,6 +58,7 @@ def delete_character(db: Session, character_id: int, universe_id: int):
     db_character = get_character(db, character_id, universe_id)
     if db_character:
         db.delete(db_character)
+        invalidate_universe(db, universe_id)
         db.commit()
         return True
     return False
@@ -107,13 +123,14 @@ def get_feed_with_retweets(db: Session, universe_id: int):
     """
     Get feed that includes both original tweets AND retweets.
     Returns list of dict with: {type: 'tweet'|'retweet', tweak: Tweak, retweeted_by_character_id: int|None, timestamp: str, quoted_tweak: Tweak|None}
+
+    Runs a fixed number of queries regardless of universe size: retweeted and
+    quoted tweaks are resolved from the tweets already loaded for the universe.
     """
-    from sqlalchemy.orm import joinedload
-    
-    # Get all original tweets WITH their quoted tweets loaded
     tweets = db.query(Tweak).filter(
         Tweak.universe_id == universe_id
     ).all()
+    tweets_by_id = {tweet.id: tweet for tweet in tweets}
     
     # Get all retweets for this universe
     retweets = db.query(Retweet).join(
@@ -122,41 +139,40 @@ def get_feed_with_retweets(db: Session, universe_id: int):
         Tweak.universe_id == universe_id
     ).all()
     
+    # Quotes of tweets outside this universe are the only ones not loaded yet
+    missing_quoted_ids = {
+        tweet.quoted_tweak_id for tweet in tweets
+        if tweet.quoted_tweak_id and tweet.quoted_tweak_id not in tweets_by_id
+    }
+    if missing_quoted_ids:
+        for quoted in db.query(Tweak).filter(Tweak.id.in_(missing_quoted_ids)).all():
+            tweets_by_id[quoted.id] = quoted
+    
     feed_items = []
     
     # Add original tweets
     for tweet in tweets:
         if not tweet.reply_to_tweak_id:  # Skip replies from main feed
-            # Get quoted tweet if exists
-            quoted_tweak = None
-            if tweet.quoted_tweak_id:
-                quoted_tweak = db.query(Tweak).filter(Tweak.id == tweet.quoted_tweak_id).first()
-            
             feed_items.append({
                 'type': 'tweet',
                 'tweak': tweet,
                 'tweak_id': tweet.id,
                 'retweeted_by_character_id': None,
                 'timestamp': tweet.custom_date or tweet.created_at,
-                'quoted_tweak': quoted_tweak  # Include full quoted tweet object
+                'quoted_tweak': tweets_by_id.get(tweet.quoted_tweak_id)  # Include full quoted tweet object
             })
     
     # Add retweets
     for retweet in retweets:
-        tweet = db.query(Tweak).filter(Tweak.id == retweet.tweak_id).first()
+        tweet = tweets_by_id.get(retweet.tweak_id)
         if tweet and not tweet.reply_to_tweak_id:  # Skip replies
-            # Get quoted tweet if the retweeted tweet is a quote
-            quoted_tweak = None
-            if tweet.quoted_tweak_id:
-                quoted_tweak = db.query(Tweak).filter(Tweak.id == tweet.quoted_tweak_id).first()
-            
             feed_items.append({
                 'type': 'retweet',
                 'tweak': tweet,
                 'tweak_id': tweet.id,
                 'retweeted_by_character_id': retweet.character_id,
                 'timestamp': retweet.created_at,
-                'quoted_tweak': quoted_tweak  # Include full quoted tweet object
+                'quoted_tweak': tweets_by_id.get(tweet.quoted_tweak_id)  # Include full quoted tweet object
             })
     
     # Sort by timestamp (newest first)
@@ -164,6 +180,166 @@ def get_feed_with_retweets(db: Session, universe_id: int):
     
     return feed_items
 
+# ===== THREADS =====
+def universe_tweaks(universe_id: int):
+    """A universe's tweets as a subquery; branches use crud.branches.visible_tweaks instead."""
+    return select(Tweak.__table__).where(Tweak.universe_id == universe_id).subquery("universe_tweaks")
+
+def get_thread(db: Session, tweets, tweak_id: int):
+    """
+    A tweet, the tweet it quotes and every reply below it (any depth, oldest
+    first in story time) from the `tweets` subquery. The replies come from a
+    recursive CTE walking ix_tweaks_reply_to_tweak_id, in one query together
+    with the quoted tweet.
+    """
+    root = db.execute(select(tweets).where(tweets.c.id == tweak_id)).first()
+    if root is None:
+        return None
+
+    thread = select(tweets.c.id).where(tweets.c.reply_to_tweak_id == tweak_id).cte("thread", recursive=True)
+    thread = thread.union_all(select(tweets.c.id).join(thread, tweets.c.reply_to_tweak_id == thread.c.id))
+    rows = db.execute(
+        select(tweets, tweets.c.id.in_(select(thread.c.id)).label("in_thread")).where(
+            tweets.c.id.in_(select(thread.c.id)) | (tweets.c.id == root.quoted_tweak_id)
+        ).order_by(func.coalesce(tweets.c.custom_date, tweets.c.created_at), tweets.c.id)
+    ).all()
+
+    replies = [dict(row._mapping) for row in rows if row.in_thread]
+    quoted = next((dict(row._mapping) for row in rows if row.id == root.quoted_tweak_id), None)
+    return {"tweak": dict(root._mapping), "quoted_tweak": quoted, "replies": replies}
+
+def universe_characters(universe_id: int):
+    """A universe's characters as a subquery; branches use crud.branches.visible_characters instead."""
+    return select(TweakNowCharacter.__table__).where(
+        TweakNowCharacter.universe_id == universe_id
+    ).subquery("universe_characters")
+
+def _is_character(characters, character_id: int):
+    """EXISTS clause: `character_id` is one of the `characters` subquery's rows"""
+    # Never correlated, so it holds when `characters` is also joined in the outer query
+    return select(characters.c.id).where(characters.c.id == character_id).correlate(None).exists()
+
+def _has_character(db: Session, characters, character_id: int) -> bool:
+    return db.scalar(select(_is_character(characters, character_id)))
+
+def get_cards(db: Session, tweets, characters, tweak_id: int, whole_thread: bool = False):
+    """
+    What the card renderer needs for a tweet, or for the tweet and every
+    reply below it: the card tweets (the root first, then story order), the
+    tweets they quote or reply to, and every author. Two queries.
+    """
+    card_ids = select(tweets.c.id).where(tweets.c.id == tweak_id).cte("card_ids", recursive=whole_thread)
+    if whole_thread:
+        card_ids = card_ids.union_all(
+            select(tweets.c.id).join(card_ids, tweets.c.reply_to_tweak_id == card_ids.c.id)
+        )
+    is_card = tweets.c.id.in_(select(card_ids.c.id))
+    linked = select(tweets.c.quoted_tweak_id.label("id")).where(is_card).union(
+        select(tweets.c.reply_to_tweak_id).where(is_card)
+    ).cte("linked_ids")
+
+    rows = db.execute(
+        select(tweets, is_card.label("is_card"))
+        .where(is_card | tweets.c.id.in_(select(linked.c.id)))
+        .order_by(func.coalesce(tweets.c.custom_date, tweets.c.created_at), tweets.c.id)
+    ).all()
+    by_id = {row.id: dict(row._mapping) for row in rows}
+    if tweak_id not in by_id or not by_id[tweak_id]["is_card"]:
+        return None
+
+    cards = [by_id[tweak_id]] + [by_id[row.id] for row in rows if row.is_card and row.id != tweak_id]
+    author_ids = {row.character_id for row in rows}
+    authors = {
+        row.id: dict(row._mapping)
+        for row in db.execute(select(characters).where(characters.c.id.in_(author_ids)))
+    }
+    return {"cards": cards, "tweets": by_id, "characters": authors}
+
+# Newest tweaks (in story time) considered by the ranked feed
+RANKED_FEED_MAX_CANDIDATES = 50_000
+
+def get_ranked_feed(db: Session, tweets, characters, character_id: int, weights: dict = None, limit: int = 50,
+                    home_universe_ids: Iterable[int] = ()):
+    """
+    "For You" feed of `character_id`: the best `limit` top-level tweaks by
+    engagement, story-time recency, follow proximity and the author's
+    displayed follower count (see app/core/ranking.py), read from the `tweets`
+    and `characters` subqueries (universe_tweaks/universe_characters, or a
+    branch's merged view). Candidates come from one query as plain
+    columns; scoring runs over NumPy arrays; only the winners are loaded as
+    full rows. Quoted tweets outside the view are looked up in the table,
+    except in `home_universe_ids` (the universes the view reads from).
+
+    None when `character_id` is not one of `characters`.
+    """
+    viewer_follow = aliased(CharacterFollow)
+    story_time = _story_time(tweets)
+
+    # Core connection: plain rows, none of the ORM's per-row loading
+    candidates = db.connection().execute(
+        select(
+            tweets.c.id,
+            tweets.c.character_id,
+            func.coalesce(tweets.c.like_count, 0),
+            func.coalesce(tweets.c.retweet_count, 0),
+            func.coalesce(tweets.c.quote_count, 0),
+            func.coalesce(tweets.c.comment_count, 0),
+            func.coalesce(tweets.c.view_count, 0),
+            epoch_seconds(story_time),
+            case((viewer_follow.id.isnot(None), 1), else_=0),
+            func.coalesce(characters.c.display_followers_count, 0),
+            func.coalesce(tweets.c.quoted_tweak_id, 0),
+        ).select_from(tweets).outerjoin(
+            viewer_follow,
+            and_(viewer_follow.follower_id == character_id, viewer_follow.following_id == tweets.c.character_id),
+        ).join(
+            characters, characters.c.id == tweets.c.character_id
+        ).where(
+            tweets.c.reply_to_tweak_id.is_(None),
+            # An unknown viewer gets no candidates; told apart from an empty universe below
+            _is_character(characters, character_id),
+        ).order_by(story_time.desc()).limit(RANKED_FEED_MAX_CANDIDATES)
+    ).all()
+    if not candidates:
+        return [] if _has_character(db, characters, character_id) else None
+
+    # Plain tuples: NumPy probes Row objects attribute by attribute
+    matrix = np.array([tuple(row) for row in candidates], dtype=np.float64)
+    scores = ranking.score_candidates(matrix, character_id, ranking.resolve_weights(weights))
+    best = ranking.top_k(scores, limit)
+    ranked_ids = [int(tweak_id) for tweak_id in matrix[best, 0]]
+
+    # The winners and the tweets they quote, in one query by id: an
+    # `IN (subquery)` alternative cannot use the primary key and scans
+    # every tweet (every partition, when tweaks is partitioned)
+    quoted_ids = {int(quoted) for quoted in matrix[best, ranking.CANDIDATE_COLUMNS.index("quoted_tweak_id")] if quoted}
+    tweets_by_id = {
+        row.id: dict(row._mapping)
+        for row in db.execute(select(tweets).where(tweets.c.id.in_(set(ranked_ids) | quoted_ids)))
+    }
+    # Quotes of tweets in other universes; a home tweet missing from the view is deleted there
+    missing_quoted_ids = quoted_ids - tweets_by_id.keys()
+    if missing_quoted_ids:
+        tweets_by_id.update({
+            row.id: dict(row._mapping)
+            for row in db.execute(select(Tweak.__table__).where(
+                Tweak.id.in_(missing_quoted_ids), Tweak.universe_id.notin_(list(home_universe_ids))
+            ))
+        })
+
+    return [
+        {
+            'type': 'tweet',
+            'tweak': tweets_by_id[tweak_id],
+            'tweak_id': tweak_id,
+            'retweeted_by_character_id': None,
+            'timestamp': tweets_by_id[tweak_id]["custom_date"] or tweets_by_id[tweak_id]["created_at"],
+            'quoted_tweak': tweets_by_id.get(tweets_by_id[tweak_id]["quoted_tweak_id"]),
+            'score': round(float(score), 6),
+        }
+        for tweak_id, score in zip(ranked_ids, scores[best])
+    ]
+
 def get_tweak(db: Session, tweak_id: int, universe_id: int):
     return db.query(Tweak).filter(
         Tweak.id == tweak_id,
@@ -173,27 +349,36 @@ def get_tweak(db: Session, tweak_id: int, universe_id: int):
 def create_tweak(db: Session, tweak: TweakCreate):
     db_tweak = Tweak(**tweak.dict())
     db.add(db_tweak)
+    invalidate_universe(db, tweak.universe_id)
     db.commit()
     db.refresh(db_tweak)
     return db_tweak
 
 def update_tweak(db: Session, tweak_id: int, universe_id: int, tweak_update: TweakUpdate):
-    db_tweak = get_tweak(db, tweak_id, universe_id)
+    update_data = tweak_update.dict(exclude_unset=True)
+    if not update_data:
+        return get_tweak(db, tweak_id, universe_id)
+
+    # One UPDATE ... RETURNING, keyed on the universe too (a single partition
+    # when tweaks is partitioned, app/core/partitioning.py)
+    db_tweak = db.scalars(
+        update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id)
+        .values(**update_data).returning(Tweak),
+        execution_options={"populate_existing": True},
+    ).first()
     if not db_tweak:
         return None
-    
-    update_data = tweak_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_tweak, field, value)
-    
+    if "content" in update_data or "custom_date" in update_data:
+        note_tweak(db, db_tweak)
+    invalidate_universe(db, universe_id)
     db.commit()
-    db.refresh(db_tweak)
     return db_tweak
 
 def delete_tweak(db: Session, tweak_id: int, universe_id: int):
     db_tweak = get_tweak(db, tweak_id, universe_id)
     if db_tweak:
         db.delete(db_tweak)
+        invalidate_universe(db, universe_id)
         db.commit()
         return True
     return False
@@ -208,17 +393,20 @@ def create_quote_tweet(db: Session, tweak: TweakCreate):
         quoted = db.query(Tweak).filter(Tweak.id == tweak.quoted_tweak_id).first()
         if quoted:
             quoted.quote_count = (quoted.quote_count or 0) + 1
+            if quoted.universe_id != tweak.universe_id:
+                invalidate_universe(db, quoted.universe_id)
     
+    invalidate_universe(db, tweak.universe_id)
     db.commit()
     db.refresh(db_tweak)
     return db_tweak
 
 
 # ===== RETWEET CRUD (NEW APPROACH) =====
-def create_retweet(db: Session, character_id: int, tweak_id: int):
+def create_retweet(db: Session, character_id: int, tweak_id: int, universe_id: int):
     """Create a retweet entry - doesn't duplicate the tweet"""
     # Check if tweet exists
-    tweak = db.query(Tweak).filter(Tweak.id == tweak_id).first()
+    tweak = get_tweak(db, tweak_id, universe_id)
     if not tweak:
         return None
     
@@ -236,13 +424,18 @@ def create_retweet(db: Session, character_id: int, tweak_id: int):
     db.add(retweet)
     
     # Increment retweet count on original tweet
-    tweak.retweet_count = (tweak.retweet_count or 0) + 1
+    db.execute(
+        update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id)
+        .values(retweet_count=func.coalesce(Tweak.retweet_count, 0) + 1)
+        .execution_options(synchronize_session=False)
+    )
     
+    invalidate_universe(db, universe_id)
     db.commit()
     db.refresh(retweet)
     return retweet
 
-def delete_retweet(db: Session, character_id: int, tweak_id: int):
+def delete_retweet(db: Session, character_id: int, tweak_id: int, universe_id: int):
     """Undo a retweet"""
     retweet = db.query(Retweet).filter(
         Retweet.character_id == character_id,
@@ -253,9 +446,13 @@ def delete_retweet(db: Session, character_id: int, tweak_id: int):
         db.delete(retweet)
         
         # Decrement retweet count
-        tweak = db.query(Tweak).filter(Tweak.id == tweak_id).first()
-        if tweak:
-            tweak.retweet_count = max(0, (tweak.retweet_count or 0) - 1)
+        decremented = db.execute(
+            update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id)
+            .values(retweet_count=greatest(func.coalesce(Tweak.retweet_count, 0) - 1, 0))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if decremented:
+            invalidate_universe(db, universe_id)
         
         db.commit()
         return True
@@ -275,6 +472,98 @@ def get_retweets_by_character(db: Session, character_id: int) -> List[Retweet]:
     ).order_by(Retweet.created_at.desc()).all()
 
 
+# ===== LIKE CRUD =====
+def like_tweak(db: Session, character_id: int, tweak_id: int, universe_id: int):
+    """Like a tweak. Returns (liked, like_count), or None if the tweak isn't in the universe"""
+    tweak = get_tweak(db, tweak_id, universe_id)
+    if not tweak:
+        return None
+
+    # The unique (character, tweak) pair makes a repeated like a no-op
+    inserted = db.execute(
+        insert_ignoring(db.get_bind(), Like, {"character_id": character_id, "tweak_id": tweak_id}, "unique_like")
+        .returning(Like.id)
+    ).first()
+    like_count = tweak.like_count or 0
+    if inserted:
+        # Counted in SQL so concurrent likes never overwrite each other
+        like_count = db.execute(
+            update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id)
+            .values(like_count=func.coalesce(Tweak.like_count, 0) + 1)
+            .returning(Tweak.like_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        invalidate_universe(db, universe_id)
+    db.commit()
+    return True, like_count
+
+def unlike_tweak(db: Session, character_id: int, tweak_id: int, universe_id: int):
+    """Undo a like. Returns (liked, like_count), or None if the tweak isn't in the universe"""
+    tweak = get_tweak(db, tweak_id, universe_id)
+    if not tweak:
+        return None
+
+    deleted = db.execute(
+        delete(Like).where(Like.character_id == character_id, Like.tweak_id == tweak_id).returning(Like.id)
+    ).first()
+    like_count = tweak.like_count or 0
+    if deleted:
+        like_count = db.execute(
+            update(Tweak).where(Tweak.id == tweak_id, Tweak.universe_id == universe_id)
+            .values(like_count=greatest(func.coalesce(Tweak.like_count, 0) - 1, 0))
+            .returning(Tweak.like_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        invalidate_universe(db, universe_id)
+    db.commit()
+    return False, like_count
+
+
+# ===== VIEWER STATE =====
+def get_viewer_state(
+    db: Session, tweets, characters, character_id: int, tweak_ids: Optional[List[int]]
+) -> Optional[List[dict]]:
+    """
+    Liked/retweeted/following-author flags of one character for a page of
+    tweaks from the `tweets` subquery, in one query; with `tweak_ids=None`,
+    for every tweak the character liked or retweeted, by id. None when
+    `character_id` is not one of `characters`.
+    """
+    if tweak_ids is not None and not tweak_ids:
+        return [] if _has_character(db, characters, character_id) else None
+    liked = exists().where(Like.character_id == character_id, Like.tweak_id == tweets.c.id)
+    retweeted = exists().where(Retweet.character_id == character_id, Retweet.tweak_id == tweets.c.id)
+    following = exists().where(
+        CharacterFollow.follower_id == character_id,
+        CharacterFollow.following_id == tweets.c.character_id,
+    )
+    if tweak_ids is None:
+        wanted = or_(
+            tweets.c.id.in_(select(Like.tweak_id).where(Like.character_id == character_id)),
+            tweets.c.id.in_(select(Retweet.tweak_id).where(Retweet.character_id == character_id)),
+        )
+    else:
+        wanted = tweets.c.id.in_(set(tweak_ids))
+    rows = db.execute(
+        select(tweets.c.id, liked.label("liked"), retweeted.label("retweeted"), following.label("following_author"))
+        .where(wanted, _is_character(characters, character_id))
+        .order_by(tweets.c.id)
+    ).all()
+    if not rows and not _has_character(db, characters, character_id):
+        return None
+
+    by_id = {row.id: row for row in rows}
+    return [
+        {
+            "tweak_id": tweak_id,
+            "liked": by_id[tweak_id].liked,
+            "retweeted": by_id[tweak_id].retweeted,
+            "following_author": by_id[tweak_id].following_author,
+        }
+        for tweak_id in (by_id if tweak_ids is None else dict.fromkeys(tweak_ids)) if tweak_id in by_id
+    ]
+
+
 # ===== TEMPLATE CRUD =====
 def get_templates(db: Session, user_id: int) -> List[TweakTemplate]:
     return db.query(TweakTemplate).filter(TweakTemplate.user_id == user_id).all()
@@ -299,7 +588,7 @@ def delete_template(db: Session, template_id: int, user_id: int):
 
 
 # ===== FOLLOW CRUD =====
-def follow_character(db: Session, follower_id: int, following_id: int):
+def follow_character(db: Session, follower_id: int, following_id: int, universe_id: Optional[int] = None):
     from app.models.tweaknow import CharacterFollow
     
     existing = db.query(CharacterFollow).filter(
@@ -312,11 +601,12 @@ def follow_character(db: Session, follower_id: int, following_id: int):
     
     db_follow = CharacterFollow(follower_id=follower_id, following_id=following_id)
     db.add(db_follow)
+    invalidate_universe(db, universe_id)
     db.commit()
     db.refresh(db_follow)
     return db_follow
 
-def unfollow_character(db: Session, follower_id: int, following_id: int):
+def unfollow_character(db: Session, follower_id: int, following_id: int, universe_id: Optional[int] = None):
     from app.models.tweaknow import CharacterFollow
     
     db_follow = db.query(CharacterFollow).filter(
@@ -326,6 +616,7 @@ def unfollow_character(db: Session, follower_id: int, following_id: int):
     
     if db_follow:
         db.delete(db_follow)
+        invalidate_universe(db, universe_id)
         db.commit()
         return True
     return False
@@ -352,6 +643,279 @@ def get_following_count(db: Session, character_id: int) -> int:
         CharacterFollow.follower_id == character_id
     ).count()
 
+def get_follow_page(db: Session, characters, character_id: int, direction: str,
+                    relative_to: Optional[int] = None, cursor: Optional[int] = None, limit: int = 50):
+    """
+    One page of a character's followers (direction="followers") or followed
+    characters ("following") among `characters` (universe_characters, or a
+    branch's merged view), newest follow first. `cursor` is the follow id
+    the previous page ended at. With `relative_to`, each row also says
+    whether that character follows them and is followed back, via EXISTS
+    probes in the same query.
+    """
+    if direction == "followers":
+        anchor, listed = CharacterFollow.following_id, CharacterFollow.follower_id
+    else:
+        anchor, listed = CharacterFollow.follower_id, CharacterFollow.following_id
+
+    columns = [
+        CharacterFollow.id.label("follow_id"),
+        CharacterFollow.created_at.label("followed_at"),
+        characters.c.id,
+        characters.c.name,
+        characters.c.username,
+        characters.c.profile_picture,
+        characters.c.official_mark,
+        characters.c.is_private,
+    ]
+    if relative_to is not None:
+        viewer_edge = aliased(CharacterFollow)
+        columns.append(exists().where(
+            viewer_edge.follower_id == relative_to, viewer_edge.following_id == characters.c.id
+        ).label("followed_by_viewer"))
+        viewer_edge = aliased(CharacterFollow)
+        columns.append(exists().where(
+            viewer_edge.follower_id == characters.c.id, viewer_edge.following_id == relative_to
+        ).label("follows_viewer"))
+
+    query = db.query(*columns).select_from(CharacterFollow).join(characters, characters.c.id == listed).filter(
+        anchor == character_id
+    )
+    if cursor is not None:
+        query = query.filter(CharacterFollow.id < cursor)
+    rows = query.order_by(CharacterFollow.id.desc()).limit(limit + 1).all()
+
+    items = []
+    for row in rows[:limit]:
+        item = {
+            "character": {
+                "id": row.id,
+                "name": row.name,
+                "username": row.username,
+                "profile_picture": row.profile_picture,
+                "official_mark": row.official_mark,
+                "is_private": row.is_private,
+            },
+            "followed_at": row.followed_at,
+        }
+        if relative_to is not None:
+            item["followed_by_viewer"] = row.followed_by_viewer
+            item["follows_viewer"] = row.follows_viewer
+            item["mutual"] = row.followed_by_viewer and row.follows_viewer
+        items.append(item)
+
+    next_cursor = rows[limit - 1].follow_id if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+# ===== FOLLOW SUGGESTIONS =====
+# Weights for "who to follow": followed-by-people-you-follow, retweet/quote
+# interactions in either direction, and log-scaled follower count
+SUGGESTION_WEIGHTS = {"mutuals": 3.0, "engagement": 2.0, "popularity": 1.0}
+# Graph candidates considered before popularity is looked up
+SUGGESTION_POOL = 200
+
+def _suggestion_candidates(tweets, characters, character_id: int):
+    """
+    The best SUGGESTION_POOL graph candidates among `characters`: followed by
+    people `character_id` follows, or retweeting/quoting (or retweeted/quoted
+    by) them in `tweets`. Popularity is only counted for the pool.
+    """
+    mine = select(CharacterFollow.following_id.label("id")).where(
+        CharacterFollow.follower_id == character_id
+    ).cte("mine")
+    follow = aliased(CharacterFollow, name="f")
+    fof = select(follow.following_id.label("id"), func.count().label("mutuals")).join(
+        mine, follow.follower_id == mine.c.id
+    ).group_by(follow.following_id).cte("fof")
+
+    retweet = Retweet.__table__.alias("r")
+    retweeted, quote, quoted = tweets.alias("t"), tweets.alias("q"), tweets.alias("qt")
+    retweets = retweet.join(retweeted, retweeted.c.id == retweet.c.tweak_id)
+    quotes = quote.join(quoted, quoted.c.id == quote.c.quoted_tweak_id)
+    engaged = union_all(
+        select(retweeted.c.character_id.label("id"), func.count().label("n")).select_from(retweets)
+        .where(retweet.c.character_id == character_id).group_by(retweeted.c.character_id),
+        select(retweet.c.character_id, func.count()).select_from(retweets)
+        .where(retweeted.c.character_id == character_id).group_by(retweet.c.character_id),
+        select(quoted.c.character_id, func.count()).select_from(quotes)
+        .where(quote.c.character_id == character_id).group_by(quoted.c.character_id),
+        select(quote.c.character_id, func.count()).select_from(quotes)
+        .where(quoted.c.character_id == character_id).group_by(quote.c.character_id),
+    ).cte("engaged")
+    engagement = select(
+        engaged.c.id, cast(func.sum(engaged.c.n), Integer).label("engagement")
+    ).group_by(engaged.c.id).cte("engagement")
+
+    mutuals = func.coalesce(fof.c.mutuals, 0)
+    engagements = func.coalesce(engagement.c.engagement, 0)
+    pool = select(characters.c.id, mutuals.label("mutuals"), engagements.label("engagement")).select_from(
+        characters.outerjoin(fof, fof.c.id == characters.c.id)
+        .outerjoin(engagement, engagement.c.id == characters.c.id)
+    ).where(
+        _is_character(characters, character_id),
+        characters.c.id != character_id,
+        characters.c.id.notin_(select(mine.c.id)),
+        or_(fof.c.id.isnot(None), engagement.c.id.isnot(None)),
+    ).order_by(
+        (SUGGESTION_WEIGHTS["mutuals"] * mutuals + SUGGESTION_WEIGHTS["engagement"] * engagements).desc(),
+        characters.c.id,
+    ).limit(SUGGESTION_POOL).cte("pool")
+
+    followers = select(func.count()).where(CharacterFollow.following_id == pool.c.id).scalar_subquery()
+    return select(pool.c.id, pool.c.mutuals, pool.c.engagement, followers.label("followers"))
+
+def _popular_characters(characters, character_id: int, limit: int):
+    followed = aliased(CharacterFollow)
+    return select(
+        characters.c.id, literal(0).label("mutuals"), literal(0).label("engagement"),
+        func.count(CharacterFollow.id).label("followers"),
+    ).select_from(
+        characters.outerjoin(CharacterFollow, CharacterFollow.following_id == characters.c.id)
+    ).where(
+        _is_character(characters, character_id),
+        characters.c.id != character_id,
+        characters.c.id.notin_(select(followed.following_id).where(followed.follower_id == character_id)),
+    ).group_by(characters.c.id).order_by(func.count(CharacterFollow.id).desc(), characters.c.id).limit(limit)
+
+def get_follow_suggestions(
+    db: Session, tweets, characters, character_id: int, limit: int = 20
+) -> Optional[List[dict]]:
+    """
+    Characters `character_id` doesn't follow yet, best first, from the
+    `tweets` and `characters` subqueries (universe_tweaks/universe_characters,
+    or a branch's merged view). Graph signals are aggregated in SQL over the
+    follow/retweet/quote edges touching the character; popularity is only
+    counted for the best SUGGESTION_POOL candidates. Characters with no graph
+    around them get the most-followed characters of the universe. None when
+    the character isn't one of `characters`.
+    """
+    rows = db.execute(_suggestion_candidates(tweets, characters, character_id)).all()
+    if len(rows) < limit:
+        seen = {row.id for row in rows}
+        rows += [row for row in db.execute(_popular_characters(characters, character_id, limit + len(seen))).all()
+                 if row.id not in seen]
+
+    scored = sorted((
+        (
+            SUGGESTION_WEIGHTS["mutuals"] * row.mutuals
+            + SUGGESTION_WEIGHTS["engagement"] * row.engagement
+            + SUGGESTION_WEIGHTS["popularity"] * math.log1p(row.followers),
+            row,
+        )
+        for row in rows
+    ), key=lambda pair: (-pair[0], pair[1].id))[:limit]
+    if not scored:
+        return [] if _has_character(db, characters, character_id) else None
+
+    found = {
+        row.id: row for row in db.execute(select(
+            characters.c.id, characters.c.name, characters.c.username,
+            characters.c.profile_picture, characters.c.official_mark, characters.c.is_private,
+        ).where(characters.c.id.in_([row.id for _, row in scored])))
+    }
+    return [
+        {
+            "character": found[row.id]._asdict(),
+            "score": round(score, 4),
+            "mutual_count": row.mutuals,
+            "engagement_count": row.engagement,
+            "followers_count": row.followers,
+        }
+        for score, row in scored
+    ]
+
+# ===== PROFILE =====
+PROFILE_TABS = ("tweets", "replies", "media", "likes")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _story_time(tweets):
+    # Must match the expression in the ix_tweaks_character_* indexes
+    return func.coalesce(tweets.c.custom_date, tweets.c.created_at)
+
+def _encode_story_cursor(tweak) -> str:
+    moment = tweak["custom_date"] or tweak["created_at"]
+    return f"{(moment - _EPOCH) // timedelta(microseconds=1)}:{tweak['id']}"
+
+def _decode_story_cursor(cursor: str):
+    micros, tweak_id = cursor.split(":")
+    return _EPOCH + timedelta(microseconds=int(micros)), int(tweak_id)
+
+def get_profile(db: Session, tweets, characters, character_id: int, viewer_id: Optional[int] = None):
+    """
+    Header data for a profile, from the `tweets` and `characters` subqueries
+    (universe_tweaks/universe_characters, or a branch's merged view). Every
+    count is a scalar subquery over an index led by the character id, so the
+    cost follows the character's own activity rather than the size of the
+    universe.
+    """
+    character = db.execute(select(characters).where(characters.c.id == character_id)).first()
+    if character is None:
+        return None
+
+    def count(table, *criteria):
+        return select(func.count()).select_from(table).where(*criteria).scalar_subquery()
+
+    own = tweets.c.character_id == character_id
+    columns = [
+        count(tweets, own, tweets.c.reply_to_tweak_id.is_(None)).label("tweet_count"),
+        count(tweets, own, tweets.c.reply_to_tweak_id.isnot(None)).label("reply_count"),
+        count(tweets, own, list_length(tweets.c.images) > 0).label("media_count"),
+        count(Like, Like.character_id == character_id).label("like_count"),
+        count(CharacterFollow, CharacterFollow.following_id == character_id).label("followers_count"),
+        count(CharacterFollow, CharacterFollow.follower_id == character_id).label("following_count"),
+    ]
+    if viewer_id is not None:
+        columns.append(exists().where(
+            CharacterFollow.follower_id == viewer_id, CharacterFollow.following_id == character_id
+        ).label("followed_by_viewer"))
+        columns.append(exists().where(
+            CharacterFollow.follower_id == character_id, CharacterFollow.following_id == viewer_id
+        ).label("follows_viewer"))
+
+    profile = dict(db.execute(select(*columns)).one()._mapping)
+    profile["character"] = dict(character._mapping)
+    return profile
+
+def get_profile_tweaks(db: Session, tweets, characters, character_id: int, tab: str,
+                       cursor: Optional[str] = None, limit: int = 20):
+    """
+    One page of a profile tab from the `tweets` and `characters` subqueries,
+    newest first. "tweets", "replies" and "media" are keyset-paginated on
+    (story time, id) along their partial indexes; "likes" on the like id.
+    Raises ValueError for a malformed cursor.
+    """
+    # Each tweet with its author, in one query
+    author_columns = [column.label(f"author_{column.name}") for column in characters.c]
+    query = select(tweets, *author_columns).join(characters, characters.c.id == tweets.c.character_id)
+    if tab == "likes":
+        query = query.add_columns(Like.id.label("like_id")).join(Like, Like.tweak_id == tweets.c.id).where(
+            Like.character_id == character_id
+        )
+        if cursor is not None:
+            query = query.where(Like.id < int(cursor))
+        rows = db.execute(query.order_by(Like.id.desc()).limit(limit + 1)).all()
+        next_cursor = str(rows[limit - 1].like_id) if len(rows) > limit else None
+    else:
+        story_time = _story_time(tweets)
+        query = query.where(tweets.c.character_id == character_id)
+        if tab == "tweets":
+            query = query.where(tweets.c.reply_to_tweak_id.is_(None))
+        elif tab == "media":
+            query = query.where(list_length(tweets.c.images) > 0)
+        if cursor is not None:
+            query = query.where(tuple_(story_time, tweets.c.id) < tuple_(*_decode_story_cursor(cursor)))
+        rows = db.execute(query.order_by(story_time.desc(), tweets.c.id.desc()).limit(limit + 1)).all()
+        next_cursor = _encode_story_cursor(rows[limit - 1]._mapping) if len(rows) > limit else None
+
+    items, authors = [], {}
+    for row in rows[:limit]:
+        values = row._mapping
+        items.append({column.name: values[column.name] for column in tweets.c})
+        authors[values["author_id"]] = {column.name: values[f"author_{column.name}"] for column in characters.c}
+    authors = list(authors.values())
+    return {"items": items, "authors": authors, "next_cursor": next_cursor}
+
 # ===== TREND CRUD =====
 def get_trends(db: Session, universe_id: int) -> List:
     from app.models.tweaknow import Trend
@@ -363,6 +927,7 @@ def create_trend(db: Session, name: str, tweet_count: int, universe_id: int):
     from app.models.tweaknow import Trend
     db_trend = Trend(name=name, tweet_count=tweet_count, universe_id=universe_id)
     db.add(db_trend)
+    invalidate_universe(db, universe_id)
     db.commit()
     db.refresh(db_trend)
     return db_trend
@@ -380,6 +945,7 @@ def update_trend(db: Session, trend_id: int, universe_id: int, trend_update):
     update_data = trend_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(trend, field, value)
+    invalidate_universe(db, universe_id)
     db.commit()
     db.refresh(trend)
     return trend
@@ -392,6 +958,59 @@ def delete_trend(db: Session, trend_id: int, universe_id: int):
     ).first()
     if trend:
         db.delete(trend)
+        invalidate_universe(db, universe_id)
         db.commit()
         return True
     return False
+
+
+# ===== COUNTER RECONCILIATION =====
+def reconcile_counters(db: Session, universe_id: int, exact: bool = False, ctx: Optional[JobContext] = None) -> dict:
+    """
+    Bring like/retweet/comment/quote counts in line with the rows behind
+    them. Counts are also storyteller-set display numbers, so by default
+    they are only raised to the number of real likes, retweets, replies and
+    quotes; `exact` sets them to exactly that. Returns how many tweets
+    changed per counter. Commits once, at the end.
+    """
+    in_universe = Tweak.universe_id == universe_id
+    if exact:
+        db.execute(
+            update(Tweak).where(in_universe).values(like_count=0, retweet_count=0, comment_count=0, quote_count=0)
+            .execution_options(synchronize_session=False)
+        )
+    # One grouped pass per counter; correlated per-row subqueries would be quadratic
+    source = Tweak.__table__.alias("source")
+    grouped = {
+        "like_count": select(Like.tweak_id.label("id"), func.count().label("n"))
+        .join(Tweak, Tweak.id == Like.tweak_id).where(in_universe).group_by(Like.tweak_id),
+        "retweet_count": select(Retweet.tweak_id.label("id"), func.count().label("n"))
+        .join(Tweak, Tweak.id == Retweet.tweak_id).where(in_universe).group_by(Retweet.tweak_id),
+        "comment_count": select(source.c.reply_to_tweak_id.label("id"), func.count().label("n"))
+        .where(source.c.universe_id == universe_id, source.c.reply_to_tweak_id.isnot(None))
+        .group_by(source.c.reply_to_tweak_id),
+        "quote_count": select(source.c.quoted_tweak_id.label("id"), func.count().label("n"))
+        .where(source.c.universe_id == universe_id, source.c.quoted_tweak_id.isnot(None))
+        .group_by(source.c.quoted_tweak_id),
+    }
+    changed = {}
+    for done, (column, counts) in enumerate(grouped.items()):
+        counts = counts.subquery()
+        current = func.coalesce(getattr(Tweak, column), 0)
+        statement = update(Tweak).where(in_universe, Tweak.id == counts.c.id)
+        if exact:
+            statement = statement.values({column: counts.c.n})
+        else:
+            statement = statement.where(current < counts.c.n).values({column: greatest(current, counts.c.n)})
+        changed[column] = db.execute(statement.execution_options(synchronize_session=False)).rowcount
+        if ctx is not None:
+            ctx.check_cancelled()
+            ctx.report((done + 1) / len(grouped), f"{column.replace('_', ' ')} reconciled")
+    invalidate_universe(db, universe_id)
+    db.commit()
+    return changed
+
+
+@handler("reconcile_counters")
+def _run_reconcile(db: Session, ctx: JobContext) -> dict:
+    return reconcile_counters(db, ctx.universe_id, exact=bool(ctx.payload.get("exact")), ctx=ctx)
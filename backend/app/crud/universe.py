@@ -1,16 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, literal, or_, select, union_all, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List, Optional
+from app.core import archive
+from app.core.autocomplete import discard_index
+from app.core.cache import invalidate_universe
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.jobs import JobContext, handler
+from app.crud import branches as crud_branches
+from app.crud import jobs as crud_jobs
+from app.models.job import Job
 from app.models.universe import Universe
+from app.models.tweaknow import TweakNowCharacter, Tweak, Retweet, CharacterFollow, Trend
 from app.schemas.universe import UniverseCreate, UniverseUpdate
 
 def get_universes(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Universe]:
-    return db.query(Universe).filter(Universe.user_id == user_id).offset(skip).limit(limit).all()
-
-def get_universe(db: Session, universe_id: int, user_id: int):
     return db.query(Universe).filter(
+        Universe.user_id == user_id, Universe.deleted_at.is_(None)
+    ).offset(skip).limit(limit).all()
+
+def get_universe_summaries(db: Session, universes: List[Universe]) -> List[dict]:
+    """
+    The universes with character and tweet counts and their newest tweet's
+    story time: one grouped query per table for all of them, plus one for
+    the branches, each counted over its merged view. Universes whose rows are archived get no
+    counts.
+    """
+    live = [u for u in universes if u.storage == "live"]
+    plain_ids = [u.id for u in live if u.parent_universe_id is None]
+    character_counts, tweak_stats = {}, {}
+    if plain_ids:
+        character_counts = dict(db.execute(
+            select(TweakNowCharacter.universe_id, func.count())
+            .where(TweakNowCharacter.universe_id.in_(plain_ids)).group_by(TweakNowCharacter.universe_id)
+        ).all())
+        # Story time, as in ix_tweaks_universe_story, so both aggregates come from the index
+        tweak_stats = {row[0]: row[1:] for row in db.execute(
+            select(Tweak.universe_id, func.count(), func.max(func.coalesce(Tweak.custom_date, Tweak.created_at)))
+            .where(Tweak.universe_id.in_(plain_ids)).group_by(Tweak.universe_id)
+        )}
+    branch_stats = []
+    for branch in (u for u in live if u.parent_universe_id is not None):
+        tweets, characters = crud_branches.visible_tweaks(branch), crud_branches.visible_characters(branch)
+        branch_stats.append(select(
+            literal(branch.id),
+            select(func.count()).select_from(characters).scalar_subquery(),
+            select(func.count()).select_from(tweets).scalar_subquery(),
+            select(func.max(func.coalesce(tweets.c.custom_date, tweets.c.created_at))).scalar_subquery(),
+        ))
+    if branch_stats:
+        for row in db.execute(union_all(*branch_stats)):
+            character_counts[row[0]], tweak_stats[row[0]] = row[1], row[2:]
+
+    columns = [column.key for column in Universe.__table__.columns]
+    summaries = []
+    for universe in universes:
+        summary = {key: getattr(universe, key) for key in columns}
+        if universe.storage == "live":
+            tweak_count, last_tweak_at = tweak_stats.get(universe.id, (0, None))
+            summary.update(
+                character_count=character_counts.get(universe.id, 0),
+                tweak_count=tweak_count, last_tweak_at=last_tweak_at,
+            )
+        summaries.append(summary)
+    return summaries
+
+class UniverseWarming(Exception):
+    """The universe is archived and being restored; answered with 503 and Retry-After (main.py)"""
+
+    def __init__(self, universe_id: int, job_id: int):
+        super().__init__(f"Universe {universe_id} is being restored from the archive")
+        self.universe_id = universe_id
+        self.job_id = job_id
+
+def get_universe(db: Session, universe_id: int, user_id: int, require_live: bool = True, warm: bool = True):
+    """
+    The user's universe, or None. Opening an archived universe queues its
+    restore (unless not `warm`) and raises UniverseWarming while its rows
+    are not back (unless not `require_live`, for routes that only need the
+    universe row).
+    """
+    universe = db.query(Universe).filter(
         Universe.id == universe_id,
-        Universe.user_id == user_id
+        Universe.user_id == user_id,
+        Universe.deleted_at.is_(None)
     ).first()
+    if universe is None:
+        return None
+    if universe.storage == "live":
+        _note_access(universe)
+        return universe
+    job = warm_universe(universe) if warm else None
+    if require_live:
+        raise UniverseWarming(universe.id, job.id if job else None)
+    return universe
+
+def _note_access(universe: Universe):
+    """Keep last_accessed_at within ARCHIVE_TOUCH_SECONDS; one write per universe per interval"""
+    now = datetime.now(timezone.utc)
+    if universe.last_accessed_at is not None and \
+            universe.last_accessed_at > now - timedelta(seconds=settings.ARCHIVE_TOUCH_SECONDS):
+        return
+    # A bare primary connection: the caller's session may be reading from a replica, and
+    # a session commit would count as the reader's own write and pin them to the primary
+    with engine.begin() as conn:
+        conn.execute(update(Universe).where(Universe.id == universe.id).values(last_accessed_at=now))
+
+def warm_universe(universe: Universe) -> Optional[Job]:
+    """Queue the restore of an archived (or archiving) universe; the job already queued if there is one"""
+    with SessionLocal() as primary:
+        primary.execute(
+            update(Universe).where(Universe.id == universe.id, Universe.storage.in_(("archiving", "archived")))
+            .values(storage="warming").execution_options(synchronize_session=False)
+        )
+        # Someone is waiting for it
+        job = crud_jobs.enqueue(primary, "rehydrate_universe", universe.user_id, universe.id, priority=20)
+        primary.refresh(job)
+        primary.expunge(job)
+    universe.storage = "warming"
+    return job
 
 def create_universe(db: Session, universe: UniverseCreate, user_id: int):
     db_universe = Universe(**universe.dict(), user_id=user_id)
@@ -20,11 +129,17 @@ def create_universe(db: Session, universe: UniverseCreate, user_id: int):
     return db_universe
 
 def update_universe(db: Session, universe_id: int, user_id: int, universe_update: UniverseUpdate):
-    db_universe = get_universe(db, universe_id, user_id)
+    db_universe = get_universe(db, universe_id, user_id, require_live=False)
     if not db_universe:
         return None
     
     update_data = universe_update.dict(exclude_unset=True)
+    if update_data.get("ranking_weights") is not None:
+        update_data["ranking_weights"] = {
+            key: value for key, value in update_data["ranking_weights"].items() if value is not None
+        }
+        # Ranked feeds were scored with the old weights
+        invalidate_universe(db, universe_id)
     for field, value in update_data.items():
         setattr(db_universe, field, value)
     
@@ -32,10 +147,73 @@ def update_universe(db: Session, universe_id: int, user_id: int, universe_update
     db.refresh(db_universe)
     return db_universe
 
-def delete_universe(db: Session, universe_id: int, user_id: int):
-    db_universe = get_universe(db, universe_id, user_id)
-    if db_universe:
-        db.delete(db_universe)
+def delete_universe(db: Session, universe: Universe) -> Job:
+    """
+    Hide the universe and its branches at once and queue the job that
+    removes their rows; see _run_delete.
+    """
+    branch_ids = [row.id for row in db.query(Universe.id).filter(Universe.parent_universe_id == universe.id)]
+    db.query(Universe).filter(Universe.id.in_([universe.id, *branch_ids])).update(
+        {Universe.deleted_at: datetime.now(timezone.utc)}, synchronize_session=False
+    )
+    for universe_id in (universe.id, *branch_ids):
+        invalidate_universe(db, universe_id)
+        discard_index(db, universe_id)
+    return crud_jobs.enqueue(db, "delete_universe", universe.user_id, universe.id)
+
+@handler("delete_universe")
+def _run_delete(db: Session, ctx: JobContext):
+    """
+    Delete a hidden universe in batches of JOB_DELETE_BATCH tweets, one
+    transaction each, so neither locks nor undo pile up however large it
+    is. A retried attempt carries on from the last committed batch.
+    """
+    universe_ids = [ctx.universe_id] + [
+        row.id for row in db.query(Universe.id).filter(Universe.parent_universe_id == ctx.universe_id)
+    ]
+    total = db.query(func.count(Tweak.id)).filter(Tweak.universe_id.in_(universe_ids)).scalar() or 0
+    deleted = 0
+    for universe_id in reversed(universe_ids):
+        # Branches build on this universe's rows, so they go first
+        for batch in _delete_universe_rows(db, universe_id):
+            deleted += batch
+            ctx.report(deleted / total if total else 0.0, f"{deleted} of {total} tweets deleted")
+        # An archived universe's rows are in its archive
+        archive.remove(universe_id)
+    return {"tweaks_deleted": deleted}
+
+def _delete_universe_rows(db: Session, universe_id: int, keep_universe: bool = False) -> Iterator[int]:
+    """Commits after every batch of tweets and yields its size; `keep_universe` leaves the universe row"""
+    character_ids = select(TweakNowCharacter.id).where(TweakNowCharacter.universe_id == universe_id)
+    while True:
+        tweak_ids = db.scalars(
+            select(Tweak.id).where(Tweak.universe_id == universe_id).order_by(Tweak.id)
+            .limit(settings.JOB_DELETE_BATCH)
+        ).all()
+        if not tweak_ids:
+            break
+        db.query(Retweet).filter(Retweet.tweak_id.in_(tweak_ids)).delete(synchronize_session=False)
+        # Detach replies and quotes pointing at these tweaks before removing them
+        db.query(Tweak).filter(Tweak.reply_to_tweak_id.in_(tweak_ids)).update(
+            {Tweak.reply_to_tweak_id: None}, synchronize_session=False
+        )
+        db.query(Tweak).filter(Tweak.quoted_tweak_id.in_(tweak_ids)).update(
+            {Tweak.quoted_tweak_id: None}, synchronize_session=False
+        )
+        db.query(Tweak).filter(Tweak.id.in_(tweak_ids)).delete(synchronize_session=False)
         db.commit()
-        return True
-    return False
\ No newline at end of file
+        yield len(tweak_ids)
+
+    db.query(Retweet).filter(Retweet.character_id.in_(character_ids)).delete(synchronize_session=False)
+    db.query(CharacterFollow).filter(
+        or_(CharacterFollow.follower_id.in_(character_ids), CharacterFollow.following_id.in_(character_ids))
+    ).delete(synchronize_session=False)
+    db.query(Trend).filter(Trend.universe_id == universe_id).delete(synchronize_session=False)
+    db.query(TweakNowCharacter).filter(
+        TweakNowCharacter.universe_id == universe_id
+    ).delete(synchronize_session=False)
+    if not keep_universe:
+        db.query(Universe).filter(Universe.id == universe_id).delete(synchronize_session=False)
+    invalidate_universe(db, universe_id)
+    discard_index(db, universe_id)
+    db.commit()
@@ -3,5 +3,7 @@ from app.models.universe import Universe
 from app.models.tweaknow import TweakNowCharacter, Tweak, TweakTemplate
 
 from app.models.user import User
-from app.models.universe import Universe
-from app.models.tweaknow import TweakNowCharacter, Tweak, TweakTemplate, CharacterFollow, Trend
\ No newline at end of file
+from app.models.universe import Universe, BranchTombstone
+from app.models.tweaknow import TweakNowCharacter, Tweak, TweakTemplate, CharacterFollow, Trend, Like
+from app.models.media import Media
+from app.models.job import Job
@@ -0,0 +1,38 @@
+from sqlalchemy import JSON, Boolean, Column, Float, ForeignKey, Index, Integer, String, Text, false
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.dialect import Timestamp
+
+class Job(Base):
+    """A unit of background work (app/core/jobs.py); its row is both the queue entry and the status report"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    # The universe the job works on; not a foreign key, since deleting the universe is itself a job
+    universe_id = Column(Integer, nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    # queued -> running -> succeeded | failed | cancelled; failed attempts go back to queued until max_attempts
+    status = Column(String, nullable=False, default="queued", server_default="queued")
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    # Not claimed before this time (retry backoff)
+    run_after = Column(Timestamp, server_default=func.now(), nullable=False)
+    progress = Column(Float, nullable=False, default=0.0, server_default="0")
+    progress_message = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default=false())
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    # Who holds a running job, and when it last said it was alive
+    worker = Column(String, nullable=True)
+    heartbeat_at = Column(Timestamp, nullable=True)
+    created_at = Column(Timestamp, server_default=func.now())
+    started_at = Column(Timestamp, nullable=True)
+    finished_at = Column(Timestamp, nullable=True)
+
+    __table_args__ = (
+        # Claiming (status = 'queued' by priority) and finding expired leases (status = 'running')
+        Index('ix_jobs_status_priority', 'status', 'priority'),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.dialect import Timestamp
+
+class Media(Base):
+    """An uploaded image; the file itself is shared by every upload with the same hash (app/core/media.py)"""
+    __tablename__ = "media"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    content_type = Column(String, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    created_at = Column(Timestamp, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'sha256', name='unique_user_media'),
+    )
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, Text, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
-from sqlalchemy.dialects.postgresql import ARRAY
+from app.core.dialect import StringList, Timestamp
 
 class TweakNowCharacter(Base):
     __tablename__ = "tweaknow_characters"
@@ -25,23 +25,30 @@ class TweakNowCharacter(Base):
     
     profile_picture = Column(Text, nullable=True)
     banner_image = Column(Text, nullable=True)
+    # In a branch: the parent character this row replaces (app/crud/branches.py)
+    overrides_id = Column(Integer, ForeignKey("tweaknow_characters.id", ondelete="CASCADE"), nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
     
     universe = relationship("Universe", back_populates="tweaknow_characters")
     tweaks = relationship("Tweak", back_populates="character", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_tweaknow_characters_overrides_id', 'overrides_id', postgresql_where=text('overrides_id IS NOT NULL'),
+              sqlite_where=text('overrides_id IS NOT NULL')),
+    )
+
 
 class Tweak(Base):
     __tablename__ = "tweaks"
     
     id = Column(Integer, primary_key=True, index=True)
     universe_id = Column(Integer, ForeignKey("universes.id"), nullable=False)
-    character_id = Column(Integer, ForeignKey("tweaknow_characters.id"), nullable=False)
+    character_id = Column(Integer, ForeignKey("tweaknow_characters.id"), nullable=False, index=True)
     
     content = Column(Text, nullable=False)
-    images = Column(ARRAY(Text), nullable=True)
+    images = Column(StringList, nullable=True)
     
     comment_count = Column(Integer, default=0)
     retweet_count = Column(Integer, default=0)
@@ -50,31 +57,68 @@ class Tweak(Base):
     view_count = Column(Integer, default=0)
     
     source_label = Column(String, default="Twitter for iPhone")
-    custom_date = Column(DateTime(timezone=True), nullable=True)
+    custom_date = Column(Timestamp, nullable=True)
     reply_to_tweak_id = Column(Integer, ForeignKey("tweaks.id"), nullable=True)
     quoted_tweak_id = Column(Integer, ForeignKey("tweaks.id"), nullable=True)
+    # In a branch: the parent tweet this row replaces (app/crud/branches.py)
+    overrides_id = Column(Integer, ForeignKey("tweaks.id", ondelete="CASCADE"), nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
     
     universe = relationship("Universe", back_populates="tweaks")
     character = relationship("TweakNowCharacter", back_populates="tweaks")
     replies = relationship("Tweak", backref="parent_tweak", foreign_keys=[reply_to_tweak_id], remote_side=[id])
 
+    __table_args__ = (
+        Index('ix_tweaks_quoted_tweak_id', 'quoted_tweak_id', postgresql_where=text('quoted_tweak_id IS NOT NULL'),
+              sqlite_where=text('quoted_tweak_id IS NOT NULL')),
+        Index('ix_tweaks_reply_to_tweak_id', 'reply_to_tweak_id', postgresql_where=text('reply_to_tweak_id IS NOT NULL'),
+              sqlite_where=text('reply_to_tweak_id IS NOT NULL')),
+        Index('ix_tweaks_overrides_id', 'overrides_id', postgresql_where=text('overrides_id IS NOT NULL'),
+              sqlite_where=text('overrides_id IS NOT NULL')),
+        # Per-universe reads (feeds, exports, reconciliation), newest first in story time
+        Index('ix_tweaks_universe_story', 'universe_id', func.coalesce(custom_date, created_at), 'id'),
+        # Profile tabs, newest first in story time (see crud.get_profile_tweaks):
+        # "Replies" lists everything, "Tweets" top-level posts, "Media" posts with images
+        Index('ix_tweaks_character_story', 'character_id', func.coalesce(custom_date, created_at), 'id'),
+        Index('ix_tweaks_character_posts', 'character_id', func.coalesce(custom_date, created_at), 'id',
+              postgresql_where=text('reply_to_tweak_id IS NULL'),
+              sqlite_where=text('reply_to_tweak_id IS NULL')),
+        Index('ix_tweaks_character_media', 'character_id', func.coalesce(custom_date, created_at), 'id',
+              postgresql_where=text('cardinality(images) > 0'),
+              sqlite_where=text('json_array_length(images) > 0')),
+    )
+
 
 class Retweet(Base):
     __tablename__ = "retweets"
     
     id = Column(Integer, primary_key=True, index=True)
     character_id = Column(Integer, ForeignKey("tweaknow_characters.id"), nullable=False)
-    tweak_id = Column(Integer, ForeignKey("tweaks.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    tweak_id = Column(Integer, ForeignKey("tweaks.id"), nullable=False, index=True)
+    created_at = Column(Timestamp, server_default=func.now())
     
     __table_args__ = (
         UniqueConstraint('character_id', 'tweak_id', name='unique_retweet'),
     )
 
 
+class Like(Base):
+    __tablename__ = "likes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    character_id = Column(Integer, ForeignKey("tweaknow_characters.id", ondelete="CASCADE"), nullable=False)
+    tweak_id = Column(Integer, ForeignKey("tweaks.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(Timestamp, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('character_id', 'tweak_id', name='unique_like'),
+        # Newest-first "Likes" profile tab
+        Index('ix_likes_character_id_id', 'character_id', 'id'),
+    )
+
+
 class Trend(Base):
     __tablename__ = "trends"
     
@@ -85,8 +129,8 @@ class Trend(Base):
     # Header fields — stored on universe level via the first trend or a dedicated field
     header_image = Column(Text, nullable=True)
     header_text = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
 
 
 class TweakTemplate(Base):
@@ -103,7 +147,7 @@ class TweakTemplate(Base):
     view_count = Column(Integer, default=0)
     source_label = Column(String, default="Twitter for iPhone")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
 
 class CharacterFollow(Base):
@@ -112,8 +156,11 @@ class CharacterFollow(Base):
     id = Column(Integer, primary_key=True, index=True)
     follower_id = Column(Integer, ForeignKey("tweaknow_characters.id"), nullable=False)
     following_id = Column(Integer, ForeignKey("tweaknow_characters.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     
     __table_args__ = (
         UniqueConstraint('follower_id', 'following_id', name='unique_follow'),
+        # Newest-first follower/following pages (see crud.get_follow_page)
+        Index('ix_character_follows_following_id_id', 'following_id', 'id'),
+        Index('ix_character_follows_follower_id_id', 'follower_id', 'id'),
     )
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.dialect import Timestamp
 
 class Universe(Base):
     __tablename__ = "universes"
@@ -10,10 +11,38 @@ class Universe(Base):
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Overrides for the ranked feed's weights (app/core/ranking.py DEFAULT_WEIGHTS)
+    ranking_weights = Column(JSON, nullable=True)
+    # Branches (see app/crud/branches.py): the universe this one forked from,
+    # and the parent's highest tweak/character/retweet ids at that moment
+    parent_universe_id = Column(Integer, ForeignKey("universes.id"), nullable=True, index=True)
+    branch_watermarks = Column(JSON, nullable=True)
+    # Set when a delete job is queued (app/crud/universe.py); the universe is hidden from then on
+    deleted_at = Column(Timestamp, nullable=True)
+    # Cold storage (app/crud/archive.py): live -> archiving -> archived -> warming -> live;
+    # only a live universe's rows are in the database
+    storage = Column(String, nullable=False, default="live", server_default="live")
+    last_accessed_at = Column(Timestamp, server_default=func.now())
+    archived_at = Column(Timestamp, nullable=True)
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
     
     # Relationships
     owner = relationship("User", back_populates="universes")
     tweaknow_characters = relationship("TweakNowCharacter", back_populates="universe", cascade="all, delete-orphan")
-    tweaks = relationship("Tweak", back_populates="universe", cascade="all, delete-orphan")
\ No newline at end of file
+    tweaks = relationship("Tweak", back_populates="universe", cascade="all, delete-orphan")
+
+
+class BranchTombstone(Base):
+    """A parent row ("tweak" or "character") deleted inside a branch"""
+    __tablename__ = "branch_tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    universe_id = Column(Integer, ForeignKey("universes.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    target_id = Column(Integer, nullable=False)
+    created_at = Column(Timestamp, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('universe_id', 'kind', 'target_id', name='unique_tombstone'),
+    )
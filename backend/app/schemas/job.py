@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class Job(BaseModel):
+    """A background job's state; poll GET /jobs/{id} until status is succeeded, failed or cancelled"""
+    id: int
+    kind: str
+    universe_id: Optional[int] = None
+    status: str
+    priority: int
+    # 0..1, with a human-readable note on where the job is
+    progress: float
+    progress_message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    # What the job produced (e.g. an ExportSummary) once it succeeded
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class Media(BaseModel):
+    id: int
+    sha256: str
+    content_type: str
+    size_bytes: int
+    # Where the image is served; store this in a tweak's images or a character's pictures
+    url: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
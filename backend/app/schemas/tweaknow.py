@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from typing import Optional, List
@@ -87,6 +87,13 @@ class Tweak(TweakBase):
         from_attributes = True
 
 
+class TweakThread(BaseModel):
+    tweak: Tweak
+    quoted_tweak: Optional[Tweak] = None
+    # Every reply below `tweak`, oldest first; nest them by reply_to_tweak_id
+    replies: List[Tweak]
+
+
 # ===== RETWEET SCHEMAS =====
 class RetweetCreate(BaseModel):
     character_id: int
@@ -102,6 +109,53 @@ class RetweetResponse(BaseModel):
         from_attributes = True
 
 
+# ===== LIKE SCHEMAS =====
+class LikeCreate(BaseModel):
+    character_id: int
+
+class LikeResponse(BaseModel):
+    liked: bool
+    like_count: int
+
+
+# ===== VIEWER STATE SCHEMAS =====
+class ViewerStateRequest(BaseModel):
+    character_id: int
+    tweak_ids: List[int] = Field(default_factory=list, max_length=500)
+
+class TweakViewerState(BaseModel):
+    tweak_id: int
+    liked: bool
+    retweeted: bool
+    following_author: bool
+
+class ViewerState(BaseModel):
+    character_id: int
+    tweaks: List[TweakViewerState]
+
+
+# ===== IMPRESSION SCHEMAS =====
+class ImpressionBatch(BaseModel):
+    # One entry per impression; repeat an id to count it several times
+    tweak_ids: List[int] = Field(max_length=1000)
+
+class ImpressionAck(BaseModel):
+    accepted: int
+
+
+# ===== AUTOCOMPLETE SCHEMAS =====
+class AutocompleteSuggestion(BaseModel):
+    """A character ("@username") or hashtag ("#tag") for the composer; `value` is the text to insert"""
+    kind: str
+    value: str
+    character_id: Optional[int] = None
+    name: Optional[str] = None
+    username: Optional[str] = None
+    official_mark: Optional[str] = None
+    # Hashtags: tweets using it
+    count: Optional[int] = None
+
+
 # ===== TEMPLATE SCHEMAS =====
 class TweakTemplateBase(BaseModel):
     name: str
@@ -139,6 +193,59 @@ class CharacterFollow(BaseModel):
         from_attributes = True
 
 
+class CharacterSummary(BaseModel):
+    """Compact character row for lists (no banner or profile text)"""
+    id: int
+    name: str
+    username: str
+    profile_picture: Optional[str] = None
+    official_mark: Optional[str] = "None"
+    is_private: Optional[bool] = False
+
+    class Config:
+        from_attributes = True
+
+class FollowListItem(BaseModel):
+    character: CharacterSummary
+    followed_at: Optional[datetime] = None
+    # Relationship to the `relative_to` character, when one was given
+    followed_by_viewer: Optional[bool] = None
+    follows_viewer: Optional[bool] = None
+    mutual: Optional[bool] = None
+
+class FollowSuggestion(BaseModel):
+    character: CharacterSummary
+    score: float
+    mutual_count: int
+    engagement_count: int
+    followers_count: int
+
+class FollowPage(BaseModel):
+    items: List[FollowListItem]
+    next_cursor: Optional[int] = None
+
+
+# ===== PROFILE SCHEMAS =====
+class CharacterProfile(BaseModel):
+    """Profile header: the character plus real counts, from one aggregate query"""
+    character: TweakNowCharacter
+    tweet_count: int
+    reply_count: int
+    media_count: int
+    like_count: int
+    followers_count: int
+    following_count: int
+    # Relationship to `viewer_id`, when one was given
+    followed_by_viewer: Optional[bool] = None
+    follows_viewer: Optional[bool] = None
+
+class ProfileTweakPage(BaseModel):
+    items: List[Tweak]
+    # Authors of the page's tweets (others than the profile's own on "Likes")
+    authors: List[CharacterSummary]
+    next_cursor: Optional[str] = None
+
+
 # ===== TREND SCHEMAS =====
 class TrendBase(BaseModel):
     name: str
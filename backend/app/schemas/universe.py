@@ -1,6 +1,18 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
 from datetime import datetime
+from app.schemas.tweaknow import (
+    CharacterProfile, ProfileTweakPage, TweakNowCharacter, TweakTemplate, TweakThread, Trend, ViewerState
+)
+from app.schemas.user import User
+
+class RankingWeights(BaseModel):
+    """Per-universe weights for the "For You" feed; unset fields keep the defaults"""
+    engagement: Optional[float] = Field(None, ge=0)
+    recency: Optional[float] = Field(None, ge=0)
+    proximity: Optional[float] = Field(None, ge=0)
+    popularity: Optional[float] = Field(None, ge=0)
+    recency_half_life_hours: Optional[float] = Field(None, gt=0)
 
 class UniverseBase(BaseModel):
     name: str
@@ -12,12 +24,58 @@ class UniverseCreate(UniverseBase):
 class UniverseUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
+    ranking_weights: Optional[RankingWeights] = None
+
+class BranchCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
 
 class Universe(UniverseBase):
     id: int
     user_id: int
+    ranking_weights: Optional[dict] = None
+    # Set on branches: the universe they overlay
+    parent_universe_id: Optional[int] = None
+    # live, or archiving / archived / warming while its rows are in cold storage
+    storage: str = "live"
+    last_accessed_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UniverseSummary(Universe):
+    """A universe with its size, from grouped counts; unknown (None) while it is not live"""
+    character_count: Optional[int] = None
+    tweak_count: Optional[int] = None
+    # Story time of its newest tweet
+    last_tweak_at: Optional[datetime] = None
+
+class UniverseListBootstrap(BaseModel):
+    user: User
+    universes: List[UniverseSummary]
+
+class ScreenBootstrap(BaseModel):
+    """What one screen needs to draw; only the parts of the requested screen are present"""
+    screen: str
+    universe: Optional[UniverseSummary] = None
+    characters: Optional[List[TweakNowCharacter]] = None
+    # Same items as GET /tweaknow/universes/{id}/tweaks (latest or for_you)
+    feed: Optional[List[Any]] = None
+    # Flags for the tweets the character liked or retweeted; every other tweet has none
+    viewer_state: Optional[ViewerState] = None
+    profile: Optional[CharacterProfile] = None
+    # First page of the profile's "tweets" tab
+    tweaks: Optional[ProfileTweakPage] = None
+    thread: Optional[TweakThread] = None
+    templates: Optional[List[TweakTemplate]] = None
+    trends: Optional[List[Trend]] = None
+
+class ExportSummary(BaseModel):
+    """What a static archive export changed on disk"""
+    pages_written: int
+    pages_unchanged: int
+    pages_removed: int
+    media_written: int
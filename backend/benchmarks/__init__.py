@@ -0,0 +1,10 @@
+"""
+Benchmarks for the AllSocIt API.
+
+    python -m benchmarks.generate   seed a synthetic universe at a given scale
+    python -m benchmarks.load       replay mobile screen-open traffic against a server
+    python -m benchmarks.stats      compare a result file against a stored baseline
+
+Results are JSON files; the ones committed under benchmarks/baselines/ are the
+reference numbers performance changes are measured against.
+"""
@@ -0,0 +1,317 @@
+"""
+Synthetic universe generator.
+
+Seeds one universe with a realistic shape: power-law popularity for follows
+and retweets, reply chains, quotes and image-bearing tweaks. Rows go in
+through bulk INSERTs in batches, so a million tweaks takes minutes, not hours.
+
+    python -m benchmarks.generate --characters 1000 --tweaks 1000000
+    python -m benchmarks.generate --scale small        # presets: tiny, small, medium, large
+
+The universe belongs to --email (created with --password if missing), which
+is also what benchmarks.load logs in as.
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import func, insert, select, update
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models.tweaknow import CharacterFollow, Retweet, Trend, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+from app.models.user import User
+
+SCALES = {
+    #          characters, tweaks, follows/character, retweets/tweak
+    "tiny": (20, 500, 5, 0.3),
+    "small": (100, 10_000, 15, 0.3),
+    "medium": (500, 100_000, 40, 0.4),
+    "large": (1_000, 1_000_000, 80, 0.5),
+}
+
+DEFAULT_EMAIL = "bench@example.com"
+DEFAULT_PASSWORD = "benchmark"
+
+
+def zipf_weights(n: int, alpha: float, rng: random.Random) -> List[float]:
+    """Power-law weights for n items, shuffled so popularity is not tied to insertion order."""
+    weights = [1.0 / (rank + 1) ** alpha for rank in range(n)]
+    rng.shuffle(weights)
+    return weights
+
+
+def fake_image(rng: random.Random, size: int) -> str:
+    """A data URI of the same size as the base64 images the app uploads."""
+    return "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(size)).decode()
+
+
+def _batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _log(message: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+
+class UniverseGenerator:
+    def __init__(
+        self,
+        characters: int,
+        tweaks: int,
+        follows_per_character: int,
+        retweets_per_tweak: float,
+        reply_ratio: float = 0.3,
+        quote_ratio: float = 0.05,
+        image_ratio: float = 0.1,
+        image_bytes: int = 30_000,
+        alpha: float = 1.1,
+        batch_size: int = 5_000,
+        seed: int = 0,
+    ):
+        self.characters = characters
+        self.tweaks = tweaks
+        self.follows_per_character = follows_per_character
+        self.retweets_per_tweak = retweets_per_tweak
+        self.reply_ratio = reply_ratio
+        self.quote_ratio = quote_ratio
+        self.image_ratio = image_ratio
+        self.image_bytes = image_bytes
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        # A handful of distinct images, reused like real uploads would be
+        self._images = [fake_image(self.rng, image_bytes) for _ in range(8)] if image_ratio else []
+
+    # ===== ENTRY POINT =====
+    def run(self, db, user_id: int, name: Optional[str] = None) -> dict:
+        started = time.perf_counter()
+        universe_id = db.execute(
+            insert(Universe).returning(Universe.id),
+            [{"name": name or f"Benchmark {self.characters}x{self.tweaks}", "user_id": user_id,
+              "description": "Synthetic universe generated by benchmarks.generate"}],
+        ).scalar_one()
+
+        character_ids = self._insert_characters(db, universe_id)
+        popularity = zipf_weights(len(character_ids), self.alpha, self.rng)
+        follows = self._insert_follows(db, character_ids, popularity)
+        tweak_ids = self._insert_tweaks(db, universe_id, character_ids, popularity)
+        retweets = self._insert_retweets(db, character_ids, popularity, tweak_ids)
+        self._insert_trends(db, universe_id)
+        self._refresh_counters(db, universe_id)
+        db.commit()
+
+        summary = {
+            "universe_id": universe_id,
+            "characters": len(character_ids),
+            "tweaks": len(tweak_ids),
+            "follows": follows,
+            "retweets": retweets,
+            "seconds": round(time.perf_counter() - started, 1),
+        }
+        _log(f"done: {summary}")
+        return summary
+
+    # ===== CHARACTERS =====
+    def _insert_characters(self, db, universe_id: int) -> List[int]:
+        rows = [
+            {
+                "universe_id": universe_id,
+                "name": f"Character {i}",
+                "username": f"character_{i}",
+                "bio": f"Synthetic character number {i}.",
+                "profile_picture": self._images[i % len(self._images)] if self._images and i % 3 == 0 else None,
+                "display_followers_count": self.rng.randint(0, 100_000),
+                "display_following_count": self.rng.randint(0, 2_000),
+            }
+            for i in range(self.characters)
+        ]
+        ids = []
+        for batch in _batches(rows, self.batch_size):
+            ids.extend(db.execute(
+                insert(TweakNowCharacter).returning(TweakNowCharacter.id, sort_by_parameter_order=True), batch
+            ).scalars())
+        _log(f"characters: {len(ids)}")
+        return ids
+
+    # ===== FOLLOW GRAPH =====
+    def _insert_follows(self, db, character_ids: Sequence[int], popularity: Sequence[float]) -> int:
+        total = 0
+
+        def pairs():
+            for follower in character_ids:
+                # Out-degree varies per character; targets are drawn by popularity
+                degree = min(len(character_ids) - 1, int(self.rng.expovariate(1 / self.follows_per_character)))
+                targets = set(self.rng.choices(character_ids, weights=popularity, k=degree))
+                targets.discard(follower)
+                for following in targets:
+                    yield {"follower_id": follower, "following_id": following}
+
+        for batch in _batches(pairs(), self.batch_size):
+            db.execute(insert(CharacterFollow), batch)
+            total += len(batch)
+        _log(f"follows: {total}")
+        return total
+
+    # ===== TWEAKS =====
+    def _insert_tweaks(self, db, universe_id: int, character_ids, popularity) -> List[int]:
+        story_start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        ids: List[int] = []
+        inserted = 0
+        while inserted < self.tweaks:
+            count = min(self.batch_size, self.tweaks - inserted)
+            authors = self.rng.choices(character_ids, weights=popularity, k=count)
+            batch = []
+            for offset, author in enumerate(authors):
+                index = inserted + offset
+                row = {
+                    "universe_id": universe_id,
+                    "character_id": author,
+                    "content": f"Synthetic tweak {index} #topic{index % 50}",
+                    "custom_date": story_start + timedelta(minutes=index),
+                    "images": None,
+                    "reply_to_tweak_id": None,
+                    "quoted_tweak_id": None,
+                    "like_count": int(self.rng.paretovariate(1.2)) - 1,
+                    "view_count": int(self.rng.paretovariate(1.1) * 50),
+                }
+                # Earlier batches are already inserted, so they can be replied to or quoted.
+                # Replies favour recent tweaks, which produces chains.
+                if ids:
+                    roll = self.rng.random()
+                    if roll < self.reply_ratio:
+                        row["reply_to_tweak_id"] = ids[-1 - min(len(ids) - 1, int(self.rng.expovariate(1 / 20)))]
+                    elif roll < self.reply_ratio + self.quote_ratio:
+                        row["quoted_tweak_id"] = self.rng.choice(ids)
+                if self._images and self.rng.random() < self.image_ratio:
+                    row["images"] = self.rng.sample(self._images, self.rng.randint(1, 4))
+                batch.append(row)
+            ids.extend(db.execute(insert(Tweak).returning(Tweak.id, sort_by_parameter_order=True), batch).scalars())
+            inserted += count
+            _log(f"tweaks: {inserted}/{self.tweaks}")
+        return ids
+
+    # ===== RETWEETS =====
+    def _insert_retweets(self, db, character_ids, popularity, tweak_ids) -> int:
+        target = int(len(tweak_ids) * self.retweets_per_tweak)
+        tweak_weights = zipf_weights(len(tweak_ids), self.alpha, self.rng)
+        seen = set()
+        total = 0
+        while total < target:
+            count = min(self.batch_size, target - total)
+            batch = []
+            tweaks = self.rng.choices(tweak_ids, weights=tweak_weights, k=count)
+            retweeters = self.rng.choices(character_ids, weights=popularity, k=count)
+            for character_id, tweak_id in zip(retweeters, tweaks):
+                if (character_id, tweak_id) not in seen:
+                    seen.add((character_id, tweak_id))
+                    batch.append({"character_id": character_id, "tweak_id": tweak_id})
+            if not batch:
+                break
+            db.execute(insert(Retweet), batch)
+            total += len(batch)
+        _log(f"retweets: {total}")
+        return total
+
+    def _insert_trends(self, db, universe_id: int):
+        db.execute(insert(Trend), [
+            {"universe_id": universe_id, "name": f"#topic{i}", "tweet_count": self.rng.randint(1_000, 500_000)}
+            for i in range(20)
+        ])
+
+    def _refresh_counters(self, db, universe_id: int):
+        """Make comment/retweet/quote counts agree with the generated rows."""
+        in_universe = Tweak.universe_id == universe_id
+        db.execute(
+            update(Tweak).where(in_universe).values(retweet_count=0, comment_count=0, quote_count=0)
+            .execution_options(synchronize_session=False)
+        )
+        # One grouped pass per counter; reply/quote columns have no index, so
+        # correlated per-row subqueries would be quadratic
+        source = Tweak.__table__.alias("source")
+        grouped = {
+            "retweet_count": select(Retweet.tweak_id.label("id"), func.count().label("n"))
+            .join(Tweak, Tweak.id == Retweet.tweak_id).where(in_universe).group_by(Retweet.tweak_id),
+            "comment_count": select(source.c.reply_to_tweak_id.label("id"), func.count().label("n"))
+            .where(source.c.universe_id == universe_id, source.c.reply_to_tweak_id.isnot(None))
+            .group_by(source.c.reply_to_tweak_id),
+            "quote_count": select(source.c.quoted_tweak_id.label("id"), func.count().label("n"))
+            .where(source.c.universe_id == universe_id, source.c.quoted_tweak_id.isnot(None))
+            .group_by(source.c.quoted_tweak_id),
+        }
+        for column, counts in grouped.items():
+            counts = counts.subquery()
+            db.execute(
+                update(Tweak).where(Tweak.id == counts.c.id).values({column: counts.c.n})
+                .execution_options(synchronize_session=False)
+            )
+        _log("counters refreshed")
+
+
+def get_or_create_user(db, email: str, password: str) -> int:
+    user_id = db.execute(select(User.id).where(User.email == email)).scalar()
+    if user_id is None:
+        user_id = db.execute(
+            insert(User).returning(User.id),
+            [{"email": email, "username": email.split("@")[0], "hashed_password": get_password_hash(password)}],
+        ).scalar_one()
+    return user_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a synthetic universe for benchmarking.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--characters", type=int)
+    parser.add_argument("--tweaks", type=int)
+    parser.add_argument("--follows-per-character", type=int)
+    parser.add_argument("--retweets-per-tweak", type=float)
+    parser.add_argument("--reply-ratio", type=float, default=0.3)
+    parser.add_argument("--quote-ratio", type=float, default=0.05)
+    parser.add_argument("--image-ratio", type=float, default=0.1)
+    parser.add_argument("--image-bytes", type=int, default=30_000)
+    parser.add_argument("--alpha", type=float, default=1.1, help="power-law exponent for popularity")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--email", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--name")
+    args = parser.parse_args(argv)
+
+    characters, tweaks, follows, retweets = SCALES[args.scale]
+    generator = UniverseGenerator(
+        characters=args.characters or characters,
+        tweaks=args.tweaks or tweaks,
+        follows_per_character=args.follows_per_character or follows,
+        retweets_per_tweak=args.retweets_per_tweak if args.retweets_per_tweak is not None else retweets,
+        reply_ratio=args.reply_ratio,
+        quote_ratio=args.quote_ratio,
+        image_ratio=args.image_ratio,
+        image_bytes=args.image_bytes,
+        alpha=args.alpha,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+    db = SessionLocal()
+    try:
+        user_id = get_or_create_user(db, args.email, args.password)
+        summary = generator.run(db, user_id, name=args.name)
+    finally:
+        db.close()
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Asyncio HTTP load driver that replays the mobile app's screen-open patterns.
+
+Each virtual user logs in once, then repeatedly opens a screen picked from a
+weighted mix and fires the same requests the app fires for it, concurrently
+where the app uses Promise.all. Screen latency is the wall time until every
+request for the screen has completed.
+
+    python -m benchmarks.load --universe-id 3 --users 20 --duration 60 \\
+        --output results.json --baseline benchmarks/baselines/load-small.json
+
+The HTTP client is a minimal HTTP/1.1 keep-alive implementation on asyncio
+streams so the driver needs nothing beyond the standard library.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks import stats
+
+
+# ===== HTTP CLIENT =====
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection. Not safe for concurrent use."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, headers: Dict[str, str] = None, body: bytes = b"") -> Tuple[int, bytes]:
+        reused = self.writer is not None and not self.writer.is_closing()
+        try:
+            return await self._send(method, path, headers, body)
+        except (HTTPError, asyncio.IncompleteReadError, ConnectionError):
+            await self.close()
+            if not reused:
+                raise
+        # The server dropped an idle keep-alive connection; retry once on a fresh one
+        return await self._send(method, path, headers, body)
+
+    async def _send(self, method, path, headers, body) -> Tuple[int, bytes]:
+        if self.writer is None or self.writer.is_closing():
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in (headers or {}).items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+        return await self._read_response()
+
+    async def _read_response(self) -> Tuple[int, bytes]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+# ===== SCREENS =====
+# Each screen is a list of request groups; groups run in order, requests in a
+# group run concurrently (mirroring Promise.all in the screens).
+def screen_requests(screen: str, universe_id: int, character_id: int, other_id: int) -> List[List[str]]:
+    base = f"/tweaknow/universes/{universe_id}"
+    if screen == "home":
+        return [[f"{base}/characters", f"{base}/tweaks"]]
+    if screen == "profile":
+        return [
+            [f"{base}/characters", f"{base}/tweaks"],
+            [f"{base}/characters/{character_id}/is-following/{other_id}"],
+        ]
+    if screen == "detail":
+        return [[f"{base}/tweaks", f"{base}/characters"]]
+    if screen == "notifications":
+        return [[f"{base}/characters", f"{base}/tweaks"]]
+    raise ValueError(f"unknown screen {screen!r}")
+
+
+DEFAULT_MIX = {"home": 0.5, "detail": 0.2, "profile": 0.2, "notifications": 0.1}
+
+
+class LoadDriver:
+    def __init__(self, base_url: str, universe_id: int, users: int, duration: float, warmup: float,
+                 mix: Dict[str, float], parallel: int = 2, seed: int = 0, label: str = ""):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.universe_id = universe_id
+        self.users = users
+        self.duration = duration
+        self.warmup = warmup
+        self.mix = mix
+        self.parallel = parallel
+        self.rng = random.Random(seed)
+        self.label = label
+        self.screen_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.request_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.character_ids: List[int] = []
+
+    async def login(self, email: str, password: str) -> str:
+        connection = Connection(self.host, self.port)
+        body = urlencode({"username": email, "password": password}).encode()
+        status, payload = await connection.request(
+            "POST", "/auth/login", {"Content-Type": "application/x-www-form-urlencoded"}, body
+        )
+        await connection.close()
+        if status != 200:
+            raise HTTPError(f"login failed with {status}: {payload[:200]!r}")
+        return json.loads(payload)["access_token"]
+
+    async def load_characters(self, headers):
+        connection = Connection(self.host, self.port)
+        status, payload = await connection.request(
+            "GET", f"/tweaknow/universes/{self.universe_id}/characters", headers
+        )
+        await connection.close()
+        if status != 200:
+            raise HTTPError(f"could not list characters ({status})")
+        self.character_ids = [c["id"] for c in json.loads(payload)]
+        if len(self.character_ids) < 2:
+            raise HTTPError("the benchmark universe needs at least two characters")
+
+    async def _timed_get(self, connection: Connection, path: str, headers, record: bool):
+        route = "/".join("{id}" if part.isdigit() else part for part in path.split("?")[0].split("/"))
+        start = time.perf_counter()
+        try:
+            status, _ = await connection.request("GET", path, headers)
+        except (HTTPError, OSError, asyncio.IncompleteReadError):
+            status = 599
+        elapsed = time.perf_counter() - start
+        if record:
+            if status >= 400:
+                self.errors[route] += 1
+            else:
+                self.request_latencies[route].append(elapsed)
+        return status < 400
+
+    async def virtual_user(self, headers, deadline: float, record_after: float):
+        connections = [Connection(self.host, self.port) for _ in range(self.parallel)]
+        screens, weights = zip(*self.mix.items())
+        rng = random.Random(self.rng.random())
+        try:
+            while time.perf_counter() < deadline:
+                screen = rng.choices(screens, weights=weights)[0]
+                character_id, other_id = rng.sample(self.character_ids, 2)
+                record = time.perf_counter() >= record_after
+                start = time.perf_counter()
+                ok = True
+                for group in screen_requests(screen, self.universe_id, character_id, other_id):
+                    results = await asyncio.gather(*(
+                        self._timed_get(connections[i % len(connections)], path, headers, record)
+                        for i, path in enumerate(group)
+                    ))
+                    ok = ok and all(results)
+                if record:
+                    if ok:
+                        self.screen_latencies[screen].append(time.perf_counter() - start)
+                    else:
+                        self.errors[f"screen:{screen}"] += 1
+        finally:
+            for connection in connections:
+                await connection.close()
+
+    async def run(self, email: str, password: str) -> dict:
+        token = await self.login(email, password)
+        headers = {"Authorization": f"Bearer {token}"}
+        await self.load_characters(headers)
+
+        start = time.perf_counter()
+        record_after = start + self.warmup
+        deadline = record_after + self.duration
+        await asyncio.gather(*(self.virtual_user(headers, deadline, record_after) for _ in range(self.users)))
+        measured = time.perf_counter() - record_after
+
+        all_screens = [latency for values in self.screen_latencies.values() for latency in values]
+        return {
+            "config": {
+                "label": self.label,
+                "universe_id": self.universe_id,
+                "users": self.users,
+                "duration_s": self.duration,
+                "warmup_s": self.warmup,
+                "mix": self.mix,
+            },
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "overall": stats.summarize(all_screens, measured, sum(self.errors.values())),
+            "screens": {
+                name: stats.summarize(values, measured, self.errors.get(f"screen:{name}", 0))
+                for name, values in sorted(self.screen_latencies.items())
+            },
+            "requests": {
+                route: stats.summarize(values, measured, self.errors.get(route, 0))
+                for route, values in sorted(self.request_latencies.items())
+            },
+        }
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    from benchmarks.generate import DEFAULT_EMAIL, DEFAULT_PASSWORD
+
+    parser = argparse.ArgumentParser(description="Replay mobile screen-open traffic against the API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--universe-id", type=int, required=True)
+    parser.add_argument("--email", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before recording")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="screen weights, e.g. home=0.5,detail=0.2,profile=0.2,notifications=0.1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default="", help="free-form description of the dataset, stored in the result")
+    parser.add_argument("--output", help="write the result JSON here")
+    parser.add_argument("--baseline", help="compare against this stored result")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    driver = LoadDriver(args.base_url, args.universe_id, args.users, args.duration, args.warmup,
+                        args.mix, seed=args.seed, label=args.label)
+    result = asyncio.run(driver.run(args.email, args.password))
+
+    if args.output:
+        stats.save_result(result, args.output)
+    print(json.dumps(result["overall"]))
+    if args.baseline:
+        lines = stats.compare(result, stats.load_result(args.baseline), args.tolerance)
+        print("\n".join(lines))
+        if any(line.endswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
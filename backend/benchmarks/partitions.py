@@ -0,0 +1,104 @@
+"""
+Per-universe query latency, to check that it tracks the universe's own size
+and not the size of the whole database (app/core/partitioning.py).
+
+    python -m benchmarks.partitions --universe 2 --runs 200 --output before.json
+    python -m benchmarks.generate --tweaks 1000000     # grow everything else
+    python partition.py run
+    python -m benchmarks.partitions --universe 2 --runs 200 --output after.json
+    python -m benchmarks.stats after.json before.json
+
+Each "screen" is one crud call on its own session, straight against the
+database (no HTTP, no response cache): the home feed, the ranked feed, a
+profile tab, a single tweet, and a like/unlike pair on a random tweet.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from app.core import partitioning
+from app.core.database import SessionLocal, engine
+from app.crud import tweaknow as crud_tweaknow
+from app.models.tweaknow import Tweak, TweakNowCharacter
+from benchmarks import stats
+
+
+def _like_unlike(db, universe_id, character_id, tweak_id):
+    crud_tweaknow.like_tweak(db, character_id, tweak_id, universe_id)
+    crud_tweaknow.unlike_tweak(db, character_id, tweak_id, universe_id)
+
+
+SCREENS = {
+    "feed": lambda db, u, c, t: crud_tweaknow.get_feed_with_retweets(db, u),
+    "ranked_feed": lambda db, u, c, t: crud_tweaknow.get_ranked_feed(
+        db, crud_tweaknow.universe_tweaks(u), crud_tweaknow.universe_characters(u), c, home_universe_ids=[u]
+    ),
+    "profile": lambda db, u, c, t: crud_tweaknow.get_profile_tweaks(
+        db, crud_tweaknow.universe_tweaks(u), crud_tweaknow.universe_characters(u), c, "tweets"
+    ),
+    "tweet": lambda db, u, c, t: crud_tweaknow.get_tweak(db, t, u),
+    "like": _like_unlike,
+}
+
+
+def run(universe_id: int, runs: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    with SessionLocal() as db:
+        character_ids = list(db.scalars(select(TweakNowCharacter.id).where(TweakNowCharacter.universe_id == universe_id)))
+        tweak_ids = list(db.scalars(select(Tweak.id).where(Tweak.universe_id == universe_id)))
+        total = db.scalar(select(func.count()).select_from(Tweak))
+    if not character_ids or not tweak_ids:
+        raise SystemExit(f"universe {universe_id} has no characters or tweets")
+
+    try:
+        state = partitioning.status(engine)
+    except partitioning.PartitioningError:
+        state = {"state": "unpartitioned"}
+    result = {
+        "config": {
+            "universe": universe_id,
+            "runs": runs,
+            "universe_tweaks": len(tweak_ids),
+            "total_tweaks": total,
+            "partitioning": state["state"],
+            "partitions": state.get("partitions"),
+        },
+        "screens": {},
+    }
+    for name, screen in SCREENS.items():
+        # One unmeasured call: plans and caches warm up
+        with SessionLocal() as db:
+            screen(db, universe_id, character_ids[0], tweak_ids[0])
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(runs):
+            args = (universe_id, rng.choice(character_ids), rng.choice(tweak_ids))
+            with SessionLocal() as db:
+                began = time.perf_counter()
+                screen(db, *args)
+                latencies.append(time.perf_counter() - began)
+        result["screens"][name] = stats.summarize(latencies, time.perf_counter() - started)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-universe query latency.")
+    parser.add_argument("--universe", type=int, required=True)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    result = run(args.universe, args.runs, args.seed)
+    if args.output:
+        stats.save_result(result, args.output)
+    print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
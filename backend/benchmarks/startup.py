@@ -0,0 +1,117 @@
+"""
+Startup benchmark: import time of the app and time-to-first-request.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+
+Each run starts a fresh interpreter. "import" is the time to import main;
+"first_response" is from spawning the server until /health answers, and
+"first_api_request" is the latency of the first authenticated API call on
+the fresh worker (pool connections, validators and mappers are cold there
+unless warm-up already built them).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks import stats
+from benchmarks.generate import DEFAULT_EMAIL, DEFAULT_PASSWORD
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str, headers=None, data=None, timeout=5.0):
+    request = urllib.request.Request(url, headers=headers or {}, data=data)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def measure_first_request(email: str, password: str, timeout: float, use_supervisor: bool):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    if use_supervisor:
+        command = [sys.executable, "serve.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(port),
+                   "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--log-level", "warning"]
+
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited: {server.stderr.read().decode()[-2000:]}")
+            try:
+                _get(f"{base}/health", timeout=0.5)
+                break
+            except OSError:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("server did not answer in time")
+                time.sleep(0.01)
+        first_response = time.perf_counter() - started
+
+        body = f"username={email}&password={password}".encode()
+        _, payload = _get(f"{base}/auth/login", data=body,
+                          headers={"Content-Type": "application/x-www-form-urlencoded"})
+        token = json.loads(payload)["access_token"]
+        request_start = time.perf_counter()
+        _get(f"{base}/universes/", headers={"Authorization": f"Bearer {token}"})
+        first_api_request = time.perf_counter() - request_start
+        return first_response, first_api_request
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-request.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--email", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--supervisor", action="store_true", help="start through serve.py instead of plain uvicorn")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    imports, first_responses, first_requests = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import())
+        first_response, first_request = measure_first_request(
+            args.email, args.password, args.timeout, args.supervisor
+        )
+        first_responses.append(first_response)
+        first_requests.append(first_request)
+
+    result = {
+        "config": {"runs": args.runs, "supervisor": args.supervisor},
+        "import": stats.summarize(imports, sum(imports)),
+        "first_response": stats.summarize(first_responses, sum(first_responses)),
+        "first_api_request": stats.summarize(first_requests, sum(first_requests)),
+    }
+    if args.output:
+        stats.save_result(result, args.output)
+    print(json.dumps({name: result[name]["p50_ms"] for name in ("import", "first_response", "first_api_request")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Latency summaries and baseline comparison for benchmark results.
+
+    python -m benchmarks.stats results.json benchmarks/baselines/load-small.json
+"""
+import argparse
+import json
+import math
+import sys
+from typing import Dict, List, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of an unsorted sequence (pct in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Summarize latencies (seconds) measured over `elapsed` wall-clock seconds, in milliseconds."""
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+        "max_ms": round(1000 * max(latencies), 2) if latencies else 0.0,
+    }
+
+
+def load_result(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_result(result: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Compare the `screens` sections of two results. Returns one line per
+    screen and marks p95 regressions larger than `tolerance` with "REGRESSION".
+    """
+    lines = [f"{'screen':<16}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>16}"]
+    for name, now in sorted(current.get("screens", {}).items()):
+        before = baseline.get("screens", {}).get(name)
+        if before is None:
+            lines.append(f"{name:<16}{'(no baseline)':>18}")
+            continue
+
+        def cell(key):
+            return f"{before[key]:.1f} -> {now[key]:.1f}"
+
+        flag = ""
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            flag = "  REGRESSION"
+        lines.append(
+            f"{name:<16}{cell('p50_ms'):>18}{cell('p95_ms'):>18}{cell('p99_ms'):>18}"
+            f"{cell('throughput_rps'):>16}{flag}"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a benchmark result against a baseline.")
+    parser.add_argument("result")
+    parser.add_argument("baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95 slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    lines = compare(load_result(args.result), load_result(args.baseline), args.tolerance)
+    print("\n".join(lines))
+    return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
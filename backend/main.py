@@ -1,17 +1,49 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine, Base
+from app.core.cache import start_invalidation_listener, stop_invalidation_listener
+from app.core.config import settings
+from app.core.impressions import buffer as impression_buffer
+from app.core.database import engine
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.jobs import start_threads as start_job_threads, stop_threads as stop_job_threads
+from app.core.workers import shutdown_pool
+from app.core.replication import ReadYourWritesMiddleware
+from app.core.startup import check_schema_revision, warm_up
 from app.api.auth import router as auth_router
 from app.api.universes import router as universes_router
 from app.api.tweaknow import router as tweaknow_router
+from app.api.metrics import router as metrics_router
+from app.api.admin import router as admin_router
+from app.api.media import router as media_router
+from app.api.jobs import router as jobs_router
+from app.crud.universe import UniverseWarming
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are managed by Alembic; workers only verify the revision
+    check_schema_revision(engine)
+    warm_up(app, engine)
+    # Hear cache invalidations committed by other workers
+    start_invalidation_listener(engine)
+    impression_buffer.start()
+    # Background jobs, unless worker.py processes run them (JOB_THREADS=0)
+    start_job_threads()
+    yield
+    stop_job_threads()
+    # Flush buffered view counts before the worker exits
+    impression_buffer.stop()
+    stop_invalidation_listener()
+    shutdown_pool()
 
 app = FastAPI(
     title="AllSocIt API",
     description="Digital Storyteller's Toolkit API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware (allows React Native to connect)
@@ -21,12 +53,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Write-LSN", "Retry-After"],
 )
 
+# Routes reads to replicas without losing a caller's own recent writes
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Sampling profiles for admin requests sent with X-Profile: 1 (see app/core/profiling.py)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency, response size and SQL counts (see app/core/metrics.py)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# An archived universe answers while its restore job runs (see app/crud/archive.py)
+@app.exception_handler(UniverseWarming)
+async def universe_warming(request: Request, exc: UniverseWarming):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "status": "warming", "job_id": exc.job_id},
+        headers={"Retry-After": str(settings.ARCHIVE_RETRY_AFTER_SECONDS)},
+    )
+
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(universes_router, prefix="/universes", tags=["Universes"])
 app.include_router(tweaknow_router, prefix="/tweaknow", tags=["TweakNow"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
+app.include_router(media_router, prefix="/media", tags=["Media"])
+app.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["Metrics"])
 
 @app.get("/")
 def root():
@@ -0,0 +1,57 @@
+"""
+Hash-partition `tweaks` by universe online (app/core/partitioning.py).
+
+    python partition.py status
+    python partition.py run --partitions 16 --batch-size 5000
+
+`run` is start, backfill and swap; each is also a command of its own, and
+backfill can be interrupted and run again (--after-id skips ids already
+copied). The API keeps serving throughout; swap holds its locks for
+a row count and a few renames. Afterwards, `drop-old` removes the
+unpartitioned copy.
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.core import partitioning
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partition the tweaks table by universe.")
+    parser.add_argument("command", choices=["status", "start", "backfill", "swap", "run", "drop-old"])
+    parser.add_argument("--partitions", type=int, default=partitioning.DEFAULT_PARTITIONS)
+    parser.add_argument("--batch-size", type=int, default=partitioning.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--after-id", type=int, default=0, help="backfill: resume after this tweak id")
+    args = parser.parse_args(argv)
+
+    from app.core.database import engine
+
+    def progress(last_id: int, max_id: int, copied: int):
+        print(f"copied up to id {last_id} of {max_id} (+{copied})", flush=True)
+
+    try:
+        if args.command == "status":
+            print(json.dumps(partitioning.status(engine), indent=2))
+        if args.command in ("start", "run"):
+            partitioning.start(engine, args.partitions)
+            print(f"created {partitioning.SHADOW} with {args.partitions} partitions")
+        if args.command in ("backfill", "run"):
+            started = time.monotonic()
+            copied = partitioning.backfill(engine, args.batch_size, args.after_id, on_batch=progress)
+            print(f"backfilled {copied} rows in {time.monotonic() - started:.1f}s")
+        if args.command in ("swap", "run"):
+            partitioning.swap(engine)
+            print(f"{partitioning.TABLE} is partitioned; the old table is {partitioning.OLD}")
+        if args.command == "drop-old":
+            partitioning.drop_old(engine)
+            print(f"dropped {partitioning.OLD}")
+    except partitioning.PartitioningError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
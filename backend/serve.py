@@ -0,0 +1,215 @@
+"""
+Production entry point: a prefork supervisor around uvicorn workers.
+
+    python serve.py --workers 4 --port 8000 --migrate
+
+The supervisor binds the listening socket once and hands it to every worker.
+It restarts workers that die, rolls every worker on SIGHUP (graceful reload:
+a replacement is started before the old worker is asked to finish its
+in-flight requests), and recycles workers whose resident memory grows past
+--max-rss-mb. SIGTERM/SIGINT shut everything down gracefully.
+
+Schema changes are applied here, once, with --migrate; workers themselves
+only verify the schema revision at startup (see app/core/startup.py).
+
+With no database server:
+
+    DATABASE_URL=sqlite:///allsocit.db python serve.py --migrate
+
+runs a single worker against a local SQLite file.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+logger = logging.getLogger("allsocit.serve")
+
+
+def worker_main(config: uvicorn.Config, sockets):
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, from /proc on Linux and `ps` elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True, check=True)
+        return int(output.stdout.strip()) * 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+class Worker:
+    def __init__(self, process: multiprocessing.Process):
+        self.process = process
+        self.started_at = time.monotonic()
+        self.retiring_since: Optional[float] = None
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+class Supervisor:
+    def __init__(self, config: uvicorn.Config, workers: int, max_rss_mb: Optional[int],
+                 check_interval: float, graceful_timeout: float):
+        self.config = config
+        self.target_workers = workers
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.check_interval = check_interval
+        self.graceful_timeout = graceful_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.sockets = [config.bind_socket()]
+        self.workers: Dict[int, Worker] = {}
+        self.retiring: List[Worker] = []
+        self.reload_queue: List[int] = []
+        self.should_exit = False
+
+    # ===== PROCESS MANAGEMENT =====
+    def spawn(self) -> Worker:
+        process = self.context.Process(target=worker_main, kwargs={"config": self.config, "sockets": self.sockets})
+        process.start()
+        worker = Worker(process)
+        self.workers[worker.pid] = worker
+        logger.info("started worker %s", worker.pid)
+        return worker
+
+    def retire(self, worker: Worker, reason: str):
+        """Replace a worker: start its successor first, then let it drain."""
+        self.workers.pop(worker.pid, None)
+        if not self.should_exit:
+            self.spawn()
+        logger.info("retiring worker %s (%s)", worker.pid, reason)
+        worker.retiring_since = time.monotonic()
+        self.retiring.append(worker)
+        self._signal(worker, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(worker: Worker, signum: int):
+        try:
+            os.kill(worker.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    # ===== SIGNALS =====
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._handle_reload)
+
+    def _handle_exit(self, signum, frame):
+        self.should_exit = True
+
+    def _handle_reload(self, signum, frame):
+        logger.info("reload requested, rolling %d workers", len(self.workers))
+        self.reload_queue = list(self.workers)
+
+    # ===== MAIN LOOP =====
+    def run(self):
+        self.install_signal_handlers()
+        for _ in range(self.target_workers):
+            self.spawn()
+        try:
+            while not self.should_exit:
+                time.sleep(self.check_interval)
+                self.tick()
+        finally:
+            self.shutdown()
+
+    def tick(self):
+        # Respawn workers that died on their own
+        for pid, worker in list(self.workers.items()):
+            if not worker.process.is_alive():
+                logger.warning("worker %s exited with %s, restarting", pid, worker.process.exitcode)
+                self.workers.pop(pid)
+                self.spawn()
+
+        # Rolling reload: one worker at a time, so capacity never drops
+        if self.reload_queue and not self.retiring:
+            pid = self.reload_queue.pop(0)
+            if pid in self.workers:
+                self.retire(self.workers[pid], "reload")
+
+        # Memory recycling
+        if self.max_rss:
+            for worker in list(self.workers.values()):
+                rss = rss_bytes(worker.pid)
+                if rss is not None and rss > self.max_rss:
+                    self.retire(worker, f"rss {rss // (1024 * 1024)} MB over limit")
+
+        # Reap retiring workers; force-kill those that overstay the graceful timeout
+        for worker in list(self.retiring):
+            if not worker.process.is_alive():
+                worker.process.join()
+                self.retiring.remove(worker)
+            elif time.monotonic() - worker.retiring_since > self.graceful_timeout:
+                logger.warning("worker %s did not stop in time, killing", worker.pid)
+                self._signal(worker, signal.SIGKILL)
+
+    def shutdown(self):
+        everyone = list(self.workers.values()) + self.retiring
+        for worker in everyone:
+            self._signal(worker, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        for worker in everyone:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                self._signal(worker, signal.SIGKILL)
+                worker.process.join()
+        for sock in self.sockets:
+            sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with a prefork worker supervisor.")
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--max-rss-mb", type=int, default=None, help="recycle workers above this resident size")
+    parser.add_argument("--check-interval", type=float, default=1.0, help="supervisor poll interval in seconds")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--migrate", action="store_true", help="run `alembic upgrade head` before starting workers")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [supervisor] %(message)s")
+
+    from app.core.config import settings
+    if settings.DATABASE_URL.startswith("sqlite") and args.workers > 1:
+        # Locks that keep two exports apart are per-process on SQLite (app/core/dialect.py)
+        logger.warning("SQLite allows one writer: starting 1 worker instead of %d", args.workers)
+        args.workers = 1
+
+    if args.migrate:
+        from app.core.startup import run_migrations
+        run_migrations()
+
+    config = uvicorn.Config(
+        args.app,
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    Supervisor(config, args.workers, args.max_rss_mb, args.check_interval, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Shared fixtures for the API test suite.
+
+The suite talks to a real database: a fresh SQLite file by default, or the
+database TEST_DATABASE_URL points at (every table in it is dropped and
+recreated), e.g. a scratch PostgreSQL database for the PostgreSQL-only tests.
+"""
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='allsocit-db-')}/test.db"
+TEST_DATABASE_URL = os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+POSTGRES = TEST_DATABASE_URL.startswith("postgresql")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Tables are created with create_all below, not through Alembic
+os.environ.setdefault("SCHEMA_CHECK", "off")
+# Tests flush impressions explicitly
+os.environ.setdefault("IMPRESSION_FLUSH_SECONDS", "3600")
+# Tests run background jobs explicitly (app.core.jobs.run_pending)
+os.environ.setdefault("JOB_THREADS", "0")
+# Uploads, rendered cards and archives go to scratch directories
+os.environ.setdefault("MEDIA_DIR", tempfile.mkdtemp(prefix="allsocit-media-"))
+os.environ.setdefault("RENDER_CACHE_DIR", tempfile.mkdtemp(prefix="allsocit-cards-"))
+os.environ.setdefault("EXPORT_DIR", tempfile.mkdtemp(prefix="allsocit-exports-"))
+os.environ.setdefault("ARCHIVE_DIR", tempfile.mkdtemp(prefix="allsocit-archive-"))
+
+TEST_PASSWORD = "correct horse battery staple"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.core.database import Base, engine
+    import app.models  # noqa: F401  (register every table)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    from main import app as fastapi_app
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(app):
+    from app.core.database import SessionLocal, engine
+
+    # A SQLite transaction reads from one snapshot; tests expect every query
+    # to see what the API committed in between, as on PostgreSQL
+    bind = engine.execution_options(isolation_level="AUTOCOMMIT") if engine.dialect.name == "sqlite" else engine
+    session = SessionLocal(bind=bind)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def user(app):
+    from app.core.database import SessionLocal
+    from app.crud import user as crud_user
+    from app.schemas.user import UserCreate
+
+    session = SessionLocal()
+    try:
+        created = crud_user.create_user(
+            session, UserCreate(email="writer@example.com", username="writer", password=TEST_PASSWORD)
+        )
+        return {"id": created.id, "email": created.email}
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client, user):
+    response = client.post("/auth/login", data={"username": user["email"], "password": TEST_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def count_queries(app):
+    """
+    Count SQL statements executed on the engine inside a `with` block:
+
+        with count_queries() as queries:
+            client.get(...)
+        assert queries.count <= 4
+    """
+    from app.core.database import engine
+    from app.core.metrics import QueryStats
+
+    @contextmanager
+    def _count():
+        stats = QueryStats(record_statements=True)
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            stats.add(statement, 0.0)
+
+        event.listen(engine, "after_cursor_execute", on_execute)
+        try:
+            yield stats
+        finally:
+            event.remove(engine, "after_cursor_execute", on_execute)
+
+    return _count
+
+
+def seed_universe(session, user_id: int, characters: int, tweaks: int, seed: int = 0):
+    """
+    Insert a universe with `characters` characters and `tweaks` tweaks, plus
+    replies, quotes, retweets, follows and trends proportional to its size.
+    Returns a dict of ids handy for building request paths.
+    """
+    from app.models.tweaknow import (
+        CharacterFollow, Retweet, Trend, Tweak, TweakNowCharacter,
+    )
+    from app.models.universe import Universe
+
+    rng = random.Random(seed)
+    universe = Universe(name=f"Seeded {characters}x{tweaks}", user_id=user_id)
+    session.add(universe)
+    session.flush()
+
+    cast = [
+        TweakNowCharacter(universe_id=universe.id, name=f"Character {i}", username=f"char{i}")
+        for i in range(characters)
+    ]
+    session.add_all(cast)
+    session.flush()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(tweaks):
+        post = Tweak(
+            universe_id=universe.id,
+            character_id=rng.choice(cast).id,
+            content=f"Tweak {i}",
+            custom_date=start + timedelta(minutes=i),
+            images=["data:image/png;base64,AAAA"] if i % 7 == 0 else None,
+        )
+        if posts and i % 5 == 0:
+            post.reply_to_tweak_id = rng.choice(posts).id
+        elif posts and i % 4 == 0:
+            post.quoted_tweak_id = rng.choice(posts).id
+        session.add(post)
+        session.flush()
+        posts.append(post)
+
+    retweet_pairs = {(rng.choice(cast).id, rng.choice(posts).id) for _ in range(tweaks // 2)}
+    session.add_all(Retweet(character_id=c, tweak_id=t) for c, t in retweet_pairs)
+
+    follow_pairs = {(a.id, b.id) for a in cast for b in rng.sample(cast, min(3, characters)) if a.id != b.id}
+    session.add_all(CharacterFollow(follower_id=a, following_id=b) for a, b in follow_pairs)
+
+    session.add_all(
+        Trend(universe_id=universe.id, name=f"#trend{i}", tweet_count=i * 10)
+        for i in range(max(1, characters // 2))
+    )
+    session.commit()
+
+    return {
+        "universe_id": universe.id,
+        "character_ids": [c.id for c in cast],
+        "tweak_ids": [p.id for p in posts],
+    }
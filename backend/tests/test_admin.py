@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def as_admin(monkeypatch, tmp_path, user):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", user["email"])
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL", 0.001)
+
+
+def test_admin_routes_reject_regular_users(client, auth_headers):
+    assert client.get("/admin/memory", headers=auth_headers).status_code == 403
+    assert client.get("/admin/profiles", headers=auth_headers).status_code == 403
+
+
+def test_profile_header_is_ignored_for_regular_users(client, auth_headers):
+    response = client.get("/auth/me", headers={**auth_headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_admin_request_profile_is_saved(client, auth_headers, as_admin):
+    response = client.get("/universes/?__profile=1", headers=auth_headers)
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    assert profile_id in client.get("/admin/profiles", headers=auth_headers).json()["profiles"]
+    folded = client.get(f"/admin/profiles/{profile_id}", headers=auth_headers)
+    assert folded.status_code == 200
+    assert folded.text.startswith("# GET /universes/ -> 200")
+
+
+def test_memory_snapshots_can_be_diffed(client, auth_headers, as_admin):
+    assert client.post("/admin/memory/start", headers=auth_headers).json()["tracing"] is True
+    try:
+        first = client.post("/admin/memory/snapshots", headers=auth_headers).json()["id"]
+        ballast = [bytearray(1024) for _ in range(1000)]  # noqa: F841
+        second = client.post("/admin/memory/snapshots", headers=auth_headers).json()["id"]
+
+        top = client.get(f"/admin/memory/snapshots/{second}?limit=5", headers=auth_headers)
+        assert top.status_code == 200 and len(top.json()["top"]) <= 5
+
+        diff = client.get(f"/admin/memory/snapshots/{second}/diff/{first}", headers=auth_headers).json()["diff"]
+        assert any("test_admin.py" in entry["location"][0] and entry["size_diff"] > 0 for entry in diff)
+    finally:
+        client.post("/admin/memory/stop", headers=auth_headers)
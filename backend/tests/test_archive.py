@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core import archive, jobs
+from app.crud import archive as crud_archive
+from app.models.tweaknow import Like, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+from tests.conftest import seed_universe
+
+AVATAR = "data:image/png;base64,iVBORw0KGgo="
+
+
+def _cold_universe(db, user, seed):
+    """A seeded universe last opened long ago, followed by another one (SQLite keeps the newest ids)"""
+    seeded = seed_universe(db, user["id"], characters=4, tweaks=30, seed=seed)
+    characters = db.scalars(select(TweakNowCharacter).where(
+        TweakNowCharacter.universe_id == seeded["universe_id"]
+    )).all()
+    for character in characters:
+        character.profile_picture = AVATAR
+    db.add(Like(character_id=seeded["character_ids"][0], tweak_id=seeded["tweak_ids"][3]))
+    db.query(Universe).filter(Universe.id == seeded["universe_id"]).update(
+        {Universe.last_accessed_at: datetime.now(timezone.utc) - timedelta(days=200)}
+    )
+    db.commit()
+    neighbour = seeded["neighbour"] = seed_universe(db, user["id"], characters=2, tweaks=5, seed=seed + 100)
+    db.add(Like(character_id=neighbour["character_ids"][0], tweak_id=neighbour["tweak_ids"][0]))
+    db.commit()
+    return seeded
+
+
+def _snapshot(db, universe_id):
+    return {
+        model.__tablename__: [dict(row._mapping) for row in db.execute(
+            crud_archive._archive_query(model, universe_id).order_by(model.id)
+        )]
+        for model in crud_archive.ARCHIVED_MODELS
+    }
+
+
+def _storage(db, universe_id):
+    db.expire_all()
+    return db.get(Universe, universe_id).storage
+
+
+def test_archive_and_restore_keep_every_row(client, auth_headers, db, user):
+    seeded = _cold_universe(db, user, seed=41)
+    uid = seeded["universe_id"]
+    before = _snapshot(db, uid)
+
+    assert crud_archive.enqueue_cold(db, older_than_days=90) == 1
+    jobs.run_pending()
+    assert _storage(db, uid) == "archived"
+    assert archive.archive_path(uid).is_file()
+    assert db.scalar(select(Tweak.id).where(Tweak.universe_id == uid)) is None
+    # The neighbour is untouched
+    assert db.scalar(select(Tweak.id).where(Tweak.universe_id == seeded["neighbour"]["universe_id"])) is not None
+
+    # Listing and reading the universe row still work; opening it starts the restore
+    assert client.get(f"/universes/{uid}", headers=auth_headers).json()["storage"] == "warming"
+    response = client.get(f"/tweaknow/universes/{uid}/tweaks", headers=auth_headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    body = response.json()
+    assert body["status"] == "warming" and body["job_id"]
+
+    jobs.run_pending()
+    assert _storage(db, uid) == "live"
+    assert _snapshot(db, uid) == before
+    assert not archive.archive_path(uid).exists()
+    assert client.get(f"/tweaknow/universes/{uid}/tweaks", headers=auth_headers).status_code == 200
+
+
+def test_images_are_stored_once(db, user):
+    seeded = _cold_universe(db, user, seed=42)
+    result = crud_archive.archive_universe(db, seeded["universe_id"], older_than_days=90)
+    assert result["archived"]
+    # Every avatar and attached image is one of two pictures
+    assert result["media_stored"] + result["media_shared"] > 2
+    assert result["media_stored"] <= 2
+    rows = list(archive.read_rows(seeded["universe_id"]))
+    assert {row["profile_picture"] for table, row in rows if table == "tweaknow_characters"} == {AVATAR}
+
+
+def test_universe_referenced_elsewhere_stays_live(db, user):
+    seeded = _cold_universe(db, user, seed=43)
+    neighbour = seeded["neighbour"]
+    db.add(Tweak(universe_id=neighbour["universe_id"], character_id=neighbour["character_ids"][0],
+                 content="Quoting across", quoted_tweak_id=seeded["tweak_ids"][0]))
+    db.commit()
+    seed_universe(db, user["id"], characters=2, tweaks=2, seed=143)
+
+    result = crud_archive.archive_universe(db, seeded["universe_id"], older_than_days=90)
+    assert "another universe" in result["skipped"]
+    assert _storage(db, seeded["universe_id"]) == "live"
+    assert not archive.archive_path(seeded["universe_id"]).exists()
+
+
+def test_recently_opened_universe_is_not_archived(client, auth_headers, db, user):
+    seeded = _cold_universe(db, user, seed=44)
+    uid = seeded["universe_id"]
+    assert client.get(f"/tweaknow/universes/{uid}/tweaks", headers=auth_headers).status_code == 200
+    assert crud_archive.archive_universe(db, uid, older_than_days=90)["skipped"]
+    assert _storage(db, uid) == "live"
+
+
+def test_deleting_an_archived_universe_removes_its_archive(client, auth_headers, db, user):
+    seeded = _cold_universe(db, user, seed=45)
+    uid = seeded["universe_id"]
+    crud_archive.archive_universe(db, uid, older_than_days=90)
+    assert archive.archive_path(uid).is_file()
+
+    assert client.delete(f"/universes/{uid}", headers=auth_headers).status_code == 202
+    jobs.run_pending()
+    assert not archive.archive_path(uid).exists()
+    assert db.get(Universe, uid) is None
@@ -0,0 +1,132 @@
+import statistics
+import time
+
+from app.core import autocomplete
+from app.core.autocomplete import PrefixIndex
+from app.core.jobs import run_pending
+from app.models.tweaknow import Tweak, TweakNowCharacter
+from tests.conftest import seed_universe
+
+
+def _suggest(client, auth_headers, universe_id, q, **params):
+    response = client.get(f"/tweaknow/universes/{universe_id}/autocomplete", headers=auth_headers,
+                          params=dict(params, q=q))
+    assert response.status_code == 200, response.text
+    return [suggestion["value"] for suggestion in response.json()]
+
+
+def test_ranks_characters_and_hashtags(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=0, tweaks=0)
+    universe_id = ids["universe_id"]
+    quiet = TweakNowCharacter(universe_id=universe_id, name="Joan Quiet", username="joanq", display_followers_count=10)
+    famous = TweakNowCharacter(universe_id=universe_id, name="Jo Famous", username="thejo",
+                               display_followers_count=2_000_000, official_mark="Blue")
+    other = TweakNowCharacter(universe_id=universe_id, name="Max", username="maxwell", display_followers_count=50)
+    db.add_all([quiet, famous, other])
+    db.flush()
+    db.add_all([
+        Tweak(universe_id=universe_id, character_id=quiet.id, content=f"#JoinUs and #java {n}") for n in range(3)
+    ] + [Tweak(universe_id=universe_id, character_id=other.id, content="#jokes C#sharp no#tag")])
+    db.commit()
+
+    # Usernames, names and words of names; most followed first
+    assert _suggest(client, auth_headers, universe_id, "@jo") == ["@thejo", "@joanq"]
+    assert _suggest(client, auth_headers, universe_id, "@FAM") == ["@thejo"]
+    assert _suggest(client, auth_headers, universe_id, "@max") == ["@maxwell"]
+    # Most used first, ties alphabetically; only whole hashtags count
+    assert _suggest(client, auth_headers, universe_id, "#j") == ["#java", "#JoinUs", "#jokes"]
+    assert _suggest(client, auth_headers, universe_id, "#s") == []
+    assert _suggest(client, auth_headers, universe_id, "#j", limit=1) == ["#java"]
+    assert set(_suggest(client, auth_headers, universe_id, "jo")) == {"@thejo", "@joanq", "#JoinUs", "#jokes"}
+
+    first, = client.get(f"/tweaknow/universes/{universe_id}/autocomplete", headers=auth_headers,
+                        params={"q": "@thej"}).json()
+    assert first == {"kind": "character", "value": "@thejo", "character_id": famous.id, "name": "Jo Famous",
+                     "username": "thejo", "official_mark": "Blue"}
+    assert client.get("/tweaknow/universes/999999/autocomplete", headers=auth_headers,
+                      params={"q": "@a"}).status_code == 404
+
+
+def test_follows_writes_without_rebuilding(client, auth_headers, user, db, count_queries):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=10, seed=4)
+    universe_id, author = ids["universe_id"], ids["character_ids"][0]
+    base = f"/tweaknow/universes/{universe_id}"
+    assert _suggest(client, auth_headers, universe_id, "#") == []
+    index = autocomplete.cached_index(universe_id)
+
+    tweak = client.post(f"{base}/tweaks", headers=auth_headers, json={
+        "universe_id": universe_id, "character_id": author, "content": "Launch day #rocket #RocketLab",
+    }).json()
+    assert _suggest(client, auth_headers, universe_id, "#ROCK") == ["#rocket", "#RocketLab"]
+    client.put(f"{base}/tweaks/{tweak['id']}", headers=auth_headers, json={"content": "Scrubbed #weather"})
+    assert _suggest(client, auth_headers, universe_id, "#") == ["#weather"]
+
+    created = client.post(f"{base}/characters", headers=auth_headers, json={
+        "universe_id": universe_id, "name": "Zed Newcomer", "username": "zed",
+    }).json()
+    assert _suggest(client, auth_headers, universe_id, "@new") == ["@zed"]
+    client.put(f"{base}/characters/{created['id']}", headers=auth_headers, json={"username": "zedd"})
+    assert _suggest(client, auth_headers, universe_id, "@ze") == ["@zedd"]
+
+    # Real followers count towards a character's rank
+    zed = index.characters[created["id"]]
+    assert client.post(f"{base}/characters/{author}/follow/{created['id']}", headers=auth_headers).status_code == 201
+    assert zed.followers == 1
+    client.delete(f"{base}/characters/{author}/unfollow/{created['id']}", headers=auth_headers)
+    assert zed.followers == 0
+
+    client.delete(f"{base}/tweaks/{tweak['id']}", headers=auth_headers)
+    client.delete(f"{base}/characters/{created['id']}", headers=auth_headers)
+    assert _suggest(client, auth_headers, universe_id, "#") == []
+    assert _suggest(client, auth_headers, universe_id, "@ze") == []
+
+    # All of it applied in place: same index, and keystrokes only authenticate
+    assert autocomplete.cached_index(universe_id) is index
+    with count_queries() as queries:
+        _suggest(client, auth_headers, universe_id, "@c")
+    assert queries.count == 1, queries.statements
+
+
+def test_discarded_with_the_universe(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=4, seed=6)
+    universe_id = ids["universe_id"]
+    branch = client.post(f"/universes/{universe_id}/branches", headers=auth_headers, json={"name": "Alt"}).json()
+    assert set(_suggest(client, auth_headers, branch["id"], "@char")) == {"@char0", "@char1"}
+    _suggest(client, auth_headers, universe_id, "@char")
+
+    # A branch index is rebuilt, in the background, once the branch changes
+    client.post(f"/tweaknow/universes/{branch['id']}/characters", headers=auth_headers,
+                json={"universe_id": branch["id"], "name": "Alt", "username": "charalt"})
+    for _ in range(100):
+        if "@charalt" in _suggest(client, auth_headers, branch["id"], "@char"):
+            break
+        time.sleep(0.02)
+    assert set(_suggest(client, auth_headers, branch["id"], "@char")) == {"@char0", "@char1", "@charalt"}
+
+    assert client.delete(f"/universes/{universe_id}", headers=auth_headers).status_code == 202
+    assert run_pending() == 1
+    assert autocomplete.cached_index(universe_id) is None
+    assert autocomplete.cached_index(branch["id"]) is None
+    assert client.get(f"/tweaknow/universes/{universe_id}/autocomplete", headers=auth_headers,
+                      params={"q": "@c"}).status_code == 404
+
+
+def test_prefix_queries_stay_fast_on_a_large_index():
+    index = PrefixIndex()
+    scores = {n: (n * 7919) % 100_003 for n in range(200_000)}
+    index.load([(f"user{n:06d}", n) for n in scores] + [(f"name{n % 5000}", n) for n in scores])
+    assert len(index) == 400_000
+    assert index.search("user00012", scores.get, 5) == sorted(range(120, 130), key=scores.get, reverse=True)[:5]
+
+    timings = []
+    for prefix in ["u", "us", "user1", "user01234", "n", "name4", "nobody"] * 20:
+        started = time.perf_counter()
+        index.search(prefix, scores.get, 8)
+        timings.append(time.perf_counter() - started)
+    # Short prefixes cover the whole index once, then come from their kept results
+    assert statistics.median(timings) < 0.005
+
+    index.add("user000120x", 42)
+    assert 42 in index.search("user00012", scores.get, 20)
+    index.remove("user000120x", 42)
+    assert 42 not in index.search("user00012", scores.get, 20)
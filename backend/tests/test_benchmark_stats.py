@@ -0,0 +1,25 @@
+from benchmarks import stats
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [4, 1, 3, 2]
+    assert stats.percentile(values, 0) == 1
+    assert stats.percentile(values, 50) == 2.5
+    assert stats.percentile(values, 100) == 4
+    assert stats.percentile([], 95) == 0.0
+
+
+def test_summarize_reports_milliseconds_and_throughput():
+    summary = stats.summarize([0.010, 0.020, 0.030], elapsed=1.5, errors=1)
+    assert summary["count"] == 3
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == 20.0
+
+
+def test_compare_flags_p95_regressions():
+    baseline = {"screens": {"home": stats.summarize([0.1] * 10, 1.0)}}
+    current = {"screens": {"home": stats.summarize([0.2] * 10, 1.0), "profile": stats.summarize([0.1], 1.0)}}
+    lines = stats.compare(current, baseline, tolerance=0.1)
+    assert lines[1].startswith("home") and lines[1].endswith("REGRESSION")
+    assert "(no baseline)" in lines[2]
@@ -0,0 +1,121 @@
+from app.core.config import settings
+from app.models.tweaknow import Like, TweakTemplate
+from tests.conftest import seed_universe
+
+
+def _bootstrap(client, auth_headers, universe_id, screen, **params):
+    return client.get(f"/universes/{universe_id}/bootstrap", headers=auth_headers, params=dict(params, screen=screen))
+
+
+def test_home_has_what_the_single_routes_return(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=6, tweaks=40, seed=3)
+    universe_id, first = ids["universe_id"], min(ids["character_ids"])
+    db.add_all(Like(character_id=first, tweak_id=tweak_id) for tweak_id in ids["tweak_ids"][::9])
+    db.commit()
+    base = f"/tweaknow/universes/{universe_id}"
+
+    home = _bootstrap(client, auth_headers, universe_id, "home")
+    assert home.status_code == 200, home.text
+    body = home.json()
+    assert body["screen"] == "home"
+    assert body["characters"] == client.get(f"{base}/characters", headers=auth_headers).json()
+    assert body["feed"] == client.get(f"{base}/tweaks", headers=auth_headers).json()
+
+    # Without a character, the viewer is the first one; only flagged tweets are listed
+    single = client.post(f"{base}/viewer-state", headers=auth_headers,
+                         json={"character_id": first, "tweak_ids": ids["tweak_ids"]}).json()
+    flagged = [t for t in single["tweaks"] if t["liked"] or t["retweeted"]]
+    assert body["viewer_state"] == {"character_id": first, "tweaks": sorted(flagged, key=lambda t: t["tweak_id"])}
+    assert sum(t["liked"] for t in flagged) == len(ids["tweak_ids"][::9])
+
+    ranked = _bootstrap(client, auth_headers, universe_id, "home", mode="for_you", character_id=first, limit=10).json()
+    assert ranked["feed"] == client.get(f"{base}/tweaks", headers=auth_headers,
+                                        params={"mode": "for_you", "character_id": first, "limit": 10}).json()
+    assert set(ranked) == {"screen", "characters", "feed", "viewer_state"}
+
+
+def test_profile_detail_and_composer(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=30, seed=5)
+    universe_id, character_id = ids["universe_id"], ids["character_ids"][1]
+    tweak_id = ids["tweak_ids"][0]
+    db.add(TweakTemplate(user_id=user["id"], name="Viral", like_count=90000))
+    db.commit()
+    base = f"/tweaknow/universes/{universe_id}"
+
+    profile = _bootstrap(client, auth_headers, universe_id, "profile",
+                         character_id=character_id, viewer_id=ids["character_ids"][0]).json()
+    assert profile["profile"] == client.get(f"{base}/characters/{character_id}/profile", headers=auth_headers,
+                                            params={"viewer_id": ids["character_ids"][0]}).json()
+    assert profile["tweaks"] == client.get(f"{base}/characters/{character_id}/tweaks", headers=auth_headers).json()
+
+    detail = _bootstrap(client, auth_headers, universe_id, "detail", tweak_id=tweak_id, character_id=character_id).json()
+    assert detail["thread"] == client.get(f"{base}/tweaks/{tweak_id}/thread", headers=auth_headers).json()
+    assert detail["viewer_state"]["character_id"] == character_id
+
+    composer = _bootstrap(client, auth_headers, universe_id, "composer").json()
+    assert composer["templates"] == client.get("/tweaknow/templates", headers=auth_headers).json()
+    trends = _bootstrap(client, auth_headers, universe_id, "trends").json()
+    assert trends["trends"] == client.get(f"{base}/trends", headers=auth_headers).json()
+
+    assert _bootstrap(client, auth_headers, universe_id, "profile").status_code == 422
+    assert _bootstrap(client, auth_headers, universe_id, "detail").status_code == 422
+    assert _bootstrap(client, auth_headers, universe_id, "inbox").status_code == 422
+    assert _bootstrap(client, auth_headers, universe_id, "profile", character_id=999999).status_code == 404
+    assert _bootstrap(client, auth_headers, universe_id, "detail", tweak_id=999999).status_code == 404
+    assert _bootstrap(client, auth_headers, 999999, "home").status_code == 404
+
+
+def test_viewer_state_matches_the_single_route(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=20, seed=13)
+    universe_id, character_id = ids["universe_id"], ids["character_ids"][0]
+    kept, edited, removed = ids["tweak_ids"][:3]
+    db.add_all(Like(character_id=character_id, tweak_id=tweak_id) for tweak_id in (kept, edited, removed))
+    db.commit()
+    foreign = seed_universe(db, user["id"], characters=1, tweaks=1, seed=14)["character_ids"][0]
+    for screen, params in (("home", {}), ("detail", {"tweak_id": kept})):
+        assert _bootstrap(client, auth_headers, universe_id, screen, character_id=foreign, **params).status_code == 404
+
+    branch_id = client.post(f"/universes/{universe_id}/branches", headers=auth_headers,
+                            json={"name": "What if"}).json()["id"]
+    b = f"/tweaknow/universes/{branch_id}"
+    client.put(f"{b}/tweaks/{edited}", headers=auth_headers, json={"content": "Alternate ending"})
+    assert client.delete(f"{b}/tweaks/{removed}", headers=auth_headers).status_code == 204
+
+    home = _bootstrap(client, auth_headers, branch_id, "home", character_id=character_id).json()
+    single = client.post(f"{b}/viewer-state", headers=auth_headers,
+                         json={"character_id": character_id, "tweak_ids": ids["tweak_ids"]}).json()
+    flagged = [t for t in single["tweaks"] if t["liked"] or t["retweeted"]]
+    assert home["viewer_state"] == {"character_id": character_id, "tweaks": flagged}
+    shown = [t["tweak_id"] for t in flagged]
+    assert kept in shown and edited in shown and removed not in shown
+
+
+def test_parts_run_the_same_without_threads(client, auth_headers, user, db, monkeypatch):
+    ids = seed_universe(db, user["id"], characters=5, tweaks=25, seed=8)
+    concurrent = _bootstrap(client, auth_headers, ids["universe_id"], "home").content
+    monkeypatch.setattr(settings, "BOOTSTRAP_THREADS", 0)
+    assert _bootstrap(client, auth_headers, ids["universe_id"], "home").content == concurrent
+
+
+def test_universe_summaries_count_rows(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=12, seed=11)
+    universe_id = ids["universe_id"]
+    branch = client.post(f"/universes/{universe_id}/branches", headers=auth_headers, json={"name": "What if"}).json()
+    client.post(f"/tweaknow/universes/{branch['id']}/tweaks", headers=auth_headers,
+                json={"universe_id": branch["id"], "character_id": ids["character_ids"][0], "content": "only here"})
+    untouched = client.post(f"/universes/{universe_id}/branches", headers=auth_headers, json={"name": "As is"}).json()
+    empty = client.post("/universes/", headers=auth_headers, json={"name": "Empty"}).json()
+
+    listing = client.get("/universes/bootstrap", headers=auth_headers, params={"limit": 1000}).json()
+    assert listing["user"]["id"] == user["id"]
+    by_id = {u["id"]: u for u in listing["universes"]}
+    assert (by_id[universe_id]["character_count"], by_id[universe_id]["tweak_count"]) == (3, 12)
+    assert by_id[universe_id]["last_tweak_at"] is not None
+    # A branch counts its parent's rows as well as its own
+    assert (by_id[branch["id"]]["character_count"], by_id[branch["id"]]["tweak_count"]) == (3, 13)
+    assert (by_id[untouched["id"]]["character_count"], by_id[untouched["id"]]["tweak_count"]) == (3, 12)
+    assert (by_id[empty["id"]]["character_count"], by_id[empty["id"]]["tweak_count"]) == (0, 0)
+    assert by_id[empty["id"]]["last_tweak_at"] is None
+
+    dashboard = _bootstrap(client, auth_headers, universe_id, "dashboard").json()
+    assert dashboard["universe"] == by_id[universe_id]
@@ -0,0 +1,263 @@
+from sqlalchemy import func, select
+
+from app.core.jobs import run_pending
+from app.models.tweaknow import Like, Tweak, TweakNowCharacter
+from app.models.universe import BranchTombstone
+from tests.conftest import seed_universe
+
+
+def _feed(client, headers, universe_id):
+    items = client.get(f"/tweaknow/universes/{universe_id}/tweaks", headers=headers).json()
+    return {item["tweak"]["id"]: item["tweak"] for item in items if item["type"] == "tweet"}
+
+
+def _characters(client, headers, universe_id):
+    return {c["id"]: c for c in client.get(f"/tweaknow/universes/{universe_id}/characters", headers=headers).json()}
+
+
+def _branch(client, headers, universe_id):
+    response = client.post(f"/universes/{universe_id}/branches", headers=headers, json={"name": "What if"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_branching_copies_nothing(client, auth_headers, user, db, count_queries):
+    ids = seed_universe(db, user["id"], characters=10, tweaks=200, seed=11)
+    rows_before = db.scalar(select(func.count()).select_from(Tweak))
+
+    with count_queries() as queries:
+        branch_id = _branch(client, auth_headers, ids["universe_id"])
+    assert queries.count == 5
+    assert db.scalar(select(func.count()).select_from(Tweak)) == rows_before
+
+    assert _feed(client, auth_headers, branch_id).keys() == _feed(client, auth_headers, ids["universe_id"]).keys()
+    assert _characters(client, auth_headers, branch_id).keys() == set(ids["character_ids"])
+    branches = client.get(f"/universes/{ids['universe_id']}/branches", headers=auth_headers).json()
+    assert [b["id"] for b in branches] == [branch_id]
+    assert branches[0]["parent_universe_id"] == ids["universe_id"]
+
+
+def test_branch_edits_stay_in_the_branch(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=12, seed=12)
+    parent_id = ids["universe_id"]
+    parent_feed = _feed(client, auth_headers, parent_id)
+    edited, removed = list(parent_feed)[:2]
+    branch_id = _branch(client, auth_headers, parent_id)
+    b = f"/tweaknow/universes/{branch_id}"
+
+    updated = client.put(f"{b}/tweaks/{edited}", headers=auth_headers, json={"content": "Alternate ending"})
+    assert updated.status_code == 200 and updated.json()["id"] == edited
+    assert client.put(f"{b}/tweaks/{edited}", headers=auth_headers, json={"like_count": 7}).status_code == 200
+    assert client.delete(f"{b}/tweaks/{removed}", headers=auth_headers).status_code == 204
+    created = client.post(f"{b}/tweaks", headers=auth_headers, json={
+        "content": "Only in the branch", "universe_id": branch_id, "character_id": ids["character_ids"][0],
+    }).json()
+    # Written to the parent after the fork: invisible to the branch
+    late = client.post(f"/tweaknow/universes/{parent_id}/tweaks", headers=auth_headers, json={
+        "content": "Later in the parent", "universe_id": parent_id, "character_id": ids["character_ids"][0],
+    }).json()
+
+    branch_feed = _feed(client, auth_headers, branch_id)
+    assert branch_feed[edited]["content"] == "Alternate ending" and branch_feed[edited]["like_count"] == 7
+    assert removed not in branch_feed and late["id"] not in branch_feed
+    assert created["id"] in branch_feed
+    assert len(branch_feed) == len(parent_feed)
+
+    parent_now = _feed(client, auth_headers, parent_id)
+    assert parent_now[edited]["content"] == parent_feed[edited]["content"]
+    assert removed in parent_now and created["id"] not in parent_now
+    # One override row, one tombstone
+    assert db.scalar(select(func.count()).select_from(Tweak).where(Tweak.universe_id == branch_id)) == 2
+    assert db.scalar(select(func.count()).select_from(BranchTombstone)) >= 1
+
+
+def test_deleting_a_character_in_a_branch_hides_their_tweets(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=20, seed=13)
+    victim = ids["character_ids"][0]
+    branch_id = _branch(client, auth_headers, ids["universe_id"])
+
+    renamed = client.put(f"/tweaknow/universes/{branch_id}/characters/{ids['character_ids'][1]}",
+                         headers=auth_headers, json={"name": "Renamed"})
+    assert renamed.json()["name"] == "Renamed"
+    assert client.delete(f"/tweaknow/universes/{branch_id}/characters/{victim}", headers=auth_headers).status_code == 204
+
+    characters = _characters(client, auth_headers, branch_id)
+    assert victim not in characters and characters[ids["character_ids"][1]]["name"] == "Renamed"
+    assert all(t["character_id"] != victim for t in _feed(client, auth_headers, branch_id).values())
+    assert victim in _characters(client, auth_headers, ids["universe_id"])
+
+
+def test_threads_merge_branch_replies(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=6, seed=14)
+    parent_id = ids["universe_id"]
+    root = db.get(Tweak, ids["tweak_ids"][0])
+    first = Tweak(universe_id=parent_id, character_id=root.character_id, content="first", reply_to_tweak_id=root.id)
+    db.add(first)
+    db.commit()
+    first_id, root_id = first.id, root.id
+    db.add(Tweak(universe_id=parent_id, character_id=root.character_id, content="nested", reply_to_tweak_id=first_id))
+    db.commit()
+
+    branch_id = _branch(client, auth_headers, parent_id)
+    client.post(f"/tweaknow/universes/{branch_id}/tweaks", headers=auth_headers, json={
+        "content": "branch reply", "universe_id": branch_id, "character_id": ids["character_ids"][0],
+        "reply_to_tweak_id": first_id,
+    })
+    client.put(f"/tweaknow/universes/{branch_id}/tweaks/{first_id}", headers=auth_headers, json={"content": "edited"})
+
+    def thread(universe_id):
+        response = client.get(f"/tweaknow/universes/{universe_id}/tweaks/{root_id}/thread", headers=auth_headers)
+        assert response.status_code == 200
+        return sorted(r["content"] for r in response.json()["replies"])
+
+    assert thread(parent_id) == ["first", "nested"]
+    assert thread(branch_id) == ["branch reply", "edited", "nested"]
+
+
+def test_profiles_count_their_own_universe(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=9, seed=19)
+    parent_id, author = ids["universe_id"], ids["character_ids"][0]
+    branch_id = _branch(client, auth_headers, parent_id)
+    for n in range(3):
+        client.post(f"/tweaknow/universes/{branch_id}/tweaks", headers=auth_headers, json={
+            "content": f"branch {n}", "universe_id": branch_id, "character_id": author,
+        })
+
+    def profile(universe_id):
+        base = f"/tweaknow/universes/{universe_id}/characters/{author}"
+        response = client.get(f"{base}/profile", headers=auth_headers)
+        tab = client.get(f"{base}/tweaks", headers=auth_headers, params={"tab": "tweets", "limit": 100})
+        assert response.status_code == 200 and tab.status_code == 200
+        assert response.json()["tweet_count"] == len(tab.json()["items"])
+        return response.json()["tweet_count"]
+
+    parent_count = profile(parent_id)
+    assert db.scalar(select(func.count()).select_from(Tweak).where(
+        Tweak.universe_id == parent_id, Tweak.character_id == author, Tweak.reply_to_tweak_id.is_(None),
+    )) == parent_count
+    # Inherited from the parent, plus the branch's own tweets
+    assert profile(branch_id) == parent_count + 3
+
+
+def test_branch_reads_inherit_the_parent(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=5, tweaks=30, seed=21)
+    parent_id, viewer = ids["universe_id"], ids["character_ids"][0]
+    db.add(Like(character_id=viewer, tweak_id=ids["tweak_ids"][0]))
+    db.commit()
+    branch_id = _branch(client, auth_headers, parent_id)
+
+    def reads(universe_id):
+        u = f"/tweaknow/universes/{universe_id}"
+        c = f"{u}/characters/{viewer}"
+        responses = {
+            "for_you": client.get(f"{u}/tweaks", headers=auth_headers,
+                                  params={"mode": "for_you", "character_id": viewer}),
+            "viewer_state": client.post(f"{u}/viewer-state", headers=auth_headers,
+                                        json={"character_id": viewer, "tweak_ids": ids["tweak_ids"]}),
+            "followers": client.get(f"{c}/followers", headers=auth_headers),
+            "following": client.get(f"{c}/following", headers=auth_headers),
+            "suggestions": client.get(f"{c}/suggestions", headers=auth_headers),
+        }
+        assert {name: r.status_code for name, r in responses.items()} == dict.fromkeys(responses, 200)
+        body = {name: r.json() for name, r in responses.items()}
+        return {
+            "for_you": [item["tweak_id"] for item in body["for_you"]],
+            "viewer_state": body["viewer_state"]["tweaks"],
+            "followers": [item["character"]["id"] for item in body["followers"]["items"]],
+            "following": [item["character"]["id"] for item in body["following"]["items"]],
+            "suggestions": [item["character"]["id"] for item in body["suggestions"]],
+        }
+
+    parent = reads(parent_id)
+    assert all(parent.values())
+    assert reads(branch_id) == parent
+
+    # The branch's own edits show in its ranked feed
+    top = parent["for_you"][0]
+    client.put(f"/tweaknow/universes/{branch_id}/tweaks/{top}", headers=auth_headers, json={"content": "Edited"})
+    feed = client.get(f"/tweaknow/universes/{branch_id}/tweaks", headers=auth_headers,
+                      params={"mode": "for_you", "character_id": viewer}).json()
+    assert {item["tweak_id"]: item["tweak"]["content"] for item in feed}[top] == "Edited"
+
+
+def test_parent_writes_refresh_cached_branch_rankings(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=12, seed=22)
+    parent_id, viewer = ids["universe_id"], ids["character_ids"][0]
+    branch_id = _branch(client, auth_headers, parent_id)
+    params = {"mode": "for_you", "character_id": viewer}
+
+    def ranked(path, **extra):
+        items = client.get(path, headers=auth_headers, params=dict(params, **extra)).json()
+        items = items["feed"] if "feed" in items else items
+        return {item["tweak_id"]: item["tweak"]["content"] for item in items}
+
+    feed_path = f"/tweaknow/universes/{branch_id}/tweaks"
+    bootstrap_path = f"/universes/{branch_id}/bootstrap"
+    top = next(iter(ranked(feed_path)))
+    ranked(bootstrap_path, screen="home")
+    client.put(f"/tweaknow/universes/{parent_id}/tweaks/{top}", headers=auth_headers, json={"content": "Rewritten"})
+
+    assert ranked(feed_path)[top] == "Rewritten"
+    assert ranked(bootstrap_path, screen="home")[top] == "Rewritten"
+
+
+def test_merge_applies_the_branch_to_its_parent(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=10, seed=15)
+    parent_id = ids["universe_id"]
+    edited, removed = list(_feed(client, auth_headers, parent_id))[:2]
+    branch_id = _branch(client, auth_headers, parent_id)
+    b = f"/tweaknow/universes/{branch_id}"
+    client.put(f"{b}/tweaks/{edited}", headers=auth_headers, json={"content": "Canon now"})
+    client.delete(f"{b}/tweaks/{removed}", headers=auth_headers)
+    created = client.post(f"{b}/tweaks", headers=auth_headers, json={
+        "content": "New canon", "universe_id": branch_id, "character_id": ids["character_ids"][0],
+    }).json()
+    expected = _feed(client, auth_headers, branch_id)
+
+    merged = client.post(f"/universes/{branch_id}/merge", headers=auth_headers)
+    assert merged.status_code == 200 and merged.json()["id"] == parent_id
+
+    after = _feed(client, auth_headers, parent_id)
+    assert after.keys() == expected.keys()
+    assert after[edited]["content"] == "Canon now" and after[created["id"]]["universe_id"] == parent_id
+    assert client.get(f"/universes/{branch_id}", headers=auth_headers).status_code == 404
+    assert db.scalar(select(func.count()).select_from(BranchTombstone).where(
+        BranchTombstone.universe_id == branch_id)) == 0
+
+
+def test_discarding_leaves_the_parent_alone(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=10, seed=16)
+    parent_id = ids["universe_id"]
+    before = _feed(client, auth_headers, parent_id)
+    branch_id = _branch(client, auth_headers, parent_id)
+    client.put(f"/tweaknow/universes/{branch_id}/tweaks/{next(iter(before))}", headers=auth_headers,
+               json={"content": "Never mind"})
+    client.post(f"/tweaknow/universes/{branch_id}/tweaks", headers=auth_headers, json={
+        "content": "Reply", "universe_id": branch_id, "character_id": ids["character_ids"][0],
+        "reply_to_tweak_id": next(iter(before)),
+    })
+
+    assert client.delete(f"/universes/{branch_id}", headers=auth_headers).status_code == 202
+    assert run_pending() == 1
+    assert _feed(client, auth_headers, parent_id) == before
+
+    # A parent takes its branches with it
+    _branch(client, auth_headers, parent_id)
+    assert client.delete(f"/universes/{parent_id}", headers=auth_headers).status_code == 202
+    assert run_pending() == 1
+    assert db.scalar(select(func.count()).select_from(TweakNowCharacter).where(
+        TweakNowCharacter.id.in_(ids["character_ids"]))) == 0
+
+
+def test_engagement_writes_and_nested_branches_are_refused(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=4, seed=17)
+    branch_id = _branch(client, auth_headers, ids["universe_id"])
+    liked = client.post(f"/tweaknow/universes/{branch_id}/tweaks/{ids['tweak_ids'][0]}/like",
+                        headers=auth_headers, json={"character_id": ids["character_ids"][0]})
+    assert liked.status_code == 409
+    followed = client.post(
+        f"/tweaknow/universes/{branch_id}/characters/{ids['character_ids'][0]}/follow/{ids['character_ids'][1]}",
+        headers=auth_headers)
+    assert followed.status_code == 409
+    assert client.post(f"/universes/{branch_id}/branches", headers=auth_headers,
+                       json={"name": "Deeper"}).status_code == 400
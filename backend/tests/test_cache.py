@@ -0,0 +1,167 @@
+import sqlite3
+import time
+
+import pytest
+
+from sqlalchemy import create_engine, text
+
+from app.core import cache
+from app.core.cache import LRUCache, cache_key
+from tests.conftest import POSTGRES, seed_universe
+
+
+# ===== LRU backend =====
+def test_lru_evicts_least_recently_used_by_size():
+    lru = LRUCache(max_bytes=40, default_ttl=60)
+    lru.set("a", b"x" * 10)
+    lru.set("b", b"x" * 10)
+    lru.set("c", b"x" * 10)
+    lru.get("a")
+    lru.set("d", b"x" * 10)
+    lru.set("e", b"x" * 10)
+
+    assert lru.get("b") is None
+    assert lru.get("a") is not None
+    assert lru.size_bytes <= 40
+
+
+def test_lru_skips_oversized_entries_and_expires():
+    lru = LRUCache(max_bytes=40, default_ttl=60)
+    lru.set("big", b"x" * 11)
+    assert lru.get("big") is None
+
+    lru.set("short", b"ok", ttl=0.01)
+    time.sleep(0.02)
+    assert lru.get("short") is None
+    assert lru.entry_count == 0
+
+
+def test_bumping_the_version_changes_the_key():
+    lru = LRUCache(max_bytes=1024, default_ttl=60)
+    before = cache_key("feed", 7, lru.version(7))
+    lru.bump(7)
+    assert cache_key("feed", 7, lru.version(7)) != before
+    assert lru.version(8) == 0
+
+
+# ===== API =====
+def test_feed_is_served_from_cache_until_a_write(client, auth_headers, user, db, count_queries):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=10, seed=3)
+    path = f"/tweaknow/universes/{ids['universe_id']}/tweaks"
+
+    first = client.get(path, headers=auth_headers)
+    with count_queries() as queries:
+        second = client.get(path, headers=auth_headers)
+    assert second.json() == first.json()
+    # Only the user and universe-ownership lookups run on a hit
+    assert queries.count == 2
+
+    created = client.post(path, headers=auth_headers, json={
+        "character_id": ids["character_ids"][0], "content": "Fresh off the press", "universe_id": ids["universe_id"],
+    })
+    assert created.status_code == 201
+    after = client.get(path, headers=auth_headers).json()
+    assert after[0]["tweak"]["content"] == "Fresh off the press"
+    assert len(after) == len(first.json()) + 1
+
+
+def test_cached_characters_match_the_response_model(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=2, seed=4)
+    path = f"/tweaknow/universes/{ids['universe_id']}/characters"
+
+    first = client.get(path, headers=auth_headers).json()
+    assert client.get(path, headers=auth_headers).json() == first
+    assert {c["id"] for c in first} == set(ids["character_ids"])
+
+    client.put(f"{path}/{ids['character_ids'][0]}", headers=auth_headers, json={"bio": "Renamed"})
+    updated = {c["id"]: c for c in client.get(path, headers=auth_headers).json()}
+    assert updated[ids["character_ids"][0]]["bio"] == "Renamed"
+
+
+def test_rolled_back_writes_do_not_invalidate(app, db):
+    universe_id = 987654
+    before = cache.backend.version(universe_id)
+    cache.invalidate_universe(db, universe_id)
+    db.rollback()
+    assert cache.backend.version(universe_id) == before
+
+
+@pytest.mark.skipif(not POSTGRES, reason="LISTEN/NOTIFY needs PostgreSQL")
+def test_notifications_from_other_workers_invalidate(client, app):
+    from app.core.database import engine
+
+    universe_id = 123456
+    before = cache.backend.version(universe_id)
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                           {"channel": cache.NOTIFY_CHANNEL, "payload": str(universe_id)})
+
+    deadline = time.monotonic() + 5
+    while cache.backend.version(universe_id) == before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.backend.version(universe_id) > before
+
+
+@pytest.fixture
+def frozen_replica(app, tmp_path):
+    """Returns a read bind frozen at the database's current state: a replica that stopped replaying."""
+    from app.core.database import engine
+
+    opened = []
+
+    def freeze():
+        if POSTGRES:
+            # Its own engine, as a replica has: a session keys connections by engine
+            replica = create_engine(engine.url, isolation_level="REPEATABLE READ")
+            connection = replica.connect()
+            connection.begin()
+            connection.execute(text("SELECT 1"))  # takes the snapshot
+            opened.append(connection)
+            return connection
+        source = engine.raw_connection()
+        copy = sqlite3.connect(tmp_path / "replica.db")
+        try:
+            source.driver_connection.backup(copy)
+        finally:
+            copy.close()
+            source.close()
+        replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+        opened.append(replica)
+        return replica
+
+    yield freeze
+    for bind in opened:
+        if POSTGRES:
+            bind.close()
+        bind.engine.dispose()
+
+
+def test_misses_after_a_write_are_not_filled_from_a_lagging_replica(
+    client, auth_headers, user, db, frozen_replica, monkeypatch
+):
+    from app.core import database
+
+    ids = seed_universe(db, user["id"], characters=2, tweaks=2, seed=5)
+    path = f"/tweaknow/universes/{ids['universe_id']}/characters"
+    client.get(path, headers=auth_headers)
+
+    class LaggingRouter:
+        enabled = False
+
+        def __init__(self, replica):
+            self.replica = replica
+
+        def choose(self, *args):
+            return self.replica
+
+    primary_router = database.router
+    monkeypatch.setattr(database, "router", LaggingRouter(frozen_replica()))
+    created = client.post(path, headers=auth_headers, json={
+        "name": "Fresh", "username": "fresh", "universe_id": ids["universe_id"],
+    })
+    assert created.status_code == 201
+
+    # Another reader misses while the replica has not replayed the write
+    assert "fresh" in [c["username"] for c in client.get(path, headers=auth_headers).json()]
+    monkeypatch.setattr(database, "router", primary_router)
+    assert "fresh" in [c["username"] for c in client.get(path, headers=auth_headers).json()]
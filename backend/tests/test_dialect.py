@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.dialect import create_database_engine, epoch_seconds, greatest, list_length, try_exclusive
+from app.models.tweaknow import Tweak, TweakNowCharacter
+from app.models.universe import Universe
+from app.models.user import User
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    import app.models  # noqa: F401  (register every table)
+
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(User(email="solo@example.com", username="solo", hashed_password="x"))
+        session.flush()
+        universe = Universe(name="Local", user_id=1)
+        session.add(universe)
+        session.flush()
+        session.add(TweakNowCharacter(universe_id=universe.id, name="Ada", username="ada"))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def test_functions_compile_for_both_dialects():
+    expressions = (list_length(Tweak.images), greatest(Tweak.like_count, 0), epoch_seconds(Tweak.created_at))
+    assert [str(e.compile(dialect=postgresql.dialect())).split("(")[0] for e in expressions] == [
+        "cardinality", "greatest", "CAST",
+    ]
+    assert [str(e.compile(dialect=sqlite.dialect())).split("(")[0] for e in expressions] == [
+        "json_array_length", "max", "",
+    ]
+
+
+def test_sqlite_keeps_images_and_timezones(sqlite_engine):
+    story_time = datetime(2024, 3, 1, 12, 30, tzinfo=timezone(timedelta(hours=5)))
+    with Session(sqlite_engine) as session:
+        session.add(Tweak(universe_id=1, character_id=1, content="Hi", images=["a.png", "b.png"],
+                          custom_date=story_time))
+        session.add(Tweak(universe_id=1, character_id=1, content="No images"))
+        session.commit()
+
+    with Session(sqlite_engine) as session:
+        tweak = session.scalars(select(Tweak).where(list_length(Tweak.images) > 0)).one()
+        assert tweak.images == ["a.png", "b.png"]
+        assert tweak.custom_date == story_time and tweak.custom_date.tzinfo == timezone.utc
+        assert session.scalar(select(epoch_seconds(Tweak.custom_date)).where(Tweak.id == tweak.id)) == \
+            pytest.approx(story_time.timestamp())
+        assert session.get(Tweak, 2).created_at.tzinfo == timezone.utc
+
+
+def test_sqlite_writers_queue_instead_of_failing(sqlite_engine):
+    with Session(sqlite_engine) as session:
+        session.add(Tweak(universe_id=1, character_id=1, content="Counted", like_count=0))
+        session.commit()
+    errors = []
+
+    def like(times):
+        try:
+            for _ in range(times):
+                with Session(sqlite_engine) as session:
+                    # Read first, then write: the write must not fail on a stale snapshot
+                    session.get(Tweak, 1)
+                    session.execute(update(Tweak).where(Tweak.id == 1).values(like_count=Tweak.like_count + 1))
+                    session.commit()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=like, args=(25,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with Session(sqlite_engine) as session:
+        assert session.get(Tweak, 1).like_count == 200
+
+
+def test_sqlite_exclusive_lock_is_per_key(sqlite_engine):
+    with Session(sqlite_engine) as first, Session(sqlite_engine) as second:
+        with try_exclusive(first, 1, 7) as acquired:
+            assert acquired
+            with try_exclusive(second, 1, 7) as again:
+                assert not again
+            with try_exclusive(second, 1, 8) as other:
+                assert other
+        with try_exclusive(second, 1, 7) as released:
+            assert released
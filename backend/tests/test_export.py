@@ -0,0 +1,134 @@
+import base64
+import io
+import json
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.core import export as export_site
+from app.core.config import settings
+from app.core.jobs import run_pending
+from app.models.tweaknow import Tweak, TweakNowCharacter
+from tests.conftest import seed_universe
+
+
+def _png_data_uri(color) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_PAGE_SIZE", 5)
+
+
+def _export(client, auth_headers, universe_id):
+    response = client.post(f"/universes/{universe_id}/export", headers=auth_headers)
+    assert response.status_code == 202, response.text
+    assert run_pending() == 1
+    job = client.get(f"/jobs/{response.json()['id']}", headers=auth_headers).json()
+    assert job["status"] == "succeeded" and job["progress"] == 1.0, job
+    return job["result"]
+
+
+def _read(universe_id, path):
+    return json.loads((export_site.site_dir(universe_id) / f"{path}.json").read_text())
+
+
+def test_export_writes_pages_and_media_once(client, auth_headers, user, db, small_pages):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=30, seed=31)
+    uid = ids["universe_id"]
+    avatar = _png_data_uri("red")
+    for character in db.query(TweakNowCharacter).filter_by(universe_id=uid):
+        character.profile_picture = avatar
+    db.commit()
+
+    summary = _export(client, auth_headers, uid)
+    site = export_site.site_dir(uid)
+    top_level = db.query(Tweak).filter_by(universe_id=uid, reply_to_tweak_id=None).count()
+    pages = -(-top_level // 5)
+    assert sorted(p.name for p in (site / "feed").glob("*.html")) == sorted(
+        f"page-{n}.html" for n in range(1, pages + 1)
+    )
+    assert len(list((site / "characters").glob("*.html"))) == 4
+    assert summary["pages_unchanged"] == 0 and summary["pages_removed"] == 0
+    # One avatar shared by every character is stored once
+    assert summary["media_written"] == 1 and len(list((site / "media").iterdir())) == 1
+
+    feed = _read(uid, "feed/page-1")
+    assert [t["story_time"] for t in feed["tweets"]] == sorted(t["story_time"] for t in feed["tweets"])
+    assert all(a["picture"].startswith("../media/") for a in feed["authors"].values())
+    assert "index.html" in {p.name for p in site.iterdir()}
+
+    replied = db.query(Tweak.reply_to_tweak_id).filter(
+        Tweak.universe_id == uid, Tweak.reply_to_tweak_id.isnot(None)
+    ).first()[0]
+    root = db.get(Tweak, replied)
+    while root.reply_to_tweak_id is not None:
+        root = db.get(Tweak, root.reply_to_tweak_id)
+    thread = _read(uid, f"threads/{root.id}")
+    assert thread["tweets"][0]["id"] == root.id and len(thread["tweets"]) > 1
+    assert all(t["replying_to"] for t in thread["tweets"][1:])
+
+
+def test_reexport_rewrites_only_changed_pages(client, auth_headers, user, db, small_pages):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=40, seed=32)
+    uid = ids["universe_id"]
+    first = _export(client, auth_headers, uid)
+    assert _export(client, auth_headers, uid) == {
+        "pages_written": 0, "pages_unchanged": first["pages_written"], "pages_removed": 0, "media_written": 0,
+    }
+
+    # Editing the oldest tweet touches its feed page and the pages showing it, nothing else
+    site = export_site.site_dir(uid)
+    oldest = _read(uid, "feed/page-1")["tweets"][0]
+    last_page = sorted((site / "feed").glob("*.html"))[-1]
+    untouched = last_page.stat().st_mtime_ns
+    client.put(f"/tweaknow/universes/{uid}/tweaks/{oldest['id']}", headers=auth_headers,
+               json={"content": "Edited for the archive"})
+    edited = _export(client, auth_headers, uid)
+    assert 1 <= edited["pages_written"] < first["pages_written"] // 2
+    assert _read(uid, "feed/page-1")["tweets"][0]["content"] == "Edited for the archive"
+    assert last_page.name != "page-1.html" and last_page.stat().st_mtime_ns == untouched
+
+    # A page whose file went missing is written again
+    (export_site.site_dir(uid) / "feed/page-2.html").unlink()
+    assert _export(client, auth_headers, uid)["pages_written"] == 1
+
+
+def test_deleted_pages_are_pruned(client, auth_headers, user, db, small_pages):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=12, seed=33)
+    uid = ids["universe_id"]
+    character_id = client.post(f"/tweaknow/universes/{uid}/characters", headers=auth_headers, json={
+        "universe_id": uid, "name": "Walk-on", "username": "walkon",
+    }).json()["id"]
+    _export(client, auth_headers, uid)
+    site = export_site.site_dir(uid)
+    # Characters without posts still get a profile
+    assert _read(uid, f"characters/{character_id}")["tweets"] == []
+
+    client.delete(f"/tweaknow/universes/{uid}/characters/{character_id}", headers=auth_headers)
+    summary = _export(client, auth_headers, uid)
+    assert summary["pages_removed"] == 1 and summary["pages_written"] == 0
+    assert not (site / f"characters/{character_id}.html").exists()
+    assert not (site / f"characters/{character_id}.json").exists()
+
+
+def test_export_zip_streams_the_site(client, auth_headers, user, db, small_pages):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=10, seed=34)
+    uid = ids["universe_id"]
+    assert client.get(f"/universes/{uid}/export.zip", headers=auth_headers).status_code == 404
+    _export(client, auth_headers, uid)
+
+    response = client.get(f"/universes/{uid}/export.zip", headers=auth_headers)
+    assert response.status_code == 200 and response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    assert "index.html" in names and "style.css" in names and "feed/page-1.html" in names
+    assert export_site.MANIFEST not in names
+    assert archive.getinfo("feed/page-1.html").compress_type == zipfile.ZIP_DEFLATED
+    assert b"page-" in archive.read("index.html")
+    assert archive.testzip() is None
+
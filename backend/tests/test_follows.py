@@ -0,0 +1,58 @@
+from app.models.tweaknow import CharacterFollow, TweakNowCharacter
+from app.models.universe import Universe
+
+
+def _graph(db, user_id, size):
+    """A star: characters[0] is followed by everyone else, and follows the even ones back."""
+    universe = Universe(name="Follow graph", user_id=user_id)
+    db.add(universe)
+    db.flush()
+    cast = [TweakNowCharacter(universe_id=universe.id, name=f"C{i}", username=f"c{i}") for i in range(size)]
+    db.add_all(cast)
+    db.flush()
+    hub = cast[0]
+    db.add_all(CharacterFollow(follower_id=c.id, following_id=hub.id) for c in cast[1:])
+    db.add_all(CharacterFollow(follower_id=hub.id, following_id=c.id) for c in cast[2::2])
+    db.commit()
+    return universe.id, [c.id for c in cast]
+
+
+def test_followers_paginate_without_gaps_or_repeats(client, auth_headers, user, db, count_queries):
+    universe_id, ids = _graph(db, user["id"], 26)
+    path = f"/tweaknow/universes/{universe_id}/characters/{ids[0]}/followers"
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        with count_queries() as queries:
+            page = client.get(path, headers=auth_headers, params=params).json()
+        assert queries.count == 3  # user, universe, page
+        seen += [item["character"]["id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(ids[1:])
+    # Newest follow first
+    assert seen == list(reversed(ids[1:]))
+
+
+def test_relative_flags(client, auth_headers, user, db):
+    universe_id, ids = _graph(db, user["id"], 6)
+    hub = ids[0]
+
+    page = client.get(f"/tweaknow/universes/{universe_id}/characters/{hub}/followers",
+                      headers=auth_headers, params={"relative_to": hub}).json()
+    flags = {item["character"]["id"]: item for item in page["items"]}
+    for character_id in ids[1:]:
+        followed_back = character_id in ids[2::2]
+        assert flags[character_id]["follows_viewer"] is True
+        assert flags[character_id]["followed_by_viewer"] is followed_back
+        assert flags[character_id]["mutual"] is followed_back
+    assert "banner_image" not in flags[ids[1]]["character"]
+
+    plain = client.get(f"/tweaknow/universes/{universe_id}/characters/{hub}/following", headers=auth_headers).json()
+    assert {item["character"]["id"] for item in plain["items"]} == set(ids[2::2])
+    assert plain["items"][0]["mutual"] is None
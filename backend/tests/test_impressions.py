@@ -0,0 +1,145 @@
+import threading
+
+from app.core import cache
+from app.core.impressions import ImpressionBuffer, buffer, impressions_total
+from tests.conftest import seed_universe
+
+
+def _view_counts(db, tweak_ids):
+    from app.models.tweaknow import Tweak
+
+    db.expire_all()
+    rows = db.query(Tweak.id, Tweak.view_count).filter(Tweak.id.in_(tweak_ids)).all()
+    return {tweak_id: view_count for tweak_id, view_count in rows}
+
+
+def test_batches_are_coalesced_into_one_update(client, auth_headers, user, db, count_queries):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=5, seed=21)
+    hot, cold = ids["tweak_ids"][0], ids["tweak_ids"][1]
+    path = f"/tweaknow/universes/{ids['universe_id']}/impressions"
+    buffer.flush()
+    before = _view_counts(db, [hot, cold])
+
+    for _ in range(10):
+        response = client.post(path, headers=auth_headers, json={"tweak_ids": [hot, hot, cold]})
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 3}
+
+    version = cache.backend.version(ids["universe_id"])
+    with count_queries() as queries:
+        assert buffer.flush() == 2
+    assert sum("UPDATE tweaks" in s for s in queries.statements) == 1
+    # View counts alone leave cached responses in place
+    assert cache.backend.version(ids["universe_id"]) == version
+
+    after = _view_counts(db, [hot, cold])
+    assert after[hot] - (before[hot] or 0) == 20
+    assert after[cold] - (before[cold] or 0) == 10
+
+
+def test_impressions_only_count_inside_their_universe(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=2, seed=22)
+    other = seed_universe(db, user["id"], characters=2, tweaks=2, seed=23)
+    buffer.flush()
+    before = _view_counts(db, other["tweak_ids"])
+
+    client.post(f"/tweaknow/universes/{ids['universe_id']}/impressions", headers=auth_headers,
+                json={"tweak_ids": other["tweak_ids"]})
+    buffer.flush()
+    assert _view_counts(db, other["tweak_ids"]) == before
+
+
+def test_branch_impressions_reach_the_row_behind_each_tweet(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=6, seed=25)
+    parent_id = ids["universe_id"]
+    inherited, edited, deleted = ids["tweak_ids"][:3]
+    branch_id = client.post(f"/universes/{parent_id}/branches", headers=auth_headers,
+                            json={"name": "Views"}).json()["id"]
+    b = f"/tweaknow/universes/{branch_id}"
+    client.put(f"{b}/tweaks/{edited}", headers=auth_headers, json={"content": "Edited"})
+    client.delete(f"{b}/tweaks/{deleted}", headers=auth_headers)
+    buffer.flush()
+
+    def views():
+        from app.models.tweaknow import Tweak
+
+        db.expire_all()
+        override = db.query(Tweak).filter(Tweak.universe_id == branch_id, Tweak.overrides_id == edited).one()
+        counts = _view_counts(db, [inherited, edited, deleted, override.id])
+        return {key: counts[row_id] or 0 for key, row_id in (
+            ("inherited", inherited), ("parent_edited", edited), ("deleted", deleted), ("override", override.id),
+        )}
+
+    before = views()
+    dropped_before = impressions_total.value(result="dropped")
+    response = client.post(f"{b}/impressions", headers=auth_headers,
+                           json={"tweak_ids": [inherited, inherited, edited, deleted]})
+    assert response.json()["accepted"] == 3
+    assert impressions_total.value(result="dropped") - dropped_before == 1
+    buffer.flush()
+
+    after = views()
+    assert {key: after[key] - before[key] for key in after} == {
+        "inherited": 2, "parent_edited": 0, "deleted": 0, "override": 1,
+    }
+
+
+def test_batch_size_is_limited(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=1, tweaks=1, seed=24)
+    response = client.post(f"/tweaknow/universes/{ids['universe_id']}/impressions", headers=auth_headers,
+                           json={"tweak_ids": [ids["tweak_ids"][0]] * 1001})
+    assert response.status_code == 422
+
+
+def test_failed_flush_keeps_counts_up_to_the_buffer_limit(app):
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            # Impressions keep arriving while the flush is in flight
+            broken.add(1, [11, 12])
+            raise RuntimeError("database is down")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    broken = ImpressionBuffer(BrokenSession, flush_seconds=60, max_pending=100, max_buffered=2)
+    dropped_before = impressions_total.value(result="dropped")
+    broken.add(1, [10, 10, 11])
+
+    assert broken.flush() == 0
+    # 11 merges with the newer count; 10 no longer fits
+    assert broken.pending == 2
+    assert impressions_total.value(result="dropped") - dropped_before == 2
+
+
+def test_new_impressions_are_dropped_once_the_buffer_is_full(app):
+    capped = ImpressionBuffer(None, flush_seconds=60, max_pending=100, max_buffered=3)
+    dropped_before = impressions_total.value(result="dropped")
+
+    assert capped.add(1, [1, 2, 3, 4, 5]) == 3
+    # Tweaks already buffered still count
+    assert capped.add(1, [1, 6]) == 1
+    assert capped.pending == 3
+    assert impressions_total.value(result="dropped") - dropped_before == 3
+
+
+def test_full_buffer_wakes_the_flusher(app):
+    woken = threading.Event()
+
+    class Recorder(ImpressionBuffer):
+        def flush(self):
+            if self.pending:
+                woken.set()
+            return 0
+
+    recorder = Recorder(None, flush_seconds=3600, max_pending=3, max_buffered=10)
+    recorder.start()
+    try:
+        recorder.add(1, [1, 2])
+        assert not woken.wait(0.1)
+        recorder.add(1, [3])
+        assert woken.wait(2.0)
+    finally:
+        recorder.stop()
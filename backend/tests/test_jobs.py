@@ -0,0 +1,202 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core import jobs
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import jobs as crud_jobs
+from app.models.job import Job
+from app.models.tweaknow import Like, Retweet, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+from tests.conftest import seed_universe
+
+failures = {}
+
+
+@jobs.handler("test_flaky")
+def _flaky(db, ctx):
+    if failures.get(ctx.job_id, 0) > 0:
+        failures[ctx.job_id] -= 1
+        raise RuntimeError("transient")
+    return {"attempt": ctx.attempt}
+
+
+@jobs.handler("test_refuse")
+def _refuse(db, ctx):
+    raise jobs.JobFailed("bad input")
+
+
+@jobs.handler("test_cancel_me")
+def _cancel_me(db, ctx):
+    ctx.report(0.5, "halfway")
+    with SessionLocal() as other:
+        crud_jobs.cancel_job(other, other.get(Job, ctx.job_id))
+    deadline = time.monotonic() + 5
+    while not ctx.cancel_requested and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Written after the cancellation arrived (SQLite heartbeats wait for the write lock); rolled back
+    db.query(Universe).filter(Universe.id == ctx.universe_id).update({Universe.name: "Half done"})
+    ctx.check_cancelled()
+    return {"finished": True}
+
+
+def _enqueue(db, user, kind="test_flaky", **kwargs):
+    return crud_jobs.enqueue(db, kind, user["id"], **kwargs)
+
+
+def test_claims_follow_priority_then_age_and_never_repeat(db, user):
+    low = _enqueue(db, user, priority=0)
+    high = _enqueue(db, user, priority=5)
+    rest = [_enqueue(db, user) for _ in range(10)]
+    with SessionLocal() as session:
+        assert crud_jobs.claim_next(session, "first").id == high.id
+        assert crud_jobs.claim_next(session, "first").id == low.id
+
+    claimed, lock = [], threading.Lock()
+
+    def claim(name):
+        with SessionLocal() as session:
+            while (job := crud_jobs.claim_next(session, name)) is not None:
+                with lock:
+                    claimed.append(job.id)
+
+    threads = [threading.Thread(target=claim, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == [job.id for job in rest]
+
+    for job in [low, high, *rest]:
+        with SessionLocal() as session:
+            worker = session.get(Job, job.id).worker
+            assert crud_jobs.finish(session, job.id, worker, "succeeded")
+
+
+def test_failed_attempts_are_retried_with_backoff(db, user, monkeypatch):
+    job = _enqueue(db, user)
+    failures[job.id] = 1
+    assert jobs.run_pending() == 1
+    db.refresh(job)
+    assert job.status == "queued" and job.attempts == 1 and "transient" in job.error
+    assert job.run_after > datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_RETRY_SECONDS / 2)
+    # Not due yet
+    assert jobs.run_pending() == 0
+
+    db.query(Job).filter(Job.id == job.id).update({Job.run_after: datetime.now(timezone.utc)})
+    db.commit()
+    assert jobs.run_pending() == 1
+    db.refresh(job)
+    assert (job.status, job.attempts, job.result, job.error) == ("succeeded", 2, {"attempt": 2}, None)
+
+
+def test_jobs_fail_after_max_attempts_or_when_refused(db, user, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_SECONDS", 0)
+    job = _enqueue(db, user)
+    failures[job.id] = 10
+    assert jobs.run_pending() == settings.JOB_MAX_ATTEMPTS
+    db.refresh(job)
+    assert job.status == "failed" and job.attempts == settings.JOB_MAX_ATTEMPTS
+
+    refused = _enqueue(db, user, kind="test_refuse")
+    assert jobs.run_pending() == 1
+    db.refresh(refused)
+    assert (refused.status, refused.attempts, refused.error) == ("failed", 1, "bad input")
+
+
+def test_running_job_stops_at_cancellation(client, auth_headers, db, user, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.01)
+    universe_id = seed_universe(db, user["id"], characters=1, tweaks=1)["universe_id"]
+    job = _enqueue(db, user, kind="test_cancel_me", universe_id=universe_id)
+    assert jobs.run_pending() == 1
+
+    body = client.get(f"/jobs/{job.id}", headers=auth_headers).json()
+    assert body["status"] == "cancelled" and body["cancel_requested"]
+    assert body["progress"] == 0.5 and body["progress_message"] == "halfway"
+    assert db.get(Universe, universe_id).name != "Half done"
+    assert client.post(f"/jobs/{job.id}/cancel", headers=auth_headers).status_code == 409
+
+
+def test_queued_job_cancelled_through_the_api(client, auth_headers, db, user):
+    job = _enqueue(db, user)
+    response = client.post(f"/jobs/{job.id}/cancel", headers=auth_headers)
+    assert response.status_code == 200 and response.json()["status"] == "cancelled"
+    assert jobs.run_pending() == 0
+    assert job.id in [j["id"] for j in client.get("/jobs/?status=cancelled", headers=auth_headers).json()]
+    assert client.get("/jobs/999999", headers=auth_headers).status_code == 404
+
+
+def test_jobs_of_dead_workers_are_handed_on(db, user):
+    job = _enqueue(db, user)
+    with SessionLocal() as session:
+        assert crud_jobs.claim_next(session, "dead").id == job.id
+        session.query(Job).filter(Job.id == job.id).update(
+            {Job.heartbeat_at: datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)}
+        )
+        session.commit()
+        assert crud_jobs.expire_leases(session, settings.JOB_LEASE_SECONDS) == 1
+
+    assert jobs.run_pending() == 1
+    with SessionLocal() as session:
+        # The dead worker coming back cannot overwrite the new attempt
+        assert not crud_jobs.finish(session, job.id, "dead", "failed", error="late")
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("succeeded", 2)
+
+
+def test_deleting_a_universe_hides_it_then_removes_it_in_batches(client, auth_headers, db, user, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_DELETE_BATCH", 7)
+    ids = seed_universe(db, user["id"], characters=4, tweaks=30, seed=41)
+    uid = ids["universe_id"]
+    branch_id = client.post(f"/universes/{uid}/branches", headers=auth_headers, json={"name": "What if"}).json()["id"]
+    db.add(Like(character_id=ids["character_ids"][0], tweak_id=ids["tweak_ids"][0]))
+    db.commit()
+
+    response = client.delete(f"/universes/{uid}", headers=auth_headers)
+    assert response.status_code == 202 and response.json()["kind"] == "delete_universe"
+    # Gone for the API before any row is deleted; asking again returns 404, not a second job
+    for hidden in (uid, branch_id):
+        assert client.get(f"/universes/{hidden}", headers=auth_headers).status_code == 404
+    assert uid not in [u["id"] for u in client.get("/universes/", headers=auth_headers).json()]
+    assert client.delete(f"/universes/{uid}", headers=auth_headers).status_code == 404
+
+    assert jobs.run_pending() == 1
+    job = client.get(f"/jobs/{response.json()['id']}", headers=auth_headers).json()
+    assert job["status"] == "succeeded" and job["result"] == {"tweaks_deleted": 30}
+    assert db.scalar(select(func.count()).select_from(Universe).where(Universe.id.in_([uid, branch_id]))) == 0
+    assert db.scalar(select(func.count()).select_from(TweakNowCharacter).where(
+        TweakNowCharacter.id.in_(ids["character_ids"]))) == 0
+
+
+def test_reconcile_raises_counters_or_sets_them_exactly(client, auth_headers, db, user):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=20, seed=42)
+    uid = ids["universe_id"]
+    retweeted = db.scalar(select(Retweet.tweak_id).join(Tweak, Tweak.id == Retweet.tweak_id)
+                          .where(Tweak.universe_id == uid).limit(1))
+    quiet = db.scalar(select(Tweak.id).where(Tweak.universe_id == uid, ~Tweak.id.in_(select(Retweet.tweak_id))))
+    db.query(Tweak).filter(Tweak.id == retweeted).update({Tweak.retweet_count: 0})
+    db.query(Tweak).filter(Tweak.id == quiet).update({Tweak.retweet_count: 500})
+    db.commit()
+    real = db.scalar(select(func.count()).select_from(Retweet).where(Retweet.tweak_id == retweeted))
+
+    assert client.post(f"/universes/{uid}/reconcile", headers=auth_headers).status_code == 202
+    assert jobs.run_pending() == 1
+    db.expire_all()
+    assert db.get(Tweak, retweeted).retweet_count == real
+    # A storyteller's made-up count is left alone
+    assert db.get(Tweak, quiet).retweet_count == 500
+
+    client.post(f"/universes/{uid}/reconcile?exact=true", headers=auth_headers)
+    assert jobs.run_pending() == 1
+    db.expire_all()
+    assert db.get(Tweak, quiet).retweet_count == 0
+
+
+@pytest.fixture(autouse=True)
+def _drain():
+    yield
+    failures.clear()
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.conftest import seed_universe
+
+
+def _like_path(ids, tweak_id):
+    return f"/tweaknow/universes/{ids['universe_id']}/tweaks/{tweak_id}/like"
+
+
+def test_like_is_persisted_once_per_character(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=4, seed=11)
+    tweak_id = ids["tweak_ids"][0]
+    body = {"character_id": ids["character_ids"][0]}
+
+    first = client.post(_like_path(ids, tweak_id), headers=auth_headers, json=body).json()
+    again = client.post(_like_path(ids, tweak_id), headers=auth_headers, json=body).json()
+    assert first == {"liked": True, "like_count": 1}
+    assert again == first
+
+    undone = client.delete(f"{_like_path(ids, tweak_id)}/{ids['character_ids'][0]}", headers=auth_headers)
+    assert undone.json() == {"liked": False, "like_count": 0}
+    undone = client.delete(f"{_like_path(ids, tweak_id)}/{ids['character_ids'][0]}", headers=auth_headers)
+    assert undone.json() == {"liked": False, "like_count": 0}
+
+
+def test_concurrent_likes_are_all_counted(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=8, tweaks=2, seed=12)
+    tweak_id = ids["tweak_ids"][0]
+
+    def like(character_id):
+        return client.post(_like_path(ids, tweak_id), headers=auth_headers, json={"character_id": character_id})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(like, ids["character_ids"]))
+    assert all(r.status_code == 200 for r in responses)
+
+    feed = client.get(f"/tweaknow/universes/{ids['universe_id']}/tweaks", headers=auth_headers).json()
+    counts = {item["tweak"]["id"]: item["tweak"]["like_count"] for item in feed if item["type"] == "tweet"}
+    assert counts[tweak_id] == len(ids["character_ids"])
+
+
+def test_like_rejects_characters_and_tweaks_from_elsewhere(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=2, seed=13)
+    other = seed_universe(db, user["id"], characters=2, tweaks=2, seed=14)
+
+    foreign_character = client.post(_like_path(ids, ids["tweak_ids"][0]), headers=auth_headers,
+                                    json={"character_id": other["character_ids"][0]})
+    foreign_tweak = client.post(_like_path(ids, other["tweak_ids"][0]), headers=auth_headers,
+                                json={"character_id": ids["character_ids"][0]})
+    assert foreign_character.status_code == 404
+    assert foreign_tweak.status_code == 404
+
+
+def test_viewer_state_reports_every_flag_in_one_call(client, auth_headers, user, db, count_queries):
+    from app.models.tweaknow import CharacterFollow, Like, Retweet, Tweak
+
+    ids = seed_universe(db, user["id"], characters=3, tweaks=3, seed=15)
+    actor, author = ids["character_ids"][0], ids["character_ids"][1]
+    db.query(CharacterFollow).filter(CharacterFollow.follower_id == actor).delete()
+    liked, retweeted, followed = [
+        Tweak(universe_id=ids["universe_id"], character_id=character_id, content=f"Post {i}")
+        for i, character_id in enumerate((actor, actor, author))
+    ]
+    db.add_all([liked, retweeted, followed])
+    db.flush()
+    db.add_all([
+        Like(character_id=actor, tweak_id=liked.id),
+        Retweet(character_id=actor, tweak_id=retweeted.id),
+        CharacterFollow(follower_id=actor, following_id=author),
+    ])
+    db.commit()
+    liked, retweeted, followed = liked.id, retweeted.id, followed.id
+
+    with count_queries() as queries:
+        response = client.post(f"/tweaknow/universes/{ids['universe_id']}/viewer-state", headers=auth_headers,
+                               json={"character_id": actor, "tweak_ids": [followed, liked, retweeted, 0]})
+    assert queries.count == 3
+    state = response.json()
+    assert state["character_id"] == actor
+    assert state["tweaks"] == [
+        {"tweak_id": followed, "liked": False, "retweeted": False, "following_author": True},
+        {"tweak_id": liked, "liked": True, "retweeted": False, "following_author": False},
+        {"tweak_id": retweeted, "liked": False, "retweeted": True, "following_author": False},
+    ]
+
+    # Someone else's character, or none at all
+    other = seed_universe(db, user["id"], characters=1, tweaks=1, seed=16)
+    for character_id in (other["character_ids"][0], 0):
+        response = client.post(f"/tweaknow/universes/{ids['universe_id']}/viewer-state", headers=auth_headers,
+                               json={"character_id": character_id, "tweak_ids": [liked]})
+        assert response.status_code == 404
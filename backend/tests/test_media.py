@@ -0,0 +1,67 @@
+import hashlib
+
+from sqlalchemy import func, select
+
+from app.core import media
+from app.core.config import settings
+from app.models.media import Media
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+JPEG = b"\xff\xd8\xff\xe0" + b"\x01" * 200_000
+
+
+def _upload(client, headers, *parts):
+    return client.post("/media/", headers=headers, files=[("files", part) for part in parts])
+
+
+def test_upload_streams_to_content_addressed_files(client, auth_headers, db):
+    response = _upload(client, auth_headers, ("a.png", PNG, "image/png"), ("b.jpg", JPEG, "application/octet-stream"))
+    assert response.status_code == 201, response.text
+    png, jpeg = response.json()
+
+    assert png["sha256"] == hashlib.sha256(PNG).hexdigest() and png["content_type"] == "image/png"
+    # The type comes from the bytes, not the client
+    assert jpeg["content_type"] == "image/jpeg" and jpeg["size_bytes"] == len(JPEG)
+    assert jpeg["url"].endswith(f"/media/{jpeg['sha256']}.jpg")
+
+    served = client.get(jpeg["url"])
+    assert served.status_code == 200 and served.content == JPEG
+    assert served.headers["content-type"] == "image/jpeg"
+    assert "immutable" in served.headers["cache-control"]
+    # Nothing left behind in the scratch directory
+    assert not any((media.media_root() / "tmp").iterdir())
+
+
+def test_repeated_uploads_share_one_row_and_file(client, auth_headers, db):
+    first = _upload(client, auth_headers, ("x.png", PNG + b"again", "image/png")).json()[0]
+    second = _upload(client, auth_headers, ("y.png", PNG + b"again", "image/png")).json()[0]
+    assert first["id"] == second["id"]
+    assert db.scalar(select(func.count()).select_from(Media).where(Media.sha256 == first["sha256"])) == 1
+
+
+def test_oversized_files_are_cut_off(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_BYTES", 1024)
+    response = _upload(client, auth_headers, ("big.jpg", JPEG, "image/jpeg"))
+    assert response.status_code == 413
+    assert not any((media.media_root() / "tmp").iterdir())
+
+    too_many = _upload(client, auth_headers, *[(f"{n}.png", PNG, "image/png") for n in range(settings.MEDIA_MAX_FILES + 1)])
+    assert too_many.status_code == 413
+
+
+def test_declared_length_is_checked_before_reading(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_BYTES", 1024)
+    response = client.post("/media/", headers={
+        **auth_headers,
+        "Content-Type": "multipart/form-data; boundary=x",
+        "Content-Length": str(10 * 1024 * 1024),
+    }, content=b"")
+    assert response.status_code == 413
+
+
+def test_rejects_non_images_and_non_multipart(client, auth_headers):
+    assert _upload(client, auth_headers, ("notes.txt", b"hello there", "image/png")).status_code == 415
+    assert client.post("/media/", headers=auth_headers, json={"images": ["data:"]}).status_code == 400
+    assert client.post("/media/", files=[("files", ("a.png", PNG, "image/png"))]).status_code == 401
+    assert client.get("/media/../../etc/passwd").status_code == 404
+    assert client.get("/media/" + "0" * 64 + ".png").status_code == 404
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from tests.conftest import seed_universe
+
+CHARACTERS_ROUTE = "/tweaknow/universes/{universe_id}/characters"
+
+
+def _scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def _series(name, route):
+    return f'{name}{{method="GET",route="{route}"}}'
+
+
+def test_requests_show_up_in_the_scrape(client, auth_headers, user, db, count_queries):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=5, seed=31)
+    before = _scrape(client)
+
+    with count_queries() as queries:
+        response = client.get(f"/tweaknow/universes/{ids['universe_id']}/characters", headers=auth_headers)
+    assert response.status_code == 200
+    after = _scrape(client)
+
+    latency = _series("allsocit_http_request_duration_seconds_count", CHARACTERS_ROUTE)
+    assert after[latency] == before.get(latency, 0) + 1
+    sql_count = _series("allsocit_request_db_queries_sum", CHARACTERS_ROUTE)
+    assert after[sql_count] - before.get(sql_count, 0) == queries.count > 0
+
+
+def test_failed_statements_do_not_skew_timings(app):
+    from app.core.database import engine
+    from app.core.metrics import db_query_duration
+
+    with engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.rollback()
+        observed = db_query_duration.count()
+        conn.execute(text("SELECT 1"))
+    assert db_query_duration.count() == observed + 1
+
+
+def test_statements_without_an_execution_context_are_timed(app):
+    from app.core.database import engine
+    from app.core.metrics import db_query_duration
+
+    with engine.connect() as conn:
+        observed = db_query_duration.count()
+        # The path dialects use for their own probes on connect
+        conn._cursor_execute(conn.connection.cursor(), "SELECT 1", ())
+    assert db_query_duration.count() == observed + 1
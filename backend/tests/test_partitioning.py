@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.core import partitioning
+from app.core.database import Base
+from app.crud import tweaknow as crud_tweaknow
+from app.models.tweaknow import Like, Retweet, Tweak
+from app.models.user import User
+from app.schemas.tweaknow import TweakCreate, TweakUpdate
+from tests.conftest import POSTGRES, TEST_DATABASE_URL, seed_universe
+
+SCHEMA = "partition_test"
+
+
+@pytest.fixture
+def scratch(app):
+    """An engine on a schema of its own, holding two seeded universes"""
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        owner = User(email="part@example.com", username="part", hashed_password="x")
+        session.add(owner)
+        session.commit()
+        universes = [seed_universe(session, owner.id, characters=4, tweaks=40, seed=seed) for seed in (1, 2)]
+    try:
+        yield engine, Session, universes
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT * FROM tweaks ORDER BY id")).all()
+
+
+@pytest.mark.skipif(not POSTGRES, reason="Partitioning needs PostgreSQL")
+def test_online_conversion_keeps_every_row_and_write(scratch):
+    engine, Session, (first, second) = scratch
+    partitioning.start(engine, partitions=4)
+    assert partitioning.status(engine)["state"] == "backfilling"
+
+    # Writes between start and swap reach the new table through the trigger
+    with Session() as session:
+        session.query(Tweak).filter(Tweak.id == first["tweak_ids"][1]).update({Tweak.content: "Edited"})
+        session.add(Tweak(universe_id=second["universe_id"], character_id=second["character_ids"][0], content="Late"))
+        session.commit()
+    expected = _rows(engine)
+
+    batches = []
+    partitioning.backfill(engine, batch_size=7, on_batch=lambda *args: batches.append(args))
+    assert len(batches) > 1
+    # Running it again copies nothing twice
+    assert partitioning.backfill(engine, batch_size=50) == 0
+    partitioning.swap(engine)
+
+    assert partitioning.status(engine) == {"state": "partitioned", "old_table": True, "partitions": 4}
+    assert _rows(engine) == expected
+    with Session() as session:
+        created = crud_tweaknow.create_tweak(session, TweakCreate(
+            universe_id=first["universe_id"], character_id=first["character_ids"][0], content="After"
+        ))
+        assert created.id > max(row.id for row in expected)
+        updated = crud_tweaknow.update_tweak(session, created.id, first["universe_id"], TweakUpdate(content="Again"))
+        assert updated.content == "Again"
+        assert crud_tweaknow.update_tweak(session, created.id, second["universe_id"], TweakUpdate(content="x")) is None
+
+    partitioning.drop_old(engine)
+    assert not partitioning.status(engine)["old_table"]
+
+
+@pytest.mark.skipif(not POSTGRES, reason="Partitioning needs PostgreSQL")
+def test_partitioned_table_keeps_foreign_key_rules_and_prunes(scratch):
+    engine, Session, (first, second) = scratch
+    partitioning.start(engine, partitions=4)
+    partitioning.backfill(engine)
+    partitioning.swap(engine)
+
+    with engine.connect() as conn:
+        plan = "\n".join(conn.execute(text(
+            "EXPLAIN SELECT * FROM tweaks WHERE universe_id = :universe_id"
+        ), {"universe_id": first["universe_id"]}).scalars())
+    assert plan.count("tweaks_p") == 1, plan
+
+    with Session() as session:
+        session.add(Retweet(character_id=first["character_ids"][0], tweak_id=10**9))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.rollback()
+
+        retweeted = session.scalar(select(Retweet.tweak_id).join(Tweak, Tweak.id == Retweet.tweak_id).limit(1))
+        with pytest.raises(IntegrityError):
+            session.execute(text("DELETE FROM tweaks WHERE id = :id"), {"id": retweeted})
+        session.rollback()
+
+        # Likes cascade, as their foreign key did
+        quiet = session.scalar(select(Tweak.id).where(
+            Tweak.universe_id == second["universe_id"],
+            ~Tweak.id.in_(select(Retweet.tweak_id)),
+            ~Tweak.id.in_(select(Tweak.reply_to_tweak_id).where(Tweak.reply_to_tweak_id.isnot(None))),
+            ~Tweak.id.in_(select(Tweak.quoted_tweak_id).where(Tweak.quoted_tweak_id.isnot(None))),
+        ).limit(1))
+        session.add(Like(character_id=second["character_ids"][0], tweak_id=quiet))
+        session.commit()
+        assert crud_tweaknow.delete_tweak(session, quiet, second["universe_id"])
+        assert session.scalar(select(Like.id).where(Like.tweak_id == quiet)) is None
+
+
+@pytest.mark.skipif(POSTGRES, reason="SQLite refusal")
+def test_sqlite_is_refused(app):
+    from app.core.database import engine
+
+    with pytest.raises(partitioning.PartitioningError):
+        partitioning.status(engine)
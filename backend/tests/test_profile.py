@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.tweaknow import CharacterFollow, Like, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+
+
+def _profile_universe(db, user_id):
+    universe = Universe(name="Profiles", user_id=user_id)
+    db.add(universe)
+    db.flush()
+    me, other, fan = [TweakNowCharacter(universe_id=universe.id, name=n, username=n) for n in ("me", "other", "fan")]
+    db.add_all([me, other, fan])
+    db.flush()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = [
+        Tweak(universe_id=universe.id, character_id=me.id, content=f"post {i}",
+              images=["pic.png"] if i % 3 == 0 else None,
+              # Story time runs backwards against insertion order for half of them
+              custom_date=start + timedelta(hours=i if i % 2 else -i))
+        for i in range(25)
+    ]
+    db.add_all(posts)
+    db.flush()
+    other_post = Tweak(universe_id=universe.id, character_id=other.id, content="other's post")
+    db.add(other_post)
+    db.flush()
+    replies = [
+        Tweak(universe_id=universe.id, character_id=me.id, content=f"reply {i}", reply_to_tweak_id=other_post.id)
+        for i in range(5)
+    ]
+    db.add_all(replies)
+    db.add_all([
+        CharacterFollow(follower_id=fan.id, following_id=me.id),
+        CharacterFollow(follower_id=me.id, following_id=fan.id),
+        CharacterFollow(follower_id=other.id, following_id=me.id),
+        Like(character_id=me.id, tweak_id=other_post.id),
+        Like(character_id=me.id, tweak_id=posts[0].id),
+    ])
+    db.commit()
+    return universe.id, me.id, other.id, fan.id
+
+
+def _walk(client, auth_headers, path, **params):
+    items, authors, cursor = [], {}, None
+    while True:
+        page = client.get(path, headers=auth_headers, params=dict(params, cursor=cursor) if cursor else params).json()
+        items += page["items"]
+        authors.update({a["id"]: a for a in page["authors"]})
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, authors
+
+
+def test_profile_counts_and_viewer_flags(client, auth_headers, user, db):
+    universe_id, me, other, fan = _profile_universe(db, user["id"])
+    path = f"/tweaknow/universes/{universe_id}/characters/{me}/profile"
+
+    profile = client.get(path, headers=auth_headers, params={"viewer_id": fan}).json()
+    assert profile["character"]["username"] == "me"
+    assert (profile["tweet_count"], profile["reply_count"], profile["media_count"], profile["like_count"]) == (25, 5, 9, 2)
+    assert (profile["followers_count"], profile["following_count"]) == (2, 1)
+    assert profile["followed_by_viewer"] is True and profile["follows_viewer"] is True
+
+    anonymous = client.get(path, headers=auth_headers).json()
+    assert anonymous["followed_by_viewer"] is None
+    assert client.get(f"/tweaknow/universes/{universe_id}/characters/999999/profile",
+                      headers=auth_headers).status_code == 404
+
+
+def test_tabs_page_through_in_story_order(client, auth_headers, user, db):
+    universe_id, me, other, fan = _profile_universe(db, user["id"])
+    path = f"/tweaknow/universes/{universe_id}/characters/{me}/tweaks"
+
+    tweets, _ = _walk(client, auth_headers, path, tab="tweets", limit=4)
+    assert len(tweets) == len({t["id"] for t in tweets}) == 25
+    story = [t["custom_date"] for t in tweets]
+    assert story == sorted(story, reverse=True)
+    assert all(t["reply_to_tweak_id"] is None for t in tweets)
+
+    everything, _ = _walk(client, auth_headers, path, tab="replies", limit=7)
+    assert len(everything) == 30
+
+    media, _ = _walk(client, auth_headers, path, tab="media", limit=2)
+    assert len(media) == 9 and all(t["images"] for t in media)
+
+    likes, authors = _walk(client, auth_headers, path, tab="likes", limit=1)
+    assert [t["content"] for t in likes] == ["post 0", "other's post"]
+    assert set(authors) == {me, other}
+
+
+def test_bad_cursor_is_rejected(client, auth_headers, user, db):
+    universe_id, me, _, _ = _profile_universe(db, user["id"])
+    response = client.get(f"/tweaknow/universes/{universe_id}/characters/{me}/tweaks",
+                          headers=auth_headers, params={"cursor": "nonsense"})
+    assert response.status_code == 400
@@ -0,0 +1,386 @@
+"""
+Query budgets for every API route.
+
+Each route declares the maximum number of SQL statements one request may
+execute. The route is exercised against seeded universes of several sizes;
+it fails if it goes over budget or if its statement count changes with the
+size of the universe (the signature of a per-row lookup).
+"""
+import itertools
+
+import pytest
+
+from tests.conftest import TEST_PASSWORD, seed_universe
+
+UNIVERSE_SIZES = [
+    # (characters, tweaks)
+    (3, 12),
+    (12, 60),
+    (40, 240),
+]
+
+_unique = itertools.count()
+
+
+def _new_character(db, ctx):
+    from app.models.tweaknow import TweakNowCharacter
+
+    character = TweakNowCharacter(universe_id=ctx["universe_id"], name="Extra", username=f"extra{next(_unique)}")
+    db.add(character)
+    db.commit()
+    return {"character_id": character.id}
+
+
+def _new_tweak(db, ctx):
+    from app.models.tweaknow import Tweak
+
+    tweak = Tweak(universe_id=ctx["universe_id"], character_id=ctx["character_ids"][0], content="Disposable")
+    db.add(tweak)
+    db.commit()
+    return {"tweak_id": tweak.id}
+
+
+def _new_retweet(db, ctx):
+    from app.models.tweaknow import Retweet
+
+    ids = _new_tweak(db, ctx)
+    ids["character_id"] = ctx["character_ids"][0]
+    db.add(Retweet(character_id=ids["character_id"], tweak_id=ids["tweak_id"]))
+    db.commit()
+    return ids
+
+
+def _new_like(db, ctx):
+    from app.models.tweaknow import Like
+
+    ids = _new_tweak(db, ctx)
+    ids["character_id"] = ctx["character_ids"][0]
+    db.add(Like(character_id=ids["character_id"], tweak_id=ids["tweak_id"]))
+    db.commit()
+    return ids
+
+
+def _new_follow(db, ctx):
+    from app.models.tweaknow import CharacterFollow
+
+    ids = _new_character(db, ctx)
+    db.add(CharacterFollow(follower_id=ctx["character_ids"][0], following_id=ids["character_id"]))
+    db.commit()
+    return ids
+
+
+def _new_trend(db, ctx):
+    from app.models.tweaknow import Trend
+
+    trend = Trend(universe_id=ctx["universe_id"], name="#disposable")
+    db.add(trend)
+    db.commit()
+    return {"trend_id": trend.id}
+
+
+def _new_template(db, ctx):
+    from app.models.tweaknow import TweakTemplate
+
+    template = TweakTemplate(user_id=ctx["user_id"], name="Disposable")
+    db.add(template)
+    db.commit()
+    return {"template_id": template.id}
+
+
+def _new_universe(db, ctx):
+    return {"universe_id": seed_universe(db, ctx["user_id"], characters=4, tweaks=10)["universe_id"]}
+
+
+def _new_branch(db, ctx):
+    """A branch with one override, one tombstone and one tweet of its own"""
+    from app.crud import branches
+    from app.models.tweaknow import Tweak
+    from app.models.universe import Universe
+
+    parent = db.get(Universe, ctx["universe_id"])
+    branch = branches.create_branch(db, parent, name="What if")
+    branches.update_entity(db, branch, "tweak", ctx["tweak_ids"][0], {"content": "Rewritten"})
+    branches.delete_entity(db, branch, "tweak", ctx["tweak_ids"][1])
+    db.add(Tweak(universe_id=branch.id, character_id=ctx["character_ids"][0], content="Only here",
+                 reply_to_tweak_id=ctx["tweak_ids"][0]))
+    db.commit()
+    return {"branch_id": branch.id}
+
+
+def _warm_index(db, ctx):
+    """Build the mention index up front, so the composer's background build isn't counted"""
+    from app.core import autocomplete
+    from app.models.universe import Universe
+
+    autocomplete.get_index(db, db.get(Universe, ctx["universe_id"]))
+    return {}
+
+
+def _quoting_branch(db, ctx):
+    """A branch that quotes a parent tweet it deleted, so its feed always looks for the quoted tweet"""
+    from app.crud import branches
+    from app.models.tweaknow import Tweak
+    from app.models.universe import Universe
+
+    quoted = _new_tweak(db, ctx)["tweak_id"]
+    ids = _new_branch(db, ctx)
+    branch = db.get(Universe, ids["branch_id"])
+    branches.delete_entity(db, branch, "tweak", quoted)
+    db.add(Tweak(universe_id=branch.id, character_id=ctx["character_ids"][0], content="Quoting",
+                 quoted_tweak_id=quoted))
+    db.commit()
+    return ids
+
+
+def _new_export(db, ctx):
+    from app.crud import export
+    from app.models.universe import Universe
+
+    export.export_universe(db, db.get(Universe, ctx["universe_id"]))
+    return {}
+
+
+def _new_job(db, ctx):
+    from app.crud import jobs
+
+    return {"job_id": jobs.enqueue(db, "test_budget", ctx["user_id"]).id}
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def _new_media(db, ctx):
+    from app.core.media import StoredFile
+
+    stored = StoredFile("pixel.png")
+    stored.head = PNG
+    stored.write(PNG + b"budget")
+    stored.store()
+    return {"media_name": stored.stored_name}
+
+
+class Route:
+    def __init__(self, method, path, budget, setup=None, json=None, data=None, files=None, auth=True, admin=False):
+        self.method = method
+        self.path = path
+        self.budget = budget
+        self.setup = setup
+        self.json = json
+        self.data = data
+        self.files = files
+        self.auth = auth
+        self.admin = admin
+
+    def __repr__(self):
+        return f"{self.method} {self.path}"
+
+
+U = "/tweaknow/universes/{universe_id}"
+
+# Writes that change a universe include one `SELECT pg_notify(...)` for cache invalidation
+ROUTES = [
+    # ===== auth =====
+    Route("POST", "/auth/signup", 4, auth=False, json=lambda ctx: {
+        "email": f"new{next(_unique)}@example.com", "username": f"new{next(_unique)}", "password": "pw",
+    }),
+    Route("POST", "/auth/login", 1, auth=False, data=lambda ctx: {
+        "username": ctx["email"], "password": TEST_PASSWORD,
+    }),
+    Route("GET", "/auth/me", 1),
+
+    # ===== universes =====
+    Route("GET", "/universes/", 2),
+    Route("POST", "/universes/", 3, json=lambda ctx: {"name": "Fresh"}),
+    Route("GET", "/universes/{universe_id}", 2),
+    Route("PUT", "/universes/{universe_id}", 4, json=lambda ctx: {"description": "Updated"}),
+    # Hides the universe and queues the job that deletes its rows
+    Route("DELETE", "/universes/{universe_id}", 8, setup=_new_universe),
+
+    # ===== screen bootstraps =====
+    # Authentication and the universe row, then each part's own queries (on
+    # a cold cache: the latest feed is tweets plus retweets, and the home
+    # viewer state looks up the first character before its flags)
+    Route("GET", "/universes/bootstrap", 5),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=dashboard", 4),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=home", 7),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=home&mode=for_you&character_id={character_id}", 6),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=notifications", 5),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=profile&character_id={character_id}"
+                 "&viewer_id={follower_id}", 5),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=detail&tweak_id={tweak_id}"
+                 "&character_id={character_id}", 6),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=composer", 4, setup=_warm_index),
+    Route("GET", "/universes/{universe_id}/bootstrap?screen=trends", 3),
+
+    # ===== branches =====
+    Route("POST", "/universes/{universe_id}/branches", 5, json=lambda ctx: {"name": "What if"}),
+    Route("GET", "/universes/{universe_id}/branches", 3),
+    Route("POST", "/universes/{branch_id}/merge", 25, setup=_new_branch),
+    Route("DELETE", "/universes/{branch_id}", 8, setup=_new_branch),
+    Route("GET", "/tweaknow/universes/{branch_id}/characters", 3, setup=_new_branch),
+    Route("GET", "/tweaknow/universes/{branch_id}/tweaks", 4, setup=_new_branch),
+    Route("GET", "/universes/{branch_id}/bootstrap?screen=home&character_id={character_id}", 7,
+          setup=_quoting_branch),
+    Route("GET", "/tweaknow/universes/{branch_id}/tweaks/{tweak_id}/thread", 4, setup=_new_branch),
+    Route("GET", "/tweaknow/universes/{branch_id}/tweaks/{tweak_id}/thread/render.zip", 4, setup=_new_branch),
+    Route("PUT", "/tweaknow/universes/{branch_id}/tweaks/{tweak_id}", 8, setup=_new_branch,
+          json=lambda ctx: {"content": "Again"}),
+    Route("DELETE", "/tweaknow/universes/{branch_id}/characters/{character_id}", 9, setup=_new_branch),
+    Route("POST", "/universes/{branch_id}/export", 5, setup=_new_branch),
+
+    # ===== static export =====
+    # Queues (or finds) the export job
+    Route("POST", "/universes/{universe_id}/export", 5),
+    Route("GET", "/universes/{universe_id}/export.zip", 2, setup=_new_export),
+
+    # ===== jobs =====
+    Route("POST", "/universes/{universe_id}/reconcile", 5),
+    Route("GET", "/jobs/", 2),
+    Route("GET", "/jobs/{job_id}", 2, setup=_new_job),
+    Route("POST", "/jobs/{job_id}/cancel", 4, setup=_new_job),
+
+    # ===== characters =====
+    Route("GET", U + "/characters", 3),
+    Route("POST", U + "/characters", 5, json=lambda ctx: {
+        "name": "New", "username": "new", "universe_id": ctx["universe_id"],
+    }),
+    Route("PUT", U + "/characters/{character_id}", 6, setup=_new_character, json=lambda ctx: {"bio": "Updated"}),
+    Route("DELETE", U + "/characters/{character_id}", 6, setup=_new_character),
+
+    # ===== tweaks =====
+    Route("GET", U + "/tweaks", 4),
+    Route("GET", U + "/tweaks/{tweak_id}/thread", 4),
+    # Cards, then their authors; drawing happens outside the database
+    Route("GET", U + "/tweaks/{tweak_id}/render.png?theme=dark", 4),
+    Route("GET", U + "/tweaks/{tweak_id}/thread/render.zip", 4),
+    Route("GET", U + "/tweaks?mode=for_you&character_id={character_id}&limit=100", 4),
+    Route("POST", U + "/tweaks", 5, json=lambda ctx: {
+        "content": "New", "universe_id": ctx["universe_id"], "character_id": ctx["character_ids"][0],
+    }),
+    Route("POST", U + "/tweaks", 7, json=lambda ctx: {
+        "content": "Quote", "universe_id": ctx["universe_id"], "character_id": ctx["character_ids"][0],
+        "quoted_tweak_id": ctx["tweak_ids"][0],
+    }),
+    Route("PUT", U + "/tweaks/{tweak_id}", 6, setup=_new_tweak, json=lambda ctx: {"content": "Updated"}),
+    Route("DELETE", U + "/tweaks/{tweak_id}", 6, setup=_new_tweak),
+
+    # ===== retweets =====
+    Route("POST", U + "/tweaks/{tweak_id}/retweet", 8, setup=_new_tweak, json=lambda ctx: {
+        "character_id": ctx["character_ids"][0], "tweak_id": ctx["tweak_id"],
+    }),
+    Route("DELETE", U + "/tweaks/{tweak_id}/retweet/{character_id}", 6, setup=_new_retweet),
+    Route("GET", U + "/tweaks/{tweak_id}/retweet-status/{character_id}", 3, setup=_new_retweet),
+
+    # ===== likes =====
+    Route("POST", U + "/tweaks/{tweak_id}/like", 7, setup=_new_tweak, json=lambda ctx: {
+        "character_id": ctx["character_ids"][0],
+    }),
+    Route("DELETE", U + "/tweaks/{tweak_id}/like/{character_id}", 6, setup=_new_like),
+    Route("POST", U + "/viewer-state", 3, json=lambda ctx: {
+        "character_id": ctx["character_ids"][0], "tweak_ids": ctx["tweak_ids"][:50],
+    }),
+
+    # ===== impressions =====
+    Route("POST", U + "/impressions", 2, json=lambda ctx: {"tweak_ids": ctx["tweak_ids"][:20] * 3}),
+
+    # ===== autocomplete =====
+    # Universe, characters and hashtagged tweets on first use; later keystrokes only authenticate
+    Route("GET", U + "/autocomplete?q=%40char", 4),
+
+    # ===== templates =====
+    Route("GET", "/tweaknow/templates", 2),
+    Route("POST", "/tweaknow/templates", 3, json=lambda ctx: {"name": "Template"}),
+    Route("DELETE", "/tweaknow/templates/{template_id}", 3, setup=_new_template),
+
+    # ===== follows =====
+    Route("POST", U + "/characters/{follower_id}/follow/{character_id}", 8, setup=_new_character),
+    Route("DELETE", U + "/characters/{follower_id}/unfollow/{character_id}", 5, setup=_new_follow),
+    Route("GET", U + "/characters/{follower_id}/is-following/{character_id}", 5, setup=_new_follow),
+
+    Route("GET", U + "/characters/{character_id}/followers?relative_to={follower_id}", 3, setup=_new_follow),
+    Route("GET", U + "/characters/{follower_id}/following?relative_to={character_id}&limit=2", 3),
+    # Graph candidates, popular fallback, character rows
+    Route("GET", U + "/characters/{follower_id}/suggestions?limit=100", 5),
+
+    # ===== profiles =====
+    # Character row, then every count in one aggregate
+    Route("GET", U + "/characters/{character_id}/profile?viewer_id={follower_id}", 4),
+    Route("GET", U + "/characters/{character_id}/tweaks?tab=tweets&limit=100", 3),
+    Route("GET", U + "/characters/{character_id}/tweaks?tab=replies&limit=100", 3),
+    Route("GET", U + "/characters/{character_id}/tweaks?tab=media&limit=100", 3),
+    Route("GET", U + "/characters/{follower_id}/tweaks?tab=likes&limit=100", 3),
+
+    # ===== media =====
+    # User lookup, insert, then the rows back
+    Route("POST", "/media/", 3, files=lambda ctx: [
+        ("files", (f"{n}.png", PNG + bytes([n]), "image/png")) for n in range(4)
+    ]),
+    Route("GET", "/media/{media_name}", 0, auth=False, setup=_new_media),
+
+    # ===== trends =====
+    Route("GET", U + "/trends", 3),
+    Route("POST", U + "/trends", 5, json=lambda ctx: {"name": "#new", "tweet_count": 5, "universe_id": ctx["universe_id"]}),
+    Route("PUT", U + "/trends/{trend_id}", 6, setup=_new_trend, json=lambda ctx: {"tweet_count": 99}),
+    Route("DELETE", U + "/trends/{trend_id}", 5, setup=_new_trend),
+
+    # ===== admin =====
+    # Finds the cold universes; each one found adds its job's queries
+    Route("POST", "/admin/archive?older_than_days=36500", 2, admin=True),
+]
+
+
+@pytest.fixture(scope="module")
+def universes(app, user):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        return [
+            seed_universe(session, user["id"], characters, tweaks, seed=index)
+            for index, (characters, tweaks) in enumerate(UNIVERSE_SIZES)
+        ]
+    finally:
+        session.close()
+
+
+def _request(client, headers, route, ctx, count_queries):
+    kwargs = {}
+    if route.auth:
+        kwargs["headers"] = headers
+    if route.json is not None:
+        kwargs["json"] = route.json(ctx)
+    if route.data is not None:
+        kwargs["data"] = route.data(ctx)
+    if route.files is not None:
+        kwargs["files"] = route.files(ctx)
+    path = route.path.format(**ctx)
+
+    with count_queries() as queries:
+        response = client.request(route.method, path, **kwargs)
+    assert response.status_code < 400, f"{route}: {response.status_code} {response.text}"
+    return queries
+
+
+@pytest.mark.parametrize("route", ROUTES, ids=repr)
+def test_route_stays_within_query_budget(
+    client, auth_headers, user, universes, db, count_queries, monkeypatch, route
+):
+    if route.admin:
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "ADMIN_EMAILS", user["email"])
+    counts = []
+    for seeded in universes:
+        ctx = dict(seeded, user_id=user["id"], email=user["email"], follower_id=seeded["character_ids"][0])
+        ctx.setdefault("tweak_id", seeded["tweak_ids"][0])
+        ctx.setdefault("character_id", seeded["character_ids"][-1])
+        if route.setup is not None:
+            ctx.update(route.setup(db, ctx))
+
+        queries = _request(client, auth_headers, route, ctx, count_queries)
+        assert queries.count <= route.budget, (
+            f"{route} ran {queries.count} queries (budget {route.budget}):\n" + "\n".join(queries.statements)
+        )
+        counts.append(queries.count)
+
+    assert len(set(counts)) == 1, f"{route} query count grows with universe size: {counts}"
@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.ranking import CANDIDATE_COLUMNS, resolve_weights, score_candidates, top_k
+from app.models.tweaknow import CharacterFollow, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+from tests.conftest import seed_universe
+
+
+# ===== scoring =====
+def _synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {
+        "id": np.arange(n),
+        "character_id": rng.integers(1, 3000, n),
+        "like_count": rng.integers(0, 5000, n),
+        "retweet_count": rng.integers(0, 500, n),
+        "quote_count": rng.integers(0, 100, n),
+        "comment_count": rng.integers(0, 300, n),
+        "view_count": rng.integers(0, 100000, n),
+        "story_time": 1.7e9 - rng.integers(0, 90 * 86400, n),
+        "followed": rng.integers(0, 2, n),
+        "author_followers": rng.integers(0, 10000, n),
+        "quoted_tweak_id": np.zeros(n),
+    }
+    return np.column_stack([columns[name] for name in CANDIDATE_COLUMNS]).astype(np.float64)
+
+
+def test_each_signal_moves_the_score():
+    base = dict(id=1, character_id=10, like_count=5, retweet_count=0, quote_count=0, comment_count=0,
+                view_count=0, story_time=1_000_000.0, followed=0, author_followers=3, quoted_tweak_id=0)
+    variants = [
+        base,
+        {**base, "id": 2, "like_count": 500},
+        {**base, "id": 3, "story_time": 1_000_000.0 + 86400},
+        {**base, "id": 4, "followed": 1},
+        {**base, "id": 5, "author_followers": 300},
+    ]
+    matrix = np.array([[row[name] for name in CANDIDATE_COLUMNS] for row in variants], dtype=np.float64)
+    scores = score_candidates(matrix, viewer_id=99, weights=resolve_weights(None))
+    assert all(scores[i] > scores[0] for i in range(1, 5))
+
+
+def test_weights_override_defaults_and_reorder():
+    assert resolve_weights({"recency": 0, "unknown": 5})["recency"] == 0.0
+    matrix = _synthetic(1000)
+    by_recency = top_k(score_candidates(matrix, 1, resolve_weights({"engagement": 0, "proximity": 0, "popularity": 0})), 5)
+    newest = np.argsort(-matrix[:, CANDIDATE_COLUMNS.index("story_time")], kind="stable")[:5]
+    assert set(by_recency) == set(newest)
+
+
+def test_top_k_is_sorted_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3])
+    assert list(top_k(scores, 3)) == [1, 3, 2]
+    assert list(top_k(scores, 10)) == [1, 3, 2, 4, 0]
+
+
+def test_ranks_fifty_thousand_candidates_in_milliseconds():
+    matrix = _synthetic(50_000)
+    weights = resolve_weights(None)
+    score_candidates(matrix, 1, weights)
+    started = time.perf_counter()
+    top_k(score_candidates(matrix, 1, weights), 50)
+    # Typically ~2ms; the bound leaves room for slow CI machines
+    assert time.perf_counter() - started < 0.05
+
+
+# ===== API =====
+def test_for_you_feed_prefers_followed_authors_and_honours_weights(client, auth_headers, user, db):
+    universe = Universe(name="Ranked", user_id=user["id"])
+    db.add(universe)
+    db.flush()
+    me, friend, stranger = [TweakNowCharacter(universe_id=universe.id, name=n, username=n) for n in ("me", "friend", "stranger")]
+    db.add_all([me, friend, stranger])
+    db.flush()
+    db.add(CharacterFollow(follower_id=me.id, following_id=friend.id))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    old_friend_post = Tweak(universe_id=universe.id, character_id=friend.id, content="old", custom_date=start)
+    new_stranger_post = Tweak(universe_id=universe.id, character_id=stranger.id, content="new",
+                              custom_date=start + timedelta(days=1))
+    db.add_all([old_friend_post, new_stranger_post])
+    db.flush()
+    db.add(Tweak(universe_id=universe.id, character_id=stranger.id, content="reply",
+                 reply_to_tweak_id=new_stranger_post.id, custom_date=start + timedelta(days=3)))
+    db.commit()
+    universe_id, me_id = universe.id, me.id
+
+    path = f"/tweaknow/universes/{universe_id}/tweaks"
+    params = {"mode": "for_you", "character_id": me_id}
+    feed = client.get(path, headers=auth_headers, params=params).json()
+    assert [item["tweak"]["content"] for item in feed] == ["old", "new"]
+    assert feed[0]["score"] > feed[1]["score"]
+
+    updated = client.put(f"/universes/{universe_id}", headers=auth_headers,
+                         json={"ranking_weights": {"proximity": 0}})
+    assert updated.json()["ranking_weights"] == {"proximity": 0.0}
+    feed = client.get(path, headers=auth_headers, params=params).json()
+    assert [item["tweak"]["content"] for item in feed] == ["new", "old"]
+
+
+def test_for_you_requires_a_character(client, auth_headers, user, db):
+    universe = Universe(name="Ranked", user_id=user["id"])
+    db.add(universe)
+    db.commit()
+    response = client.get(f"/tweaknow/universes/{universe.id}/tweaks", headers=auth_headers,
+                          params={"mode": "for_you"})
+    assert response.status_code == 422
+
+
+def test_for_you_rejects_a_character_from_another_universe(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=2, tweaks=5, seed=52)
+    other = seed_universe(db, user["id"], characters=1, tweaks=1, seed=53)
+    for character_id in (other["character_ids"][0], 0):
+        response = client.get(f"/tweaknow/universes/{ids['universe_id']}/tweaks", headers=auth_headers,
+                              params={"mode": "for_you", "character_id": character_id})
+        assert response.status_code == 404
+        response = client.get(f"/universes/{ids['universe_id']}/bootstrap", headers=auth_headers,
+                              params={"screen": "home", "mode": "for_you", "character_id": character_id})
+        assert response.status_code == 404
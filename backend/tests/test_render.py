@@ -0,0 +1,95 @@
+import io
+import zipfile
+
+from PIL import Image
+
+from app.core import render
+from app.models.tweaknow import Tweak
+from tests.conftest import seed_universe
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _card_url(ids, tweak_id, **params):
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    return f"/tweaknow/universes/{ids['universe_id']}/tweaks/{tweak_id}/render.png?{query}"
+
+
+def test_card_renders_once_per_input(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=5, seed=21)
+    tweak_id = ids["tweak_ids"][0]
+
+    light = client.get(_card_url(ids, tweak_id, theme="light"), headers=auth_headers)
+    assert light.status_code == 200 and light.headers["content-type"] == "image/png"
+    image = Image.open(io.BytesIO(light.content))
+    assert image.width == render.WIDTH * render.SCALE
+    assert image.getpixel((1, 1)) == (255, 255, 255)
+    dark = client.get(_card_url(ids, tweak_id, theme="dark"), headers=auth_headers)
+    assert Image.open(io.BytesIO(dark.content)).getpixel((1, 1)) == (0, 0, 0)
+
+    # Unchanged inputs: same key, nothing redrawn
+    path = render.cache_path(light.headers["etag"].strip('"'))
+    drawn_at = path.stat().st_mtime_ns
+    again = client.get(_card_url(ids, tweak_id, theme="light"), headers=auth_headers)
+    assert again.headers["etag"] == light.headers["etag"] and path.stat().st_mtime_ns == drawn_at
+    not_modified = client.get(_card_url(ids, tweak_id, theme="light"),
+                              headers={**auth_headers, "If-None-Match": light.headers["etag"]})
+    assert not_modified.status_code == 304
+
+    client.put(f"/tweaknow/universes/{ids['universe_id']}/tweaks/{tweak_id}", headers=auth_headers,
+               json={"like_count": 123456})
+    edited = client.get(_card_url(ids, tweak_id, theme="light"), headers=auth_headers)
+    assert edited.headers["etag"] != light.headers["etag"]
+
+    assert client.get(_card_url(ids, tweak_id, theme="sepia"), headers=auth_headers).status_code == 422
+    assert client.get(_card_url(ids, 10**9), headers=auth_headers).status_code == 404
+
+
+def test_thread_renders_to_a_zip_in_story_order(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=4, tweaks=5, seed=22)
+    root = db.get(Tweak, ids["tweak_ids"][0])
+    parent_id, reply_ids = root.id, []
+    for n in range(12):
+        reply = Tweak(universe_id=ids["universe_id"], character_id=ids["character_ids"][n % 4],
+                      content=f"Reply {n}", reply_to_tweak_id=parent_id)
+        db.add(reply)
+        db.flush()
+        reply_ids.append(reply.id)
+        if n % 2:
+            parent_id = reply.id
+    db.commit()
+    expected = [root.id] + [
+        t.id for t in db.query(Tweak).filter(Tweak.id.in_(reply_ids)).order_by(Tweak.created_at, Tweak.id)
+    ]
+
+    response = client.get(f"/tweaknow/universes/{ids['universe_id']}/tweaks/{root.id}/thread/render.zip?theme=dim",
+                          headers=auth_headers)
+    assert response.status_code == 200 and response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    assert sorted(int(name.split("-")[1].split(".")[0]) for name in names) == sorted(expected)
+    assert names[0] == f"000-{root.id}.png"
+    assert all(archive.read(name).startswith(PNG_SIGNATURE) for name in names)
+
+
+def test_branch_cards_show_the_branch(client, auth_headers, user, db):
+    ids = seed_universe(db, user["id"], characters=3, tweaks=5, seed=23)
+    tweak_id = ids["tweak_ids"][0]
+    parent = client.get(_card_url(ids, tweak_id), headers=auth_headers)
+    branch_id = client.post(f"/universes/{ids['universe_id']}/branches", headers=auth_headers,
+                            json={"name": "What if"}).json()["id"]
+    unchanged = client.get(_card_url({"universe_id": branch_id}, tweak_id), headers=auth_headers)
+    assert unchanged.headers["etag"] == parent.headers["etag"]
+
+    client.put(f"/tweaknow/universes/{branch_id}/tweaks/{tweak_id}", headers=auth_headers,
+               json={"content": "It went differently"})
+    rewritten = client.get(_card_url({"universe_id": branch_id}, tweak_id), headers=auth_headers)
+    assert rewritten.headers["etag"] != parent.headers["etag"]
+
+
+def test_card_layout_helpers():
+    assert [render.format_count(n) for n in (999, 1000, 1240, 2_500_000)] == ["999", "1K", "1.2K", "2.5M"]
+    assert render.format_timestamp("2026-10-19T15:45:00") == "3:45 PM · Oct 19, 26"
+    font = render._font(18)
+    lines = render._wrap("word " * 60 + "x" * 300, font, 400)
+    assert all(font.getlength(line) <= 400 for line in lines)
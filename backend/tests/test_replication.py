@@ -0,0 +1,131 @@
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.core.replication import ReplicaRouter, format_lsn, parse_lsn
+
+
+def test_lsn_round_trip_and_ordering():
+    assert format_lsn(parse_lsn("16/B374D848")) == "16/B374D848"
+    assert parse_lsn("0/10") < parse_lsn("0/FF") < parse_lsn("1/0")
+    assert parse_lsn("garbage") is None and parse_lsn(None) is None
+
+
+@pytest.fixture
+def engines(tmp_path):
+    return [create_engine(f"sqlite:///{tmp_path / name}.db") for name in ("primary", "replica_a", "replica_b")]
+
+
+def _router(engines, positions, sticky_seconds=60):
+    router = ReplicaRouter(engines[0], engines[1:], sticky_seconds)
+    router.replay_lsn = lambda index: positions[index]
+    return router
+
+
+def test_reads_without_recent_writes_use_replicas(engines):
+    router = _router(engines, {0: None, 1: None})
+    assert {router.choose("alice") for _ in range(4)} == set(engines[1:])
+
+
+def test_writer_reads_from_a_replica_only_once_it_caught_up(engines):
+    positions = {0: parse_lsn("0/100"), 1: parse_lsn("0/50")}
+    router = _router(engines, positions)
+    router.note_write("alice", parse_lsn("0/80"))
+
+    assert {router.choose("alice") for _ in range(4)} == {engines[1]}
+    assert router.choose("bob") in engines[1:]
+
+    positions[0] = parse_lsn("0/10")
+    assert router.choose("alice") is engines[0]
+
+
+def test_writer_without_lsn_is_pinned_to_primary_for_the_window(engines):
+    router = _router(engines, {0: None, 1: None}, sticky_seconds=0)
+    router.note_write("alice", None)
+    assert router.choose("alice") in engines[1:]
+
+    router.sticky_seconds = 60
+    assert router.choose("alice") is engines[0]
+
+
+def test_client_supplied_lsn_is_honoured_across_workers(engines):
+    router = _router(engines, {0: parse_lsn("0/10"), 1: parse_lsn("0/20")})
+    assert router.choose("alice", min_lsn=parse_lsn("0/15")) is engines[2]
+    assert router.choose("alice", min_lsn=parse_lsn("0/30")) is engines[0]
+
+
+def test_no_replicas_means_primary(engines):
+    assert ReplicaRouter(engines[0], [], 5).choose("alice") is engines[0]
+
+
+@pytest.fixture
+def replica_router(app, monkeypatch):
+    """Route reads to a second engine on the test database, which is not a standby."""
+    from app.core import database
+
+    if database.engine.dialect.name != "postgresql":
+        pytest.skip("needs Postgres WAL positions")
+    replica = create_engine(database.engine.url)
+    router = ReplicaRouter(database.engine, [replica], sticky_seconds=60)
+    monkeypatch.setattr(database, "router", router)
+    yield replica
+    replica.dispose()
+
+
+def test_own_writes_are_read_from_primary(client, auth_headers, db, user, replica_router):
+    from tests.conftest import seed_universe
+
+    universe_id = seed_universe(db, user["id"], characters=2, tweaks=2)["universe_id"]
+    path = f"/tweaknow/universes/{universe_id}/characters"
+    replica_reads = []
+    event.listen(replica_router, "after_cursor_execute", lambda *args: replica_reads.append(args[2]))
+
+    # A reader that has not written anything is served by the replica
+    assert client.get(path, headers=auth_headers).status_code == 200
+    assert replica_reads
+
+    created = client.post(path, headers=auth_headers, json={
+        "name": "Fresh", "username": "fresh", "universe_id": universe_id,
+    })
+    assert created.status_code == 201
+    assert parse_lsn(created.headers["x-write-lsn"]) is not None
+
+    # The test replica never replays WAL, so the writer must now be served by the primary
+    replica_reads.clear()
+    response = client.get(path, headers=auth_headers)
+    assert "fresh" in [c["username"] for c in response.json()]
+    assert all("pg_last_wal_replay_lsn" in statement for statement in replica_reads)
+
+
+def test_opening_a_universe_does_not_pin_the_reader(client, auth_headers, db, user, replica_router):
+    from datetime import datetime, timedelta, timezone
+
+    from app.core import database
+    from app.models.universe import Universe
+    from tests.conftest import seed_universe
+
+    universe_id = seed_universe(db, user["id"], characters=2, tweaks=2)["universe_id"]
+    stale = datetime.now(timezone.utc) - timedelta(days=30)
+    db.query(Universe).filter(Universe.id == universe_id).update({Universe.last_accessed_at: stale})
+    db.commit()
+
+    assert client.get(f"/tweaknow/universes/{universe_id}/characters", headers=auth_headers).status_code == 200
+    db.expire_all()
+    assert db.get(Universe, universe_id).last_accessed_at > stale
+    assert not database.router._last_writes
+
+
+def test_writes_outside_a_request_skip_the_wal_lookup(app, engines, monkeypatch):
+    from sqlalchemy import update
+
+    from app.core import database
+    from app.models.universe import Universe
+
+    router = ReplicaRouter(database.engine, engines[1:], sticky_seconds=60)
+    lookups = []
+    router.primary_lsn = lambda: lookups.append(True)
+    monkeypatch.setattr(database, "router", router)
+
+    with database.SessionLocal() as session:
+        session.execute(update(Universe).where(Universe.id == -1).values(name="nobody"))
+        session.commit()
+    assert lookups == []
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.startup import SchemaRevisionError, check_schema_revision, expected_heads
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+
+
+def _stamp(engine, revision):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        connection.execute(text("DELETE FROM alembic_version"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+def test_unmigrated_database_is_rejected(sqlite_engine):
+    with pytest.raises(SchemaRevisionError, match="alembic upgrade head"):
+        check_schema_revision(sqlite_engine, mode="strict")
+
+
+def test_stale_revision_is_rejected_or_logged(sqlite_engine, caplog):
+    _stamp(sqlite_engine, "2f950d03b3e0")
+    with pytest.raises(SchemaRevisionError):
+        check_schema_revision(sqlite_engine, mode="strict")
+
+    check_schema_revision(sqlite_engine, mode="warn")
+    assert "2f950d03b3e0" in caplog.text
+
+
+def test_head_revision_passes(sqlite_engine):
+    (head,) = expected_heads()
+    _stamp(sqlite_engine, head)
+    check_schema_revision(sqlite_engine, mode="strict")
+
+
+def test_check_can_be_disabled(sqlite_engine):
+    check_schema_revision(sqlite_engine, mode="off")
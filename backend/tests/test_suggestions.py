@@ -0,0 +1,79 @@
+from app.models.tweaknow import CharacterFollow, Retweet, Tweak, TweakNowCharacter
+from app.models.universe import Universe
+
+
+def _cast(db, user_id, size):
+    universe = Universe(name="Suggestions", user_id=user_id)
+    db.add(universe)
+    db.flush()
+    cast = [TweakNowCharacter(universe_id=universe.id, name=f"S{i}", username=f"s{i}") for i in range(size)]
+    db.add_all(cast)
+    db.flush()
+    return universe.id, [c.id for c in cast]
+
+
+def _follow(db, pairs):
+    db.add_all(CharacterFollow(follower_id=a, following_id=b) for a, b in pairs)
+    db.commit()
+
+
+def test_friends_of_friends_rank_first_and_followed_are_excluded(client, auth_headers, user, db):
+    universe_id, (me, friend_a, friend_b, shared, single, loner, famous, *fans) = _cast(db, user["id"], 12)
+    _follow(db, [
+        (me, friend_a), (me, friend_b),
+        (friend_a, shared), (friend_b, shared),
+        (friend_a, single),
+    ] + [(fan, famous) for fan in fans])
+
+    path = f"/tweaknow/universes/{universe_id}/characters/{me}/suggestions"
+    ranked = client.get(path, headers=auth_headers, params={"limit": 50}).json()
+    order = [item["character"]["id"] for item in ranked]
+
+    assert order[:2] == [shared, single]
+    assert ranked[0]["mutual_count"] == 2
+    assert order[2] == famous  # popularity breaks the tie among strangers
+    assert me not in order and friend_a not in order and friend_b not in order
+    assert loner in order
+
+
+def test_engagement_counts_in_both_directions(client, auth_headers, user, db):
+    universe_id, (me, author, fan, stranger) = _cast(db, user["id"], 4)
+    post = Tweak(universe_id=universe_id, character_id=author, content="Hot take")
+    mine = Tweak(universe_id=universe_id, character_id=me, content="My take")
+    db.add_all([post, mine])
+    db.flush()
+    db.add_all([Retweet(character_id=me, tweak_id=post.id), Retweet(character_id=fan, tweak_id=mine.id)])
+    db.commit()
+
+    ranked = client.get(f"/tweaknow/universes/{universe_id}/characters/{me}/suggestions",
+                        headers=auth_headers).json()
+    engagement = {item["character"]["id"]: item["engagement_count"] for item in ranked}
+    assert engagement == {author: 1, fan: 1, stranger: 0}
+    assert ranked[-1]["character"]["id"] == stranger
+
+
+def test_suggestions_are_cached_until_a_follow_changes(client, auth_headers, user, db, count_queries):
+    universe_id, (me, friend, target, other) = _cast(db, user["id"], 4)
+    _follow(db, [(me, friend), (friend, target)])
+    path = f"/tweaknow/universes/{universe_id}/characters/{me}/suggestions"
+
+    first = client.get(path, headers=auth_headers).json()
+    with count_queries() as queries:
+        assert client.get(path, headers=auth_headers).json() == first
+    assert queries.count == 2
+    assert first[0]["character"]["id"] == target
+
+    client.post(f"/tweaknow/universes/{universe_id}/characters/{me}/follow/{target}", headers=auth_headers)
+    after = client.get(path, headers=auth_headers).json()
+    assert target not in [item["character"]["id"] for item in after]
+
+
+def test_characters_outside_the_universe_are_not_found(client, auth_headers, user, db):
+    universe_id, _ = _cast(db, user["id"], 3)
+    _, (stranger,) = _cast(db, user["id"], 1)
+    db.commit()
+
+    path = f"/tweaknow/universes/{universe_id}/characters/{stranger}/suggestions"
+    assert client.get(path, headers=auth_headers).status_code == 404
+    # Not cached either: the miss is rebuilt and refused again
+    assert client.get(path, headers=auth_headers).status_code == 404
@@ -0,0 +1,87 @@
+"""
+Background job workers (app/core/jobs.py) as their own processes.
+
+    JOB_THREADS=0 python worker.py --processes 4
+
+Run API processes with JOB_THREADS=0 when this is running, so that jobs
+only run here. Each process polls the jobs table; they share nothing but
+the database, so they can be spread over several machines. Processes that
+die are restarted. On SIGTERM/SIGINT every process finishes the attempt it
+is on (its heartbeat keeps the job's lease) and exits; a job interrupted
+harder than that is retried once its lease expires.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from typing import List
+
+logger = logging.getLogger("allsocit.worker")
+
+
+def worker_main(index: int, log_level: str):
+    logging.basicConfig(level=log_level.upper(), format=f"%(asctime)s [jobs {index}] %(name)s: %(message)s")
+    from app.core.jobs import work, worker_name
+    from app.core.workers import shutdown_pool
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    try:
+        work(worker_name(), stop)
+    finally:
+        shutdown_pool()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--check-interval", type=float, default=1.0, help="supervisor poll interval in seconds")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [supervisor] %(message)s")
+
+    from app.core.config import settings
+    if settings.DATABASE_URL.startswith("sqlite") and args.processes > 1:
+        # Export locks are per-process on SQLite (app/core/dialect.py)
+        logger.warning("SQLite allows one writer: starting 1 worker process instead of %d", args.processes)
+        args.processes = 1
+
+    context = multiprocessing.get_context("spawn")
+    should_exit = False
+
+    def handle_exit(signum, frame):
+        nonlocal should_exit
+        should_exit = True
+
+    signal.signal(signal.SIGTERM, handle_exit)
+    signal.signal(signal.SIGINT, handle_exit)
+
+    def spawn(index: int):
+        process = context.Process(target=worker_main, args=(index, args.log_level), name=f"jobs-{index}")
+        process.start()
+        logger.info("started job worker %s", process.pid)
+        return process
+
+    processes: List = [spawn(index) for index in range(args.processes)]
+    while not should_exit:
+        time.sleep(args.check_interval)
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not should_exit:
+                logger.warning("job worker %s exited with %s, restarting", process.pid, process.exitcode)
+                processes[index] = spawn(index)
+
+    for process in processes:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import { Tweak, TweakNowCharacter } from "../types/tweaknow";
+import { FeedItem } from "../components/TweakNow/FeedList";
+
+// Scripted scroll benchmark for the home feed (screens/FeedBenchmarkScreen):
+// a synthetic feed, scrolled at a fixed speed one step per animation frame,
+// with every frame's duration recorded. A frame that took n refresh
+// intervals instead of one dropped n - 1 frames.
+//
+// Frames are timed with requestAnimationFrame, i.e. on the JS thread, which
+// is where list rendering happens; for UI-thread frames use the platform
+// profiler (Android GPU rendering bars, Xcode Instruments) alongside.
+
+const FRAME_MS = 1000 / 60;
+
+// 8x8 PNGs in four colours, so that images repeat like avatars do
+const PIXEL_PNGS = [
+  "iVBORw0KGgoAAAANSUhEUgAAAAgAAAAICAIAAABLbSncAAAAEUlEQVR42mOQXfgJK2IYWhIA/e9sAZnf7t4AAAAASUVORK5CYII=",
+  "iVBORw0KGgoAAAANSUhEUgAAAAgAAAAICAIAAABLbSncAAAAEUlEQVR42mP4KdGAFTEMLQkASlFkQaGIARUAAAAASUVORK5CYII=",
+  "iVBORw0KGgoAAAANSUhEUgAAAAgAAAAICAIAAABLbSncAAAAEElEQVR42mNg2FWDHQ0tCQApik2BAG7aDgAAAABJRU5ErkJggg==",
+  "iVBORw0KGgoAAAANSUhEUgAAAAgAAAAICAIAAABLbSncAAAAEUlEQVR42mP4f50BK2IYWhIAKTp1gauHiA8AAAAASUVORK5CYII=",
+].map((payload) => `data:image/png;base64,${payload}`);
+
+const WORDS = (
+  "the council vote was delayed again after the storm knocked out power across " +
+  "the harbour district and nobody can agree who should pay for the repairs"
+).split(" ");
+
+// Deterministic, so runs are comparable
+const random = (seed: number) => () => {
+  seed = (seed * 1103515245 + 12345) & 0x7fffffff;
+  return seed / 0x7fffffff;
+};
+
+export interface SyntheticFeed {
+  characters: TweakNowCharacter[];
+  items: FeedItem[];
+}
+
+export const makeSyntheticFeed = (count = 5000, seed = 1): SyntheticFeed => {
+  const rand = random(seed);
+  const characters: TweakNowCharacter[] = Array.from({ length: 25 }, (_, i) => ({
+    id: i + 1,
+    universe_id: 0,
+    name: `Character ${i + 1}`,
+    username: `character${i + 1}`,
+    official_mark: (["None", "Blue", "Gold", "Grey"] as const)[i % 4],
+    is_private: i % 9 === 0,
+    profile_picture: i % 3 === 0 ? undefined : PIXEL_PNGS[i % PIXEL_PNGS.length],
+    created_at: "2024-01-01T00:00:00Z",
+  }));
+  const start = Date.parse("2024-01-01T00:00:00Z");
+  const tweets: Tweak[] = [];
+  const items: FeedItem[] = [];
+  for (let i = 0; i < count; i++) {
+    const words = 4 + Math.floor(rand() * 45);
+    const tweak: Tweak = {
+      id: i + 1,
+      universe_id: 0,
+      character_id: characters[Math.floor(rand() * characters.length)].id,
+      content: Array.from({ length: words }, () => WORDS[Math.floor(rand() * WORDS.length)]).join(" "),
+      images:
+        i % 5 === 0
+          ? PIXEL_PNGS.slice(0, 1 + Math.floor(rand() * 3))
+          : undefined,
+      comment_count: Math.floor(rand() * 50),
+      retweet_count: Math.floor(rand() * 500),
+      quote_count: Math.floor(rand() * 20),
+      like_count: Math.floor(rand() * 5000),
+      view_count: Math.floor(rand() * 100000),
+      source_label: "Twitter for iPhone",
+      created_at: new Date(start + i * 60000).toISOString(),
+    };
+    tweets.push(tweak);
+    const quoted = i % 7 === 0 && i > 0 ? tweets[Math.floor(rand() * i)] : null;
+    const retweet = i % 9 === 0;
+    items.push({
+      type: retweet ? "retweet" : "tweet",
+      tweak,
+      quoted_tweak: quoted,
+      retweeted_by_character_id: retweet ? characters[i % characters.length].id : null,
+      timestamp: tweak.created_at,
+    });
+  }
+  return { characters, items: items.reverse() };
+};
+
+export interface ScrollResult {
+  frames: number;
+  droppedFrames: number;
+  droppedPercent: number;
+  durationMs: number;
+  fps: number;
+  p50FrameMs: number;
+  p95FrameMs: number;
+  p99FrameMs: number;
+  worstFrameMs: number;
+}
+
+const percentile = (sorted: number[], p: number) =>
+  sorted.length === 0 ? 0 : sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+
+export const summarizeFrames = (frameTimes: number[]): ScrollResult => {
+  const sorted = [...frameTimes].sort((a, b) => a - b);
+  const durationMs = frameTimes.reduce((sum, ms) => sum + ms, 0);
+  const dropped = frameTimes.reduce(
+    (sum, ms) => sum + Math.max(0, Math.round(ms / FRAME_MS) - 1),
+    0,
+  );
+  const round = (value: number) => Math.round(value * 10) / 10;
+  return {
+    frames: frameTimes.length,
+    droppedFrames: dropped,
+    droppedPercent: round((100 * dropped) / Math.max(1, frameTimes.length + dropped)),
+    durationMs: Math.round(durationMs),
+    fps: round((1000 * frameTimes.length) / Math.max(1, durationMs)),
+    p50FrameMs: round(percentile(sorted, 50)),
+    p95FrameMs: round(percentile(sorted, 95)),
+    p99FrameMs: round(percentile(sorted, 99)),
+    worstFrameMs: round(sorted[sorted.length - 1] ?? 0),
+  };
+};
+
+/**
+ * Scroll `scrollTo` from 0 by `pixelsPerFrame` each frame until `distance`
+ * or `maxFrames`; resolves with the frame statistics. `stop()` on the
+ * returned handle ends the run early.
+ */
+export const runScroll = (
+  scrollTo: (offset: number) => void,
+  options: { distance: number; pixelsPerFrame?: number; maxFrames?: number },
+) => {
+  const speed = options.pixelsPerFrame ?? 40;
+  const maxFrames = options.maxFrames ?? 3600;
+  const frameTimes: number[] = [];
+  let stopped = false;
+  let offset = 0;
+  let last: number | null = null;
+
+  const done = new Promise<ScrollResult>((resolve) => {
+    const step = (now: number) => {
+      if (last !== null) frameTimes.push(now - last);
+      last = now;
+      if (stopped || offset >= options.distance || frameTimes.length >= maxFrames) {
+        resolve(summarizeFrames(frameTimes));
+        return;
+      }
+      offset += speed;
+      scrollTo(offset);
+      requestAnimationFrame(step);
+    };
+    requestAnimationFrame(step);
+  });
+  return {
+    done,
+    stop: () => {
+      stopped = true;
+    },
+  };
+};
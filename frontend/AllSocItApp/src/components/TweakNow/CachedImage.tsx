@@ -0,0 +1,21 @@
+import React from "react";
+import { Image, ImageProps, StyleProp, View, ViewStyle } from "react-native";
+import { useCachedImageUri } from "../../services/imageCache";
+
+type CachedImageProps = Omit<ImageProps, "source"> & { uri: string };
+
+// <Image> for tweet and profile pictures, shown from the on-disk cache
+// (services/imageCache.ts); an empty box of the same size until it is ready
+function CachedImage({ uri, style, ...props }: CachedImageProps) {
+  const resolved = useCachedImageUri(uri);
+  if (!resolved) {
+    return (
+      <View
+        style={[style as StyleProp<ViewStyle>, { backgroundColor: "rgba(127,127,127,0.15)" }]}
+      />
+    );
+  }
+  return <Image source={{ uri: resolved }} style={style} {...props} />;
+}
+
+export default React.memo(CachedImage);
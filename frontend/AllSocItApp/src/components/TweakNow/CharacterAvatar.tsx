@@ -1,5 +1,6 @@
 import React from "react";
-import { View, Image, Text, StyleSheet } from "react-native";
+import { View, Text, StyleSheet } from "react-native";
+import CachedImage from "./CachedImage";
 
 interface CharacterAvatarProps {
   name: string;
@@ -9,7 +10,7 @@ interface CharacterAvatarProps {
   showName?: boolean;
 }
 
-export default function CharacterAvatar({
+function CharacterAvatar({
   name,
   username,
   profilePicture,
@@ -34,8 +35,8 @@ export default function CharacterAvatar({
         ]}
       >
         {profilePicture ? (
-          <Image
-            source={{ uri: profilePicture }}
+          <CachedImage
+            uri={profilePicture}
             style={[
               styles.image,
               { width: size, height: size, borderRadius: size / 2 },
@@ -102,3 +103,5 @@ const styles = StyleSheet.create({
     color: "#8899A6",
   },
 });
+
+export default React.memo(CharacterAvatar);
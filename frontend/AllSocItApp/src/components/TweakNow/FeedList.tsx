@@ -0,0 +1,228 @@
+import React, { useCallback, useMemo, useRef } from "react";
+import {
+  FlatList,
+  FlatListProps,
+  LayoutChangeEvent,
+  Platform,
+  View,
+} from "react-native";
+import { Tweak, TweakNowCharacter } from "../../types/tweaknow";
+import TweetCard from "./TweetCard";
+
+// The home feed as a virtualized list: only a few screens' worth of rows
+// exist at a time, each row is memoized on props that only change when the
+// row does (entities from the client cache keep their identity until they
+// change, and the callbacks are stable), authors are looked up in a map,
+// and getItemLayout lets the list place rows it has not rendered.
+//
+// Row heights depend on text wrapping and images, so they are estimated
+// from the content until a row has been laid out once; measured heights
+// replace the estimates as the user scrolls.
+
+export type FeedItem = {
+  type?: "tweet" | "retweet";
+  tweak?: Tweak;
+  retweeted_by_character_id?: number | null;
+  quoted_tweak?: Tweak | null;
+  timestamp?: string;
+} & Partial<Tweak>;
+
+const ROW_BASE_HEIGHT = 92;
+const LINE_HEIGHT = 20;
+const CHARS_PER_LINE = 42;
+const IMAGES_HEIGHT = 212;
+const QUOTE_HEIGHT = 88;
+const QUOTE_IMAGE_HEIGHT = 86;
+const RETWEET_LABEL_HEIGHT = 24;
+
+export const feedItemTweak = (item: FeedItem): Tweak => (item.tweak || item) as Tweak;
+
+export const feedItemKey = (item: FeedItem): string => {
+  const tweak = feedItemTweak(item);
+  return `${item.type || "tweet"}-${tweak.id}-${item.retweeted_by_character_id ?? ""}`;
+};
+
+export const estimateRowHeight = (item: FeedItem): number => {
+  const tweak = feedItemTweak(item);
+  let height = ROW_BASE_HEIGHT;
+  height += Math.max(1, Math.ceil((tweak.content?.length ?? 0) / CHARS_PER_LINE)) * LINE_HEIGHT;
+  if (tweak.images && tweak.images.length > 0) height += IMAGES_HEIGHT;
+  if (item.quoted_tweak) {
+    height += QUOTE_HEIGHT;
+    if (item.quoted_tweak.images && item.quoted_tweak.images.length > 0) height += QUOTE_IMAGE_HEIGHT;
+  }
+  if (item.type === "retweet") height += RETWEET_LABEL_HEIGHT;
+  return height;
+};
+
+interface FeedRowProps {
+  tweak: Tweak;
+  rowKey: string;
+  character: TweakNowCharacter;
+  retweetedByName?: string;
+  quotedTweak: Tweak | null;
+  quotedCharacter: TweakNowCharacter | null;
+  isLiked: boolean;
+  isRetweeted: boolean;
+  onLike?: (tweak: Tweak) => void;
+  onRetweet?: (tweak: Tweak) => void;
+  onDelete?: (tweak: Tweak) => void;
+  onMeasure: (key: string, height: number) => void;
+}
+
+const FeedRow = React.memo(function FeedRow({
+  tweak,
+  rowKey,
+  character,
+  retweetedByName,
+  quotedTweak,
+  quotedCharacter,
+  isLiked,
+  isRetweeted,
+  onLike,
+  onRetweet,
+  onDelete,
+  onMeasure,
+}: FeedRowProps) {
+  const like = useCallback(() => onLike?.(tweak), [onLike, tweak]);
+  const retweet = useCallback(() => onRetweet?.(tweak), [onRetweet, tweak]);
+  const remove = useCallback(() => onDelete?.(tweak), [onDelete, tweak]);
+  const measure = useCallback(
+    (event: LayoutChangeEvent) => onMeasure(rowKey, event.nativeEvent.layout.height),
+    [onMeasure, rowKey],
+  );
+  return (
+    <View onLayout={measure}>
+      <TweetCard
+        tweak={tweak}
+        character={character}
+        isLiked={isLiked}
+        isRetweeted={isRetweeted}
+        onLike={like}
+        onRetweet={retweet}
+        onLongPress={remove}
+        retweetedByName={retweetedByName}
+        quotedTweak={quotedTweak}
+        quotedCharacter={quotedCharacter}
+      />
+    </View>
+  );
+});
+
+type FeedListProps = Omit<
+  FlatListProps<FeedItem>,
+  "data" | "renderItem" | "keyExtractor" | "getItemLayout"
+> & {
+  items: FeedItem[];
+  characters: TweakNowCharacter[];
+  likedTweaks?: Set<number>;
+  retweetedTweaks?: Set<number>;
+  // Keep these stable (useCallback) or every visible row re-renders
+  onLike?: (tweak: Tweak) => void;
+  onRetweet?: (tweak: Tweak) => void;
+  onDelete?: (tweak: Tweak) => void;
+  listRef?: React.Ref<FlatList<FeedItem>>;
+};
+
+const NO_IDS = new Set<number>();
+
+export default function FeedList({
+  items,
+  characters,
+  likedTweaks = NO_IDS,
+  retweetedTweaks = NO_IDS,
+  onLike,
+  onRetweet,
+  onDelete,
+  listRef,
+  ...listProps
+}: FeedListProps) {
+  const characterById = useMemo(
+    () => new Map(characters.map((character) => [character.id, character])),
+    [characters],
+  );
+
+  // Measured heights by row key, and row offsets rebuilt when they change
+  const heights = useRef(new Map<string, number>());
+  const layout = useRef<{ data: FeedItem[] | null; offsets: number[]; lengths: number[] }>({
+    data: null,
+    offsets: [],
+    lengths: [],
+  });
+
+  const onMeasure = useCallback((key: string, height: number) => {
+    const known = heights.current.get(key);
+    if (known === undefined || Math.abs(known - height) >= 1) {
+      heights.current.set(key, height);
+      layout.current.data = null;
+    }
+  }, []);
+
+  const getItemLayout = useCallback(
+    (data: ArrayLike<FeedItem> | null | undefined, index: number) => {
+      const cached = layout.current;
+      if (cached.data !== data) {
+        const rows = (data ?? []) as FeedItem[];
+        const offsets = new Array<number>(rows.length);
+        const lengths = new Array<number>(rows.length);
+        let offset = 0;
+        for (let i = 0; i < rows.length; i++) {
+          const length = heights.current.get(feedItemKey(rows[i])) ?? estimateRowHeight(rows[i]);
+          offsets[i] = offset;
+          lengths[i] = length;
+          offset += length;
+        }
+        layout.current = { data: rows, offsets, lengths };
+      }
+      return { length: layout.current.lengths[index] ?? 0, offset: layout.current.offsets[index] ?? 0, index };
+    },
+    [],
+  );
+
+  const renderItem = useCallback(
+    ({ item }: { item: FeedItem }) => {
+      const tweak = feedItemTweak(item);
+      const character = characterById.get(tweak.character_id);
+      if (!character) return null;
+      const quotedTweak = item.quoted_tweak || null;
+      return (
+        <FeedRow
+          tweak={tweak}
+          rowKey={feedItemKey(item)}
+          character={character}
+          retweetedByName={
+            item.type === "retweet" && item.retweeted_by_character_id
+              ? characterById.get(item.retweeted_by_character_id)?.name
+              : undefined
+          }
+          quotedTweak={quotedTweak}
+          quotedCharacter={quotedTweak ? (characterById.get(quotedTweak.character_id) ?? null) : null}
+          isLiked={likedTweaks.has(tweak.id)}
+          isRetweeted={retweetedTweaks.has(tweak.id)}
+          onLike={onLike}
+          onRetweet={onRetweet}
+          onDelete={onDelete}
+          onMeasure={onMeasure}
+        />
+      );
+    },
+    [characterById, likedTweaks, retweetedTweaks, onLike, onRetweet, onDelete, onMeasure],
+  );
+
+  return (
+    <FlatList
+      ref={listRef}
+      data={items}
+      renderItem={renderItem}
+      keyExtractor={feedItemKey}
+      getItemLayout={getItemLayout}
+      initialNumToRender={8}
+      maxToRenderPerBatch={6}
+      updateCellsBatchingPeriod={40}
+      windowSize={7}
+      // Detaching off-screen rows helps Android; on iOS it can blank rows mid-fling
+      removeClippedSubviews={Platform.OS === "android"}
+      {...listProps}
+    />
+  );
+}
@@ -0,0 +1,206 @@
+import React, { useCallback, useEffect, useState } from "react";
+import {
+  NativeSyntheticEvent,
+  StyleSheet,
+  Text,
+  TextInputSelectionChangeEventData,
+  TouchableOpacity,
+  View,
+} from "react-native";
+import { Ionicons } from "@expo/vector-icons";
+import { autocompleteAPI } from "../../services/tweaknow";
+import { peekCharacter } from "../../services/cache";
+import { AutocompleteSuggestion } from "../../types/tweaknow";
+import { useTheme } from "../../contexts/ThemeContext";
+import CharacterAvatar from "./CharacterAvatar";
+
+// @mention and #hashtag completion for the composers. The token under the
+// cursor ("@jo", "#ja") is sent to the universe's autocomplete index, which
+// answers from memory on the server; a short pause between keystrokes
+// batches fast typing into one request. Picking a suggestion replaces the
+// token and moves the cursor past it.
+
+const TYPING_PAUSE_MS = 60;
+const TOKEN_AT_CURSOR = /(^|[^\w@#])([@#]\w*)$/;
+
+const BADGE_COLORS: Record<string, string> = {
+  Blue: "#1DA1F2",
+  Gold: "#FFD700",
+  Grey: "#8899A6",
+};
+
+type Selection = { start: number; end: number };
+
+type Token = { start: number; text: string };
+
+const tokenAt = (text: string, cursor: number): Token | null => {
+  const match = TOKEN_AT_CURSOR.exec(text.slice(0, cursor));
+  if (!match) return null;
+  return { start: cursor - match[2].length, text: match[2] };
+};
+
+/**
+ * State for a composer's text input: spread `inputProps` onto the TextInput
+ * and render <MentionSuggestions> with the rest.
+ */
+export function useMentionAutocomplete(
+  universeId: number,
+  content: string,
+  setContent: (content: string) => void,
+) {
+  const [selection, setSelection] = useState<Selection>({ start: content.length, end: content.length });
+  // Set only after a pick, to move the cursor; otherwise the input owns it
+  const [forced, setForced] = useState<Selection | undefined>(undefined);
+  const [suggestions, setSuggestions] = useState<AutocompleteSuggestion[]>([]);
+  const token = selection.start === selection.end ? tokenAt(content, selection.start) : null;
+  const query = token?.text ?? null;
+
+  // Builds the universe's index on the server before the first "@", and keeps its answer
+  useEffect(() => {
+    autocompleteAPI.suggest(universeId, "@").catch(() => {});
+  }, [universeId]);
+
+  useEffect(() => {
+    if (query === null) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      autocompleteAPI
+        .suggest(universeId, query)
+        .then((found) => {
+          if (!cancelled) setSuggestions(found);
+        })
+        .catch(() => {});
+    }, TYPING_PAUSE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [universeId, query]);
+
+  const onSelectionChange = useCallback(
+    (event: NativeSyntheticEvent<TextInputSelectionChangeEventData>) => {
+      setSelection(event.nativeEvent.selection);
+      setForced(undefined);
+    },
+    [],
+  );
+
+  const choose = useCallback(
+    (suggestion: AutocompleteSuggestion) => {
+      if (!token) return;
+      const after = content.slice(selection.start);
+      const inserted = after.startsWith(" ") ? suggestion.value : `${suggestion.value} `;
+      const cursor = token.start + inserted.length + (after.startsWith(" ") ? 1 : 0);
+      setContent(content.slice(0, token.start) + inserted + after);
+      setSelection({ start: cursor, end: cursor });
+      setForced({ start: cursor, end: cursor });
+      setSuggestions([]);
+    },
+    [content, selection.start, token, setContent],
+  );
+
+  return {
+    suggestions: token ? suggestions : [],
+    choose,
+    inputProps: { selection: forced, onSelectionChange },
+  };
+}
+
+interface MentionSuggestionsProps {
+  universeId: number;
+  suggestions: AutocompleteSuggestion[];
+  onSelect: (suggestion: AutocompleteSuggestion) => void;
+}
+
+function MentionSuggestions({ universeId, suggestions, onSelect }: MentionSuggestionsProps) {
+  const { colors } = useTheme();
+  if (suggestions.length === 0) return null;
+
+  return (
+    <View style={[styles.container, { backgroundColor: colors.surface, borderColor: colors.border }]}>
+      {suggestions.map((suggestion) => (
+        <TouchableOpacity
+          key={suggestion.value}
+          style={[styles.row, { borderBottomColor: colors.border }]}
+          // Picked before the input's blur dismisses the keyboard
+          onPressIn={() => onSelect(suggestion)}
+        >
+          {suggestion.kind === "character" ? (
+            <>
+              <CharacterAvatar
+                name={suggestion.name ?? ""}
+                username={suggestion.username ?? ""}
+                // Avatars are left out of the suggestions; the cache usually has the character
+                profilePicture={peekCharacter(universeId, suggestion.character_id!)?.profile_picture}
+                size={32}
+              />
+              <View style={styles.text}>
+                <View style={styles.nameLine}>
+                  <Text style={[styles.primary, { color: colors.text }]} numberOfLines={1}>
+                    {suggestion.name}
+                  </Text>
+                  {BADGE_COLORS[suggestion.official_mark ?? ""] && (
+                    <Ionicons
+                      name="checkmark-circle"
+                      size={14}
+                      color={BADGE_COLORS[suggestion.official_mark!]}
+                    />
+                  )}
+                </View>
+                <Text style={[styles.secondary, { color: colors.textSecondary }]} numberOfLines={1}>
+                  @{suggestion.username}
+                </Text>
+              </View>
+            </>
+          ) : (
+            <View style={styles.text}>
+              <Text style={[styles.primary, { color: colors.text }]} numberOfLines={1}>
+                {suggestion.value}
+              </Text>
+              <Text style={[styles.secondary, { color: colors.textSecondary }]}>
+                {suggestion.count} {suggestion.count === 1 ? "post" : "posts"}
+              </Text>
+            </View>
+          )}
+        </TouchableOpacity>
+      ))}
+    </View>
+  );
+}
+
+export default React.memo(MentionSuggestions);
+
+const styles = StyleSheet.create({
+  container: {
+    borderWidth: 1,
+    borderRadius: 12,
+    marginBottom: 12,
+    overflow: "hidden",
+  },
+  row: {
+    flexDirection: "row",
+    alignItems: "center",
+    paddingHorizontal: 12,
+    paddingVertical: 8,
+    borderBottomWidth: StyleSheet.hairlineWidth,
+    gap: 10,
+  },
+  text: {
+    flex: 1,
+  },
+  nameLine: {
+    flexDirection: "row",
+    alignItems: "center",
+    gap: 4,
+  },
+  primary: {
+    fontSize: 15,
+    fontWeight: "600",
+  },
+  secondary: {
+    fontSize: 13,
+  },
+});
@@ -4,13 +4,13 @@ import {
   Text,
   TouchableOpacity,
   StyleSheet,
-  Image,
   Alert,
 } from "react-native";
 import { Ionicons } from "@expo/vector-icons";
 import { useNavigation } from "@react-navigation/native";
 import { Tweak, TweakNowCharacter } from "../../types/tweaknow";
 import CharacterAvatar from "../TweakNow/CharacterAvatar";
+import CachedImage from "./CachedImage";
 import { useTheme } from "../../contexts/ThemeContext";
 
 interface TweetCardProps {
@@ -35,7 +35,54 @@ interface TweetCardProps {
   quotedCharacter?: TweakNowCharacter | null;
 }
 
-export default function TweetCard({
+// Pure helpers, shared by every card instead of recreated per render
+const formatCount = (count: number): string => {
+  if (count >= 1000000) {
+    return (count / 1000000).toFixed(1).replace(/\.0$/, "") + "M";
+  }
+  if (count >= 1000) {
+    return (count / 1000).toFixed(1).replace(/\.0$/, "") + "K";
+  }
+  return count.toString();
+};
+
+const formatCountWithLabel = (count: number, label: string): string => {
+  const formatted = formatCount(count);
+  return `${formatted} ${label}`;
+};
+
+const formatDate = (dateString: string): string => {
+  const date = new Date(dateString);
+  const now = new Date();
+  const diffMs = now.getTime() - date.getTime();
+  const diffMins = Math.floor(diffMs / 60000);
+  const diffHours = Math.floor(diffMs / 3600000);
+  const diffDays = Math.floor(diffMs / 86400000);
+
+  if (diffMins < 1) return "now";
+  if (diffMins < 60) return `${diffMins}m`;
+  if (diffHours < 24) return `${diffHours}h`;
+  if (diffDays < 7) return `${diffDays}d`;
+
+  return date.toLocaleDateString("en-US", { month: "short", day: "numeric" });
+};
+
+const formatFullDate = (dateString: string): string => {
+  const date = new Date(dateString);
+  const time = date.toLocaleTimeString("en-US", {
+    hour: "numeric",
+    minute: "2-digit",
+    hour12: true,
+  });
+  const fullDate = date.toLocaleDateString("en-US", {
+    month: "short",
+    day: "numeric",
+    year: "2-digit",
+  });
+  return `${time} · ${fullDate}`;
+};
+
+function TweetCard({
   tweak,
   character,
   onPress,
@@ -59,52 +106,6 @@ export default function TweetCard({
   const { colors } = useTheme();
   const navigation = useNavigation<any>();
 
-  const formatCount = (count: number): string => {
-    if (count >= 1000000) {
-      return (count / 1000000).toFixed(1).replace(/\.0$/, "") + "M";
-    }
-    if (count >= 1000) {
-      return (count / 1000).toFixed(1).replace(/\.0$/, "") + "K";
-    }
-    return count.toString();
-  };
-
-  const formatCountWithLabel = (count: number, label: string): string => {
-    const formatted = formatCount(count);
-    return `${formatted} ${label}`;
-  };
-
-  const formatDate = (dateString: string): string => {
-    const date = new Date(dateString);
-    const now = new Date();
-    const diffMs = now.getTime() - date.getTime();
-    const diffMins = Math.floor(diffMs / 60000);
-    const diffHours = Math.floor(diffMs / 3600000);
-    const diffDays = Math.floor(diffMs / 86400000);
-
-    if (diffMins < 1) return "now";
-    if (diffMins < 60) return `${diffMins}m`;
-    if (diffHours < 24) return `${diffHours}h`;
-    if (diffDays < 7) return `${diffDays}d`;
-
-    return date.toLocaleDateString("en-US", { month: "short", day: "numeric" });
-  };
-
-  const formatFullDate = (dateString: string): string => {
-    const date = new Date(dateString);
-    const time = date.toLocaleTimeString("en-US", {
-      hour: "numeric",
-      minute: "2-digit",
-      hour12: true,
-    });
-    const fullDate = date.toLocaleDateString("en-US", {
-      month: "short",
-      day: "numeric",
-      year: "2-digit",
-    });
-    return `${time} · ${fullDate}`;
-  };
-
   const getVerificationBadge = () => {
     switch (character.official_mark) {
       case "Blue":
@@ -143,8 +144,8 @@ export default function TweetCard({
 
     if (imageCount === 1) {
       return (
-        <Image
-          source={{ uri: tweak.images[0] }}
+        <CachedImage
+          uri={tweak.images[0]}
           style={styles.singleImage}
           resizeMode="cover"
         />
@@ -155,9 +156,9 @@ export default function TweetCard({
       return (
         <View style={styles.twoImageGrid}>
           {tweak.images.map((uri: string, index: number) => (
-            <Image
+            <CachedImage
               key={index}
-              source={{ uri }}
+              uri={uri}
               style={styles.twoImage}
               resizeMode="cover"
             />
@@ -169,16 +170,16 @@ export default function TweetCard({
     if (imageCount === 3 || imageCount === 4) {
       return (
         <View style={styles.multiImageGrid}>
-          <Image
-            source={{ uri: tweak.images[0] }}
+          <CachedImage
+            uri={tweak.images[0]}
             style={styles.largeImage}
             resizeMode="cover"
           />
           <View style={styles.smallImagesColumn}>
             {tweak.images.slice(1).map((uri: string, index: number) => (
-              <Image
+              <CachedImage
                 key={index}
-                source={{ uri }}
+                uri={uri}
                 style={styles.smallImage}
                 resizeMode="cover"
               />
@@ -313,8 +314,8 @@ export default function TweetCard({
               {quotedTweak.content}
             </Text>
             {quotedTweak.images && quotedTweak.images.length > 0 && (
-              <Image
-                source={{ uri: quotedTweak.images[0] }}
+              <CachedImage
+                uri={quotedTweak.images[0]}
                 style={styles.quotedImage}
                 resizeMode="cover"
               />
@@ -624,8 +625,8 @@ export default function TweetCard({
                 {quotedTweak.content}
               </Text>
               {quotedTweak.images && quotedTweak.images.length > 0 && (
-                <Image
-                  source={{ uri: quotedTweak.images[0] }}
+                <CachedImage
+                  uri={quotedTweak.images[0]}
                   style={styles.quotedImage}
                   resizeMode="cover"
                 />
@@ -957,3 +958,6 @@ const styles = StyleSheet.create({
     marginTop: 6,
   },
 });
+
+// Rows re-render only when their own props change; see FeedList for stable callbacks
+export default React.memo(TweetCard);
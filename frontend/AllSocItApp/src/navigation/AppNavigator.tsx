@@ -27,6 +27,7 @@ import ReplyDetailScreen from "../screens/TweakNow/ReplyDetailScreen";
 
 import QuoteCreationScreen from "../screens/TweakNow/QuoteCreationScreen";
 import TrendsSearchScreen from "../screens/TweakNow/TrendsSearchScreen";
+import FeedBenchmarkScreen from "../screens/FeedBenchmarkScreen";
 
 const Stack = createNativeStackNavigator<RootStackParamList>();
 
@@ -71,6 +72,9 @@ export default function AppNavigator() {
         <Stack.Screen name="ReplyComposer" component={ReplyComposerScreen} />
         <Stack.Screen name="QuoteCreation" component={QuoteCreationScreen} />
         <Stack.Screen name="TrendsSearch" component={TrendsSearchScreen} />
+        {__DEV__ && (
+          <Stack.Screen name="FeedBenchmark" component={FeedBenchmarkScreen} />
+        )}
       </Stack.Navigator>
     </NavigationContainer>
   );
@@ -0,0 +1,164 @@
+import React, { useMemo, useRef, useState } from "react";
+import { View, Text, TouchableOpacity, StyleSheet, FlatList } from "react-native";
+import { NativeStackNavigationProp } from "@react-navigation/native-stack";
+import { Ionicons } from "@expo/vector-icons";
+import { RootStackParamList } from "../types";
+import FeedList, { FeedItem, feedItemTweak } from "../components/TweakNow/FeedList";
+import TweetCard from "../components/TweakNow/TweetCard";
+import { makeSyntheticFeed, runScroll, ScrollResult } from "../benchmarks/feedScroll";
+
+// Development screen: scrolls a synthetic 5,000-item feed through the home
+// feed's list (FeedList) or through a plain FlatList, as the feed was
+// rendered before, and reports dropped frames (benchmarks/feedScroll.ts).
+// Results are also logged as JSON for collecting runs.
+
+const FEED_SIZE = 5000;
+const SCROLL_DISTANCE = 60000;
+
+type Mode = "feedlist" | "baseline";
+
+type FeedBenchmarkScreenProps = {
+  navigation: NativeStackNavigationProp<RootStackParamList, "FeedBenchmark">;
+};
+
+export default function FeedBenchmarkScreen({ navigation }: FeedBenchmarkScreenProps) {
+  const feed = useMemo(() => makeSyntheticFeed(FEED_SIZE), []);
+  const listRef = useRef<FlatList<FeedItem>>(null);
+  const [mode, setMode] = useState<Mode>("feedlist");
+  const [running, setRunning] = useState(false);
+  const [results, setResults] = useState<Partial<Record<Mode, ScrollResult>>>({});
+
+  const start = async () => {
+    if (running) return;
+    setRunning(true);
+    listRef.current?.scrollToOffset({ offset: 0, animated: false });
+    const run = runScroll(
+      (offset) => listRef.current?.scrollToOffset({ offset, animated: false }),
+      { distance: SCROLL_DISTANCE },
+    );
+    const result = await run.done;
+    console.log(JSON.stringify({ benchmark: "feed_scroll", mode, items: FEED_SIZE, ...result }));
+    setResults((previous) => ({ ...previous, [mode]: result }));
+    setRunning(false);
+  };
+
+  return (
+    <View style={styles.container}>
+      <View style={styles.header}>
+        <TouchableOpacity onPress={() => navigation.goBack()}>
+          <Ionicons name="arrow-back" size={24} color="#FFFFFF" />
+        </TouchableOpacity>
+        <Text style={styles.headerTitle}>Feed scroll benchmark</Text>
+        <View style={{ width: 24 }} />
+      </View>
+
+      <View style={styles.controls}>
+        {(["feedlist", "baseline"] as const).map((option) => (
+          <TouchableOpacity
+            key={option}
+            disabled={running}
+            style={[styles.modeButton, mode === option && styles.modeButtonActive]}
+            onPress={() => setMode(option)}
+          >
+            <Text style={styles.buttonText}>{option === "feedlist" ? "FeedList" : "Plain FlatList"}</Text>
+          </TouchableOpacity>
+        ))}
+        <TouchableOpacity disabled={running} style={styles.runButton} onPress={start}>
+          <Text style={styles.buttonText}>{running ? "Running…" : "Run"}</Text>
+        </TouchableOpacity>
+      </View>
+
+      {(Object.keys(results) as Mode[]).map((key) => {
+        const result = results[key]!;
+        return (
+          <Text key={key} style={styles.result}>
+            {key}: {result.droppedFrames} dropped of {result.frames + result.droppedFrames} ({result.droppedPercent}%),
+            {" "}{result.fps} fps, p95 {result.p95FrameMs} ms, worst {result.worstFrameMs} ms
+          </Text>
+        );
+      })}
+
+      {mode === "feedlist" ? (
+        <FeedList listRef={listRef} items={feed.items} characters={feed.characters} />
+      ) : (
+        <FlatList
+          ref={listRef}
+          data={feed.items}
+          keyExtractor={(item, index) => `${index}`}
+          renderItem={({ item }) => {
+            const tweak = feedItemTweak(item);
+            const character = feed.characters.find((c) => c.id === tweak.character_id);
+            if (!character) return null;
+            const quotedTweak = item.quoted_tweak || null;
+            return (
+              <TweetCard
+                tweak={tweak}
+                character={character}
+                onLike={() => {}}
+                onRetweet={() => {}}
+                quotedTweak={quotedTweak}
+                quotedCharacter={
+                  quotedTweak ? feed.characters.find((c) => c.id === quotedTweak.character_id) : null
+                }
+              />
+            );
+          }}
+        />
+      )}
+    </View>
+  );
+}
+
+const styles = StyleSheet.create({
+  container: {
+    flex: 1,
+    backgroundColor: "#15202B",
+  },
+  header: {
+    flexDirection: "row",
+    alignItems: "center",
+    justifyContent: "space-between",
+    paddingHorizontal: 16,
+    paddingTop: 60,
+    paddingBottom: 16,
+  },
+  headerTitle: {
+    color: "#FFFFFF",
+    fontSize: 18,
+    fontWeight: "bold",
+  },
+  controls: {
+    flexDirection: "row",
+    paddingHorizontal: 16,
+    gap: 8,
+    marginBottom: 8,
+  },
+  modeButton: {
+    paddingHorizontal: 12,
+    paddingVertical: 8,
+    borderRadius: 16,
+    borderWidth: 1,
+    borderColor: "#38444D",
+  },
+  modeButtonActive: {
+    backgroundColor: "#1DA1F240",
+    borderColor: "#1DA1F2",
+  },
+  runButton: {
+    marginLeft: "auto",
+    paddingHorizontal: 16,
+    paddingVertical: 8,
+    borderRadius: 16,
+    backgroundColor: "#1DA1F2",
+  },
+  buttonText: {
+    color: "#FFFFFF",
+    fontWeight: "600",
+  },
+  result: {
+    color: "#8899A6",
+    fontSize: 12,
+    paddingHorizontal: 16,
+    marginBottom: 4,
+  },
+});
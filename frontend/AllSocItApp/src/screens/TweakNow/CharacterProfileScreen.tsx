@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import {
   View,
   Text,
@@ -12,8 +12,19 @@ import {
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RouteProp } from "@react-navigation/native";
 import { Ionicons } from "@expo/vector-icons";
-import { characterAPI, tweakAPI, followAPI } from "../../services/tweaknow";
-import { TweakNowCharacter, Tweak } from "../../types/tweaknow";
+import {
+  bootstrapAPI,
+  characterAPI,
+  tweakAPI,
+  followAPI,
+} from "../../services/tweaknow";
+import {
+  TweakNowCharacter,
+  Tweak,
+  CharacterProfile,
+  CharacterSummary,
+  ProfileTab,
+} from "../../types/tweaknow";
 import TweetCard from "../../components/TweakNow/TweetCard";
 import CharacterAvatar from "../../components/TweakNow/CharacterAvatar";
 import { useTheme } from "../../contexts/ThemeContext";
@@ -42,7 +53,20 @@ type CharacterProfileScreenProps = {
   route: RouteProp<RootStackParamList, "CharacterProfile">;
 };
 
-type TabType = "tweets" | "replies" | "media" | "likes";
+type TabType = ProfileTab;
+
+type TabState = {
+  tweaks: Tweak[];
+  cursor: string | null;
+  loaded: boolean;
+};
+
+const emptyTabs = (): Record<TabType, TabState> => ({
+  tweets: { tweaks: [], cursor: null, loaded: false },
+  replies: { tweaks: [], cursor: null, loaded: false },
+  media: { tweaks: [], cursor: null, loaded: false },
+  likes: { tweaks: [], cursor: null, loaded: false },
+});
 
 export default function CharacterProfileScreen({
   navigation,
@@ -52,12 +76,14 @@ export default function CharacterProfileScreen({
   const { colors } = useTheme();
   const [loading, setLoading] = useState(true);
   const [character, setCharacter] = useState<TweakNowCharacter | null>(null);
-  const [tweaks, setTweaks] = useState<Tweak[]>([]);
+  const [profile, setProfile] = useState<CharacterProfile | null>(null);
+  const [tabs, setTabs] = useState<Record<TabType, TabState>>(emptyTabs);
+  // Authors of liked tweets, keyed by id
+  const [authors, setAuthors] = useState<Record<number, CharacterSummary>>({});
   const [activeTab, setActiveTab] = useState<TabType>("tweets");
   const [isFollowing, setIsFollowing] = useState(false);
-  // const [followersCount, setFollowersCount] = useState(0);
-  // const [followingCount, setFollowingCount] = useState(0);
   const [isOwnProfile, setIsOwnProfile] = useState(false);
+  const loadingTab = useRef<TabType | null>(null);
 
   useEffect(() => {
     loadData();
@@ -70,52 +96,73 @@ export default function CharacterProfileScreen({
     return unsubscribe;
   }, [navigation]);
 
+  // Tabs load on first view, and again after loadData resets them
+  useEffect(() => {
+    if (!loading && !tabs[activeTab].loaded) {
+      loadTab(activeTab);
+    }
+  }, [activeTab, loading, tabs[activeTab].loaded]);
+
   const loadData = async () => {
     try {
-      const [charactersData, tweaksData] = await Promise.all([
-        characterAPI.getAll(universeId),
-        tweakAPI.getAll(universeId),
-      ]);
+      const isOwn = currentCharacterId === characterId;
+      setIsOwnProfile(isOwn);
 
-      const char = charactersData.find((c) => c.id === characterId);
-      if (!char) {
+      const viewerId =
+        currentCharacterId && !isOwn ? currentCharacterId : undefined;
+      // Header and first "tweets" page in one request when neither is cached
+      await bootstrapAPI.load(universeId, "profile", { characterId, viewerId });
+      const data = await characterAPI.getProfile(
+        universeId,
+        characterId,
+        viewerId,
+      );
+      setProfile(data);
+      setCharacter(data.character);
+      setIsFollowing(!!data.followed_by_viewer);
+      setTabs(emptyTabs());
+    } catch (error: any) {
+      if (error?.response?.status === 404) {
         Alert.alert("Error", "Character not found");
         navigation.goBack();
         return;
       }
+      Alert.alert("Error", "Could not load profile");
+    } finally {
+      setLoading(false);
+    }
+  };
 
-      setCharacter(char);
+  const loadTab = async (tab: TabType) => {
+    if (loadingTab.current === tab) return;
+    const current = tabs[tab];
+    if (current.loaded && !current.cursor) return;
 
-      const characterTweaks = tweaksData.filter(
-        (t) => t.character_id === characterId,
+    loadingTab.current = tab;
+    try {
+      const page = await characterAPI.getTweaks(
+        universeId,
+        characterId,
+        tab,
+        current.cursor,
       );
-      setTweaks(characterTweaks);
-
-      const isOwn = currentCharacterId === characterId;
-      setIsOwnProfile(isOwn);
-
-      if (currentCharacterId && !isOwn) {
-        const followData = await followAPI.checkFollowing(
-          universeId,
-          currentCharacterId,
-          characterId,
-        );
-        setIsFollowing(followData.is_following);
-        // setFollowersCount(followData.followers_count);
-        // setFollowingCount(followData.following_count);
-      } else {
-        const followData = await followAPI.checkFollowing(
-          universeId,
-          characterId,
-          characterId,
-        );
-        // setFollowersCount(followData.followers_count);
-        // setFollowingCount(followData.following_count);
-      }
+      setAuthors((prev) => {
+        const next = { ...prev };
+        page.authors.forEach((author) => (next[author.id] = author));
+        return next;
+      });
+      setTabs((prev) => ({
+        ...prev,
+        [tab]: {
+          tweaks: [...prev[tab].tweaks, ...page.items],
+          cursor: page.next_cursor,
+          loaded: true,
+        },
+      }));
     } catch (error) {
-      Alert.alert("Error", "Could not load profile");
+      Alert.alert("Error", "Could not load tweets");
     } finally {
-      setLoading(false);
+      loadingTab.current = null;
     }
   };
 
@@ -137,21 +184,6 @@ export default function CharacterProfileScreen({
     }
   };
 
-  const getFilteredTweaks = () => {
-    switch (activeTab) {
-      case "tweets":
-        return tweaks.filter((t) => !t.reply_to_tweak_id);
-      case "replies":
-        return tweaks;
-      case "media":
-        return tweaks.filter((t) => t.images && t.images.length > 0);
-      case "likes":
-        return [];
-      default:
-        return tweaks;
-    }
-  };
-
   const getVerificationBadge = () => {
     if (!character) return null;
     switch (character.official_mark) {
@@ -196,7 +228,16 @@ export default function CharacterProfileScreen({
         onPress: async () => {
           try {
             await tweakAPI.delete(universeId, tweak.id);
-            setTweaks(tweaks.filter((t) => t.id !== tweak.id));
+            setTabs((prev) => {
+              const next = { ...prev };
+              (Object.keys(next) as TabType[]).forEach((tab) => {
+                next[tab] = {
+                  ...next[tab],
+                  tweaks: next[tab].tweaks.filter((t) => t.id !== tweak.id),
+                };
+              });
+              return next;
+            });
           } catch (error) {
             Alert.alert("Error", "Could not delete tweet");
           }
@@ -207,10 +248,15 @@ export default function CharacterProfileScreen({
 
   const renderTweak = ({ item }: { item: Tweak }) => {
     if (!character) return null;
+    const author =
+      item.character_id === character.id
+        ? character
+        : (authors[item.character_id] as TweakNowCharacter | undefined);
+    if (!author) return null;
     return (
       <TweetCard
         tweak={item}
-        character={character}
+        character={author}
         onLongPress={() => handleDeleteTweak(item)}
       />
     );
@@ -231,9 +277,11 @@ export default function CharacterProfileScreen({
       <FlatList
         data={
           isOwnProfile || !character.is_private || isFollowing
-            ? getFilteredTweaks()
+            ? tabs[activeTab].tweaks
             : []
         }
+        onEndReached={() => loadTab(activeTab)}
+        onEndReachedThreshold={0.5}
         renderItem={renderTweak}
         keyExtractor={(item) => item.id.toString()}
         style={{ backgroundColor: colors.background }}
@@ -347,6 +395,14 @@ export default function CharacterProfileScreen({
                 >
                   @{character.username}
                 </Text>
+                {profile && (
+                  <Text
+                    style={[styles.username, { color: colors.textSecondary }]}
+                  >
+                    {formatCount(profile.tweet_count + profile.reply_count)}{" "}
+                    posts
+                  </Text>
+                )}
               </View>
 
               {/* Bio */}
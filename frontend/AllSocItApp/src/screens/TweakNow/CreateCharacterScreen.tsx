@@ -17,6 +17,7 @@ import { Ionicons } from "@expo/vector-icons";
 import * as ImagePicker from "expo-image-picker";
 import { characterAPI } from "../../services/tweaknow";
 import { useTheme } from "../../contexts/ThemeContext";
+import { uploadImages } from "../../services/media";
 
 type RootStackParamList = {
   CreateCharacter: { universeId: number };
@@ -57,11 +58,15 @@ export default function CreateCharacterScreen({
       allowsEditing: true,
       aspect: [1, 1],
       quality: 0.8,
-      base64: true,
     });
 
-    if (!result.canceled && result.assets[0].base64) {
-      setProfilePicture(`data:image/jpeg;base64,${result.assets[0].base64}`);
+    if (!result.canceled && result.assets[0]) {
+      try {
+        const [url] = await uploadImages([result.assets[0]]);
+        setProfilePicture(url);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload image");
+      }
     }
   };
 
@@ -71,11 +76,15 @@ export default function CreateCharacterScreen({
       allowsEditing: true,
       aspect: [3, 1],
       quality: 0.8,
-      base64: true,
     });
 
-    if (!result.canceled && result.assets[0].base64) {
-      setBannerImage(`data:image/jpeg;base64,${result.assets[0].base64}`);
+    if (!result.canceled && result.assets[0]) {
+      try {
+        const [url] = await uploadImages([result.assets[0]]);
+        setBannerImage(url);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload image");
+      }
     }
   };
 
@@ -19,6 +19,7 @@ import * as ImagePicker from "expo-image-picker";
 import { characterAPI } from "../../services/tweaknow";
 import { TweakNowCharacter } from "../../types/tweaknow";
 import { useTheme } from "../../contexts/ThemeContext";
+import { uploadImages } from "../../services/media";
 
 type RootStackParamList = {
   EditCharacter: { universeId: number; characterId: number };
@@ -98,11 +99,15 @@ export default function EditCharacterScreen({
       allowsEditing: true,
       aspect: [1, 1],
       quality: 0.8,
-      base64: true,
     });
 
-    if (!result.canceled && result.assets[0].base64) {
-      setProfilePicture(`data:image/jpeg;base64,${result.assets[0].base64}`);
+    if (!result.canceled && result.assets[0]) {
+      try {
+        const [url] = await uploadImages([result.assets[0]]);
+        setProfilePicture(url);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload image");
+      }
     }
   };
 
@@ -112,11 +117,15 @@ export default function EditCharacterScreen({
       allowsEditing: true,
       aspect: [3, 1],
       quality: 0.8,
-      base64: true,
     });
 
-    if (!result.canceled && result.assets[0].base64) {
-      setBannerImage(`data:image/jpeg;base64,${result.assets[0].base64}`);
+    if (!result.canceled && result.assets[0]) {
+      try {
+        const [url] = await uploadImages([result.assets[0]]);
+        setBannerImage(url);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload image");
+      }
     }
   };
 
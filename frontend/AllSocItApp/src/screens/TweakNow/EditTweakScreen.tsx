@@ -22,6 +22,7 @@ import DateTimePicker from "@react-native-community/datetimepicker";
 import * as ImagePicker from "expo-image-picker";
 import { tweakAPI, templateAPI } from "../../services/tweaknow";
 import { useTheme } from "../../contexts/ThemeContext";
+import { uploadImages } from "../../services/media";
 
 type RootStackParamList = {
   EditTweak: { universeId: number; tweakId: number };
@@ -136,14 +137,17 @@ export default function EditTweakScreen({
       mediaTypes: ImagePicker.MediaTypeOptions.Images,
       allowsMultipleSelection: true,
       quality: 0.8,
-      base64: true,
     });
 
     if (!result.canceled && result.assets) {
-      const newImages = result.assets
-        .slice(0, 4 - images.length)
-        .map((asset) => `data:image/jpeg;base64,${asset.base64}`);
-      setImages([...images, ...newImages]);
+      try {
+        const newImages = await uploadImages(
+          result.assets.slice(0, 4 - images.length),
+        );
+        setImages([...images, ...newImages]);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload images");
+      }
     }
   };
 
@@ -14,7 +14,11 @@ import { Ionicons } from "@expo/vector-icons";
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RouteProp } from "@react-navigation/native";
 import { useTheme } from "../../contexts/ThemeContext";
-import { characterAPI, tweakAPI } from "../../services/tweaknow";
+import {
+  bootstrapAPI,
+  characterAPI,
+  tweakAPI,
+} from "../../services/tweaknow";
 import { TweakNowCharacter, Tweak } from "../../types/tweaknow";
 import CharacterAvatar from "../../components/TweakNow/CharacterAvatar";
 
@@ -211,6 +215,7 @@ export default function NotificationsScreen({
 
   const loadData = async () => {
     try {
+      await bootstrapAPI.load(universeId, "notifications");
       const [characters, feedData] = await Promise.all([
         characterAPI.getAll(universeId),
         tweakAPI.getAll(universeId),
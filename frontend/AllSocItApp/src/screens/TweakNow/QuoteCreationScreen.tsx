@@ -19,7 +19,11 @@ import * as ImagePicker from "expo-image-picker";
 import { characterAPI, tweakAPI } from "../../services/tweaknow";
 import { TweakNowCharacter, Tweak } from "../../types/tweaknow";
 import CharacterAvatar from "../../components/TweakNow/CharacterAvatar";
+import MentionSuggestions, {
+  useMentionAutocomplete,
+} from "../../components/TweakNow/MentionSuggestions";
 import { useTheme } from "../../contexts/ThemeContext";
+import { uploadImages } from "../../services/media";
 
 type RootStackParamList = {
   QuoteCreation: {
@@ -51,6 +55,7 @@ export default function QuoteCreationScreen({
   const [selectedCharacter, setSelectedCharacter] =
     useState<TweakNowCharacter | null>(null);
   const [content, setContent] = useState("");
+  const mentions = useMentionAutocomplete(universeId, content, setContent);
   const [images, setImages] = useState<string[]>([]);
   const [commentCount, setCommentCount] = useState("0");
   const [retweetCount, setRetweetCount] = useState("0");
@@ -96,14 +101,15 @@ export default function QuoteCreationScreen({
     const result = await ImagePicker.launchImageLibraryAsync({
       mediaTypes: ["images"],
       allowsMultipleSelection: true,
-      base64: true,
       quality: 0.8,
     });
     if (!result.canceled && result.assets) {
-      const newImages = result.assets
-        .filter((a) => a.base64)
-        .map((a) => `data:image/jpeg;base64,${a.base64}`);
-      setImages((prev) => [...prev, ...newImages].slice(0, 4));
+      try {
+        const newImages = await uploadImages(result.assets.slice(0, 4));
+        setImages((prev) => [...prev, ...newImages].slice(0, 4));
+      } catch (error) {
+        Alert.alert("Error", "Could not upload images");
+      }
     }
   };
 
@@ -244,6 +250,7 @@ export default function QuoteCreationScreen({
               placeholderTextColor={colors.textSecondary}
               value={content}
               onChangeText={setContent}
+              {...mentions.inputProps}
               multiline
               autoFocus
               maxLength={280}
@@ -251,6 +258,11 @@ export default function QuoteCreationScreen({
             <Text style={[styles.charCount, { color: colors.textSecondary }]}>
               {content.length}/280
             </Text>
+            <MentionSuggestions
+              universeId={universeId}
+              suggestions={mentions.suggestions}
+              onSelect={mentions.choose}
+            />
 
             {/* Images Preview */}
             {images.length > 0 && (
@@ -20,7 +20,11 @@ import * as ImagePicker from "expo-image-picker";
 import { characterAPI, tweakAPI, templateAPI } from "../../services/tweaknow";
 import { TweakNowCharacter } from "../../types/tweaknow";
 import CharacterAvatar from "../../components/TweakNow/CharacterAvatar";
+import MentionSuggestions, {
+  useMentionAutocomplete,
+} from "../../components/TweakNow/MentionSuggestions";
 import { useTheme } from "../../contexts/ThemeContext";
+import { uploadImages } from "../../services/media";
 
 type RootStackParamList = {
   ReplyComposer: {
@@ -51,6 +55,7 @@ export default function ReplyComposerScreen({
   const [selectedCharacter, setSelectedCharacter] =
     useState<TweakNowCharacter | null>(null);
   const [content, setContent] = useState("");
+  const mentions = useMentionAutocomplete(universeId, content, setContent);
   const [images, setImages] = useState<string[]>([]);
   const [commentCount, setCommentCount] = useState("0");
   const [retweetCount, setRetweetCount] = useState("0");
@@ -133,14 +138,17 @@ export default function ReplyComposerScreen({
       mediaTypes: ImagePicker.MediaTypeOptions.Images,
       allowsMultipleSelection: true,
       quality: 0.8,
-      base64: true,
     });
 
     if (!result.canceled && result.assets) {
-      const newImages = result.assets
-        .slice(0, 4 - images.length)
-        .map((asset) => `data:image/jpeg;base64,${asset.base64}`);
-      setImages([...images, ...newImages]);
+      try {
+        const newImages = await uploadImages(
+          result.assets.slice(0, 4 - images.length),
+        );
+        setImages([...images, ...newImages]);
+      } catch (error) {
+        Alert.alert("Error", "Could not upload images");
+      }
     }
   };
 
@@ -350,6 +358,7 @@ export default function ReplyComposerScreen({
                 placeholderTextColor={colors.textSecondary}
                 value={content}
                 onChangeText={setContent}
+                {...mentions.inputProps}
                 multiline
                 autoFocus
                 maxLength={280}
@@ -357,6 +366,11 @@ export default function ReplyComposerScreen({
               <Text style={[styles.charCount, { color: colors.textSecondary }]}>
                 {content.length}/280
               </Text>
+              <MentionSuggestions
+                universeId={universeId}
+                suggestions={mentions.suggestions}
+                onSelect={mentions.choose}
+              />
             </View>
           </View>
         )}
@@ -96,7 +96,6 @@ export default function TrendsSearchScreen({
       mediaTypes: ImagePicker.MediaTypeOptions.Images,
       allowsEditing: true,
       quality: 0.8,
-      base64: true,
     });
     if (!result.canceled && result.assets[0]) {
       const uri = result.assets[0].uri;
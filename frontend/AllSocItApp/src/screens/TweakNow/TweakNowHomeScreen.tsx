@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef, useCallback } from "react";
 import {
   View,
   Text,
@@ -14,12 +14,21 @@ import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RouteProp } from "@react-navigation/native";
 import { Ionicons } from "@expo/vector-icons";
 import { TweakNowCharacter, Tweak } from "../../types/tweaknow";
-import TweetCard from "../../components/TweakNow/TweetCard";
+import FeedList from "../../components/TweakNow/FeedList";
 import CharacterAvatar from "../../components/TweakNow/CharacterAvatar";
 import SideDrawer from "../../components/TweakNow/SideDrawer";
 import { useTheme } from "../../contexts/ThemeContext";
 import { SafeAreaView } from "react-native-safe-area-context";
-import { characterAPI, tweakAPI, retweetAPI } from "../../services/tweaknow";
+import {
+  characterAPI,
+  tweakAPI,
+  retweetAPI,
+  likeAPI,
+  viewerStateAPI,
+  bootstrapAPI,
+} from "../../services/tweaknow";
+import { trackImpressions } from "../../services/impressions";
+import { subscribe } from "../../services/cache";
 
 type RootStackParamList = {
   TweakNow: { universeId: number };
@@ -45,6 +54,9 @@ type RootStackParamList = {
   TrendsSearch: { universeId: number };
 };
 
+// Constant: FlatList does not support changing it between renders
+const VIEWABILITY_CONFIG = { itemVisiblePercentThreshold: 60 };
+
 type TweakNowHomeScreenProps = {
   navigation: NativeStackNavigationProp<RootStackParamList, "TweakNow">;
   route: RouteProp<RootStackParamList, "TweakNow">;
@@ -69,16 +81,122 @@ export default function TweakNowHomeScreen({
     new Set(),
   );
   const [refreshing, setRefreshing] = useState(false);
+  const [feedMode, setFeedMode] = useState<"latest" | "for_you">("latest");
+
+  // A tweet counts as viewed once per screen visit, when it scrolls into view
+  const seenTweaks = useRef<Set<number>>(new Set());
+  const onViewableItemsChanged = useRef(
+    ({ viewableItems }: { viewableItems: any[] }) => {
+      const fresh: number[] = [];
+      viewableItems.forEach(({ item }) => {
+        const id = (item.tweak || item).id;
+        if (!seenTweaks.current.has(id)) {
+          seenTweaks.current.add(id);
+          fresh.push(id);
+        }
+      });
+      trackImpressions(universeId, fresh);
+    },
+  ).current;
 
   useEffect(() => {
     loadData();
   }, []);
 
-  const loadData = async () => {
+  // The ranked feed is personal, so it follows the selected character
+  useEffect(() => {
+    if (feedMode === "for_you" && currentCharacter) {
+      loadFeed();
+    }
+  }, [feedMode, currentCharacter]);
+
+  // Reads answer from the cache at once; background refreshes and
+  // optimistic writes land here
+  useEffect(
+    () =>
+      subscribe(universeId, () => {
+        characterAPI.getAll(universeId).then(setCharacters).catch(() => {});
+        (feedMode === "for_you" && currentCharacter
+          ? tweakAPI.getRanked(universeId, currentCharacter.id)
+          : tweakAPI.getAll(universeId)
+        )
+          .then(setTweaks)
+          .catch(() => {});
+      }),
+    [universeId, feedMode, currentCharacter],
+  );
+
+  const loadFeed = async (refresh = false) => {
     try {
+      if (feedMode === "for_you" && currentCharacter) {
+        setTweaks(
+          await tweakAPI.getRanked(universeId, currentCharacter.id, 50, {
+            refresh,
+          }),
+        );
+      } else {
+        setTweaks(await tweakAPI.getAll(universeId, { refresh }));
+      }
+    } catch (error) {
+      Alert.alert("Error", "Could not load feed");
+    }
+  };
+
+  // Flags that came with the screen's bootstrap, for this character
+  const bootstrappedViewer = useRef<number | null>(null);
+
+  // Liked/retweeted flags are per character, so reload them when either side changes
+  useEffect(() => {
+    if (currentCharacter && bootstrappedViewer.current === currentCharacter.id) {
+      bootstrappedViewer.current = null;
+      return;
+    }
+    if (currentCharacter && tweaks.length > 0) {
+      loadViewerState(currentCharacter.id, tweaks);
+    }
+  }, [currentCharacter, tweaks.length]);
+
+  const loadViewerState = async (characterId: number, feedItems: any[]) => {
+    const tweakIds = Array.from(
+      new Set(feedItems.map((item: any) => (item.tweak || item).id)),
+    ).slice(0, 500);
+    try {
+      const state = await viewerStateAPI.get(universeId, characterId, tweakIds);
+      setLikedTweaks(
+        new Set(state.tweaks.filter((t) => t.liked).map((t) => t.tweak_id)),
+      );
+      setRetweetedTweaks(
+        new Set(
+          state.tweaks.filter((t) => t.retweeted).map((t) => t.tweak_id),
+        ),
+      );
+    } catch (error) {
+      // Flags are cosmetic; the feed itself is still usable
+    }
+  };
+
+  const loadData = async (refresh = false) => {
+    try {
+      if (!refresh) {
+        // On a cold cache, one request fills it (and brings the first
+        // character's flags); the reads below are then answered from it
+        const bootstrap = await bootstrapAPI.load(universeId, "home", {
+          characterId: currentCharacter?.id,
+        });
+        const viewer = bootstrap?.viewer_state;
+        if (viewer) {
+          bootstrappedViewer.current = viewer.character_id;
+          setLikedTweaks(
+            new Set(viewer.tweaks.filter((t) => t.liked).map((t) => t.tweak_id)),
+          );
+          setRetweetedTweaks(
+            new Set(viewer.tweaks.filter((t) => t.retweeted).map((t) => t.tweak_id)),
+          );
+        }
+      }
       const [charactersData, feedData] = await Promise.all([
-        characterAPI.getAll(universeId),
-        tweakAPI.getAll(universeId), // Now returns feed items with retweets
+        characterAPI.getAll(universeId, { refresh }),
+        tweakAPI.getAll(universeId, { refresh }), // Now returns feed items with retweets
       ]);
       setCharacters(charactersData);
 
@@ -97,12 +215,20 @@ export default function TweakNowHomeScreen({
 
   const onRefresh = async () => {
     setRefreshing(true);
-    await loadData();
+    if (feedMode === "for_you") {
+      await loadFeed(true);
+    } else {
+      await loadData(true);
+    }
     setRefreshing(false);
   };
 
-  const getCharacterById = (id: number): TweakNowCharacter | undefined => {
-    return characters.find((c) => c.id === id);
+  const switchFeedMode = (mode: "latest" | "for_you") => {
+    if (mode === feedMode) return;
+    setFeedMode(mode);
+    if (mode === "latest") {
+      tweakAPI.getAll(universeId).then(setTweaks).catch(() => {});
+    }
   };
 
   const handleDeleteTweak = (tweak: any) => {
@@ -133,34 +259,48 @@ export default function TweakNowHomeScreen({
     setShowDrawer(false);
   };
 
-  const handleFeedLike = (item: any) => {
-    const tweak = item.tweak;
-    const alreadyLiked = likedTweaks.has(tweak.id);
+  const setLikeState = (tweakId: number, liked: boolean, likeCount: number) => {
     setLikedTweaks((prev) => {
       const next = new Set(prev);
-      alreadyLiked ? next.delete(tweak.id) : next.add(tweak.id);
+      liked ? next.add(tweakId) : next.delete(tweakId);
       return next;
     });
     setTweaks((prev) =>
       prev.map((feedItem: any) =>
-        feedItem.tweak.id === tweak.id
+        feedItem.tweak.id === tweakId
           ? {
               ...feedItem,
-              tweak: {
-                ...feedItem.tweak,
-                like_count: alreadyLiked
-                  ? feedItem.tweak.like_count - 1
-                  : feedItem.tweak.like_count + 1,
-              },
+              tweak: { ...feedItem.tweak, like_count: likeCount },
             }
           : feedItem,
       ),
     );
   };
 
-  const handleFeedRetweet = (item: any) => {
+  const handleFeedLike = async (tweak: Tweak) => {
+    if (!currentCharacter) return;
+    const alreadyLiked = likedTweaks.has(tweak.id);
+    const previousCount = tweak.like_count;
+
+    // Optimistic update, then settle on the server's count
+    setLikeState(
+      tweak.id,
+      !alreadyLiked,
+      alreadyLiked ? Math.max(0, previousCount - 1) : previousCount + 1,
+    );
+    try {
+      const result = alreadyLiked
+        ? await likeAPI.unlike(universeId, tweak.id, currentCharacter.id)
+        : await likeAPI.like(universeId, tweak.id, currentCharacter.id);
+      setLikeState(tweak.id, result.liked, result.like_count);
+    } catch (error) {
+      setLikeState(tweak.id, alreadyLiked, previousCount);
+      Alert.alert("Error", "Could not like tweak");
+    }
+  };
+
+  const handleFeedRetweet = (tweak: Tweak) => {
     if (!currentCharacter) return;
-    const tweak = item.tweak;
 
     Alert.alert("Retweet", "", [
       {
@@ -197,39 +337,12 @@ export default function TweakNowHomeScreen({
     ]);
   };
 
-  const renderTweak = ({ item }: { item: any }) => {
-    // Handle both old format (plain tweet) and new format (feed item with .tweak)
-    const tweak = item.tweak || item;
-    const character = getCharacterById(tweak.character_id);
-    if (!character) return null;
-
-    // If this is a retweet, show who retweeted it
-    const retweetedByName =
-      item.type === "retweet" && item.retweeted_by_character_id
-        ? getCharacterById(item.retweeted_by_character_id)?.name
-        : undefined;
-
-    // For quote tweets: use quoted_tweak from backend
-    const quotedTweak = item.quoted_tweak || null;
-    const quotedCharacter = quotedTweak
-      ? (getCharacterById(quotedTweak.character_id) ?? null)
-      : null;
-
-    return (
-      <TweetCard
-        tweak={tweak}
-        character={character}
-        isLiked={likedTweaks.has(tweak.id)}
-        isRetweeted={retweetedTweaks.has(tweak.id)}
-        onLike={() => handleFeedLike(item)}
-        onRetweet={() => handleFeedRetweet(item)}
-        onLongPress={() => handleDeleteTweak(tweak)}
-        retweetedByName={retweetedByName}
-        quotedTweak={quotedTweak}
-        quotedCharacter={quotedCharacter}
-      />
-    );
-  };
+  // Stable callbacks for the memoized feed rows; they call the latest handlers
+  const handlers = useRef({ handleFeedLike, handleFeedRetweet, handleDeleteTweak });
+  handlers.current = { handleFeedLike, handleFeedRetweet, handleDeleteTweak };
+  const onLike = useCallback((tweak: Tweak) => handlers.current.handleFeedLike(tweak), []);
+  const onRetweet = useCallback((tweak: Tweak) => handlers.current.handleFeedRetweet(tweak), []);
+  const onDelete = useCallback((tweak: Tweak) => handlers.current.handleDeleteTweak(tweak), []);
 
   if (loading) {
     return (
@@ -365,6 +478,34 @@ export default function TweakNowHomeScreen({
         </View>
       )}
 
+      {/* Feed Tabs */}
+      <View style={[styles.feedTabs, { borderBottomColor: colors.border }]}>
+        {(["latest", "for_you"] as const).map((mode) => (
+          <TouchableOpacity
+            key={mode}
+            style={[
+              styles.feedTab,
+              feedMode === mode && {
+                borderBottomColor: colors.primary,
+                borderBottomWidth: 3,
+              },
+            ]}
+            onPress={() => switchFeedMode(mode)}
+          >
+            <Text
+              style={[
+                styles.feedTabText,
+                {
+                  color: feedMode === mode ? colors.text : colors.textSecondary,
+                },
+              ]}
+            >
+              {mode === "latest" ? "Latest" : "For you"}
+            </Text>
+          </TouchableOpacity>
+        ))}
+      </View>
+
       {/* Tweet Feed */}
       {tweaks.length === 0 ? (
         <View style={styles.emptyContainer}>
@@ -381,13 +522,14 @@ export default function TweakNowHomeScreen({
           </Text>
         </View>
       ) : (
-        <FlatList
-          data={tweaks}
-          renderItem={renderTweak}
-          keyExtractor={(item) => {
-            const tweak = item.tweak || item;
-            return `${item.type || "tweet"}-${tweak.id}`;
-          }}
+        <FeedList
+          items={tweaks}
+          characters={characters}
+          likedTweaks={likedTweaks}
+          retweetedTweaks={retweetedTweaks}
+          onLike={onLike}
+          onRetweet={onRetweet}
+          onDelete={onDelete}
           refreshControl={
             <RefreshControl
               refreshing={refreshing}
@@ -397,6 +539,8 @@ export default function TweakNowHomeScreen({
           }
           contentContainerStyle={{ paddingBottom: 80 }}
           showsVerticalScrollIndicator={false}
+          onViewableItemsChanged={onViewableItemsChanged}
+          viewabilityConfig={VIEWABILITY_CONFIG}
         />
       )}
 
@@ -701,6 +845,19 @@ const styles = StyleSheet.create({
   container: {
     flex: 1,
   },
+  feedTabs: {
+    flexDirection: "row",
+    borderBottomWidth: 1,
+  },
+  feedTab: {
+    flex: 1,
+    alignItems: "center",
+    paddingVertical: 12,
+  },
+  feedTabText: {
+    fontSize: 15,
+    fontWeight: "600",
+  },
   centerContainer: {
     flex: 1,
     justifyContent: "center",
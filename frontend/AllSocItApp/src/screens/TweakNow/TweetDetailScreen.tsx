@@ -15,7 +15,13 @@ import { Ionicons } from "@expo/vector-icons";
 import { TweakNowCharacter, Tweak } from "../../types/tweaknow";
 import TweetCard from "../../components/TweakNow/TweetCard";
 import { useTheme } from "../../contexts/ThemeContext";
-import { characterAPI, tweakAPI, retweetAPI } from "../../services/tweaknow";
+import {
+  bootstrapAPI,
+  characterAPI,
+  tweakAPI,
+  retweetAPI,
+} from "../../services/tweaknow";
+import { trackImpressions } from "../../services/impressions";
 import { captureRef } from "react-native-view-shot";
 import * as Sharing from "expo-sharing";
 
@@ -60,7 +66,6 @@ export default function TweetDetailScreen({
   const [mainTweak, setMainTweak] = useState<Tweak | null>(null);
   const [replies, setReplies] = useState<Tweak[]>([]);
   const [characters, setCharacters] = useState<TweakNowCharacter[]>([]);
-  const [allTweaks, setAllTweaks] = useState<any[]>([]);
   const [quotedTweetData, setQuotedTweetData] = useState<any>(null);
   const [isLiked, setIsLiked] = useState(false);
   const [isRetweeted, setIsRetweeted] = useState(false);
@@ -76,6 +81,11 @@ export default function TweetDetailScreen({
     loadData();
   }, []);
 
+  // Opening a tweet counts as a view
+  useEffect(() => {
+    trackImpressions(universeId, [tweakId]);
+  }, [tweakId]);
+
   // ADD THIS NEW useEffect
   useEffect(() => {
     const unsubscribe = navigation.addListener("focus", () => {
@@ -86,47 +96,16 @@ export default function TweetDetailScreen({
 
   const loadData = async () => {
     try {
-      const [feedData, allCharacters] = await Promise.all([
-        tweakAPI.getAll(universeId), // Now returns feed items with quoted_tweak
+      // Thread and characters in one request when neither is cached
+      await bootstrapAPI.load(universeId, "detail", { tweakId });
+      const [thread, allCharacters] = await Promise.all([
+        tweakAPI.getThread(universeId, tweakId),
         characterAPI.getAll(universeId),
       ]);
 
-      // Extract actual tweets from feed items
-      const tweetsFromFeed = feedData.map((item: any) => item.tweak || item);
-      setAllTweaks(tweetsFromFeed);
-
-      const tweak = tweetsFromFeed.find((t: any) => t.id === tweakId);
-      if (tweak) {
-        setMainTweak(tweak);
-
-        // Find and set the quoted tweet data
-        const feedItem = feedData.find((item: any) => {
-          const t = item.tweak || item;
-          return t.id === tweakId;
-        });
-        console.log("Feed item found:", feedItem); // ADD THIS
-        console.log("Has quoted_tweak?", (feedItem as any)?.quoted_tweak);
-        if (feedItem && (feedItem as any).quoted_tweak) {
-          setQuotedTweetData((feedItem as any).quoted_tweak);
-        }
-
-        // Get ALL replies in this thread
-        const getAllRepliesInThread = (
-          rootId: number,
-          tweets: any[],
-        ): any[] => {
-          const directReplies = tweets.filter(
-            (t) => t.reply_to_tweak_id === rootId,
-          );
-          const nestedReplies = directReplies.flatMap((reply) =>
-            getAllRepliesInThread(reply.id, tweets),
-          );
-          return [...directReplies, ...nestedReplies];
-        };
-
-        const tweetReplies = getAllRepliesInThread(tweakId, tweetsFromFeed);
-        setReplies(tweetReplies);
-      }
+      setMainTweak(thread.tweak);
+      setQuotedTweetData(thread.quoted_tweak ?? null);
+      setReplies(thread.replies);
       setCharacters(allCharacters);
     } catch (error) {
       Alert.alert("Error", "Could not load tweet");
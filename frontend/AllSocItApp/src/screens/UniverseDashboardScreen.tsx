@@ -1,8 +1,9 @@
-import React from "react";
+import React, { useEffect, useState } from "react";
 import { View, Text, TouchableOpacity, StyleSheet, Alert } from "react-native";
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RouteProp } from "@react-navigation/native";
-import { RootStackParamList } from "../types";
+import { RootStackParamList, UniverseSummary } from "../types";
+import { universeAPI } from "../services/api";
 import { Ionicons } from "@expo/vector-icons";
 
 type UniverseDashboardScreenProps = {
@@ -18,6 +19,14 @@ export default function UniverseDashboardScreen({
   route,
 }: UniverseDashboardScreenProps) {
   const { universeId, universeName } = route.params;
+  const [summary, setSummary] = useState<UniverseSummary | null>(null);
+
+  useEffect(() => {
+    universeAPI
+      .getSummary(universeId)
+      .then(setSummary)
+      .catch(() => {});
+  }, [universeId]);
 
   const handleModulePress = (moduleName: string) => {
     if (moduleName === "TweakNow") {
@@ -36,10 +45,17 @@ export default function UniverseDashboardScreen({
         </TouchableOpacity>
         <View style={styles.headerCenter}>
           <Text style={styles.headerTitle}>{universeName}</Text>
-          <Text style={styles.headerSubtitle}>Choose a module</Text>
+          <Text style={styles.headerSubtitle}>
+            {summary && summary.character_count !== null
+              ? `${summary.character_count} characters · ${summary.tweak_count} tweaks`
+              : "Choose a module"}
+          </Text>
         </View>
         <TouchableOpacity
           onPress={() => Alert.alert("Settings", "Coming soon")}
+          onLongPress={
+            __DEV__ ? () => navigation.navigate("FeedBenchmark") : undefined
+          }
         >
           <Ionicons name="settings-outline" size={24} color="#1DA1F2" />
         </TouchableOpacity>
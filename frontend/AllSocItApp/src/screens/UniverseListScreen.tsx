@@ -9,7 +9,7 @@ import {
   ActivityIndicator,
 } from "react-native";
 import { universeAPI, authAPI } from "../services/api";
-import { Universe } from "../types";
+import { Universe, UniverseSummary } from "../types";
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RootStackParamList } from "../types";
 import { Ionicons } from "@expo/vector-icons";
@@ -22,7 +22,7 @@ type UniverseListScreenProps = {
 export default function UniverseListScreen({
   navigation,
 }: UniverseListScreenProps) {
-  const [universes, setUniverses] = useState<Universe[]>([]);
+  const [universes, setUniverses] = useState<UniverseSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [user, setUser] = useState<any>(null);
 
@@ -34,12 +34,10 @@ export default function UniverseListScreen({
 
   const loadData = async () => {
     try {
-      const [universesData, userData] = await Promise.all([
-        universeAPI.getAll(),
-        authAPI.getCurrentUser(),
-      ]);
-      setUniverses(universesData);
-      setUser(userData);
+      // One request for the user and the universes with their counts
+      const bootstrap = await universeAPI.getListBootstrap();
+      setUniverses(bootstrap.universes);
+      setUser(bootstrap.user);
     } catch (error) {
       Alert.alert("Error", "Could not load universes");
     } finally {
@@ -84,7 +82,7 @@ export default function UniverseListScreen({
     );
   };
 
-  const renderUniverse = ({ item }: { item: Universe }) => (
+  const renderUniverse = ({ item }: { item: UniverseSummary }) => (
     <TouchableOpacity
       style={styles.universeCard}
       onPress={() =>
@@ -104,6 +102,9 @@ export default function UniverseListScreen({
             <Text style={styles.universeDescription}>{item.description}</Text>
           )}
           <Text style={styles.universeDate}>
+            {item.character_count !== null
+              ? `${item.character_count} characters · ${item.tweak_count} tweaks · `
+              : ""}
             Created {new Date(item.created_at).toLocaleDateString()}
           </Text>
         </View>
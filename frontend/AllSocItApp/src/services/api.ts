@@ -1,5 +1,7 @@
-import axios from "axios";
+import axios, { InternalAxiosRequestConfig } from "axios";
 import AsyncStorage from "@react-native-async-storage/async-storage";
+import { ExportSummary, Job, UniverseListBootstrap, UniverseSummary } from "../types";
+import { clearCache, forgetUniverse } from "./cache";
 
 // Change this to your computer's local IP when testing on phone
 // Find it by running: ipconfig getifaddr en0 (Mac) or ipconfig (Windows)
@@ -12,13 +14,31 @@ const api = axios.create({
   },
 });
 
+// Position of our latest write on the primary database. Sending it back
+// lets the server route reads to a replica only once it has caught up.
+let lastWriteLsn: string | null = null;
+
+// The token is read from storage once, then kept in memory; login and
+// logout update both
+let accessToken: Promise<string | null> | null = null;
+
+const getAccessToken = () => {
+  if (!accessToken) {
+    accessToken = AsyncStorage.getItem("access_token");
+  }
+  return accessToken;
+};
+
 // Add token to requests automatically
 api.interceptors.request.use(
   async (config) => {
-    const token = await AsyncStorage.getItem("access_token");
+    const token = await getAccessToken();
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (lastWriteLsn) {
+      config.headers["X-Min-LSN"] = lastWriteLsn;
+    }
     return config;
   },
   (error) => {
@@ -26,6 +46,38 @@ api.interceptors.request.use(
   },
 );
 
+// Requests retried while an archived universe is restored, before giving up
+const MAX_WARMING_RETRIES = 5;
+
+api.interceptors.response.use(
+  (response) => {
+    const writeLsn = response.headers["x-write-lsn"];
+    if (writeLsn) {
+      lastWriteLsn = writeLsn;
+    }
+    return response;
+  },
+  async (error) => {
+    // 503 "warming": the universe was archived and its restore job is running
+    const config = error.config as (InternalAxiosRequestConfig & { warmingRetries?: number }) | undefined;
+    const body = error.response?.data;
+    if (error.response?.status !== 503 || body?.status !== "warming" || !config) {
+      return Promise.reject(error);
+    }
+    config.warmingRetries = (config.warmingRetries ?? 0) + 1;
+    if (config.warmingRetries > MAX_WARMING_RETRIES) {
+      return Promise.reject(error);
+    }
+    if (body.job_id) {
+      await jobsAPI.waitFor(body.job_id);
+    } else {
+      const retryAfter = Number(error.response.headers["retry-after"]) || 2;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
+    return api(config);
+  },
+);
+
 // Auth APIs
 export const authAPI = {
   signup: async (email: string, username: string, password: string) => {
@@ -50,11 +102,15 @@ export const authAPI = {
 
     // Save token
     await AsyncStorage.setItem("access_token", response.data.access_token);
+    accessToken = Promise.resolve(response.data.access_token);
     return response.data;
   },
 
   logout: async () => {
+    accessToken = Promise.resolve(null);
     await AsyncStorage.removeItem("access_token");
+    // The next account must not see this one's universes
+    await clearCache();
   },
 
   getCurrentUser: async () => {
@@ -70,6 +126,20 @@ export const universeAPI = {
     return response.data;
   },
 
+  // The list screen in one request: the user, and their universes with counts
+  getListBootstrap: async (): Promise<UniverseListBootstrap> => {
+    const response = await api.get("/universes/bootstrap");
+    return response.data;
+  },
+
+  // One universe with its counts
+  getSummary: async (id: number): Promise<UniverseSummary> => {
+    const response = await api.get(`/universes/${id}/bootstrap`, {
+      params: { screen: "dashboard" },
+    });
+    return response.data.universe;
+  },
+
   create: async (name: string, description?: string) => {
     const response = await api.post("/universes/", { name, description });
     return response.data;
@@ -85,8 +155,74 @@ export const universeAPI = {
     return response.data;
   },
 
-  delete: async (id: number) => {
-    await api.delete(`/universes/${id}`);
+  // The universe disappears at once; its rows are removed by the returned job
+  delete: async (id: number): Promise<Job> => {
+    const response = await api.delete(`/universes/${id}`);
+    await forgetUniverse(id);
+    return response.data;
+  },
+
+  // Alternate storylines: a branch shares its parent's rows until edited
+  createBranch: async (id: number, name: string, description?: string) => {
+    const response = await api.post(`/universes/${id}/branches`, { name, description });
+    return response.data;
+  },
+
+  getBranches: async (id: number) => {
+    const response = await api.get(`/universes/${id}/branches`);
+    return response.data;
+  },
+
+  mergeBranch: async (branchId: number) => {
+    const response = await api.post(`/universes/${branchId}/merge`);
+    return response.data;
+  },
+
+  // Queues the export; follow it with jobsAPI.waitFor for the ExportSummary
+  exportArchive: async (id: number): Promise<Job<ExportSummary>> => {
+    const response = await api.post(`/universes/${id}/export`);
+    return response.data;
+  },
+
+  reconcileCounters: async (id: number, exact = false): Promise<Job> => {
+    const response = await api.post(`/universes/${id}/reconcile`, null, { params: { exact } });
+    return response.data;
+  },
+};
+
+// Background job APIs
+const FINISHED_JOB_STATUSES = ["succeeded", "failed", "cancelled"];
+
+export const jobsAPI = {
+  getAll: async (status?: string): Promise<Job[]> => {
+    const response = await api.get("/jobs/", { params: { status } });
+    return response.data;
+  },
+
+  get: async <Result = Record<string, unknown>>(id: number): Promise<Job<Result>> => {
+    const response = await api.get(`/jobs/${id}`);
+    return response.data;
+  },
+
+  cancel: async (id: number): Promise<Job> => {
+    const response = await api.post(`/jobs/${id}/cancel`);
+    return response.data;
+  },
+
+  // Poll until the job ends; onProgress sees every intermediate state
+  waitFor: async <Result = Record<string, unknown>>(
+    id: number,
+    onProgress?: (job: Job<Result>) => void,
+    intervalMs = 1000,
+  ): Promise<Job<Result>> => {
+    for (;;) {
+      const job = await jobsAPI.get<Result>(id);
+      onProgress?.(job);
+      if (FINISHED_JOB_STATUSES.includes(job.status)) {
+        return job;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
   },
 };
 
@@ -0,0 +1,322 @@
+import AsyncStorage from "@react-native-async-storage/async-storage";
+import { Tweak, TweakNowCharacter } from "../types/tweaknow";
+
+// Client-side cache for TweakNow reads, one store per universe.
+//
+// Tweets and characters are kept once each, by id; a cached response holds
+// references to them ({ $ref: "tweaks", id }) instead of copies, so a like
+// or an edit applied to a tweet shows up in every feed, profile page and
+// thread that contains it. Reads are stale-while-revalidate: a cached
+// response is returned at once, and one older than STALE_AFTER_MS is
+// fetched again in the background, with subscribers told when it lands.
+// Identical requests in flight share one promise. Stores are written to
+// AsyncStorage shortly after they change and read back the first time a
+// universe is opened, so a cold start shows the last feed without waiting.
+
+const STALE_AFTER_MS = 30_000;
+const PERSIST_DELAY_MS = 1000;
+// AsyncStorage rows are capped at a few MB on Android; larger stores stay in memory
+const PERSIST_MAX_CHARS = 2_000_000;
+const STORAGE_PREFIX = "tweaknow-cache:v1:";
+
+type EntityKind = "tweaks" | "characters";
+
+interface Ref {
+  $ref: EntityKind;
+  id: number;
+}
+
+interface QueryEntry {
+  // The response with every tweet and character replaced by a Ref
+  data: unknown;
+  fetchedAt: number;
+}
+
+interface UniverseStore {
+  tweaks: Record<number, Tweak>;
+  characters: Record<number, TweakNowCharacter>;
+  queries: Record<string, QueryEntry>;
+}
+
+type Listener = () => void;
+
+const stores = new Map<number, UniverseStore>();
+const loading = new Map<number, Promise<UniverseStore>>();
+const inFlight = new Map<string, Promise<unknown>>();
+const listeners = new Map<number, Set<Listener>>();
+const persistTimers = new Map<number, ReturnType<typeof setTimeout>>();
+
+const emptyStore = (): UniverseStore => ({ tweaks: {}, characters: {}, queries: {} });
+
+const storeFor = (universeId: number): Promise<UniverseStore> => {
+  const store = stores.get(universeId);
+  if (store) return Promise.resolve(store);
+  let pending = loading.get(universeId);
+  if (!pending) {
+    pending = AsyncStorage.getItem(STORAGE_PREFIX + universeId)
+      .then((saved) => (saved ? (JSON.parse(saved) as UniverseStore) : emptyStore()))
+      .catch(() => emptyStore())
+      .then((loaded) => {
+        // A write may have created the store while the disk read was pending
+        const current = stores.get(universeId) ?? loaded;
+        stores.set(universeId, current);
+        loading.delete(universeId);
+        return current;
+      });
+    loading.set(universeId, pending);
+  }
+  return pending;
+};
+
+const schedulePersist = (universeId: number) => {
+  if (persistTimers.has(universeId)) return;
+  persistTimers.set(
+    universeId,
+    setTimeout(() => {
+      persistTimers.delete(universeId);
+      const store = stores.get(universeId);
+      if (!store) return;
+      const serialized = JSON.stringify(store);
+      const key = STORAGE_PREFIX + universeId;
+      (serialized.length <= PERSIST_MAX_CHARS
+        ? AsyncStorage.setItem(key, serialized)
+        : AsyncStorage.removeItem(key)
+      ).catch(() => {});
+    }, PERSIST_DELAY_MS),
+  );
+};
+
+const changed = (universeId: number) => {
+  schedulePersist(universeId);
+  listeners.get(universeId)?.forEach((listener) => listener());
+};
+
+// ===== NORMALIZING =====
+const isTweak = (value: any): value is Tweak =>
+  typeof value.id === "number" && typeof value.content === "string" && "character_id" in value;
+
+const isCharacter = (value: any): value is TweakNowCharacter =>
+  typeof value.id === "number" && typeof value.username === "string" && "universe_id" in value;
+
+const isRef = (value: any): value is Ref =>
+  value !== null && typeof value === "object" && "$ref" in value && typeof value.id === "number";
+
+const normalize = (store: UniverseStore, value: any): any => {
+  if (Array.isArray(value)) return value.map((item) => normalize(store, item));
+  if (value === null || typeof value !== "object") return value;
+  const fields: Record<string, any> = {};
+  for (const [key, field] of Object.entries(value)) {
+    fields[key] = normalize(store, field);
+  }
+  if (isTweak(fields)) {
+    store.tweaks[fields.id] = fields;
+    return { $ref: "tweaks", id: fields.id };
+  }
+  if (isCharacter(fields)) {
+    store.characters[fields.id] = fields;
+    return { $ref: "characters", id: fields.id };
+  }
+  return fields;
+};
+
+const resolvedEntities = new WeakMap<object, any>();
+
+// Undefined when a referenced entity is gone (deleted locally): the entry is dropped
+const denormalize = (store: UniverseStore, value: any): any => {
+  if (Array.isArray(value)) {
+    return value
+      .map((item) => denormalize(store, item))
+      .filter((item) => item !== undefined);
+  }
+  if (value === null || typeof value !== "object") return value;
+  if (isRef(value)) {
+    const entity = store[value.$ref][value.id];
+    if (entity === undefined) return undefined;
+    // Entities are replaced when they change, so one resolved copy per
+    // entity object keeps its identity across reads (memoized rows rely on it)
+    let resolved = resolvedEntities.get(entity);
+    if (!resolved) {
+      resolved = denormalize(store, entity);
+      resolvedEntities.set(entity, resolved);
+    }
+    return resolved;
+  }
+  const result: Record<string, any> = {};
+  for (const [key, field] of Object.entries(value)) {
+    const resolved = denormalize(store, field);
+    // A feed item whose tweet was deleted goes with it; a missing quote becomes null
+    if (resolved === undefined) {
+      if (key === "tweak") return undefined;
+      result[key] = null;
+    } else {
+      result[key] = resolved;
+    }
+  }
+  return result;
+};
+
+// ===== READING =====
+const fetchInto = <T>(universeId: number, key: string, fetcher: () => Promise<T>): Promise<T> => {
+  const flightKey = `${universeId}:${key}`;
+  let pending = inFlight.get(flightKey) as Promise<T> | undefined;
+  if (!pending) {
+    pending = fetcher()
+      .then(async (data) => {
+        const store = await storeFor(universeId);
+        store.queries[key] = { data: normalize(store, data), fetchedAt: Date.now() };
+        changed(universeId);
+        return data;
+      })
+      .finally(() => inFlight.delete(flightKey));
+    inFlight.set(flightKey, pending);
+  }
+  return pending;
+};
+
+/**
+ * The cached response for `key` if there is one (fetched again in the
+ * background once stale), otherwise the fetched one. `refresh` waits for
+ * a fresh response, e.g. for pull-to-refresh.
+ */
+export const cachedQuery = async <T>(
+  universeId: number,
+  key: string,
+  fetcher: () => Promise<T>,
+  options: { refresh?: boolean; maxAgeMs?: number } = {},
+): Promise<T> => {
+  const store = await storeFor(universeId);
+  const entry = store.queries[key];
+  if (!entry || options.refresh) {
+    return fetchInto(universeId, key, fetcher);
+  }
+  if (Date.now() - entry.fetchedAt > (options.maxAgeMs ?? STALE_AFTER_MS)) {
+    fetchInto(universeId, key, fetcher).catch(() => {});
+  }
+  return denormalize(store, entry.data) as T;
+};
+
+// Whether every one of `keys` has a cached response, however old
+export const hasQueries = async (universeId: number, keys: string[]): Promise<boolean> => {
+  const store = await storeFor(universeId);
+  return keys.every((key) => key in store.queries);
+};
+
+// Store responses fetched some other way (a screen bootstrap) as if each had been read by key
+export const primeQueries = async (universeId: number, responses: Record<string, unknown>) => {
+  const store = await storeFor(universeId);
+  const fetchedAt = Date.now();
+  Object.entries(responses).forEach(([key, data]) => {
+    store.queries[key] = { data: normalize(store, data), fetchedAt };
+  });
+  changed(universeId);
+};
+
+// The cached entities themselves, for screens that need one tweet or character
+export const peekTweak = (universeId: number, tweakId: number): Tweak | undefined =>
+  stores.get(universeId)?.tweaks[tweakId];
+
+export const peekCharacter = (
+  universeId: number,
+  characterId: number,
+): TweakNowCharacter | undefined => stores.get(universeId)?.characters[characterId];
+
+// Called whenever the universe's cache changes (background refreshes, writes)
+export const subscribe = (universeId: number, listener: Listener): (() => void) => {
+  const set = listeners.get(universeId) ?? new Set<Listener>();
+  set.add(listener);
+  listeners.set(universeId, set);
+  return () => {
+    set.delete(listener);
+  };
+};
+
+// ===== WRITING =====
+// Entities and cached responses are replaced, never edited in place, so
+// that a rollback only needs the previous maps
+export interface CacheDraft {
+  tweaks: Record<number, Tweak>;
+  characters: Record<number, TweakNowCharacter>;
+  // Edit cached responses in their normalized form (see `ref`)
+  updateQuery: (key: string, update: (data: any) => any) => void;
+  // Cached responses whose key starts with `prefix` are fetched before their next use
+  invalidate: (prefix: string) => void;
+}
+
+export const ref = (kind: EntityKind, id: number): Ref => ({ $ref: kind, id });
+
+const draftOf = (store: UniverseStore): CacheDraft => ({
+  tweaks: store.tweaks,
+  characters: store.characters,
+  updateQuery: (key, update) => {
+    const entry = store.queries[key];
+    if (entry) store.queries[key] = { ...entry, data: update(entry.data) };
+  },
+  invalidate: (prefix) => {
+    Object.keys(store.queries)
+      .filter((key) => key.startsWith(prefix))
+      .forEach((key) => delete store.queries[key]);
+  },
+});
+
+// Apply a change to the cache now
+export const updateCache = async (universeId: number, apply: (draft: CacheDraft) => void) => {
+  const store = await storeFor(universeId);
+  apply(draftOf(store));
+  changed(universeId);
+};
+
+/**
+ * Apply `apply` to the cache at once, then send `request`. On success
+ * `settle` reconciles the cache with the server's answer; on failure the
+ * cache goes back to how it was and the error is rethrown.
+ */
+export const optimistic = async <T>(
+  universeId: number,
+  apply: (draft: CacheDraft) => void,
+  request: () => Promise<T>,
+  settle?: (draft: CacheDraft, result: T) => void,
+): Promise<T> => {
+  const store = await storeFor(universeId);
+  const snapshot: UniverseStore = {
+    tweaks: { ...store.tweaks },
+    characters: { ...store.characters },
+    queries: { ...store.queries },
+  };
+  apply(draftOf(store));
+  changed(universeId);
+  try {
+    const result = await request();
+    if (settle) {
+      settle(draftOf(store), result);
+      changed(universeId);
+    }
+    return result;
+  } catch (error) {
+    // Back to the snapshot, fetched again on next use in case responses arrived meanwhile
+    store.tweaks = snapshot.tweaks;
+    store.characters = snapshot.characters;
+    store.queries = Object.fromEntries(
+      Object.entries(snapshot.queries).map(([key, entry]) => [key, { ...entry, fetchedAt: 0 }]),
+    );
+    changed(universeId);
+    throw error;
+  }
+};
+
+// Forget everything, in memory and on disk (logout)
+export const clearCache = async () => {
+  stores.clear();
+  inFlight.clear();
+  persistTimers.forEach((timer) => clearTimeout(timer));
+  persistTimers.clear();
+  const keys = await AsyncStorage.getAllKeys();
+  await AsyncStorage.multiRemove(keys.filter((key) => key.startsWith(STORAGE_PREFIX)));
+};
+
+// Drop one universe's cache (the universe was deleted)
+export const forgetUniverse = async (universeId: number) => {
+  stores.delete(universeId);
+  clearTimeout(persistTimers.get(universeId));
+  persistTimers.delete(universeId);
+  await AsyncStorage.removeItem(STORAGE_PREFIX + universeId);
+};
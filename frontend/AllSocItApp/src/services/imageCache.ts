@@ -0,0 +1,108 @@
+import { useEffect, useState } from "react";
+import * as FileSystem from "expo-file-system/legacy";
+
+// Inline images (data: URIs) are written to disk once, named by a hash of
+// their content, and shown from the file from then on. Handing <Image> a
+// multi-megabyte base64 string makes the native side parse and decode it
+// again every time a row mounts; a file URI is decoded once and served from
+// the platform's own decoded-image cache after that. The same picture on
+// many tweets (an avatar, a reused banner) is one file. Other URIs (uploaded
+// media served over HTTP) are left to the platform's HTTP cache.
+
+const CACHE_DIR = FileSystem.cacheDirectory ? `${FileSystem.cacheDirectory}images/` : null;
+// data: URI -> file URI, most recently used last
+const MAX_REMEMBERED = 1000;
+
+const remembered = new Map<string, string>();
+const pending = new Map<string, Promise<string>>();
+let directoryReady: Promise<void> | null = null;
+
+const isDataUri = (uri: string) => uri.startsWith("data:");
+
+// cyrb53: a fast 53-bit string hash, plenty to tell images apart by name
+const contentHash = (text: string): string => {
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(36);
+};
+
+const remember = (uri: string, fileUri: string) => {
+  remembered.delete(uri);
+  remembered.set(uri, fileUri);
+  if (remembered.size > MAX_REMEMBERED) {
+    remembered.delete(remembered.keys().next().value as string);
+  }
+};
+
+const writeToDisk = async (uri: string): Promise<string> => {
+  const [prefix, payload] = uri.split(",", 2);
+  const extension = /^data:image\/(\w+)/.exec(prefix)?.[1] ?? "img";
+  if (!CACHE_DIR || !payload || !prefix.endsWith(";base64")) return uri;
+
+  if (!directoryReady) {
+    directoryReady = FileSystem.makeDirectoryAsync(CACHE_DIR, { intermediates: true }).catch(() => {});
+  }
+  await directoryReady;
+  const fileUri = `${CACHE_DIR}${contentHash(payload)}.${extension}`;
+  const info = await FileSystem.getInfoAsync(fileUri);
+  if (!info.exists) {
+    await FileSystem.writeAsStringAsync(fileUri, payload, {
+      encoding: FileSystem.EncodingType.Base64,
+    });
+  }
+  return fileUri;
+};
+
+// The URI to display right now: a cached file, a non-inline URI, or undefined while writing
+export const cachedImageUri = (uri: string): string | undefined => {
+  if (!isDataUri(uri) || !CACHE_DIR) return uri;
+  const fileUri = remembered.get(uri);
+  if (fileUri) remember(uri, fileUri);
+  return fileUri;
+};
+
+export const cacheImage = (uri: string): Promise<string> => {
+  const known = cachedImageUri(uri);
+  if (known) return Promise.resolve(known);
+  let write = pending.get(uri);
+  if (!write) {
+    write = writeToDisk(uri)
+      // Showing the inline image beats showing none
+      .catch(() => uri)
+      .then((fileUri) => {
+        remember(uri, fileUri);
+        pending.delete(uri);
+        return fileUri;
+      });
+    pending.set(uri, write);
+  }
+  return write;
+};
+
+export const useCachedImageUri = (uri?: string | null): string | undefined => {
+  const [resolved, setResolved] = useState(() => (uri ? cachedImageUri(uri) : undefined));
+  useEffect(() => {
+    if (!uri) {
+      setResolved(undefined);
+      return;
+    }
+    const known = cachedImageUri(uri);
+    setResolved(known);
+    if (known) return;
+    let current = true;
+    cacheImage(uri).then((fileUri) => {
+      if (current) setResolved(fileUri);
+    });
+    return () => {
+      current = false;
+    };
+  }, [uri]);
+  return resolved;
+};
@@ -0,0 +1,46 @@
+import api from "./api";
+
+// Impressions are queued on the device and sent in batches; the server sums
+// them in memory as well, so each view costs neither a request nor a row write.
+const FLUSH_INTERVAL_MS = 5000;
+const MAX_BATCH = 200;
+
+const queues = new Map<number, number[]>();
+let timer: ReturnType<typeof setTimeout> | null = null;
+
+const flushUniverse = async (universeId: number) => {
+  const queue = queues.get(universeId);
+  if (!queue || queue.length === 0) return;
+  const batch = queue.splice(0, MAX_BATCH);
+  try {
+    await api.post(`/tweaknow/universes/${universeId}/impressions`, {
+      tweak_ids: batch,
+    });
+  } catch (error) {
+    // View counts are best effort; drop the batch rather than retrying forever
+  }
+  if (queue.length > 0) {
+    flushUniverse(universeId);
+  }
+};
+
+export const flushImpressions = () => {
+  if (timer) {
+    clearTimeout(timer);
+    timer = null;
+  }
+  queues.forEach((_, universeId) => flushUniverse(universeId));
+};
+
+export const trackImpressions = (universeId: number, tweakIds: number[]) => {
+  if (tweakIds.length === 0) return;
+  const queue = queues.get(universeId) ?? [];
+  queue.push(...tweakIds);
+  queues.set(universeId, queue);
+
+  if (queue.length >= MAX_BATCH) {
+    flushImpressions();
+  } else if (!timer) {
+    timer = setTimeout(flushImpressions, FLUSH_INTERVAL_MS);
+  }
+};
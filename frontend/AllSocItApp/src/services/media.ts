@@ -0,0 +1,38 @@
+import api from "./api";
+import { ImagePickerAsset } from "expo-image-picker";
+
+export interface UploadedMedia {
+  id: number;
+  sha256: string;
+  content_type: string;
+  size_bytes: number;
+  url: string;
+  created_at: string;
+}
+
+// Picked images are uploaded as multipart file parts straight from disk
+// rather than inlined as base64 JSON; tweets and characters store the URL.
+export const mediaAPI = {
+  upload: async (assets: ImagePickerAsset[]): Promise<UploadedMedia[]> => {
+    const form = new FormData();
+    assets.forEach((asset, index) => {
+      form.append("files", {
+        uri: asset.uri,
+        name: asset.fileName ?? `image-${index}.jpg`,
+        type: asset.mimeType ?? "image/jpeg",
+      } as any);
+    });
+    const response = await api.post("/media/", form, {
+      headers: { "Content-Type": "multipart/form-data" },
+    });
+    return response.data;
+  },
+};
+
+export const uploadImages = async (
+  assets: ImagePickerAsset[],
+): Promise<string[]> => {
+  if (assets.length === 0) return [];
+  const uploaded = await mediaAPI.upload(assets);
+  return uploaded.map((media) => media.url);
+};
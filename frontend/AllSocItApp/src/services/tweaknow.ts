@@ -1,4 +1,13 @@
 import api from "./api";
+import {
+  CacheDraft,
+  cachedQuery,
+  hasQueries,
+  optimistic,
+  primeQueries,
+  ref,
+  updateCache,
+} from "./cache";
 import {
   TweakNowCharacter,
   CreateCharacterInput,
@@ -10,74 +19,249 @@ import {
   CreateTemplateInput,
   Trend,
   UpdateTrendInput,
+  LikeResult,
+  ViewerState,
+  FollowPage,
+  FollowSuggestion,
+  CharacterProfile,
+  ProfileTab,
+  ProfileTweakPage,
+  TweakThread,
+  BootstrapScreen,
+  ScreenBootstrap,
+  AutocompleteSuggestion,
 } from "../types/tweaknow";
 
+// Reads go through the client cache (services/cache.ts): cached responses
+// come back at once and are refreshed in the background; pass
+// { refresh: true } to wait for the server. Writes update the cache
+// optimistically and roll it back if the request fails.
+type ReadOptions = { refresh?: boolean };
+
+// Responses that depend on which tweets exist, dropped after a write the
+// cache cannot apply locally (the server decides order and counts)
+const invalidateTweetLists = (draft: CacheDraft) => {
+  ["feed", "for_you", "profile", "thread"].forEach(draft.invalidate);
+};
+
+const patchTweak = (draft: CacheDraft, tweakId: number, patch: Partial<Tweak>) => {
+  const tweak = draft.tweaks[tweakId];
+  if (tweak) draft.tweaks[tweakId] = { ...tweak, ...patch };
+};
+
 // Character APIs
 export const characterAPI = {
-  getAll: async (universeId: number): Promise<TweakNowCharacter[]> => {
-    const response = await api.get(
-      `/tweaknow/universes/${universeId}/characters`,
-    );
-    return response.data;
-  },
+  getAll: async (
+    universeId: number,
+    options: ReadOptions = {},
+  ): Promise<TweakNowCharacter[]> =>
+    cachedQuery(
+      universeId,
+      "characters",
+      async () => {
+        const response = await api.get(
+          `/tweaknow/universes/${universeId}/characters`,
+        );
+        return response.data;
+      },
+      options,
+    ),
 
   create: async (data: CreateCharacterInput): Promise<TweakNowCharacter> => {
     const response = await api.post(
       `/tweaknow/universes/${data.universe_id}/characters`,
       data,
     );
-    return response.data;
+    const created: TweakNowCharacter = response.data;
+    await updateCache(data.universe_id, (draft) => {
+      draft.characters[created.id] = created;
+      draft.updateQuery("characters", (list: any[]) => [...list, ref("characters", created.id)]);
+    });
+    return created;
   },
 
   update: async (
     universeId: number,
     characterId: number,
     data: UpdateCharacterInput,
-  ): Promise<TweakNowCharacter> => {
-    const response = await api.put(
-      `/tweaknow/universes/${universeId}/characters/${characterId}`,
-      data,
-    );
-    return response.data;
-  },
+  ): Promise<TweakNowCharacter> =>
+    optimistic(
+      universeId,
+      (draft) => {
+        const character = draft.characters[characterId];
+        if (character) draft.characters[characterId] = { ...character, ...data };
+      },
+      async () => {
+        const response = await api.put(
+          `/tweaknow/universes/${universeId}/characters/${characterId}`,
+          data,
+        );
+        return response.data as TweakNowCharacter;
+      },
+      (draft, updated) => {
+        draft.characters[characterId] = updated;
+      },
+    ),
 
-  delete: async (universeId: number, characterId: number): Promise<void> => {
-    await api.delete(
-      `/tweaknow/universes/${universeId}/characters/${characterId}`,
+  // Their tweets go too, so every tweet list is fetched again afterwards
+  delete: async (universeId: number, characterId: number): Promise<void> =>
+    optimistic(
+      universeId,
+      (draft) => {
+        delete draft.characters[characterId];
+      },
+      async () => {
+        await api.delete(
+          `/tweaknow/universes/${universeId}/characters/${characterId}`,
+        );
+      },
+      invalidateTweetLists,
+    ),
+
+  // Header data and counts; viewerId adds follow flags
+  getProfile: async (
+    universeId: number,
+    characterId: number,
+    viewerId?: number,
+    options: ReadOptions = {},
+  ): Promise<CharacterProfile> =>
+    cachedQuery(
+      universeId,
+      `profile:${characterId}:${viewerId ?? ""}`,
+      async () => {
+        const response = await api.get(
+          `/tweaknow/universes/${universeId}/characters/${characterId}/profile`,
+          { params: viewerId ? { viewer_id: viewerId } : {} },
+        );
+        return response.data;
+      },
+      options,
+    ),
+
+  // One page of a profile tab; pass next_cursor back for the next page.
+  // Only first pages are cached.
+  getTweaks: async (
+    universeId: number,
+    characterId: number,
+    tab: ProfileTab,
+    cursor?: string | null,
+    limit: number = 20,
+    options: ReadOptions = {},
+  ): Promise<ProfileTweakPage> => {
+    const fetchPage = async () => {
+      const response = await api.get(
+        `/tweaknow/universes/${universeId}/characters/${characterId}/tweaks`,
+        { params: cursor ? { tab, cursor, limit } : { tab, limit } },
+      );
+      return response.data;
+    };
+    if (cursor) return fetchPage();
+    return cachedQuery(
+      universeId,
+      `profile-tweaks:${characterId}:${tab}:${limit}`,
+      fetchPage,
+      options,
     );
   },
 };
 
 // Tweak APIs
 export const tweakAPI = {
-  getAll: async (universeId: number): Promise<Tweak[]> => {
-    const response = await api.get(`/tweaknow/universes/${universeId}/tweaks`);
-    return response.data;
-  },
+  getAll: async (universeId: number, options: ReadOptions = {}): Promise<Tweak[]> =>
+    cachedQuery(
+      universeId,
+      "feed",
+      async () => {
+        const response = await api.get(`/tweaknow/universes/${universeId}/tweaks`);
+        return response.data;
+      },
+      options,
+    ),
+
+  // "For You" feed: top-level tweets ranked for one character
+  getRanked: async (
+    universeId: number,
+    characterId: number,
+    limit: number = 50,
+    options: ReadOptions = {},
+  ): Promise<any[]> =>
+    cachedQuery(
+      universeId,
+      `for_you:${characterId}:${limit}`,
+      async () => {
+        const response = await api.get(`/tweaknow/universes/${universeId}/tweaks`, {
+          params: { mode: "for_you", character_id: characterId, limit },
+        });
+        return response.data;
+      },
+      options,
+    ),
+
+  getThread: async (
+    universeId: number,
+    tweakId: number,
+    options: ReadOptions = {},
+  ): Promise<TweakThread> =>
+    cachedQuery(
+      universeId,
+      `thread:${tweakId}`,
+      async () => {
+        const response = await api.get(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}/thread`,
+        );
+        return response.data;
+      },
+      options,
+    ),
 
   create: async (data: CreateTweakInput): Promise<Tweak> => {
     const response = await api.post(
       `/tweaknow/universes/${data.universe_id}/tweaks`,
       data,
     );
-    return response.data;
+    const created: Tweak = response.data;
+    await updateCache(data.universe_id, (draft) => {
+      draft.tweaks[created.id] = created;
+      invalidateTweetLists(draft);
+    });
+    return created;
   },
 
   update: async (
     universeId: number,
     tweakId: number,
     data: UpdateTweakInput,
-  ): Promise<Tweak> => {
-    const response = await api.put(
-      `/tweaknow/universes/${universeId}/tweaks/${tweakId}`,
-      data,
-    );
-    return response.data;
-  },
+  ): Promise<Tweak> =>
+    optimistic(
+      universeId,
+      (draft) => patchTweak(draft, tweakId, data),
+      async () => {
+        const response = await api.put(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}`,
+          data,
+        );
+        return response.data as Tweak;
+      },
+      (draft, updated) => {
+        draft.tweaks[tweakId] = updated;
+      },
+    ),
 
-  delete: async (universeId: number, tweakId: number): Promise<void> => {
-    await api.delete(`/tweaknow/universes/${universeId}/tweaks/${tweakId}`);
-  },
+  // Cached lists drop the tweet at once; counts on its parent are refetched
+  delete: async (universeId: number, tweakId: number): Promise<void> =>
+    optimistic(
+      universeId,
+      (draft) => {
+        delete draft.tweaks[tweakId];
+      },
+      async () => {
+        await api.delete(`/tweaknow/universes/${universeId}/tweaks/${tweakId}`);
+      },
+      (draft) => {
+        draft.invalidate("profile");
+        draft.invalidate("thread");
+      },
+    ),
 };
 
 // Retweet APIs
@@ -86,23 +270,42 @@ export const retweetAPI = {
     universeId: number,
     tweakId: number,
     characterId: number,
-  ): Promise<any> => {
-    const response = await api.post(
-      `/tweaknow/universes/${universeId}/tweaks/${tweakId}/retweet`,
-      { character_id: characterId, tweak_id: tweakId },
-    );
-    return response.data;
-  },
+  ): Promise<any> =>
+    optimistic(
+      universeId,
+      (draft) =>
+        patchTweak(draft, tweakId, {
+          retweet_count: (draft.tweaks[tweakId]?.retweet_count ?? 0) + 1,
+        }),
+      async () => {
+        const response = await api.post(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}/retweet`,
+          { character_id: characterId, tweak_id: tweakId },
+        );
+        return response.data;
+      },
+      // The feed gains a retweet item, placed by the server
+      invalidateTweetLists,
+    ),
 
   delete: async (
     universeId: number,
     tweakId: number,
     characterId: number,
-  ): Promise<void> => {
-    await api.delete(
-      `/tweaknow/universes/${universeId}/tweaks/${tweakId}/retweet/${characterId}`,
-    );
-  },
+  ): Promise<void> =>
+    optimistic(
+      universeId,
+      (draft) =>
+        patchTweak(draft, tweakId, {
+          retweet_count: Math.max(0, (draft.tweaks[tweakId]?.retweet_count ?? 0) - 1),
+        }),
+      async () => {
+        await api.delete(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}/retweet/${characterId}`,
+        );
+      },
+      invalidateTweetLists,
+    ),
 
   checkStatus: async (
     universeId: number,
@@ -116,6 +319,71 @@ export const retweetAPI = {
   },
 };
 
+// The server's count wins; the likes tab of profiles changed too
+const settleLike = (tweakId: number) => (draft: CacheDraft, result: LikeResult) => {
+  patchTweak(draft, tweakId, { like_count: result.like_count });
+  draft.invalidate("profile");
+};
+
+// Like APIs
+export const likeAPI = {
+  like: async (
+    universeId: number,
+    tweakId: number,
+    characterId: number,
+  ): Promise<LikeResult> =>
+    optimistic(
+      universeId,
+      (draft) =>
+        patchTweak(draft, tweakId, {
+          like_count: (draft.tweaks[tweakId]?.like_count ?? 0) + 1,
+        }),
+      async () => {
+        const response = await api.post(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}/like`,
+          { character_id: characterId },
+        );
+        return response.data as LikeResult;
+      },
+      settleLike(tweakId),
+    ),
+
+  unlike: async (
+    universeId: number,
+    tweakId: number,
+    characterId: number,
+  ): Promise<LikeResult> =>
+    optimistic(
+      universeId,
+      (draft) =>
+        patchTweak(draft, tweakId, {
+          like_count: Math.max(0, (draft.tweaks[tweakId]?.like_count ?? 0) - 1),
+        }),
+      async () => {
+        const response = await api.delete(
+          `/tweaknow/universes/${universeId}/tweaks/${tweakId}/like/${characterId}`,
+        );
+        return response.data as LikeResult;
+      },
+      settleLike(tweakId),
+    ),
+};
+
+// Viewer state: liked / retweeted / following flags for a page of tweets
+export const viewerStateAPI = {
+  get: async (
+    universeId: number,
+    characterId: number,
+    tweakIds: number[],
+  ): Promise<ViewerState> => {
+    const response = await api.post(
+      `/tweaknow/universes/${universeId}/viewer-state`,
+      { character_id: characterId, tweak_ids: tweakIds },
+    );
+    return response.data;
+  },
+};
+
 // Template APIs
 export const templateAPI = {
   getAll: async (): Promise<TweakTemplate[]> => {
@@ -143,6 +411,7 @@ export const followAPI = {
     await api.post(
       `/tweaknow/universes/${universeId}/characters/${followerId}/follow/${followingId}`,
     );
+    await updateCache(universeId, (draft) => draft.invalidate("profile"));
   },
 
   unfollow: async (
@@ -153,6 +422,7 @@ export const followAPI = {
     await api.delete(
       `/tweaknow/universes/${universeId}/characters/${followerId}/unfollow/${followingId}`,
     );
+    await updateCache(universeId, (draft) => draft.invalidate("profile"));
   },
 
   checkFollowing: async (
@@ -169,14 +439,68 @@ export const followAPI = {
     );
     return response.data;
   },
+
+  getFollowers: async (
+    universeId: number,
+    characterId: number,
+    options: { relativeTo?: number; cursor?: number | null; limit?: number } = {},
+  ): Promise<FollowPage> => {
+    const response = await api.get(
+      `/tweaknow/universes/${universeId}/characters/${characterId}/followers`,
+      {
+        params: {
+          relative_to: options.relativeTo,
+          cursor: options.cursor ?? undefined,
+          limit: options.limit,
+        },
+      },
+    );
+    return response.data;
+  },
+
+  getSuggestions: async (
+    universeId: number,
+    characterId: number,
+    limit: number = 20,
+  ): Promise<FollowSuggestion[]> => {
+    const response = await api.get(
+      `/tweaknow/universes/${universeId}/characters/${characterId}/suggestions`,
+      { params: { limit } },
+    );
+    return response.data;
+  },
+
+  getFollowing: async (
+    universeId: number,
+    characterId: number,
+    options: { relativeTo?: number; cursor?: number | null; limit?: number } = {},
+  ): Promise<FollowPage> => {
+    const response = await api.get(
+      `/tweaknow/universes/${universeId}/characters/${characterId}/following`,
+      {
+        params: {
+          relative_to: options.relativeTo,
+          cursor: options.cursor ?? undefined,
+          limit: options.limit,
+        },
+      },
+    );
+    return response.data;
+  },
 };
 
 // Trend APIs
 export const trendAPI = {
-  getAll: async (universeId: number): Promise<Trend[]> => {
-    const response = await api.get(`/tweaknow/universes/${universeId}/trends`);
-    return response.data;
-  },
+  getAll: async (universeId: number, options: ReadOptions = {}): Promise<Trend[]> =>
+    cachedQuery(
+      universeId,
+      "trends",
+      async () => {
+        const response = await api.get(`/tweaknow/universes/${universeId}/trends`);
+        return response.data;
+      },
+      options,
+    ),
 
   create: async (
     universeId: number,
@@ -187,6 +511,7 @@ export const trendAPI = {
       `/tweaknow/universes/${universeId}/trends`,
       { name, tweet_count, universe_id: universeId },
     );
+    await updateCache(universeId, (draft) => draft.invalidate("trends"));
     return response.data;
   },
 
@@ -199,10 +524,123 @@ export const trendAPI = {
       `/tweaknow/universes/${universeId}/trends/${trendId}`,
       data,
     );
+    await updateCache(universeId, (draft) => draft.invalidate("trends"));
     return response.data;
   },
 
   delete: async (universeId: number, trendId: number): Promise<void> => {
     await api.delete(`/tweaknow/universes/${universeId}/trends/${trendId}`);
+    await updateCache(universeId, (draft) => draft.invalidate("trends"));
+  },
+};
+
+// Screen bootstraps: everything a screen needs in one request
+// (GET /universes/{id}/bootstrap). The cacheable parts are stored under the
+// keys the single reads above use, so the screen then reads them from the
+// cache as usual.
+export interface BootstrapParams {
+  characterId?: number;
+  viewerId?: number;
+  tweakId?: number;
+  mode?: "latest" | "for_you";
+  limit?: number;
+}
+
+const PROFILE_PAGE_SIZE = 20;
+
+// Cache key of each cacheable part, as the reads above name them
+const bootstrapKeys = (
+  screen: BootstrapScreen,
+  params: BootstrapParams,
+): Partial<Record<keyof ScreenBootstrap, string>> => {
+  const feed =
+    params.mode === "for_you" && params.characterId
+      ? `for_you:${params.characterId}:${params.limit ?? 50}`
+      : "feed";
+  switch (screen) {
+    case "home":
+      return { characters: "characters", feed };
+    case "notifications":
+      return { characters: "characters", feed: "feed" };
+    case "profile":
+      return {
+        profile: `profile:${params.characterId}:${params.viewerId ?? ""}`,
+        tweaks: `profile-tweaks:${params.characterId}:tweets:${PROFILE_PAGE_SIZE}`,
+      };
+    case "detail":
+      return { thread: `thread:${params.tweakId}`, characters: "characters" };
+    case "composer":
+      return { characters: "characters" };
+    case "trends":
+      return { trends: "trends" };
+    default:
+      return {};
+  }
+};
+
+export const bootstrapAPI = {
+  /**
+   * Fetch `screen`'s bootstrap and cache its parts. Resolves to null without
+   * a request when the cache already holds them all (unless `refresh`): the
+   * screen's cached reads answer at once and revalidate on their own.
+   */
+  load: async (
+    universeId: number,
+    screen: BootstrapScreen,
+    params: BootstrapParams = {},
+    options: ReadOptions = {},
+  ): Promise<ScreenBootstrap | null> => {
+    const keys = bootstrapKeys(screen, params);
+    const cacheKeys = Object.values(keys) as string[];
+    if (
+      !options.refresh &&
+      cacheKeys.length > 0 &&
+      (await hasQueries(universeId, cacheKeys))
+    ) {
+      return null;
+    }
+    const response = await api.get(`/universes/${universeId}/bootstrap`, {
+      params: {
+        screen,
+        character_id: params.characterId,
+        viewer_id: params.viewerId,
+        tweak_id: params.tweakId,
+        mode: params.mode,
+        limit: params.limit,
+      },
+    });
+    const bootstrap: ScreenBootstrap = response.data;
+    const responses: Record<string, unknown> = {};
+    (Object.keys(keys) as (keyof ScreenBootstrap)[]).forEach((part) => {
+      if (bootstrap[part] !== undefined) responses[keys[part]!] = bootstrap[part];
+    });
+    await primeQueries(universeId, responses);
+    return bootstrap;
+  },
+};
+
+// Answers are kept briefly, so backspacing over a token doesn't ask again
+const AUTOCOMPLETE_TTL_MS = 10_000;
+const AUTOCOMPLETE_MAX_KEPT = 200;
+const autocompleteAnswers = new Map<string, { at: number; suggestions: AutocompleteSuggestion[] }>();
+
+export const autocompleteAPI = {
+  // "@jo": characters, "#ja": hashtags, a bare prefix: both; best first
+  suggest: async (
+    universeId: number,
+    query: string,
+    limit = 8,
+  ): Promise<AutocompleteSuggestion[]> => {
+    const key = `${universeId}:${limit}:${query}`;
+    const kept = autocompleteAnswers.get(key);
+    if (kept && Date.now() - kept.at < AUTOCOMPLETE_TTL_MS) return kept.suggestions;
+    const response = await api.get(`/tweaknow/universes/${universeId}/autocomplete`, {
+      params: { q: query, limit },
+    });
+    if (autocompleteAnswers.size >= AUTOCOMPLETE_MAX_KEPT) {
+      autocompleteAnswers.delete(autocompleteAnswers.keys().next().value as string);
+    }
+    autocompleteAnswers.set(key, { at: Date.now(), suggestions: response.data });
+    return response.data;
   },
 };
@@ -26,10 +26,61 @@ export interface Universe {
   name: string;
   description?: string;
   user_id: number;
+  // Set on branches: the universe this alternate storyline forked from
+  parent_universe_id?: number | null;
+  // Anything but "live" means its rows are in cold storage or being restored
+  storage?: UniverseStorage;
+  last_accessed_at?: string | null;
+  archived_at?: string | null;
   created_at: string;
   updated_at?: string;
 }
 
+export type UniverseStorage = "live" | "archiving" | "archived" | "warming";
+
+// A universe with its size; the counts are null while its rows are archived
+export interface UniverseSummary extends Universe {
+  character_count: number | null;
+  tweak_count: number | null;
+  // Story time of its newest tweet
+  last_tweak_at: string | null;
+}
+
+// GET /universes/bootstrap: everything the universe list shows
+export interface UniverseListBootstrap {
+  user: User;
+  universes: UniverseSummary[];
+}
+
+// Result of refreshing a universe's static archive (POST /universes/{id}/export)
+export interface ExportSummary {
+  pages_written: number;
+  pages_unchanged: number;
+  pages_removed: number;
+  media_written: number;
+}
+
+// Background job (GET /jobs/{id}); `result` holds e.g. an ExportSummary once succeeded
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export interface Job<Result = Record<string, unknown>> {
+  id: number;
+  kind: string;
+  universe_id?: number | null;
+  status: JobStatus;
+  priority: number;
+  progress: number;
+  progress_message?: string | null;
+  attempts: number;
+  max_attempts: number;
+  cancel_requested: boolean;
+  result?: Result | null;
+  error?: string | null;
+  created_at?: string | null;
+  started_at?: string | null;
+  finished_at?: string | null;
+}
+
 export interface CreateUniverseInput {
   name: string;
   description?: string;
@@ -74,4 +125,6 @@ export type RootStackParamList = {
     quotedCharacter: TweakNowCharacter;
   };
   TrendsSearch: { universeId: number };
+  // Development only (long-press the dashboard's settings button)
+  FeedBenchmark: undefined;
 };
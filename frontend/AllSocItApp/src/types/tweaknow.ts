@@ -1,3 +1,5 @@
+import type { UniverseSummary } from "./index";
+
 // // Character types
 // export interface TweakNowCharacter {
 //   id: number;
@@ -202,6 +204,32 @@ export interface Tweak {
   quoted_tweak_id?: number | null;
 }
 
+// A tweet with its whole reply tree (GET /tweaks/{id}/thread)
+export interface TweakThread {
+  tweak: Tweak;
+  quoted_tweak?: Tweak | null;
+  // Every reply below `tweak`, oldest first; nest them by reply_to_tweak_id
+  replies: Tweak[];
+}
+
+export interface LikeResult {
+  liked: boolean;
+  like_count: number;
+}
+
+// Per-character flags for a page of tweets (POST /viewer-state)
+export interface TweakViewerState {
+  tweak_id: number;
+  liked: boolean;
+  retweeted: boolean;
+  following_author: boolean;
+}
+
+export interface ViewerState {
+  character_id: number;
+  tweaks: TweakViewerState[];
+}
+
 export interface CreateTweakInput {
   universe_id: number;
   character_id: number;
@@ -256,6 +284,59 @@ export interface CreateTemplateInput {
   source_label?: string;
 }
 
+// Follower / following lists
+export interface CharacterSummary {
+  id: number;
+  name: string;
+  username: string;
+  profile_picture?: string;
+  official_mark: "Blue" | "Gold" | "Grey" | "None";
+  is_private: boolean;
+}
+
+export interface FollowListItem {
+  character: CharacterSummary;
+  followed_at?: string;
+  // Set when the list was requested relative to a character
+  followed_by_viewer?: boolean | null;
+  follows_viewer?: boolean | null;
+  mutual?: boolean | null;
+}
+
+export interface FollowSuggestion {
+  character: CharacterSummary;
+  score: number;
+  mutual_count: number;
+  engagement_count: number;
+  followers_count: number;
+}
+
+export interface FollowPage {
+  items: FollowListItem[];
+  next_cursor: number | null;
+}
+
+// Profile header with real counts (GET /characters/{id}/profile)
+export interface CharacterProfile {
+  character: TweakNowCharacter;
+  tweet_count: number;
+  reply_count: number;
+  media_count: number;
+  like_count: number;
+  followers_count: number;
+  following_count: number;
+  followed_by_viewer?: boolean | null;
+  follows_viewer?: boolean | null;
+}
+
+export type ProfileTab = "tweets" | "replies" | "media" | "likes";
+
+export interface ProfileTweakPage {
+  items: Tweak[];
+  authors: CharacterSummary[];
+  next_cursor: string | null;
+}
+
 // Trend types
 export interface Trend {
   id: number;
@@ -279,3 +360,41 @@ export interface UpdateTrendInput {
   header_image?: string;
   header_text?: string;
 }
+
+// GET /universes/{id}/bootstrap?screen=...: only the requested screen's parts are present
+export type BootstrapScreen =
+  | "dashboard"
+  | "home"
+  | "notifications"
+  | "profile"
+  | "detail"
+  | "composer"
+  | "trends";
+
+export interface ScreenBootstrap {
+  screen: BootstrapScreen;
+  universe?: UniverseSummary;
+  characters?: TweakNowCharacter[];
+  feed?: any[];
+  // Lists only the tweets the character liked or retweeted
+  viewer_state?: ViewerState | null;
+  profile?: CharacterProfile;
+  // First page of the profile's "tweets" tab
+  tweaks?: ProfileTweakPage;
+  thread?: TweakThread;
+  templates?: TweakTemplate[];
+  trends?: Trend[];
+}
+
+// GET /tweaknow/universes/{id}/autocomplete?q=@jo: characters and hashtags for the composer
+export interface AutocompleteSuggestion {
+  kind: "character" | "hashtag";
+  // The text to insert: "@username" or "#tag"
+  value: string;
+  character_id?: number;
+  name?: string;
+  username?: string;
+  official_mark?: string;
+  // Hashtags: tweets using it
+  count?: number;
+}